@@ -3,30 +3,154 @@ AI Model Router for Robin AI
 Routes requests to different AI models based on configuration settings.
 Supports OpenAI API and Ollama local models with graceful fallbacks.
 """
+import asyncio
 import json
 import logging
 import os
 import time
-from typing import Any, Dict, List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from backend_health import BackendHealth, LatencyEWMA
+from completion_cache import CompletionCache, get_completion_cache
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Backend connection and health settings
+OLLAMA_POOL_SIZE = int(os.environ.get("OLLAMA_POOL_SIZE", "10"))
+MODEL_HEALTH_INTERVAL = float(os.environ.get("MODEL_HEALTH_INTERVAL", "10"))
+MODEL_BREAKER_THRESHOLD = int(os.environ.get("MODEL_BREAKER_THRESHOLD", "3"))
+MODEL_BREAKER_RESET = float(os.environ.get("MODEL_BREAKER_RESET", "30"))
+OLLAMA_PROBE_TIMEOUT = 2
+# Streaming: (connect, read) timeout - the read timeout applies between chunks, not to the whole reply
+STREAM_TIMEOUT = (5, 30)
+
+# Concurrent (hedged) routing, see generate_response_async
+MODEL_HEDGING = os.environ.get("MODEL_HEDGING", "false").lower() == "true"
+MODEL_HEDGE_DELAY_MS = float(os.environ.get("MODEL_HEDGE_DELAY_MS", "0"))  # 0: the model's estimated p95
+DEFAULT_HEDGE_DELAY = 2.0  # seconds, until a model has latency samples
+MIN_HEDGE_DELAY = 0.05
+FAILURE_LATENCY_PENALTY = 30.0  # seconds recorded for a failed call (the generation timeout)
+OLLAMA_MAX_IN_FLIGHT = int(os.environ.get("OLLAMA_MAX_IN_FLIGHT", "4"))
+OPENAI_MAX_IN_FLIGHT = int(os.environ.get("OPENAI_MAX_IN_FLIGHT", "16"))
+MODEL_LATENCY_ALPHA = float(os.environ.get("MODEL_LATENCY_ALPHA", "0.2"))
+
+
+class OllamaBackend:
+    """
+    Keep-alive session and cached health for one Ollama server, shared by
+    every AIModelRouter pointing at the same base URL
+    """
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=OLLAMA_POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # Model list from the last successful health probe (/api/tags)
+        self.models: List[Dict[str, Any]] = []
+        # Requests in flight to this server, across all routers
+        self.slots = threading.BoundedSemaphore(OLLAMA_MAX_IN_FLIGHT)
+        self.health = BackendHealth(
+            "ollama", probe=self._probe, interval=MODEL_HEALTH_INTERVAL,
+            failure_threshold=MODEL_BREAKER_THRESHOLD, reset_timeout=MODEL_BREAKER_RESET
+        )
+
+    def _probe(self) -> bool:
+        response = self.session.get(f"{self.base_url}/api/tags", timeout=OLLAMA_PROBE_TIMEOUT)
+        if response.status_code != 200:
+            return False
+        try:
+            self.models = response.json().get("models", [])
+        except ValueError:
+            self.models = []
+        return True
+
+
+_ollama_backends: Dict[str, OllamaBackend] = {}
+_ollama_backends_lock = threading.Lock()
+_openai_slots = threading.BoundedSemaphore(OPENAI_MAX_IN_FLIGHT)
+_model_latency: Dict[str, LatencyEWMA] = {}
+_model_latency_lock = threading.Lock()
+# Worker threads for generate_response_async. Not the event loop's default executor, so
+# asyncio.run() doesn't wait for a cancelled (losing) request to finish before returning.
+_backend_executor = ThreadPoolExecutor(
+    max_workers=OLLAMA_MAX_IN_FLIGHT + OPENAI_MAX_IN_FLIGHT, thread_name_prefix="model-backend"
+)
+
+
+def get_ollama_backend(base_url: str) -> OllamaBackend:
+    """The shared OllamaBackend for a base URL"""
+    with _ollama_backends_lock:
+        backend = _ollama_backends.get(base_url)
+        if backend is None:
+            backend = _ollama_backends[base_url] = OllamaBackend(base_url)
+        return backend
+
+
+def get_model_latency(model: str) -> LatencyEWMA:
+    """The shared response-time average for a model"""
+    with _model_latency_lock:
+        latency = _model_latency.get(model)
+        if latency is None:
+            latency = _model_latency[model] = LatencyEWMA(MODEL_LATENCY_ALPHA)
+        return latency
+
+
+def _event_loop_running() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+def to_sse(events: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """
+    Format stream events as Server-Sent Events
+
+    Each event dict's "type" becomes the SSE event name and the rest is
+    sent as the JSON data line.
+    """
+    for event in events:
+        data = {key: value for key, value in event.items() if key != "type"}
+        yield f"event: {event.get('type', 'message')}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
 class AIModelRouter:
     """
     Routes AI requests to different models based on environment configuration
     and handles fallbacks automatically when models are unavailable.
     """
     
-    def __init__(self):
-        """Initialize the AI Model Router with configuration from environment variables"""
+    def __init__(self, db_manager=None):
+        """
+        Initialize the AI Model Router with configuration from environment variables
+        
+        Args:
+            db_manager: Optional DatabaseManager; completions cached with
+                        cache_site= are then persisted to response_cache
+        """
         # Load configuration from environment variables
         self.model_backend = os.environ.get("MODEL_BACKEND", "auto").lower()
         self.ollama_base_url = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
         self.openai_api_key = os.environ.get("OPENAI_API_KEY", "")
         
+        # Pooled connections and cached availability
+        self.ollama = get_ollama_backend(self.ollama_base_url)
+        self.openai_health = BackendHealth(
+            "openai", failure_threshold=MODEL_BREAKER_THRESHOLD, reset_timeout=MODEL_BREAKER_RESET
+        )
+        self._openai_client = None
+        self.hedging = MODEL_HEDGING
+        self.completion_cache = get_completion_cache(db_manager)
+        
         # Supported models
         self.ollama_models = ["openchat", "mistral", "phi"]
         self.openai_models = ["gpt-4", "gpt-4o"]
@@ -93,12 +217,12 @@ class AIModelRouter:
         return "openchat"
     
     def is_ollama_running(self) -> bool:
-        """Check if Ollama is running and accessible"""
-        try:
-            response = requests.get(f"{self.ollama_base_url}/api/tags", timeout=2)
-            return response.status_code == 200
-        except Exception:
-            return False
+        """Check if Ollama is running and accessible (cached; see backend_health)"""
+        return self.ollama.health.is_available()
+    
+    def start_health_checks(self):
+        """Probe Ollama on a background thread so routing never waits on a probe"""
+        self.ollama.health.start()
     
     def get_available_models(self) -> Dict[str, List[str]]:
         """Get lists of available models"""
@@ -107,18 +231,16 @@ class AIModelRouter:
         # Check Ollama models
         if self.is_ollama_running():
             try:
-                response = requests.get(f"{self.ollama_base_url}/api/tags", timeout=3)
-                if response.status_code == 200:
-                    models_data = response.json()
-                    available_ollama_models = []
-                    
-                    # Get all models from Ollama that we support
-                    for model in models_data.get("models", []):
-                        model_name = model.get("name", "").split(":")[0]
-                        if model_name.lower() in [m.lower() for m in self.ollama_models]:
-                            available_ollama_models.append(model_name)
-                    
-                    available_models["ollama"] = available_ollama_models
+                # Model list cached by the last health probe
+                available_ollama_models = []
+                
+                # Get all models from Ollama that we support
+                for model in self.ollama.models:
+                    model_name = model.get("name", "").split(":")[0]
+                    if model_name.lower() in [m.lower() for m in self.ollama_models]:
+                        available_ollama_models.append(model_name)
+                
+                available_models["ollama"] = available_ollama_models
             except Exception as e:
                 logger.error(f"Error getting Ollama models: {e}")
         
@@ -177,12 +299,18 @@ class AIModelRouter:
         }
         
         try:
-            response = requests.post(
+            call_start = time.time()
+            response = self.ollama.session.post(
                 f"{self.ollama_base_url}/api/generate",
                 json=payload,
                 timeout=30  # 30 second timeout for generation
             )
             
+            if response.status_code >= 500:
+                self.ollama.health.record_failure()
+            else:
+                self.ollama.health.record_success()
+            
             if response.status_code != 200:
                 error_msg = f"Ollama API error: {response.status_code}"
                 try:
@@ -202,6 +330,7 @@ class AIModelRouter:
                 }
             
             result = response.json()
+            get_model_latency(model).record(time.time() - call_start)
             
             # Update usage metrics
             self.request_count += 1
@@ -221,6 +350,8 @@ class AIModelRouter:
             logger.error(f"Error calling Ollama API: {str(e)}")
             # Update error metrics
             self.error_count += 1
+            if isinstance(e, requests.RequestException):
+                self.ollama.health.record_failure()
             
             return {
                 "success": False,
@@ -264,18 +395,28 @@ class AIModelRouter:
                 "error_type": "missing_api_key"
             }
         
+        if not self.openai_health.is_available():
+            return {
+                "success": False,
+                "error": "OpenAI API temporarily unavailable after repeated failures",
+                "model": model,
+                "timestamp": time.time(),
+                "content": None,
+                "error_type": "service_unavailable"
+            }
+        
         try:
-            # Import needed for OpenAI client
-            import openai
-            from openai import OpenAI
-            
-            # Initialize the OpenAI client
-            client = OpenAI(api_key=self.openai_api_key)
+            # Reuse one client (and its connection pool) per router
+            if self._openai_client is None:
+                from openai import OpenAI
+                self._openai_client = OpenAI(api_key=self.openai_api_key)
+            client = self._openai_client
             
             # Default system prompt if not provided
             system = system_prompt if system_prompt else "You are Robin AI, a helpful and friendly assistant."
             
             # Create completion request
+            call_start = time.time()
             response = client.chat.completions.create(
                 model=model,
                 messages=[
@@ -288,6 +429,8 @@ class AIModelRouter:
             )
             
             # Process the response based on whether streaming is enabled
+            self.openai_health.record_success()
+            
             if stream:
                 # For streaming, return a generator (not implemented here)
                 return {
@@ -301,6 +444,7 @@ class AIModelRouter:
             else:
                 # For regular response
                 content = response.choices[0].message.content
+                get_model_latency(model).record(time.time() - call_start)
                 
                 # Update usage metrics
                 self.request_count += 1
@@ -326,6 +470,7 @@ class AIModelRouter:
             
             # Update error metrics
             self.error_count += 1
+            self.openai_health.record_failure()
             
             # Check for quota exceeded error
             error_type = "api_exception"
@@ -343,6 +488,384 @@ class AIModelRouter:
                 "suggestion": "Try using 'auto' mode which will fall back to local models when OpenAI is unavailable."
             }
     
+    def _stream_ollama(self, prompt: str, model: str, system: str,
+                       temperature: float, max_tokens: int) -> Iterator[str]:
+        """Yield text chunks from Ollama's NDJSON /api/generate stream"""
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "system": system,
+            "stream": True,
+            "options": {
+                "temperature": temperature,
+                "num_predict": max_tokens
+            }
+        }
+        try:
+            response = self.ollama.session.post(
+                f"{self.ollama_base_url}/api/generate",
+                json=payload,
+                stream=True,
+                timeout=STREAM_TIMEOUT
+            )
+        except requests.RequestException:
+            self.ollama.health.record_failure()
+            raise
+        
+        with response:
+            if response.status_code != 200:
+                if response.status_code >= 500:
+                    self.ollama.health.record_failure()
+                raise RuntimeError(f"Ollama API error: {response.status_code}")
+            self.ollama.health.record_success()
+            
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(chunk["error"])
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    return
+    
+    def _stream_openai(self, prompt: str, model: str, system: str,
+                       temperature: float, max_tokens: int) -> Iterator[str]:
+        """Yield text chunks from OpenAI's streamed chat completion"""
+        if not self.openai_health.is_available():
+            raise RuntimeError("OpenAI API temporarily unavailable after repeated failures")
+        if self._openai_client is None:
+            from openai import OpenAI
+            self._openai_client = OpenAI(api_key=self.openai_api_key)
+        
+        try:
+            response = self._openai_client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+        except Exception:
+            self.openai_health.record_failure()
+            raise
+        self.openai_health.record_success()
+        
+        for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    def _backend_plan(self, model: Optional[str]) -> List[tuple]:
+        """(backend, model) pairs to try in order, mirroring generate_response's routing and fallbacks"""
+        openai_ready = bool(self.openai_api_key) and self.openai_health.is_available()
+        
+        if model and model.lower() != "auto":
+            if model.lower() in [m.lower() for m in self.ollama_models]:
+                plan = [("ollama", model)]
+                if openai_ready:
+                    plan.append(("openai", "gpt-4o"))
+                return plan
+            if model.lower() in [m.lower() for m in self.openai_models]:
+                plan = [("openai", model)] if openai_ready else []
+                if self.is_ollama_running():
+                    plan.append(("ollama", self.ollama_models[0]))
+                return plan
+            return []
+        
+        plan = []
+        if self.model_backend == "ollama":
+            if self.is_ollama_running():
+                plan.append(("ollama", self.ollama_models[0]))
+            if openai_ready:
+                plan.append(("openai", "gpt-4o"))
+        else:
+            if openai_ready:
+                plan.append(("openai", "gpt-4o"))
+            if self.is_ollama_running():
+                plan.append(("ollama", self.ollama_models[0]))
+        return plan
+    
+    def stream_response(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        cache_site: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream an AI response token by token
+        
+        Yields {"type": "token", "content": ...} events as the backend
+        produces them, then one final event: {"type": "done", ...} with the
+        full content, model and time_to_first_token_ms, or {"type": "error",
+        ...}. A backend that fails before its first token falls back to the
+        next one, as generate_response does; once tokens have been sent the
+        error is reported instead.
+        
+        Args:
+            prompt: The user's input text
+            model: Optional specific model to use (overrides MODEL_BACKEND)
+            system_prompt: Optional system instructions for the model
+            temperature: Controls randomness (0.0 to 1.0)
+            max_tokens: Maximum tokens to generate
+            cache_site: Opt in to the completion cache (see generate_response);
+                        a hit is sent as a single token event
+        """
+        start_time = time.time()
+        system = system_prompt if system_prompt else "You are Robin AI, a helpful and friendly assistant."
+        
+        cache_key = None
+        if cache_site:
+            cache_key = self._completion_key(prompt, model, system_prompt, temperature, max_tokens)
+            cached = self.completion_cache.get(cache_key, cache_site)
+            if cached is not None:
+                yield {"type": "token", "content": cached["content"]}
+                yield {
+                    "type": "done",
+                    **cached,
+                    "cached": True,
+                    "time_to_first_token_ms": round((time.time() - start_time) * 1000, 1)
+                }
+                return
+        
+        plan = self._backend_plan(model)
+        if not plan:
+            yield {
+                "type": "error",
+                "error": f"No AI backend available for model: {model or self.model_backend}",
+                "error_type": "no_backends_available",
+                "model": model,
+                "timestamp": time.time()
+            }
+            return
+        
+        error = None
+        for index, (backend, backend_model) in enumerate(plan):
+            stream = self._stream_ollama if backend == "ollama" else self._stream_openai
+            parts = []
+            first_token_ms = None
+            try:
+                for token in stream(prompt, backend_model, system, temperature, max_tokens):
+                    if first_token_ms is None:
+                        first_token_ms = (time.time() - start_time) * 1000
+                        logger.info(f"Time to first token: {first_token_ms:.0f}ms ({backend_model})")
+                    parts.append(token)
+                    yield {"type": "token", "content": token}
+            except Exception as e:
+                error = str(e)
+                logger.error(f"Error streaming from {backend}: {error}")
+                self.error_count += 1
+                if parts:
+                    yield {
+                        "type": "error",
+                        "error": error,
+                        "error_type": "stream_interrupted",
+                        "model": backend_model,
+                        "content": "".join(parts),
+                        "timestamp": time.time()
+                    }
+                    return
+                continue
+            
+            total_ms = (time.time() - start_time) * 1000
+            self.request_count += 1
+            self.last_model_used = backend_model
+            self.last_request_time = time.time()
+            logger.info(f"Streamed response using {backend_model} in {total_ms / 1000:.2f}s")
+            
+            done = {
+                "type": "done",
+                "success": True,
+                "content": "".join(parts),
+                "model": backend_model,
+                "time_to_first_token_ms": round(first_token_ms, 1) if first_token_ms is not None else None,
+                "total_time_ms": round(total_ms, 1),
+                "timestamp": time.time()
+            }
+            if index > 0:
+                done["original_model"] = model or plan[0][1]
+                done["fallback"] = True
+            # A fallback reply would be cached under the requested model; don't reuse it
+            if cache_key and index == 0:
+                self.completion_cache.put(cache_key, {
+                    key: value for key, value in done.items()
+                    if key not in ("type", "time_to_first_token_ms", "total_time_ms")
+                }, cache_site)
+            yield done
+            return
+        
+        yield {
+            "type": "error",
+            "error": error,
+            "error_type": "api_exception",
+            "model": plan[-1][1],
+            "timestamp": time.time()
+        }
+    
+    def _rank_by_latency(self, plan: List[tuple]) -> List[tuple]:
+        """
+        Order auto-mode candidates by recent response time; unmeasured models go
+        first, in plan order, and backends with an open circuit go last
+        """
+        def key(candidate):
+            backend, backend_model = candidate
+            health = self.ollama.health if backend == "ollama" else self.openai_health
+            latency = get_model_latency(backend_model)
+            return (health.breaker.is_open(),) + ((1, latency.mean) if latency.samples else (0, 0.0))
+        return sorted(plan, key=key)
+    
+    def _hedge_delay(self, model: str) -> float:
+        """Seconds to wait for a model before starting the next backend"""
+        if MODEL_HEDGE_DELAY_MS > 0:
+            return MODEL_HEDGE_DELAY_MS / 1000
+        p95 = get_model_latency(model).p95()
+        return max(p95, MIN_HEDGE_DELAY) if p95 is not None else DEFAULT_HEDGE_DELAY
+    
+    def _call_backend(self, backend: str, model: str, slots: threading.BoundedSemaphore,
+                      prompt: str, system_prompt: Optional[str],
+                      temperature: float, max_tokens: int) -> Dict[str, Any]:
+        """Run one blocking completion (in a worker thread) and release its in-flight slot"""
+        try:
+            complete = self.complete_with_ollama if backend == "ollama" else self.complete_with_openai
+            call_start = time.time()
+            result = complete(
+                prompt=prompt,
+                model=model,
+                system_prompt=system_prompt,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+            if not result.get("success"):
+                # Successes are recorded by complete_with_*; without a penalty sample
+                # a model that keeps failing would keep its old (or no) latency and stay first
+                get_model_latency(model).record(max(time.time() - call_start, FAILURE_LATENCY_PENALTY))
+            return result
+        finally:
+            slots.release()
+    
+    async def generate_response_async(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        hedge: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Generate an AI response, running fallbacks concurrently instead of one after another
+        
+        Candidates are the same as generate_response's, but in auto mode they
+        are ordered by each model's recent response time (EWMA). The next
+        candidate starts as soon as the current one fails or, with hedge,
+        if it hasn't answered within its estimated p95 (MODEL_HEDGE_DELAY_MS
+        overrides the estimate). The first success wins and the other
+        requests are cancelled; a request already running in a worker
+        thread finishes in the background and its result is dropped.
+        Backends at their in-flight cap (OLLAMA_MAX_IN_FLIGHT,
+        OPENAI_MAX_IN_FLIGHT) are skipped.
+        
+        Args:
+            prompt: The user's input text
+            model: Optional specific model to use (overrides MODEL_BACKEND)
+            system_prompt: Optional system instructions for the model
+            temperature: Controls randomness (0.0 to 1.0)
+            max_tokens: Maximum tokens to generate
+            hedge: Start the next backend when the current one is slow
+            
+        Returns:
+            Dict with response content and metadata, as generate_response
+        """
+        start_time = time.time()
+        plan = self._backend_plan(model)
+        if not model or model.lower() == "auto":
+            plan = self._rank_by_latency(plan)
+        if not plan:
+            return {
+                "success": False,
+                "error": f"No AI backend available for model: {model or self.model_backend}",
+                "model": model,
+                "timestamp": time.time(),
+                "content": None,
+                "error_type": "no_backends_available"
+            }
+        
+        remaining = list(plan)
+        tasks: Dict[asyncio.Future, tuple] = {}
+        launched = []
+        hedged = False
+        
+        def launch_next() -> bool:
+            while remaining:
+                backend, backend_model = remaining.pop(0)
+                slots = self.ollama.slots if backend == "ollama" else _openai_slots
+                if not slots.acquire(blocking=False):
+                    logger.warning(f"{backend} has too many requests in flight, skipping {backend_model}")
+                    continue
+                task = asyncio.get_running_loop().run_in_executor(
+                    _backend_executor, self._call_backend, backend, backend_model, slots,
+                    prompt, system_prompt, temperature, max_tokens
+                )
+                tasks[task] = (backend, backend_model)
+                launched.append(backend_model)
+                return True
+            return False
+        
+        result = None
+        launch_next()
+        try:
+            while tasks:
+                timeout = self._hedge_delay(launched[-1]) if hedge and remaining else None
+                done, _ = await asyncio.wait(list(tasks), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.info(f"No reply from {launched[-1]} within {timeout * 1000:.0f}ms, hedging")
+                    hedged = launch_next() or hedged
+                    continue
+                
+                for task in done:
+                    backend, backend_model = tasks.pop(task)
+                    result = task.result()
+                    if result["success"]:
+                        logger.info(f"Generated response using {backend_model} in {time.time() - start_time:.2f}s "
+                                    f"({len(launched)} backend(s) started)")
+                        result["hedged"] = hedged
+                        if backend_model != plan[0][1]:
+                            result["original_model"] = model or plan[0][1]
+                            result["fallback"] = True
+                        return result
+                    logger.warning(f"{backend_model} failed: {result.get('error', 'unknown error')}")
+                
+                if not tasks:
+                    launch_next()
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        if result is None:
+            return {
+                "success": False,
+                "error": "All AI backends are at their in-flight request limit",
+                "model": model,
+                "timestamp": time.time(),
+                "content": None,
+                "error_type": "backend_busy"
+            }
+        return result
+    
+    def generate_response_hedged(self, *args, **kwargs) -> Dict[str, Any]:
+        """Blocking wrapper around generate_response_async for synchronous callers"""
+        return asyncio.run(self.generate_response_async(*args, **kwargs))
+    
+    def _completion_key(self, prompt: str, model: Optional[str], system_prompt: Optional[str],
+                        temperature: float, max_tokens: int) -> str:
+        return CompletionCache.key(model or self.model_backend, system_prompt, prompt, temperature, max_tokens)
+    
     def generate_response(
         self,
         prompt: str,
@@ -350,7 +873,9 @@ class AIModelRouter:
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: int = 1000,
-        stream: bool = False
+        stream: bool = False,
+        cache_site: Optional[str] = None,
+        cache_if: Optional[Callable[[Dict[str, Any]], bool]] = None
     ) -> Dict[str, Any]:
         """
         Generate AI response using the configured model backend
@@ -362,10 +887,74 @@ class AIModelRouter:
             temperature: Controls randomness (0.0 to 1.0)
             max_tokens: Maximum tokens to generate
             stream: Whether to stream the response
+            cache_site: Opt in to the shared completion cache under this call-site
+                        name (only for prompts whose answer may be reused)
+            cache_if: With cache_site, only cache successful results this accepts
+                      (e.g. replies the caller could parse)
             
         Returns:
-            Dict with response content and metadata
+            Dict with response content and metadata ("cached": True on a cache hit)
         """
+        if not cache_site or stream:
+            return self._generate_response(prompt, model, system_prompt, temperature, max_tokens, stream)
+        
+        cache_key = self._completion_key(prompt, model, system_prompt, temperature, max_tokens)
+        cached = self.completion_cache.get(cache_key, cache_site)
+        if cached is not None:
+            cached["cached"] = True
+            return cached
+        
+        def generate():
+            result = self._generate_response(prompt, model, system_prompt, temperature, max_tokens, stream)
+            # Errors, the emergency fallback text and one-off fallback replies (keyed
+            # under the requested model) are not worth reusing
+            if (result.get("success") and not result.get("error_type") and not result.get("fallback")
+                    and (cache_if is None or cache_if(result))):
+                self.completion_cache.put(cache_key, result, cache_site)
+            return result
+        
+        # Identical requests already in flight share that call
+        result, shared = self.completion_cache.in_flight.do(cache_key, generate)
+        if shared:
+            result["coalesced"] = True
+        return result
+    
+    def get_cached_completion(self, prompt: str, model: Optional[str] = None,
+                              system_prompt: Optional[str] = None, temperature: float = 0.7,
+                              max_tokens: int = 1000, cache_site: str = "default") -> Optional[Dict[str, Any]]:
+        """The cached generate_response result for these arguments, or None"""
+        cached = self.completion_cache.get(
+            self._completion_key(prompt, model, system_prompt, temperature, max_tokens), cache_site
+        )
+        if cached is not None:
+            cached["cached"] = True
+        return cached
+    
+    def cache_completion(self, content: str, prompt: str, model: Optional[str] = None,
+                         system_prompt: Optional[str] = None, temperature: float = 0.7,
+                         max_tokens: int = 1000, cache_site: str = "default", **metadata):
+        """
+        Store content as the generate_response result for these arguments
+        
+        For callers that obtained the answer another way, e.g. one item of a
+        batched prompt, so the single-item call is served from the cache.
+        """
+        self.completion_cache.put(
+            self._completion_key(prompt, model, system_prompt, temperature, max_tokens),
+            {"success": True, "content": content, "timestamp": time.time(), **metadata},
+            cache_site
+        )
+    
+    def _generate_response(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        stream: bool = False
+    ) -> Dict[str, Any]:
+        """generate_response without the completion cache"""
         # Start time for tracking
         start_time = time.time()
         
@@ -479,6 +1068,14 @@ class AIModelRouter:
                 }
         
         # No specific model provided, use configured backend
+        if self.model_backend == "auto" and self.hedging and not stream and not _event_loop_running():
+            return self.generate_response_hedged(
+                prompt=prompt,
+                system_prompt=system_prompt,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+        
         if self.model_backend == "auto":
             # Auto mode - try both backends based on availability
             if self.openai_api_key:
@@ -712,6 +1309,13 @@ class AIModelRouter:
             "ollama_running": ollama_running,
             "openai_configured": openai_configured,
             "available_models": available_models,
+            "backend_health": {
+                "ollama": self.ollama.health.status(),
+                "openai": self.openai_health.status()
+            },
+            "model_latency": {name: latency.status() for name, latency in list(_model_latency.items())},
+            "completion_cache": self.completion_cache.stats(),
+            "hedging": self.hedging,
             "request_count": self.request_count,
             "error_count": self.error_count,
             "last_model_used": self.last_model_used,
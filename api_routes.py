@@ -10,7 +10,8 @@ from typing import Dict, Any, List, Optional
 from textblob import TextBlob
 
 # Import decision engine components
-from rules_config_loader import RulesConfigLoader, load_rules_from_config
+from rules_config_loader import RulesConfigLoader, RulesReloader, rule_from_dict
+from rules_store import RulesStore
 from rule_engine import RobinDecisionEngine, Rule
 from memory_store import save_memory, get_memory
 from log_manager import log_interaction
@@ -39,12 +40,25 @@ def init_api(app, db_manager=None, emotion_tracker=None, face_detector=None,
     """Initialize the API blueprint with necessary dependencies"""
     # Register the blueprint
     app.register_blueprint(api_bp)
+    
+    # Move this worker's rules to the store shared by all workers and keep them in sync
+    store_path = getattr(config, 'RULES_STORE_PATH', None)
+    if isinstance(store_path, str) and store_path and rules_loader.store is None:
+        rules_loader.attach_store(RulesStore(store_path))
+        robin_engine.replace_rules([rule_from_dict(rule_data) for rule_data in rules_loader.rules])
+    if rules_loader.store is not None:
+        rules_reloader.interval = getattr(config, 'RULES_RELOAD_INTERVAL', rules_reloader.interval)
+        rules_reloader.start()
+    
     logger.info("API routes registered successfully")
     return api_bp
 
-# Initialize rules config loader and Robin Decision Engine
-rules_loader = RulesConfigLoader()
-robin_engine = load_rules_from_config('rules_config.json')
+# Initialize rules config loader and Robin Decision Engine (init_api switches them to the
+# rules store shared by all workers, at config.RULES_STORE_PATH)
+rules_loader = RulesConfigLoader('rules_config.json')
+robin_engine = RobinDecisionEngine()
+robin_engine.replace_rules([rule_from_dict(rule_data) for rule_data in rules_loader.rules])
+rules_reloader = RulesReloader(rules_loader, robin_engine)
 
 @api_bp.route('/chat', methods=['POST'])
 def chat():
@@ -197,19 +211,20 @@ def process_feedback():
                 'error': 'Invalid feedback value. Must be "positive" or "negative"'
             }), 400
         
-        # Calculate delta for rule weight adjustment
-        delta = 0.1 if feedback.lower() == 'positive' else -0.1
-        
-        # Adjust rule weight in both systems
+        # Adjust the rule weight; with a rules store the change is written in the
+        # next batch and every worker's engine picks it up from there
         rules_success = rules_loader.adjust_rule_weight(rule_id, feedback)
-        engine_success = robin_engine.update_rule_weight(rule_id, delta)
         
-        if not rules_success and not engine_success:
+        if not rules_success:
             return jsonify({
                 'success': False, 
                 'error': f'Failed to process feedback for rule ID: {rule_id}. Rule not found in any system.'
             }), 404
         
+        if rules_loader.store is None:
+            # No store, so no reloader: update this worker's engine directly
+            robin_engine.replace_rules([rule_from_dict(rule_data) for rule_data in rules_loader.rules])
+        
         # Get updated rule for response
         updated_rule = rules_loader.get_rule_by_id(rule_id)
         
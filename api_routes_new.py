@@ -6,7 +6,7 @@ import logging
 import traceback
 import twilio_api
 from datetime import datetime, timedelta
-from flask import Blueprint, jsonify, request, session
+from flask import Blueprint, jsonify, request, session, Response, stream_with_context
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -51,12 +51,16 @@ def init_api(app, _db_manager, _emotion_tracker, _face_detector,
         # Create AI Model Router on demand if not available
         try:
             from ai_model_router import AIModelRouter
-            model_router = AIModelRouter()
+            model_router = AIModelRouter(db_manager)
             logger.info("Initialized AI Model Router for API routes")
         except Exception as e:
             logger.warning(f"Could not initialize AI Model Router: {str(e)}")
             model_router = None
     
+    # Keep backend availability fresh off the request path
+    if model_router is not None and hasattr(model_router, 'start_health_checks'):
+        model_router.start_health_checks()
+    
     # Add API documentation endpoint
     @api.route('/', methods=['GET'])
     def api_docs():
@@ -211,6 +215,16 @@ def init_api(app, _db_manager, _emotion_tracker, _face_detector,
                     {'name': 'system_prompt', 'type': 'string', 'default': None, 'description': 'Optional system instructions'},
                     {'name': 'temperature', 'type': 'float', 'default': 0.7, 'description': 'Controls randomness (0.0 to 1.0)'}
                 ]
+            },
+            '/api/ai-query/stream': {
+                'methods': ['POST'],
+                'description': 'Same as /api/ai-query, streamed as Server-Sent Events (token events, then done or error)',
+                'params': [
+                    {'name': 'query', 'type': 'string', 'required': True, 'description': 'The text query to send to the AI model'},
+                    {'name': 'model', 'type': 'string', 'default': None, 'description': 'Optional specific model to use'},
+                    {'name': 'system_prompt', 'type': 'string', 'default': None, 'description': 'Optional system instructions'},
+                    {'name': 'temperature', 'type': 'float', 'default': 0.7, 'description': 'Controls randomness (0.0 to 1.0)'}
+                ]
             }
         }
         
@@ -291,6 +305,14 @@ def get_status():
             }
         }
         
+        # Emotion analysis memo metrics
+        if emotion_tracker is not None and hasattr(emotion_tracker, 'get_analysis_cache_stats'):
+            status['emotion_analysis_cache'] = emotion_tracker.get_analysis_cache_stats()
+        
+        # TTS request and audio cache metrics
+        if tts_manager is not None and hasattr(tts_manager, 'get_cache_stats'):
+            status['tts_cache'] = tts_manager.get_cache_stats()
+        
         # Notification service status
         twilio_status = {
             'configured': twilio_api.is_twilio_configured(),
@@ -1174,6 +1196,45 @@ def ai_query():
             'content': None
         }), 500
 
+@api.route('/ai-query/stream', methods=['POST'])
+def ai_query_stream():
+    """Send a query to the selected AI model and stream the reply as Server-Sent Events"""
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({
+            'success': False,
+            'error': 'No data provided'
+        }), 400
+    
+    query = data.get('query')
+    if not query or not isinstance(query, str) or len(query.strip()) == 0:
+        return jsonify({
+            'success': False,
+            'error': 'Query is required'
+        }), 400
+    
+    if not model_router:
+        return jsonify({
+            'success': False,
+            'error': 'AI Model Router not available'
+        }), 503
+    
+    logger.info(f"AI stream request: query='{query[:50]}...', model={data.get('model')}")
+    
+    from ai_model_router import to_sse
+    events = model_router.stream_response(
+        prompt=query,
+        model=data.get('model'),
+        system_prompt=data.get('system_prompt'),
+        temperature=data.get('temperature', 0.7),
+        max_tokens=500
+    )
+    return Response(
+        stream_with_context(to_sse(events)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @api.route('/sms-alert', methods=['POST'])
 def send_sms_alert():
     """Send SMS notification with pre-formatted alert message with enhanced error handling"""
@@ -0,0 +1,213 @@
+"""
+Backend health tracking for the AI model router.
+
+BackendHealth caches whether a backend (e.g. Ollama) is reachable, so
+routing decisions don't cost a live probe each time. The cached state is
+refreshed by a probe on a timer - on a background thread once start() is
+called, otherwise lazily when it is older than the interval - and by the
+outcome of real requests via a CircuitBreaker: after failure_threshold
+consecutive failures the backend is reported unavailable (requests fail
+fast) until a probe succeeds after reset_timeout.
+
+LatencyEWMA keeps an exponentially weighted mean and variance of a
+backend's response times, for latency-aware routing and hedging budgets.
+"""
+import math
+import time
+import logging
+import threading
+from typing import Callable, Dict, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECK_INTERVAL = 10.0
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_RESET_TIMEOUT = 30.0
+DEFAULT_LATENCY_ALPHA = 0.2
+# One-sided z-score of the 95th percentile, for the normal approximation in LatencyEWMA.p95
+P95_Z = 1.645
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures; lets a probe through once reset_timeout has passed"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state == self.OPEN:
+                logger.info("Circuit closed after a successful probe")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> bool:
+        """Count a failure; True if this opened (or re-opened) the circuit"""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def is_open(self) -> bool:
+        """True while requests should fail fast"""
+        return self.state == self.OPEN and time.monotonic() - self.opened_at < self.reset_timeout
+
+    def probe_due(self) -> bool:
+        """True once an open circuit may be probed again"""
+        return self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout
+
+
+class BackendHealth:
+    """Cached availability of one backend, kept fresh by a timed probe and request outcomes"""
+
+    def __init__(self, name: str, probe: Optional[Callable[[], bool]] = None,
+                 interval: float = DEFAULT_CHECK_INTERVAL,
+                 failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        """
+        Args:
+            name: Backend name, for logging
+            probe: Returns True if the backend is reachable (None: availability
+                   is only derived from request outcomes)
+            interval: Seconds between probes
+            failure_threshold: Consecutive request failures that open the circuit
+            reset_timeout: Seconds an open circuit fails fast before it is probed again
+        """
+        self.name = name
+        self.probe = probe
+        self.interval = interval
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+        self._available = probe is None
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def is_available(self) -> bool:
+        """Cached availability; probes only if the cache is stale (no background thread) or a retry is due"""
+        if self.breaker.is_open():
+            return False
+        if self.probe is None:
+            return True
+        background = self._thread is not None and self._thread.is_alive()
+        stale = self._checked_at is None or (
+            not background and time.monotonic() - self._checked_at >= self.interval)
+        if stale or self.breaker.probe_due():
+            self.check()
+        return self._available
+
+    def check(self) -> bool:
+        """Probe the backend now and update the cached state"""
+        if self.probe is None:
+            return not self.breaker.is_open()
+        try:
+            ok = bool(self.probe())
+        except Exception:
+            ok = False
+        with self._lock:
+            was_available = self._available
+            self._available = ok
+            self._checked_at = time.monotonic()
+        if ok:
+            self.breaker.record_success()
+        elif self.breaker.state == CircuitBreaker.OPEN:
+            # Still down: wait another reset_timeout before the next retry
+            self.breaker.record_failure()
+        if ok != was_available:
+            logger.info(f"{self.name} backend is now {'available' if ok else 'unavailable'}")
+        return ok
+
+    def record_success(self) -> None:
+        """A request to the backend succeeded"""
+        self.breaker.record_success()
+        with self._lock:
+            self._available = True
+
+    def record_failure(self) -> None:
+        """A request to the backend failed (connection error, timeout, 5xx)"""
+        if self.breaker.record_failure():
+            with self._lock:
+                self._available = False
+            logger.warning(f"{self.name} circuit open: failing fast for {self.breaker.reset_timeout:.0f}s")
+
+    def start(self) -> threading.Thread:
+        """Probe every interval on a daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name=f"{self.name}-health", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            self.check()
+            if self._stop_event.wait(self.interval):
+                return
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "available": self._available if self.probe is not None else not self.breaker.is_open(),
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "last_checked_seconds_ago": (
+                round(time.monotonic() - self._checked_at, 1) if self._checked_at is not None else None
+            ),
+        }
+
+
+class LatencyEWMA:
+    """Exponentially weighted moving mean and variance of response times (seconds)"""
+
+    def __init__(self, alpha: float = DEFAULT_LATENCY_ALPHA):
+        """
+        Args:
+            alpha: Weight of the newest sample (higher reacts faster, lower is smoother)
+        """
+        self.alpha = alpha
+        self.mean = 0.0
+        self.variance = 0.0
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            if self.samples == 0:
+                self.mean = seconds
+                self.variance = 0.0
+            else:
+                diff = seconds - self.mean
+                increment = self.alpha * diff
+                self.mean += increment
+                self.variance = (1 - self.alpha) * (self.variance + diff * increment)
+            self.samples += 1
+
+    def p95(self) -> Optional[float]:
+        """Estimated 95th percentile (None until the first sample)"""
+        if self.samples == 0:
+            return None
+        return self.mean + P95_Z * math.sqrt(self.variance)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "samples": self.samples,
+            "mean_ms": round(self.mean * 1000, 1) if self.samples else None,
+            "p95_ms": round(self.p95() * 1000, 1) if self.samples else None,
+        }
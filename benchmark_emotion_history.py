@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Emotion History Benchmark for Mashaaer
+Builds a synthetic SQLite database of emotion events (one million by
+default, spread over 120 days) and times the 7/30/90-day history and trend
+queries three ways:
+
+- raw_scan: the original approach, fetching every event in the window and
+  counting per day and emotion in Python
+- raw_group_by: GROUP BY day/emotion in SQL over the indexed events table
+- rollup: EmotionTracker.get_emotion_history / _analyze_trends_from_database,
+  which read the emotion_daily_rollup table into a DailyEmotionMatrix
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from database.emotion_rollup import SQLITE_TIMESTAMP_FORMAT, parse_db_timestamp, upsert_daily_rollups
+
+DEFAULT_ROWS = 1_000_000
+DEFAULT_DAYS = 120
+WINDOWS = (7, 30, 90)
+BATCH_SIZE = 50_000
+
+
+def build_database(db_manager, rows: int, days: int, emotions, seed: int = 1) -> float:
+    """Fill emotions / emotion_data / emotion_daily_rollup with synthetic events; returns seconds"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    span = days * 86400
+    sessions = [f"session-{i}" for i in range(50)] + [None]
+
+    start = time.perf_counter()
+    conn = db_manager.get_connection()
+    cursor = conn.cursor()
+    for offset in range(0, rows, BATCH_SIZE):
+        batch = []
+        for _ in range(min(BATCH_SIZE, rows - offset)):
+            batch.append({
+                "emotion": rng.choice(emotions),
+                "timestamp": (now - timedelta(seconds=rng.randrange(span))).strftime(SQLITE_TIMESTAMP_FORMAT),
+                "intensity": round(rng.random(), 2),
+                "session_id": rng.choice(sessions),
+            })
+        cursor.executemany(
+            "INSERT INTO emotions (emotion, text, timestamp, source, intensity) VALUES (?, '', ?, 'text', ?)",
+            [(e["emotion"], e["timestamp"], e["intensity"]) for e in batch]
+        )
+        cursor.executemany(
+            "INSERT INTO emotion_data (timestamp, emotion, source, intensity, text, session_id) "
+            "VALUES (?, ?, 'text', ?, '', ?)",
+            [(e["timestamp"], e["emotion"], e["intensity"], e["session_id"]) for e in batch]
+        )
+        upsert_daily_rollups(cursor, batch, use_postgres=False)
+    conn.commit()
+    return time.perf_counter() - start
+
+
+def raw_scan(db_manager, window: int):
+    """The pre-rollup get_emotion_history: fetch the window and count in Python"""
+    cursor = db_manager.get_connection().cursor()
+    start_date = (datetime.now() - timedelta(days=window)).strftime(SQLITE_TIMESTAMP_FORMAT)
+    cursor.execute("SELECT emotion, timestamp, intensity FROM emotions WHERE timestamp >= ? ORDER BY timestamp",
+                   (start_date,))
+    counts = defaultdict(lambda: defaultdict(int))
+    for emotion, timestamp, _ in cursor.fetchall():
+        counts[parse_db_timestamp(timestamp).strftime("%Y-%m-%d")][emotion] += 1
+    return counts
+
+
+def raw_group_by(db_manager, window: int):
+    """Aggregate the raw events in SQL"""
+    cursor = db_manager.get_connection().cursor()
+    start_date = (datetime.now() - timedelta(days=window)).strftime(SQLITE_TIMESTAMP_FORMAT)
+    cursor.execute(
+        "SELECT date(timestamp), emotion, COUNT(*), SUM(intensity) FROM emotions "
+        "WHERE timestamp >= ? GROUP BY 1, 2",
+        (start_date,)
+    )
+    return cursor.fetchall()
+
+
+def _time(func, repeats: int) -> float:
+    """Best of `repeats` runs in milliseconds"""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 2)
+
+
+def run_benchmark(rows: int = DEFAULT_ROWS, days: int = DEFAULT_DAYS, repeats: int = 3) -> dict:
+    """Build the synthetic database and time each query path per window"""
+    from database.db_manager import DatabaseManager
+    from emotion_tracker import EmotionTracker
+
+    work_dir = tempfile.mkdtemp(prefix="emotion_history_benchmark_")
+    db_manager = DatabaseManager(db_path=os.path.join(work_dir, "emotions.db"))
+    db_manager.initialize_db()
+
+    tracker = EmotionTracker(db_manager)
+    tracker.data_dir = work_dir
+    tracker.initialize()
+    tracker.trend_data = {}
+
+    build_seconds = build_database(db_manager, rows, days, tracker.emotion_labels)
+    rollup_rows = db_manager.execute_query("SELECT COUNT(*) FROM emotion_daily_rollup")[0][0]
+
+    windows = {}
+    for window in WINDOWS:
+        windows[window] = {
+            "raw_scan_ms": _time(lambda: raw_scan(db_manager, window), repeats),
+            "raw_group_by_ms": _time(lambda: raw_group_by(db_manager, window), repeats),
+            "rollup_history_ms": _time(lambda: tracker.get_emotion_history(window), repeats),
+            "rollup_trends_ms": _time(lambda: tracker._analyze_trends_from_database(window), repeats),
+            "wellbeing_ms": _time(lambda: tracker.get_emotional_wellbeing_score(window), repeats),
+        }
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "rows": rows,
+        "days": days,
+        "rollup_rows": rollup_rows,
+        "build_seconds": round(build_seconds, 2),
+        "database": db_manager.db_path,
+        "windows": windows,
+    }
+
+
+def main():
+    """Main function to run the benchmark from the command line"""
+    parser = argparse.ArgumentParser(description="Mashaaer emotion history query benchmark")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="Synthetic emotion events")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="Days the events are spread over")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per measurement (best is reported)")
+    parser.add_argument("--output", help="Optional path to save the results as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(rows=args.rows, days=args.days, repeats=args.repeats)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    print("\n=== Emotion History Benchmark ===\n")
+    print(f"Events: {results['rows']} over {results['days']} days "
+          f"({results['rollup_rows']} rollup rows, built in {results['build_seconds']}s)")
+    for window, timings in results["windows"].items():
+        print(f"\n{window}-day window:")
+        for name, value in timings.items():
+            print(f"  {name}: {value:.2f}ms")
+    print()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Rule-Based Emotion Analysis Benchmark for Mashaaer
+Measures per-message latency of EmotionTracker._analyze_with_rules, and of
+EmotionTracker.analyze_batch, over the phrase corpora used by the existing
+emotion test scripts.
+"""
+import os
+import ast
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+from datetime import datetime
+from typing import List
+
+# Test scripts whose phrase literals make up the benchmark corpus
+CORPUS_FILES = [
+    "test_emotion_tracker_phrases.py",
+    "test_expanded_phrases.py",
+    "test_mixed_emotions.py",
+    "test_rule_based_emotions.py",
+    "test_emotion_synonym.py",
+    "test_emotion_tracker.py",
+]
+
+DEFAULT_ITERATIONS = 20
+
+
+def _collect_phrases(node, phrases: List[str]):
+    """Collect phrase strings from a literal list/dict of test cases"""
+    if isinstance(node, str):
+        if " " in node and len(node) > 10:
+            phrases.append(node)
+    elif isinstance(node, list):
+        for item in node:
+            _collect_phrases(item, phrases)
+    elif isinstance(node, dict):
+        if "text" in node or "phrase" in node:
+            _collect_phrases(node.get("text") or node.get("phrase"), phrases)
+        else:
+            for value in node.values():
+                _collect_phrases(value, phrases)
+
+
+def load_corpus(base_dir: str = None) -> List[str]:
+    """Extract the literal test phrase lists from the emotion test scripts"""
+    base_dir = base_dir or os.path.dirname(os.path.abspath(__file__))
+    phrases = []
+    for filename in CORPUS_FILES:
+        path = os.path.join(base_dir, filename)
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Assign) and isinstance(node.value, (ast.List, ast.Dict)):
+                try:
+                    _collect_phrases(ast.literal_eval(node.value), phrases)
+                except ValueError:
+                    continue
+    # Preserve order but drop duplicates shared between scripts
+    return list(dict.fromkeys(phrases))
+
+
+def run_benchmark(iterations: int = DEFAULT_ITERATIONS) -> dict:
+    """Time tracker construction and per-message rule-based analysis"""
+    from emotion_tracker import EmotionTracker
+
+    corpus = load_corpus()
+
+    start = time.perf_counter()
+    tracker = EmotionTracker(None)
+    init_ms = (time.perf_counter() - start) * 1000
+
+    # Keep trend snapshots written during the run out of the repository
+    tracker.data_dir = tempfile.mkdtemp(prefix="emotion_benchmark_")
+
+    # Warm-up pass so lazily populated caches do not skew the first samples
+    for phrase in corpus:
+        tracker._analyze_with_rules(phrase.lower().strip())
+
+    samples = []
+    for _ in range(iterations):
+        for phrase in corpus:
+            text = phrase.lower().strip()
+            start = time.perf_counter()
+            tracker._analyze_with_rules(text)
+            samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+
+    # The same corpus through analyze_batch: distinct texts once, then with duplicates
+    batch = {}
+    for name, texts in (("unique", corpus), ("repeated", corpus * iterations)):
+        tracker.trend_data = {}
+        start = time.perf_counter()
+        _, timings = tracker.analyze_batch(texts, return_timings=True)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        batch[name] = {
+            "texts": len(texts),
+            "total_ms": round(elapsed_ms, 2),
+            "per_message_ms": round(elapsed_ms / len(texts), 4),
+            "stages_ms": {stage: round(value, 2) for stage, value in timings.items()},
+        }
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "corpus_size": len(corpus),
+        "iterations": iterations,
+        "init_ms": round(init_ms, 2),
+        "per_message_ms": {
+            "mean": round(statistics.mean(samples), 4),
+            "p50": round(samples[len(samples) // 2], 4),
+            "p95": round(samples[int(len(samples) * 0.95) - 1], 4),
+            "max": round(samples[-1], 4),
+        },
+        "batch": batch,
+    }
+
+
+def main():
+    """Main function to run the benchmark from the command line"""
+    parser = argparse.ArgumentParser(description="Mashaaer rule-based emotion analysis benchmark")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="Passes over the corpus")
+    parser.add_argument("--output", help="Optional path to save the results as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(iterations=args.iterations)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    print("\n=== Rule-Based Emotion Analysis Benchmark ===\n")
+    print(f"Corpus: {results['corpus_size']} phrases x {results['iterations']} iterations")
+    print(f"Tracker init: {results['init_ms']:.2f}ms")
+    for name, value in results["per_message_ms"].items():
+        print(f"Per message {name}: {value:.4f}ms")
+    for name, batch in results["batch"].items():
+        print(f"analyze_batch ({name}, {batch['texts']} texts): {batch['total_ms']:.2f}ms total, "
+              f"{batch['per_message_ms']:.4f}ms per message")
+    print()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
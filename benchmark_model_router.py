@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+AI Model Router Benchmark for Mashaaer
+Runs a stub Ollama server on localhost (instant /api/tags and /api/generate
+replies, so the numbers are pure per-request overhead) and times
+complete_with_ollama two ways:
+
+- unpooled: the original behaviour, a live /api/tags probe before every
+  generation and a new TCP connection for each of the two requests
+- pooled: AIModelRouter with its keep-alive session and cached backend
+  health (one probe per MODEL_HEALTH_INTERVAL)
+
+It also times how fast a call fails once the backend is down and the
+circuit breaker has opened.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from ai_model_router import AIModelRouter
+
+DEFAULT_REQUESTS = 500
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    """Minimal Ollama API: model list and an instant generation"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # headers and body are separate writes
+
+    def _reply(self, payload: dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._reply({"models": [{"name": "openchat:latest"}, {"name": "mistral:7b"}]})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._reply({"response": "ok", "done": True})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_ollama():
+    """Start the stub server on a free port; returns (server, base_url)"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOllamaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def unpooled_complete(base_url: str, prompt: str) -> bool:
+    """The pre-pooling request pattern: probe, then generate, each on a new connection"""
+    try:
+        if requests.get(f"{base_url}/api/tags", timeout=2).status_code != 200:
+            return False
+        response = requests.post(f"{base_url}/api/generate",
+                                 json={"model": "openchat", "prompt": prompt, "stream": False}, timeout=30)
+        return response.status_code == 200
+    except Exception:
+        return False
+
+
+def _router_for(base_url: str) -> AIModelRouter:
+    os.environ["MODEL_BACKEND"] = "ollama"
+    os.environ["OLLAMA_BASE_URL"] = base_url
+    return AIModelRouter()
+
+
+def run_benchmark(count: int = DEFAULT_REQUESTS) -> dict:
+    """Time both request paths against the stub, then the fail-fast path against a closed port"""
+    server, base_url = start_stub_ollama()
+    try:
+        start = time.perf_counter()
+        unpooled_ok = sum(unpooled_complete(base_url, f"hello {i}") for i in range(count))
+        unpooled_ms = (time.perf_counter() - start) * 1000
+
+        router = _router_for(base_url)
+        router.complete_with_ollama("warm up")
+        start = time.perf_counter()
+        pooled_ok = sum(router.complete_with_ollama(f"hello {i}")["success"] for i in range(count))
+        pooled_ms = (time.perf_counter() - start) * 1000
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # Backend down: open the breaker with failed requests, then time fail-fast calls
+    down = _router_for(f"http://127.0.0.1:{_free_port()}")
+    down.ollama.health._available = True
+    down.ollama.health._checked_at = time.monotonic()
+    for _ in range(down.ollama.health.breaker.failure_threshold):
+        down.complete_with_ollama("down")
+    start = time.perf_counter()
+    for _ in range(count):
+        down.complete_with_ollama("down")
+    fail_fast_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "requests": count,
+        "unpooled_ms_per_request": round(unpooled_ms / count, 3),
+        "pooled_ms_per_request": round(pooled_ms / count, 3),
+        "speedup": round(unpooled_ms / pooled_ms, 1) if pooled_ms else None,
+        "unpooled_succeeded": unpooled_ok,
+        "pooled_succeeded": pooled_ok,
+        "circuit": down.ollama.health.breaker.state,
+        "fail_fast_ms_per_request": round(fail_fast_ms / count, 4),
+    }
+
+
+def main():
+    """Main function to run the benchmark from the command line"""
+    parser = argparse.ArgumentParser(description="Mashaaer AI model router overhead benchmark")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS, help="Requests per path")
+    parser.add_argument("--output", help="Optional path to save the results as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(count=args.requests)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    print("\n=== AI Model Router Benchmark ===\n")
+    for name, value in results.items():
+        print(f"  {name}: {value}")
+    print()
+    return 0 if results["pooled_succeeded"] == args.requests else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
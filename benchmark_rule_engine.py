@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Rule Engine Benchmark for Mashaaer
+Builds a synthetic rule set (10,000 rules by default, spread over emotions
+and English/Arabic keywords) and times RobinDecisionEngine.decide two ways:
+
+- linear: the original approach, Rule.matches on every rule and a sort of
+  the matches by weight
+- indexed: decide() with the precompiled RuleIndex (emotion buckets, one
+  keyword automaton per bucket, max-weight winner per keyword)
+"""
+import sys
+import json
+import time
+import random
+import argparse
+from datetime import datetime
+
+from rule_engine import RobinDecisionEngine, Rule, RuleIndex
+
+DEFAULT_RULES = 10_000
+DEFAULT_MESSAGES = 500
+EMOTIONS = ["happy", "sad", "angry", "surprised", "fearful", "disgusted", "neutral", "confused"]
+SYLLABLES_EN = ["ka", "lo", "mi", "ne", "ra", "to", "su", "vi", "de", "po", "qua", "zen"]
+SYLLABLES_AR = ["حب", "سل", "فر", "قل", "ور", "ند", "مل", "صد"]
+
+
+def _word(rng: random.Random) -> str:
+    syllables = SYLLABLES_AR if rng.random() < 0.3 else SYLLABLES_EN
+    return "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+
+
+def build_rules(count: int, seed: int = 1):
+    """Synthetic rules with random emotions, keywords and weights"""
+    rng = random.Random(seed)
+    return [
+        Rule(rng.choice(EMOTIONS), _word(rng), f"action_{i % 50}",
+             weight=round(rng.uniform(0.5, 3.0), 1), rule_id=f"rule{i:05d}")
+        for i in range(count)
+    ]
+
+
+def build_messages(count: int, seed: int = 2):
+    """Chat-sized messages made of the same kind of words (some match, most don't)"""
+    rng = random.Random(seed)
+    return [
+        (" ".join(_word(rng) for _ in range(rng.randint(5, 20))), rng.choice(EMOTIONS + [None]))
+        for _ in range(count)
+    ]
+
+
+def linear_decide(rules, message, emotion):
+    """The pre-index decide(): Rule.matches on every rule, then sort by weight"""
+    matched = [r for r in rules if r.matches(message, emotion)]
+    if not matched:
+        return None
+    matched.sort(key=lambda r: r.weight, reverse=True)
+    return matched[0]
+
+
+def run_benchmark(rules: int = DEFAULT_RULES, messages: int = DEFAULT_MESSAGES) -> dict:
+    """Time index construction and both decide() paths; also checks they agree"""
+    rule_set = build_rules(rules)
+    message_set = build_messages(messages)
+
+    engine = RobinDecisionEngine()
+    for rule in rule_set:
+        engine.add_rule(rule)
+
+    start = time.perf_counter()
+    RuleIndex(engine.rules)
+    build_ms = (time.perf_counter() - start) * 1000
+    engine.decide("warm up", None)
+
+    start = time.perf_counter()
+    linear = [linear_decide(engine.rules, message, emotion) for message, emotion in message_set]
+    linear_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    indexed = [engine.decide(message, emotion) for message, emotion in message_set]
+    indexed_ms = (time.perf_counter() - start) * 1000
+
+    mismatches = sum(
+        1 for expected, result in zip(linear, indexed)
+        if (expected.action if expected else "respond_normally") != result["action"]
+    )
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "rules": rules,
+        "messages": messages,
+        "matched_messages": sum(1 for rule in linear if rule is not None),
+        "index_build_ms": round(build_ms, 2),
+        "linear_ms_per_message": round(linear_ms / messages, 4),
+        "indexed_ms_per_message": round(indexed_ms / messages, 4),
+        "speedup": round(linear_ms / indexed_ms, 1) if indexed_ms else None,
+        "mismatches": mismatches,
+    }
+
+
+def main():
+    """Main function to run the benchmark from the command line"""
+    parser = argparse.ArgumentParser(description="Mashaaer rule engine decide() benchmark")
+    parser.add_argument("--rules", type=int, default=DEFAULT_RULES, help="Synthetic rules")
+    parser.add_argument("--messages", type=int, default=DEFAULT_MESSAGES, help="Messages decided")
+    parser.add_argument("--output", help="Optional path to save the results as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(rules=args.rules, messages=args.messages)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    print("\n=== Rule Engine Benchmark ===\n")
+    for name, value in results.items():
+        print(f"  {name}: {value}")
+    print()
+    return 1 if results["mismatches"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+TTS Concurrency Benchmark for Mashaaer
+Simulates concurrent clients against TTSManager backed by a local stub
+provider with fixed synthesis latency, so lock contention, single-flight
+coalescing and cache-hit latency can be measured without network access.
+"""
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import tempfile
+import threading
+import statistics
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_CLIENTS = 16
+DEFAULT_REQUESTS = 200
+DEFAULT_PHRASES = 20
+DEFAULT_LATENCY_MS = 150
+
+
+class StubProvider:
+    """Provider with the ElevenLabsTTS interface that sleeps instead of calling an API"""
+
+    def __init__(self, cache_dir, latency_ms):
+        self.cache_dir = cache_dir
+        self.latency = latency_ms / 1000.0
+        self.use_cache = True
+        self.voices = {"default": "stub"}
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _cache_path(self, text, voice):
+        digest = hashlib.md5(f"{voice}:{text}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"stub_{digest}.mp3")
+
+    def cached_path(self, text, voice="default", voice_params=None):
+        path = self._cache_path(text, voice)
+        return path if os.path.exists(path) else None
+
+    def speak(self, text, voice="default", voice_params=None, use_cache=None):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        path = self._cache_path(text, voice)
+        with open(path, "wb") as f:
+            f.write(b"\xff\xf3" + text.encode("utf-8"))
+        return path
+
+    def is_available(self):
+        return True
+
+
+class StubConfig:
+    TTS_PROVIDER = "elevenlabs"
+    ELEVENLABS_API_KEY = ""
+    APP_URL = ""
+
+    def __init__(self, max_workers):
+        self.TTS_MAX_WORKERS = max_workers
+
+    def is_offline(self):
+        return True
+
+
+def _build_manager(cache_dir, latency_ms, max_workers):
+    from tts import gtts_fallback
+    from tts.tts_manager import TTSManager
+
+    # Keep the gTTS fallback from reaching the network while it sets up
+    gtts_fallback.gTTS = None
+    manager = TTSManager(StubConfig(max_workers))
+    manager.elevenlabs = StubProvider(cache_dir, latency_ms)
+    manager.use_elevenlabs = True
+    manager.use_gtts = False
+    return manager
+
+
+def run_benchmark(clients=DEFAULT_CLIENTS, requests=DEFAULT_REQUESTS, phrases=DEFAULT_PHRASES,
+                  latency_ms=DEFAULT_LATENCY_MS, max_workers=4, serialize=False, seed=7):
+    """
+    Issue `requests` speak() calls from `clients` threads over `phrases` distinct texts.
+
+    With serialize=True every call holds one global lock, reproducing the
+    behaviour before single-flight synthesis, as a baseline.
+    """
+    workdir = tempfile.mkdtemp(prefix="tts_benchmark_")
+    previous_dir = os.getcwd()
+    os.chdir(workdir)
+    try:
+        manager = _build_manager(workdir, latency_ms, max_workers)
+        rng = random.Random(seed)
+        texts = [f"Benchmark phrase number {rng.randrange(phrases)}" for _ in range(requests)]
+        global_lock = threading.Lock()
+
+        def request(text):
+            start = time.perf_counter()
+            if serialize:
+                with global_lock:
+                    manager.speak(text)
+            else:
+                manager.speak(text)
+            return (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            samples = sorted(pool.map(request, texts))
+        wall_ms = (time.perf_counter() - start) * 1000
+    finally:
+        os.chdir(previous_dir)
+
+    return {
+        "mode": "global_lock" if serialize else "single_flight",
+        "clients": clients,
+        "requests": requests,
+        "distinct_phrases": phrases,
+        "provider_latency_ms": latency_ms,
+        "provider_calls": manager.elevenlabs.calls,
+        "wall_ms": round(wall_ms, 1),
+        "throughput_rps": round(requests / (wall_ms / 1000), 1),
+        "latency_ms": {
+            "mean": round(statistics.mean(samples), 2),
+            "p50": round(samples[len(samples) // 2], 2),
+            "p95": round(samples[int(len(samples) * 0.95) - 1], 2),
+            "max": round(samples[-1], 2),
+        },
+        "manager_stats": dict(manager.stats),
+    }
+
+
+def main():
+    """Main function to run the benchmark from the command line"""
+    parser = argparse.ArgumentParser(description="Mashaaer TTS concurrency benchmark (stub provider)")
+    parser.add_argument("--clients", type=int, default=DEFAULT_CLIENTS, help="Concurrent client threads")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS, help="Total speak() calls")
+    parser.add_argument("--phrases", type=int, default=DEFAULT_PHRASES, help="Distinct texts requested")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY_MS, help="Stub synthesis latency (ms)")
+    parser.add_argument("--workers", type=int, default=4, help="TTS_MAX_WORKERS for the manager")
+    parser.add_argument("--output", help="Optional path to save the results as JSON")
+    args = parser.parse_args()
+
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "runs": [
+            run_benchmark(args.clients, args.requests, args.phrases, args.latency, args.workers, serialize=serialize)
+            for serialize in (True, False)
+        ],
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    print("\n=== TTS Concurrency Benchmark ===\n")
+    for run in results["runs"]:
+        latency = run["latency_ms"]
+        print(f"{run['mode']}: {run['requests']} requests from {run['clients']} clients, "
+              f"{run['provider_calls']} provider calls")
+        print(f"  wall {run['wall_ms']:.1f}ms, {run['throughput_rps']:.1f} req/s, "
+              f"p50 {latency['p50']:.2f}ms, p95 {latency['p95']:.2f}ms, max {latency['max']:.2f}ms")
+    print()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""
+Prompt-keyed cache of LLM completions.
+
+Idiom translations, common-idiom lists and music recommendations ask the
+model the same prompts again and again. CompletionCache keys each
+completion on a hash of everything that determines it (model, system
+prompt, prompt, temperature, max_tokens) and keeps it in a bounded
+in-process LRU with a TTL, optionally written through to the
+response_cache table so other workers and restarts share it.
+
+Caching is opt-in: call sites pass a site name (e.g. cache_site= on
+AIModelRouter.generate_response), which also labels the per-site hit rates
+reported by stats().
+
+SingleFlight coalesces concurrent identical requests: while one caller is
+computing a key, the others wait for its result instead of repeating the
+call.
+"""
+import copy
+import json
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Prefix of completion keys in the response_cache table
+COMPLETION_KEY_PREFIX = "llm_completion"
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share its result"""
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Call fn(), or wait for the call already running for key
+
+        Returns:
+            (result, shared) - shared is True if another caller's result was
+            reused (followers get a deep copy and see the leader's exception)
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result), True
+
+        try:
+            flight.result = fn()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+
+class CompletionCache:
+    """Thread-safe LRU/TTL cache of completions with optional database persistence"""
+
+    def __init__(self, max_entries: int = 2048, ttl: float = 3600, db_manager=None,
+                 persist: bool = True, persist_ttl: int = 86400):
+        """
+        Args:
+            max_entries: Completions kept in memory at most
+            ttl: Seconds a completion is served from memory
+            db_manager: DatabaseManager used for persistence
+            persist: Also store completions in the response_cache table
+            persist_ttl: Expiry in seconds of persisted completions
+        """
+        self.logger = logging.getLogger(__name__)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_manager = db_manager
+        self.persist = persist
+        self.persist_ttl = persist_ttl
+
+        # key -> (JSON-encoded completion, monotonic expiry)
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.evictions = 0
+        self.expirations = 0
+        # Concurrent misses for the same key share one model call
+        self.in_flight = SingleFlight()
+        # site -> {"hits", "persistent_hits", "misses", "stores"}
+        self._sites: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def key(model: Optional[str], system_prompt: Optional[str], prompt: str,
+            temperature: float, max_tokens: Optional[int]) -> str:
+        """Cache key for everything that determines a completion"""
+        parameters = [model, system_prompt, prompt, temperature, max_tokens]
+        digest = hashlib.sha256(json.dumps(parameters, ensure_ascii=False).encode("utf-8")).hexdigest()
+        return f"{COMPLETION_KEY_PREFIX}:{digest}"
+
+    def get(self, key: str, site: str = "default") -> Optional[Dict[str, Any]]:
+        """Return a fresh copy of a cached completion, or None"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now < entry[1]:
+                    self._entries.move_to_end(key)
+                    self._count(site, "hits")
+                    return json.loads(entry[0])
+                del self._entries[key]
+                self.expirations += 1
+
+        if self._persisting():
+            try:
+                value, metadata = self.db_manager.get_cached_response(key)
+                if metadata.get("cache_hit") and isinstance(value, dict):
+                    self._store(key, json.dumps(value))
+                    with self._lock:
+                        self._count(site, "persistent_hits")
+                    return value
+            except Exception as e:
+                self.logger.error(f"Error reading cached completion: {str(e)}")
+
+        with self._lock:
+            self._count(site, "misses")
+        return None
+
+    def put(self, key: str, completion: Dict[str, Any], site: str = "default"):
+        """Cache a completion (stored as JSON, so later changes by callers do not leak in)"""
+        try:
+            encoded = json.dumps(completion, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return
+        self._store(key, encoded)
+        with self._lock:
+            self._count(site, "stores")
+
+        if self._persisting():
+            try:
+                self.db_manager.store_cached_response(key, encoded, expiry_seconds=self.persist_ttl)
+            except Exception as e:
+                self.logger.error(f"Error persisting completion: {str(e)}")
+
+    def attach(self, db_manager):
+        """Persist through db_manager from now on (if none was given at construction)"""
+        if self.db_manager is None and db_manager is not None:
+            self.db_manager = db_manager
+
+    def clear(self):
+        """Drop all in-memory completions (persisted ones expire on their own)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sites = {}
+            totals = {"hits": 0, "persistent_hits": 0, "misses": 0}
+            for site, counts in self._sites.items():
+                lookups = counts["hits"] + counts["persistent_hits"] + counts["misses"]
+                sites[site] = {
+                    **counts,
+                    "hit_rate": (counts["hits"] + counts["persistent_hits"]) / lookups if lookups else 0.0,
+                }
+                for name in totals:
+                    totals[name] += counts[name]
+            lookups = sum(totals.values())
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "persist": self._persisting(),
+                **totals,
+                "hit_rate": (totals["hits"] + totals["persistent_hits"]) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "coalesced": self.in_flight.coalesced,
+                "sites": sites,
+            }
+
+    def _persisting(self) -> bool:
+        return self.persist and self.db_manager is not None
+
+    def _count(self, site: str, name: str):
+        counts = self._sites.get(site)
+        if counts is None:
+            counts = self._sites[site] = {"hits": 0, "persistent_hits": 0, "misses": 0, "stores": 0}
+        counts[name] += 1
+
+    def _store(self, key: str, encoded: str):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (encoded, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+
+# Process-wide instance shared by every AIModelRouter and direct callers
+completion_cache = None
+_completion_cache_lock = threading.Lock()
+
+
+def get_completion_cache(db_manager=None) -> CompletionCache:
+    """
+    Get or create the shared CompletionCache
+
+    Settings come from db_manager.config (LLM_CACHE_*) when the cache is
+    created; a db_manager passed later is attached for persistence.
+
+    Args:
+        db_manager: Optional DatabaseManager for the response_cache tier
+
+    Returns:
+        Shared CompletionCache instance
+    """
+    global completion_cache
+    with _completion_cache_lock:
+        if completion_cache is None:
+            config = getattr(db_manager, "config", None)
+            completion_cache = CompletionCache(
+                max_entries=getattr(config, "LLM_CACHE_MAX_ENTRIES", 2048),
+                ttl=getattr(config, "LLM_CACHE_TTL", 3600),
+                db_manager=db_manager,
+                persist=getattr(config, "LLM_CACHE_PERSIST", True),
+                persist_ttl=getattr(config, "LLM_CACHE_PERSIST_TTL", 86400),
+            )
+        else:
+            completion_cache.attach(db_manager)
+        return completion_cache
@@ -37,6 +37,39 @@ class Config:
         self.PGPASSWORD = os.environ.get("PGPASSWORD", "")
         self.PGDATABASE = os.environ.get("PGDATABASE", "")
         
+        # Response cache settings (in-process tier in front of response_cache)
+        self.MEMORY_CACHE_MAX_ENTRIES = int(os.environ.get("MEMORY_CACHE_MAX_ENTRIES", "1000"))
+        self.MEMORY_CACHE_MAX_BYTES = int(os.environ.get("MEMORY_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+        self.MEMORY_CACHE_TTL = float(os.environ.get("MEMORY_CACHE_TTL", "60"))
+        self.CACHE_HIT_FLUSH_INTERVAL = float(os.environ.get("CACHE_HIT_FLUSH_INTERVAL", "5"))
+        
+        # Decision rules shared by all workers (rules_store)
+        self.RULES_STORE_PATH = os.environ.get("RULES_STORE_PATH", "rules_store.db")
+        self.RULES_RELOAD_INTERVAL = float(os.environ.get("RULES_RELOAD_INTERVAL", "2"))
+        
+        # Background removal of expired user memories (memory_store)
+        self.MEMORY_EXPIRY_SWEEP_INTERVAL = float(os.environ.get("MEMORY_EXPIRY_SWEEP_INTERVAL", "3600"))
+        
+        # Emotion event logging (batched, write-behind)
+        self.EMOTION_LOG_MAX_LATENCY = float(os.environ.get("EMOTION_LOG_MAX_LATENCY", "1.0"))
+        self.EMOTION_LOG_BATCH_SIZE = int(os.environ.get("EMOTION_LOG_BATCH_SIZE", "200"))
+        
+        # Batch emotion analysis (worker processes are off unless EMOTION_BATCH_WORKERS > 1)
+        self.EMOTION_BATCH_WORKERS = int(os.environ.get("EMOTION_BATCH_WORKERS", "0"))
+        self.EMOTION_BATCH_PROCESS_THRESHOLD = int(os.environ.get("EMOTION_BATCH_PROCESS_THRESHOLD", "1000"))
+        
+        # Memo of emotion analysis results (optionally persisted to response_cache)
+        self.EMOTION_MEMO_MAX_ENTRIES = int(os.environ.get("EMOTION_MEMO_MAX_ENTRIES", "1024"))
+        self.EMOTION_MEMO_TTL = float(os.environ.get("EMOTION_MEMO_TTL", "300"))
+        self.EMOTION_MEMO_PERSIST = self._get_bool_env("EMOTION_MEMO_PERSIST", False)
+        self.EMOTION_MEMO_PERSIST_TTL = int(os.environ.get("EMOTION_MEMO_PERSIST_TTL", "3600"))
+        
+        # Prompt-keyed LLM completion cache (persisted to response_cache, see completion_cache.py)
+        self.LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "2048"))
+        self.LLM_CACHE_TTL = float(os.environ.get("LLM_CACHE_TTL", "3600"))
+        self.LLM_CACHE_PERSIST = self._get_bool_env("LLM_CACHE_PERSIST", True)
+        self.LLM_CACHE_PERSIST_TTL = int(os.environ.get("LLM_CACHE_PERSIST_TTL", "86400"))
+        
         # Create data directories if they don't exist
         self.data_dirs = [
             "emotion_data", 
@@ -66,6 +99,15 @@ class Config:
         
         # TTS settings
         self.TTS_PROVIDER = "elevenlabs" if self.ELEVENLABS_API_KEY and not self.OFFLINE_MODE else "gtts"
+        self.TTS_MAX_WORKERS = int(os.environ.get("TTS_MAX_WORKERS", "4"))
+        self.TTS_CACHE_MAX_BYTES = int(os.environ.get("TTS_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+        
+        # Pre-synthesis of static phrases (guidance scripts, greetings) after TTS startup.
+        # Opt-in: every process would synthesize all of them through the paid provider
+        # on a cold cache; warm the shared cache once with `python tts_warmup.py` instead
+        self.TTS_WARMUP_ENABLED = self._get_bool_env("TTS_WARMUP_ENABLED", False)
+        self.TTS_WARMUP_WORKERS = int(os.environ.get("TTS_WARMUP_WORKERS", "2"))
+        self.TTS_WARMUP_LANGUAGES = [lang.strip() for lang in os.environ.get("TTS_WARMUP_LANGUAGES", "en,ar").split(",") if lang.strip()]
         
         # Application URL for CORS and templates
         self.APP_URL = os.environ.get("APP_URL", "https://mashaaer.replit.app")
@@ -28,7 +28,7 @@ class ContextAssistant:
         self.intent_classifier = intent_classifier
         
         # Initialize AI Model Router for dynamic model selection
-        self.model_router = AIModelRouter()
+        self.model_router = AIModelRouter(db_manager)
         
         # Context memory maintains recent conversations
         self.context_memory = deque(maxlen=10)  # Remember last 10 exchanges
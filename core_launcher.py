@@ -30,6 +30,10 @@ class CoreLauncher:
             self.logger.info("Initializing database...")
             self.db_manager.initialize_db()
             
+            # Periodic removal of expired user memories
+            from memory_store import start_expiry_sweeper
+            start_expiry_sweeper(getattr(self.config, 'MEMORY_EXPIRY_SWEEP_INTERVAL', 3600))
+            
             # Start each system in a separate thread
             self._start_subsystem("Emotion tracker", self.emotion_tracker.initialize)
             self._start_subsystem("Intent classifier", self.intent_classifier.initialize)
@@ -39,8 +43,8 @@ class CoreLauncher:
                 self.logger.info("Checking for offline voice models...")
                 self._start_subsystem("Voice model verification", self.voice_recognition.verify_offline_models)
             
-            # TTS setup
-            self._start_subsystem("Text-to-speech", self.tts_manager.initialize)
+            # TTS setup, then pre-synthesis of static phrases on the same thread
+            self._start_subsystem("Text-to-speech", self._initialize_tts)
             
             # Face recognition initialization
             self._start_subsystem("Face recognition", self.face_detector.initialize)
@@ -67,6 +71,17 @@ class CoreLauncher:
             self.system_status = "error"
             self.logger.error(f"Core launcher error: {str(e)}")
     
+    def _initialize_tts(self):
+        """Initialize TTS providers and, if TTS_WARMUP_ENABLED, warm the audio cache with static phrases"""
+        if not self.tts_manager.initialize():
+            return
+        if self.config.is_offline():
+            self.logger.info("Offline mode - skipping TTS warm-up")
+            return
+        
+        from tts_warmup import warm_tts_cache
+        warm_tts_cache(self.tts_manager, self.config)
+    
     def _start_subsystem(self, name, func):
         """Start a subsystem in a separate thread"""
         self.logger.info(f"Starting subsystem: {name}")
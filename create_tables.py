@@ -21,7 +21,7 @@ def create_tables():
                 id SERIAL PRIMARY KEY,
                 emotion TEXT NOT NULL,
                 text TEXT,
-                timestamp TEXT NOT NULL,
+                timestamp TIMESTAMP NOT NULL,
                 source TEXT DEFAULT 'text',
                 intensity REAL DEFAULT 0.5
             )
@@ -31,7 +31,7 @@ def create_tables():
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS emotion_data (
                 id SERIAL PRIMARY KEY,
-                timestamp TEXT NOT NULL,
+                timestamp TIMESTAMP NOT NULL,
                 emotion TEXT NOT NULL,
                 source TEXT DEFAULT 'text',
                 intensity REAL DEFAULT 0.5,
@@ -40,6 +40,31 @@ def create_tables():
             )
         ''')
         
+        # Indexes for time-window and per-session emotion queries
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_emotions_timestamp ON emotions (timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_emotions_emotion_timestamp ON emotions (emotion, timestamp)")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS ix_emotion_data_session_timestamp ON emotion_data (session_id, timestamp)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS ix_emotion_data_emotion_timestamp ON emotion_data (emotion, timestamp)"
+        )
+        
+        # Create emotion_daily_rollup table (maintained by EmotionLogWriter)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS emotion_daily_rollup (
+                day DATE NOT NULL,
+                session_id TEXT NOT NULL DEFAULT '',
+                emotion TEXT NOT NULL,
+                event_count INTEGER NOT NULL DEFAULT 0,
+                intensity_sum REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, session_id, emotion)
+            )
+        ''')
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS ix_emotion_daily_rollup_session_day ON emotion_daily_rollup (session_id, day)"
+        )
+        
         # Create faces table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS faces (
@@ -1,4 +1,5 @@
 import os
+import atexit
 import logging
 import threading
 import time
@@ -11,6 +12,7 @@ from psycopg2 import pool
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine, text, select, delete
 from database.models import Base, Setting, EmotionData, Face, RecognitionHistory, VoiceLog, Cache
+from database.memory_cache import MemoryCacheTier
 
 class DatabaseManager:
     """Manages database connections and operations with support for SQLite and PostgreSQL"""
@@ -55,6 +57,21 @@ class DatabaseManager:
             
         self.Session = sessionmaker(bind=self.engine)
 
+        # In-process tier in front of the response_cache table
+        self.memory_cache = MemoryCacheTier(
+            max_entries=getattr(config, 'MEMORY_CACHE_MAX_ENTRIES', 1000),
+            max_bytes=getattr(config, 'MEMORY_CACHE_MAX_BYTES', 16 * 1024 * 1024),
+            ttl=getattr(config, 'MEMORY_CACHE_TTL', 60)
+        )
+        # Seconds between batched hit-count writes; 0 writes on every hit
+        self.cache_flush_interval = getattr(config, 'CACHE_HIT_FLUSH_INTERVAL', 5.0)
+        self.db_cache_hits = 0
+        self.db_cache_misses = 0
+        self._cache_flush_thread = None
+        self._cache_flush_stop = threading.Event()
+        self._cache_flush_lock = threading.Lock()
+        self._cache_flush_registered = False
+
     def initialize_db(self):
         """Initialize the ORM database and create tables"""
         try:
@@ -385,12 +402,22 @@ class DatabaseManager:
         """
         Get a cached response by key
         
+        Served from the in-process tier when possible; database hits populate
+        it. Hit counts are batched and written by flush_cache_hits().
+        
         Args:
             cache_key: The unique identifier for the cached data
             
         Returns:
             dict: The cached data if found and not expired, None otherwise
         """
+        cached = self.memory_cache.get(cache_key)
+        if cached is not None:
+            value, metadata = cached
+            metadata["cache_tier"] = "memory"
+            self._schedule_cache_flush()
+            return self._decode_cached_value(value), metadata
+        
         try:
             with self.Session() as session:
                 # Query for the cache entry
@@ -400,38 +427,101 @@ class DatabaseManager:
                 ).first()
                 
                 if cache_entry:
-                    # Update hit count and last_hit_at timestamp
-                    cache_entry.hit_count += 1
-                    cache_entry.last_hit_at = datetime.now()
-                    session.commit()
+                    self.db_cache_hits += 1
+                    hit_at = datetime.now()
+                    metadata = {
+                        "cache_hit": True,
+                        "created_at": cache_entry.created_at.isoformat() if cache_entry.created_at else None,
+                        "expires_at": cache_entry.expires_at.isoformat() if cache_entry.expires_at else None,
+                        # Include this hit and hits not yet flushed by this worker
+                        "hit_count": (cache_entry.hit_count or 0) + self.memory_cache.pending_hits(cache_key) + 1,
+                        "last_hit_at": hit_at.isoformat(),
+                        "content_type": cache_entry.content_type
+                    }
+                    value = cache_entry.value
+                    self.memory_cache.put(cache_key, value, dict(metadata), cache_entry.expires_at)
+                    self.memory_cache.record_hit(cache_key, hit_at)
+                    self._schedule_cache_flush()
                     
-                    # Return cached data
-                    try:
-                        return json.loads(cache_entry.value), {
-                            "cache_hit": True,
-                            "created_at": cache_entry.created_at.isoformat() if cache_entry.created_at else None,
-                            "expires_at": cache_entry.expires_at.isoformat() if cache_entry.expires_at else None,
-                            "hit_count": cache_entry.hit_count,
-                            "last_hit_at": cache_entry.last_hit_at.isoformat() if cache_entry.last_hit_at else None,
-                            "content_type": cache_entry.content_type
-                        }
-                    except json.JSONDecodeError:
-                        # If it's not JSON, return raw value
-                        return cache_entry.value, {
-                            "cache_hit": True,
-                            "created_at": cache_entry.created_at.isoformat() if cache_entry.created_at else None,
-                            "expires_at": cache_entry.expires_at.isoformat() if cache_entry.expires_at else None,
-                            "hit_count": cache_entry.hit_count,
-                            "last_hit_at": cache_entry.last_hit_at.isoformat() if cache_entry.last_hit_at else None,
-                            "content_type": cache_entry.content_type
-                        }
+                    metadata["cache_tier"] = "database"
+                    return self._decode_cached_value(value), metadata
                         
+            self.db_cache_misses += 1
             return None, {"cache_hit": False}
                 
         except Exception as e:
             self.logger.error(f"Error retrieving cached response for key '{cache_key}': {str(e)}")
             return None, {"cache_hit": False, "error": str(e)}
     
+    def _decode_cached_value(self, value):
+        """Return cached JSON as data, or the raw value if it is not JSON"""
+        try:
+            return json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return value
+    
+    def _schedule_cache_flush(self):
+        """Write hit counts now, or make sure the background flusher is running"""
+        if not self.cache_flush_interval or self.cache_flush_interval <= 0:
+            self.flush_cache_hits()
+            return
+        
+        with self._cache_flush_lock:
+            if self._cache_flush_thread and self._cache_flush_thread.is_alive():
+                return
+            self._cache_flush_stop.clear()
+            self._cache_flush_thread = threading.Thread(
+                target=self._cache_flush_loop, name="cache-hit-flusher", daemon=True
+            )
+            self._cache_flush_thread.start()
+            if not self._cache_flush_registered:
+                # Flush outstanding hit counts on interpreter shutdown
+                atexit.register(self.stop_cache_flusher)
+                self._cache_flush_registered = True
+    
+    def _cache_flush_loop(self):
+        while not self._cache_flush_stop.wait(self.cache_flush_interval):
+            self.flush_cache_hits()
+    
+    def stop_cache_flusher(self):
+        """Stop the background flusher and write any remaining hit counts"""
+        self._cache_flush_stop.set()
+        thread = self._cache_flush_thread
+        if thread and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        self.flush_cache_hits()
+    
+    def flush_cache_hits(self):
+        """
+        Write batched hit counts to the response_cache table
+        
+        Returns:
+            int: Number of cache entries updated
+        """
+        pending = self.memory_cache.drain_pending_hits()
+        if not pending:
+            return 0
+        
+        try:
+            with self.Session() as session:
+                session.execute(
+                    text(
+                        "UPDATE response_cache "
+                        "SET hit_count = COALESCE(hit_count, 0) + :hits, last_hit_at = :hit_at "
+                        "WHERE key = :cache_key"
+                    ),
+                    [
+                        {"cache_key": key, "hits": hits, "hit_at": hit_at}
+                        for key, (hits, hit_at) in pending.items()
+                    ]
+                )
+                session.commit()
+            return len(pending)
+        except Exception as e:
+            self.logger.error(f"Error flushing cache hit counts: {str(e)}")
+            self.memory_cache.restore_pending_hits(pending)
+            return 0
+    
     def store_cached_response(self, cache_key, value, expiry_seconds=300, content_type='application/json'):
         """
         Store a response in the cache
@@ -476,8 +566,19 @@ class DatabaseManager:
                     session.add(cache_entry)
                     
                 session.commit()
-                self.logger.debug(f"Cached response stored with key '{cache_key}', expires in {expiry_seconds}s")
-                return True
+                
+            # Write through to the in-process tier; the hit count was reset above
+            self.memory_cache.invalidate(cache_key=cache_key)
+            self.memory_cache.put(cache_key, value, {
+                "cache_hit": True,
+                "created_at": datetime.now().isoformat(),
+                "expires_at": expires_at.isoformat() if expires_at else None,
+                "hit_count": 0,
+                "last_hit_at": None,
+                "content_type": content_type
+            }, expires_at)
+            self.logger.debug(f"Cached response stored with key '{cache_key}', expires in {expiry_seconds}s")
+            return True
                 
         except Exception as e:
             self.logger.error(f"Error storing cached response for key '{cache_key}': {str(e)}")
@@ -494,6 +595,9 @@ class DatabaseManager:
         Returns:
             int: Number of invalidated entries
         """
+        # Drop the in-process copies first so this worker never serves them again
+        self.memory_cache.invalidate(cache_key=cache_key, pattern=pattern)
+        
         try:
             with self.Session() as session:
                 query = session.query(Cache)
@@ -525,6 +629,8 @@ class DatabaseManager:
         Returns:
             int: Number of removed entries
         """
+        self.memory_cache.purge_expired()
+        
         try:
             with self.Session() as session:
                 count = session.query(Cache).filter(
@@ -569,6 +675,7 @@ class DatabaseManager:
                 """
                 
                 result = session.execute(text(size_query)).first()
+                db_lookups = self.db_cache_hits + self.db_cache_misses
                 
                 return {
                     "total_entries": total,
@@ -578,6 +685,12 @@ class DatabaseManager:
                     "avg_entry_size_bytes": int(result.avg_size) if result else 0,
                     "max_entry_size_bytes": result.max_size if result else 0,
                     "avg_hits_per_entry": float(result.avg_hits) if result else 0,
+                    "memory_tier": self.memory_cache.stats(),
+                    "database_tier": {
+                        "hits": self.db_cache_hits,
+                        "misses": self.db_cache_misses,
+                        "hit_rate": self.db_cache_hits / db_lookups if db_lookups else 0.0
+                    },
                     "timestamp": datetime.now().isoformat()
                 }
                 
@@ -0,0 +1,119 @@
+"""
+Typed timestamps and daily rollups for emotion events.
+
+emotion_data / emotions timestamps are real DATETIME columns (see the
+emotion_timestamps alembic revision). PostgreSQL gets datetime objects;
+SQLite has no datetime storage class, so timestamps are written as
+'YYYY-MM-DD HH:MM:SS.ffffff' text, the format SQLAlchemy's DateTime uses,
+which sorts and compares correctly as a string.
+
+Every batch written by EmotionLogWriter is also folded into
+emotion_daily_rollup (one row per day, session and emotion with the event
+count and intensity sum) in the same transaction, so history and trend
+queries over 7/30/90 days read a few dozen rollup rows instead of
+scanning raw events.
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+SQLITE_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+ROLLUP_TABLE = "emotion_daily_rollup"
+
+# (day, session_id, emotion) -> [event_count, intensity_sum]
+RollupKey = Tuple[date, str, str]
+
+
+def parse_db_timestamp(value: Union[str, datetime, None]) -> Optional[datetime]:
+    """Read a timestamp column value (datetime from PostgreSQL, ISO text from SQLite)"""
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+
+
+def to_db_timestamp(value: Union[str, datetime], use_postgres: bool) -> Union[str, datetime]:
+    """Convert a datetime or ISO string into the parameter for a timestamp column"""
+    timestamp = parse_db_timestamp(value)
+    return timestamp if use_postgres else timestamp.strftime(SQLITE_TIMESTAMP_FORMAT)
+
+
+def to_db_day(value: Union[date, datetime, str], use_postgres: bool) -> Union[str, date]:
+    """Convert a date, datetime or ISO string into the parameter for a date column"""
+    if isinstance(value, str):
+        value = parse_db_timestamp(value)
+    if isinstance(value, datetime):
+        value = value.date()
+    return value if use_postgres else value.isoformat()
+
+
+def day_key(value: Union[date, str]) -> str:
+    """'YYYY-MM-DD' for a date column value"""
+    return value.isoformat() if isinstance(value, date) else str(value)[:10]
+
+
+def aggregate_daily(events: Iterable[Dict[str, Any]]) -> Dict[RollupKey, List[float]]:
+    """Fold events (emotion, timestamp, intensity, session_id) into rollup deltas"""
+    totals: Dict[RollupKey, List[float]] = defaultdict(lambda: [0, 0.0])
+    for event in events:
+        if not event.get("emotion"):
+            continue
+        day = parse_db_timestamp(event["timestamp"]).date()
+        key = (day, event.get("session_id") or "", event["emotion"])
+        totals[key][0] += 1
+        totals[key][1] += float(event.get("intensity") or 0.0)
+    return totals
+
+
+def upsert_daily_rollups(cursor, events: Iterable[Dict[str, Any]], use_postgres: bool) -> int:
+    """
+    Add a batch of events to emotion_daily_rollup using the caller's cursor
+
+    Runs inside the caller's transaction, so the rollup commits or rolls
+    back together with the raw events (the caller's connection must not be
+    in autocommit mode).
+
+    Returns:
+        Number of rollup rows touched
+    """
+    totals = aggregate_daily(events)
+    if not totals:
+        return 0
+
+    placeholder = "%s" if use_postgres else "?"
+    cursor.executemany(
+        f"INSERT INTO {ROLLUP_TABLE} (day, session_id, emotion, event_count, intensity_sum) "
+        f"VALUES ({', '.join([placeholder] * 5)}) "
+        "ON CONFLICT (day, session_id, emotion) DO UPDATE SET "
+        f"event_count = {ROLLUP_TABLE}.event_count + excluded.event_count, "
+        f"intensity_sum = {ROLLUP_TABLE}.intensity_sum + excluded.intensity_sum",
+        [(to_db_day(day, use_postgres), session_id, emotion, count, intensity_sum)
+         for (day, session_id, emotion), (count, intensity_sum) in totals.items()]
+    )
+    return len(totals)
+
+
+def query_daily_rollups(db_manager, start_day: Union[date, datetime],
+                        session_id: Optional[str] = None) -> List[Tuple[str, str, int, float]]:
+    """
+    Per day and emotion totals since start_day (inclusive), summed over sessions
+
+    Returns:
+        (day 'YYYY-MM-DD', emotion, event_count, intensity_sum) rows ordered by day
+    """
+    use_postgres = getattr(db_manager, "use_postgres", False)
+    query = (
+        f"SELECT day, emotion, SUM(event_count), SUM(intensity_sum) FROM {ROLLUP_TABLE} "
+        "WHERE day >= ?"
+    )
+    params = [to_db_day(start_day, use_postgres)]
+    if session_id is not None:
+        query += " AND session_id = ?"
+        params.append(session_id)
+    query += " GROUP BY day, emotion ORDER BY day"
+
+    rows = db_manager.execute_query(query, tuple(params)) or []
+    return [(day_key(day), emotion, int(count), float(intensity_sum or 0.0))
+            for day, emotion, count, intensity_sum in rows]
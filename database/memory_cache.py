@@ -0,0 +1,192 @@
+"""
+In-process LRU/TTL cache tier in front of the response_cache table.
+
+Each worker keeps a bounded copy of recently used cache entries so repeated
+hits are answered without opening an ORM session. Hit counters are not
+written per hit; they are accumulated here and flushed to the database in
+batches by DatabaseManager.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+
+def like_to_regex(pattern: str):
+    """Compile a SQL LIKE pattern (% and _ wildcards) into an anchored regex"""
+    parts = []
+    for char in pattern:
+        if char == '%':
+            parts.append('.*')
+        elif char == '_':
+            parts.append('.')
+        else:
+            parts.append(re.escape(char))
+    return re.compile('^' + ''.join(parts) + '$', re.DOTALL)
+
+
+class _Entry:
+    __slots__ = ("value", "metadata", "size", "stale_at", "expires_at")
+
+    def __init__(self, value: str, metadata: Dict[str, Any], stale_at: float, expires_at: Optional[datetime]):
+        self.value = value
+        self.metadata = metadata
+        self.size = len(value)
+        self.stale_at = stale_at
+        self.expires_at = expires_at
+
+
+class MemoryCacheTier:
+    """
+    Thread-safe LRU cache bounded by entry count and total value size.
+
+    Entries live for at most `ttl` seconds (so entries invalidated by another
+    worker disappear within that window) and never outlive the expires_at of
+    the database row they mirror.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 16 * 1024 * 1024, ttl: float = 60):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._size = 0
+        self._pending_hits: Dict[str, Tuple[int, datetime]] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Return (value, metadata) for a live entry and count the hit.
+
+        The entry becomes most recently used, its hit_count/last_hit_at
+        metadata is bumped and the hit is queued for the next database flush.
+        """
+        now = time.monotonic()
+        hit_at = datetime.now()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if now >= entry.stale_at or (entry.expires_at and entry.expires_at <= hit_at):
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            entry.metadata["hit_count"] = (entry.metadata.get("hit_count") or 0) + 1
+            entry.metadata["last_hit_at"] = hit_at.isoformat()
+            self._add_pending_hit(key, hit_at)
+            return entry.value, dict(entry.metadata)
+
+    def put(self, key: str, value: str, metadata: Dict[str, Any], expires_at: Optional[datetime] = None):
+        """Insert or replace an entry, evicting least recently used ones to stay in budget"""
+        if len(value) > self.max_bytes or self.max_entries <= 0:
+            return
+        entry = _Entry(value, metadata, time.monotonic() + self.ttl, expires_at)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._size += entry.size
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def record_hit(self, key: str, hit_at: Optional[datetime] = None):
+        """Queue a hit served outside this tier (e.g. from the database) for the next flush"""
+        with self._lock:
+            self._add_pending_hit(key, hit_at or datetime.now())
+
+    def pending_hits(self, key: str) -> int:
+        with self._lock:
+            return self._pending_hits.get(key, (0, None))[0]
+
+    def drain_pending_hits(self) -> Dict[str, Tuple[int, datetime]]:
+        """Take all pending hit counters, leaving the tier with none"""
+        with self._lock:
+            pending, self._pending_hits = self._pending_hits, {}
+            return pending
+
+    def restore_pending_hits(self, pending: Dict[str, Tuple[int, datetime]]):
+        """Merge back counters whose flush failed so they are retried"""
+        with self._lock:
+            for key, (count, hit_at) in pending.items():
+                current, latest = self._pending_hits.get(key, (0, hit_at))
+                self._pending_hits[key] = (current + count, max(latest, hit_at))
+
+    def invalidate(self, cache_key: Optional[str] = None, pattern: Optional[str] = None) -> int:
+        """
+        Drop entries (and their pending hit counters) like invalidate_cache does.
+
+        Args:
+            cache_key: Exact key to drop
+            pattern: SQL LIKE pattern of keys to drop; with neither, drop everything
+
+        Returns:
+            int: Number of entries dropped from memory
+        """
+        with self._lock:
+            if cache_key:
+                keys = [cache_key] if cache_key in self._entries else []
+                self._pending_hits.pop(cache_key, None)
+            elif pattern:
+                regex = like_to_regex(pattern)
+                keys = [k for k in self._entries if regex.match(k)]
+                for pending_key in [k for k in self._pending_hits if regex.match(k)]:
+                    del self._pending_hits[pending_key]
+            else:
+                keys = list(self._entries)
+                self._pending_hits.clear()
+            for k in keys:
+                self._remove(k)
+            return len(keys)
+
+    def purge_expired(self) -> int:
+        """Remove entries past their TTL or database expiry"""
+        now = time.monotonic()
+        wall_now = datetime.now()
+        with self._lock:
+            expired = [
+                k for k, e in self._entries.items()
+                if now >= e.stale_at or (e.expires_at and e.expires_at <= wall_now)
+            ]
+            for k in expired:
+                self._remove(k)
+            self.expirations += len(expired)
+            return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "pending_hit_updates": sum(count for count, _ in self._pending_hits.values()),
+            }
+
+    def _add_pending_hit(self, key: str, hit_at: datetime):
+        count, _ = self._pending_hits.get(key, (0, hit_at))
+        self._pending_hits[key] = (count + 1, hit_at)
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._size -= entry.size
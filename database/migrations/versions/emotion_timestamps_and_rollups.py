@@ -0,0 +1,109 @@
+"""typed emotion timestamps, composite indexes and daily rollups
+
+Revision ID: emotion_timestamps
+Revises: update_voice_logs
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'emotion_timestamps'
+down_revision = 'update_voice_logs'
+branch_labels = None
+depends_on = None
+
+
+EMOTION_TABLES = ('emotion_data', 'emotions')
+
+INDEXES = {
+    'emotion_data': {
+        'ix_emotion_data_session_timestamp': ['session_id', 'timestamp'],
+        'ix_emotion_data_emotion_timestamp': ['emotion', 'timestamp'],
+    },
+    'emotions': {
+        'ix_emotions_timestamp': ['timestamp'],
+        'ix_emotions_emotion_timestamp': ['emotion', 'timestamp'],
+    },
+}
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing_tables = inspector.get_table_names()
+    is_postgres = bind.dialect.name == 'postgresql'
+
+    for table in EMOTION_TABLES:
+        if table not in existing_tables:
+            continue
+        if is_postgres:
+            op.alter_column(
+                table, 'timestamp',
+                type_=sa.DateTime(),
+                existing_type=sa.String(),
+                postgresql_using='timestamp::timestamp'
+            )
+        else:
+            # SQLite stores datetimes as text; switch the ISO 'T' separator to the
+            # format SQLAlchemy's DateTime writes so range comparisons stay correct.
+            # The declared column type is left alone (changing it means a table rebuild).
+            op.execute(f"UPDATE {table} SET timestamp = replace(timestamp, 'T', ' ') WHERE timestamp LIKE '%T%'")
+
+    # Tables created by create_all() after the model change already have these
+    for table, indexes in INDEXES.items():
+        if table not in existing_tables:
+            continue
+        existing_indexes = {index['name'] for index in inspector.get_indexes(table)}
+        for name, columns in indexes.items():
+            if name not in existing_indexes:
+                op.create_index(name, table, columns)
+
+    if 'emotion_daily_rollup' not in existing_tables:
+        op.create_table('emotion_daily_rollup',
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column('session_id', sa.String(), nullable=False),
+            sa.Column('emotion', sa.String(), nullable=False),
+            sa.Column('event_count', sa.Integer(), nullable=False),
+            sa.Column('intensity_sum', sa.Float(), nullable=False),
+            sa.PrimaryKeyConstraint('day', 'session_id', 'emotion')
+        )
+        op.create_index('ix_emotion_daily_rollup_session_day', 'emotion_daily_rollup', ['session_id', 'day'])
+
+    # Backfill the rollup from existing events (create_all() may have made it empty)
+    if 'emotion_data' in existing_tables:
+        day_expr = 'CAST(timestamp AS DATE)' if is_postgres else 'date(timestamp)'
+        op.execute(f'''
+        INSERT INTO emotion_daily_rollup (day, session_id, emotion, event_count, intensity_sum)
+        SELECT {day_expr}, COALESCE(session_id, ''), emotion, COUNT(*), SUM(COALESCE(intensity, 0))
+        FROM emotion_data
+        WHERE timestamp IS NOT NULL AND emotion IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM emotion_daily_rollup)
+        GROUP BY 1, 2, 3
+        ''')
+
+
+def downgrade():
+    bind = op.get_bind()
+    existing_tables = sa.inspect(bind).get_table_names()
+    is_postgres = bind.dialect.name == 'postgresql'
+
+    op.drop_index('ix_emotion_daily_rollup_session_day', table_name='emotion_daily_rollup')
+    op.drop_table('emotion_daily_rollup')
+
+    for table, indexes in INDEXES.items():
+        if table in existing_tables:
+            for name in indexes:
+                op.drop_index(name, table_name=table)
+
+    if is_postgres:
+        for table in EMOTION_TABLES:
+            if table in existing_tables:
+                op.alter_column(
+                    table, 'timestamp',
+                    type_=sa.String(),
+                    existing_type=sa.DateTime(),
+                    postgresql_using='timestamp::text'
+                )
@@ -1,6 +1,6 @@
 
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, Integer, String, Float, Text, Boolean, BigInteger, DateTime, ForeignKey, Numeric
+from sqlalchemy import Column, Integer, String, Float, Text, Boolean, BigInteger, Date, DateTime, ForeignKey, Numeric, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -14,15 +14,36 @@ class Setting(Base):
 
 class EmotionData(Base):
     __tablename__ = 'emotion_data'
+    __table_args__ = (
+        Index('ix_emotion_data_session_timestamp', 'session_id', 'timestamp'),
+        Index('ix_emotion_data_emotion_timestamp', 'emotion', 'timestamp'),
+    )
     id = Column(Integer, primary_key=True, autoincrement=True)
     session_id = Column(String)
     emotion = Column(String)
-    timestamp = Column(String)
+    timestamp = Column(DateTime)
     intensity = Column(Float)
     text = Column(Text)
     source = Column(String)
     context = Column(Text, nullable=True)  # Added context for emotion timeline
 
+class EmotionDailyRollup(Base):
+    """
+    Per day, session and emotion totals of emotion_data events
+
+    Maintained on insert by EmotionLogWriter (see database/emotion_rollup.py)
+    so history and trend queries don't scan raw events.
+    """
+    __tablename__ = 'emotion_daily_rollup'
+    __table_args__ = (
+        Index('ix_emotion_daily_rollup_session_day', 'session_id', 'day'),
+    )
+    day = Column(Date, primary_key=True)
+    session_id = Column(String, primary_key=True, default='')  # '' for events without a session
+    emotion = Column(String, primary_key=True)
+    event_count = Column(Integer, nullable=False, default=0)
+    intensity_sum = Column(Float, nullable=False, default=0.0)
+
 class Face(Base):
     __tablename__ = 'faces'
     id = Column(Integer, primary_key=True, autoincrement=True)
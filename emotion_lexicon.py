@@ -0,0 +1,194 @@
+"""
+Precomputed synonym lexicon for the emotion keyword table.
+
+Expanding every emotion keyword through WordNet is slow, needs the WordNet
+corpus on disk and, done lazily, is repeated by every worker process. This
+module moves that work to an offline build step:
+
+    python emotion_lexicon.py            # writes emotion_data/synonym_lexicon.json
+
+The file stores each distinct synonym once and refers to it by index, so it
+stays small and loads with a single json.load at EmotionTracker startup.
+Keywords missing from the file (e.g. added by retraining) fall back to the
+runtime WordNet lookup.
+"""
+import os
+import sys
+import json
+import hashlib
+import logging
+import argparse
+import tempfile
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when the file layout or the synonym expansion rules change
+LEXICON_VERSION = 1
+LEXICON_FILENAME = "synonym_lexicon.json"
+DEFAULT_LEXICON_PATH = os.path.join("emotion_data", LEXICON_FILENAME)
+
+SynonymFunction = Callable[[str, int, Optional[str]], List[str]]
+
+
+def keywords_fingerprint(emotion_keywords: Dict[str, Dict[str, float]]) -> str:
+    """Stable hash of the keyword table a lexicon was built from"""
+    normalized = {
+        emotion: sorted(keywords.keys() if isinstance(keywords, dict) else keywords)
+        for emotion, keywords in emotion_keywords.items()
+    }
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+class SynonymLexicon:
+    """Read-only (emotion, keyword) -> synonyms lookup loaded from a lexicon file"""
+
+    def __init__(self, terms: List[str], synonyms: Dict[str, Dict[str, List[int]]],
+                 version: int = LEXICON_VERSION, fingerprint: str = None, generated_at: str = None):
+        self.terms = terms
+        self.synonyms = synonyms
+        self.version = version
+        self.fingerprint = fingerprint
+        self.generated_at = generated_at
+
+    def __len__(self) -> int:
+        return sum(len(keywords) for keywords in self.synonyms.values())
+
+    def get(self, keyword: str, emotion: str) -> Optional[List[str]]:
+        """Synonyms for a keyword in an emotion context, or None if not in the lexicon"""
+        indices = self.synonyms.get(emotion, {}).get(keyword)
+        if indices is None:
+            return None
+        return [self.terms[i] for i in indices]
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": self.version,
+            "generated_at": self.generated_at,
+            "fingerprint": self.fingerprint,
+            "terms": self.terms,
+            "synonyms": self.synonyms,
+        }
+
+
+def build_lexicon(emotion_keywords: Dict[str, Dict[str, float]],
+                  synonym_function: SynonymFunction) -> SynonymLexicon:
+    """
+    Expand every keyword of every emotion into its synonyms.
+
+    Args:
+        emotion_keywords: Emotion -> {keyword: weight} table (list values are legacy and skipped)
+        synonym_function: Called as synonym_function(keyword, depth, emotion)
+
+    Returns:
+        SynonymLexicon with each distinct synonym stored once
+    """
+    from emotion_matcher import synonym_depth
+
+    term_index: Dict[str, int] = {}
+    terms: List[str] = []
+    synonyms: Dict[str, Dict[str, List[int]]] = {}
+
+    for emotion, keywords in emotion_keywords.items():
+        if not isinstance(keywords, dict):
+            continue
+        depth = synonym_depth(emotion)
+        expanded = {}
+        for keyword in keywords:
+            indices = []
+            for synonym in sorted(set(synonym_function(keyword, depth, emotion))):
+                if synonym not in term_index:
+                    term_index[synonym] = len(terms)
+                    terms.append(synonym)
+                indices.append(term_index[synonym])
+            expanded[keyword] = indices
+        synonyms[emotion] = expanded
+
+    return SynonymLexicon(
+        terms,
+        synonyms,
+        fingerprint=keywords_fingerprint(emotion_keywords),
+        generated_at=datetime.now().isoformat(),
+    )
+
+
+def save_lexicon(lexicon: SynonymLexicon, path: str = DEFAULT_LEXICON_PATH):
+    """Write the lexicon atomically so running workers never read a partial file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # A temp file of its own per writer, so concurrent builds never interleave
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory or ".",
+                                     prefix=f"{os.path.basename(path)}.", suffix=".tmp",
+                                     delete=False) as f:
+        temp_path = f.name
+        try:
+            json.dump(lexicon.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+        except BaseException:
+            f.close()
+            os.remove(temp_path)
+            raise
+    os.replace(temp_path, path)
+
+
+def load_lexicon(path: str = DEFAULT_LEXICON_PATH) -> Optional[SynonymLexicon]:
+    """Load a lexicon file, returning None if it is missing, unreadable or outdated"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error(f"Error loading synonym lexicon {path}: {str(e)}")
+        return None
+
+    if data.get("version") != LEXICON_VERSION:
+        logger.warning(
+            f"Ignoring synonym lexicon {path}: version {data.get('version')} != {LEXICON_VERSION}, "
+            f"rebuild it with 'python emotion_lexicon.py'"
+        )
+        return None
+
+    return SynonymLexicon(
+        data["terms"],
+        data["synonyms"],
+        version=data["version"],
+        fingerprint=data.get("fingerprint"),
+        generated_at=data.get("generated_at"),
+    )
+
+
+def main():
+    """Build the synonym lexicon from the EmotionTracker keyword table"""
+    parser = argparse.ArgumentParser(description="Build the Mashaaer emotion synonym lexicon")
+    parser.add_argument("--output", default=DEFAULT_LEXICON_PATH, help="Lexicon file to write")
+    parser.add_argument("--download", action="store_true", help="Download the WordNet corpus if missing")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    import nltk
+    try:
+        nltk.data.find("corpora/wordnet")
+    except LookupError:
+        if not args.download or not nltk.download("wordnet"):
+            logger.error("WordNet corpus not found; run with --download or install it with nltk.download('wordnet')")
+            return 1
+
+    from emotion_tracker import EmotionTracker, _get_synonyms
+
+    # The tracker merges saved keywords from emotion_data/ into its table
+    emotion_keywords = EmotionTracker(None).emotion_keywords
+    lexicon = build_lexicon(
+        emotion_keywords,
+        lambda keyword, depth, emotion: _get_synonyms(keyword, depth=depth, emotion_context=emotion),
+    )
+    save_lexicon(lexicon, args.output)
+
+    logger.info(f"Wrote {len(lexicon)} keyword expansions ({len(lexicon.terms)} distinct terms) to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""
+Write-behind logging of emotion detection events.
+
+EmotionTracker.log_emotion used to run two INSERTs, a commit and a full
+rewrite of the daily JSON backup file on the request path. EmotionLogWriter
+queues events instead and a background thread writes them in batches: one
+executemany per table per batch, and backup records appended to a daily
+line-delimited (JSONL) file. Each batch also updates emotion_daily_rollup;
+the inserts and the rollup run in one explicit transaction (autocommit is
+switched off for the batch), so they commit or roll back together. Pending events are flushed on close() and at
+interpreter shutdown.
+"""
+import os
+import json
+import queue
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from database.emotion_rollup import to_db_timestamp, upsert_daily_rollups
+
+# Sentinel asking the worker to flush what it has and acknowledge
+_FLUSH = object()
+_STOP = object()
+
+
+class EmotionLogWriter:
+    """Batches emotion events into executemany INSERTs on a background thread"""
+
+    def __init__(self, db_manager, data_dir: str = "emotion_data", max_latency: float = 1.0,
+                 max_batch_size: int = 200, max_queue_size: int = 10000):
+        """
+        Args:
+            db_manager: DatabaseManager providing get_connection()
+            data_dir: Directory for the daily emotions_YYYY-MM-DD.jsonl backups
+            max_latency: Longest time in seconds an event waits before being written
+            max_batch_size: Events written per batch at most
+            max_queue_size: Pending events before log() starts dropping new ones
+        """
+        self.logger = logging.getLogger(__name__)
+        self.db_manager = db_manager
+        self.data_dir = data_dir
+        self.max_latency = max_latency
+        self.max_batch_size = max_batch_size
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue_size)
+        self._closed = False
+        self.events_written = 0
+        self.batches_written = 0
+        self.failed_batches = 0
+        self.dropped_events = 0
+
+        self._thread = threading.Thread(target=self._run, name="emotion-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, event: Dict[str, Any]) -> bool:
+        """
+        Queue one event (emotion, text, timestamp, source, intensity, session_id)
+
+        Never blocks: if the writer has fallen max_queue_size events behind
+        (e.g. the database stalls), the event is dropped and counted in
+        stats() instead of holding up the request thread.
+
+        Returns:
+            True if the event was queued
+        """
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped_events += 1
+            if self.dropped_events == 1 or self.dropped_events % 1000 == 0:
+                self.logger.warning(f"Emotion log queue full, {self.dropped_events} events dropped so far")
+            return False
+        return True
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Block until every event queued so far has been written"""
+        if self._closed or not self._thread.is_alive():
+            return False
+        done = threading.Event()
+        try:
+            self._queue.put((_FLUSH, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Write pending events and stop the worker thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put((_STOP, None))
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self._queue.qsize(),
+            "events_written": self.events_written,
+            "batches_written": self.batches_written,
+            "failed_batches": self.failed_batches,
+            "dropped_events": self.dropped_events,
+        }
+
+    def _run(self):
+        batch: List[Dict[str, Any]] = []
+        deadline = None
+
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            control = item[0] if isinstance(item, tuple) else None
+            if item is not None and control is None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.max_latency
+
+            batch_due = deadline is not None and time.monotonic() >= deadline
+            if batch and (control is not None or batch_due or len(batch) >= self.max_batch_size):
+                self._write_batch(batch)
+                batch = []
+                deadline = None
+
+            if control is _FLUSH:
+                item[1].set()
+            elif control is _STOP:
+                return
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        # Backup first, so events survive a database outage
+        self._append_backup(batch)
+
+        conn = None
+        autocommit = False
+        try:
+            conn = self.db_manager.get_connection()
+            # PostgreSQL connections from DatabaseManager are in autocommit mode;
+            # the batch needs one explicit transaction so a failed rollup upsert
+            # also rolls back its raw events
+            autocommit = getattr(conn, "autocommit", False) is True
+            if autocommit:
+                conn.autocommit = False
+            cursor = conn.cursor()
+            use_postgres = getattr(self.db_manager, "use_postgres", False)
+            placeholder = "%s" if use_postgres else "?"
+            timestamps = [to_db_timestamp(e["timestamp"], use_postgres) for e in batch]
+
+            # emotion_data table (used for dashboard visualizations)
+            cursor.executemany(
+                "INSERT INTO emotion_data (timestamp, emotion, source, intensity, text, session_id) "
+                f"VALUES ({', '.join([placeholder] * 6)})",
+                [(ts, e["emotion"], e["source"], e["intensity"], e["text"], e["session_id"])
+                 for ts, e in zip(timestamps, batch)]
+            )
+
+            # emotions table (used for model training)
+            cursor.executemany(
+                "INSERT INTO emotions (emotion, text, timestamp, source, intensity) "
+                f"VALUES ({', '.join([placeholder] * 5)})",
+                [(e["emotion"], e["text"], ts, e["source"], e["intensity"]) for ts, e in zip(timestamps, batch)]
+            )
+
+            # Daily totals read by the history and trend queries
+            upsert_daily_rollups(cursor, batch, use_postgres)
+
+            conn.commit()
+            self.events_written += len(batch)
+            self.batches_written += 1
+            self.logger.debug(f"Logged {len(batch)} emotion events")
+        except Exception as e:
+            self.failed_batches += 1
+            self.logger.error(f"Failed to log {len(batch)} emotion events: {str(e)}")
+            if conn is not None:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+        finally:
+            if autocommit:
+                try:
+                    conn.autocommit = True
+                except Exception:
+                    pass
+
+    def _append_backup(self, batch: List[Dict[str, Any]]):
+        """Append the batch to the daily JSONL backup files (one line per event)"""
+        by_day = defaultdict(list)
+        for event in batch:
+            by_day[event["timestamp"][:10]].append(event)
+
+        try:
+            os.makedirs(self.data_dir, exist_ok=True)
+            for day, events in by_day.items():
+                filename = os.path.join(self.data_dir, f"emotions_{day}.jsonl")
+                with open(filename, "a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps(event, ensure_ascii=False) + "\n" for event in events))
+        except Exception as e:
+            self.logger.error(f"Failed to write emotion backup: {str(e)}")
@@ -0,0 +1,218 @@
+"""
+Compiled keyword, synonym and phrase matcher for rule-based emotion analysis.
+
+The matcher is built once from the emotion keyword table, the synonym
+expansion of every keyword and the literal phrases used by the rule-based
+analyzer. A message is then scored with a single tokenization pass plus a
+single Aho-Corasick scan, instead of one regex search per keyword, one per
+synonym and one substring check per special phrase.
+"""
+import re
+from collections import Counter, defaultdict, deque
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+WORD_PATTERN = re.compile(r'\b\w+\b')
+_WORD_CHAR = re.compile(r'\w')
+
+# Emotions whose keywords are expanded two synonym levels deep
+DEEP_SYNONYM_EMOTIONS = ("contemplative", "inspired", "satisfied", "frustrated", "amused")
+
+SynonymLookup = Callable[[str, int, Optional[str]], List[str]]
+
+
+def synonym_depth(emotion: str) -> int:
+    """Synonym expansion depth used for an emotion's keywords"""
+    return 2 if emotion in DEEP_SYNONYM_EMOTIONS else 1
+
+
+def synonym_factor(depth: int) -> float:
+    """Weight multiplier for a synonym found at the given depth"""
+    return 0.7 if depth == 1 else 0.5
+
+
+def _is_word_char(char: str) -> bool:
+    return bool(_WORD_CHAR.match(char))
+
+
+class PhraseAutomaton:
+    """Aho-Corasick automaton reporting every phrase occurrence, overlaps included"""
+
+    def __init__(self, phrases: Iterable[str] = ()):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        self._built = False
+        for phrase in phrases:
+            self.add(phrase)
+
+    def __len__(self) -> int:
+        return sum(1 for out in self._output if out)
+
+    def add(self, phrase: str):
+        """Register a phrase; the automaton is rebuilt lazily on the next scan"""
+        if not phrase:
+            return
+        state = 0
+        for char in phrase:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        if phrase not in self._output[state]:
+            self._output[state].append(phrase)
+        self._built = False
+
+    def build(self):
+        """Compute failure links and merge outputs along them"""
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                inherited = self._output[self._fail[next_state]]
+                if inherited:
+                    self._output[next_state] = self._output[next_state] + [
+                        p for p in inherited if p not in self._output[next_state]
+                    ]
+
+        self._built = True
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str]]:
+        """Yield (start_index, phrase) for every occurrence of every phrase"""
+        if not self._built:
+            self.build()
+
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                for phrase in output[state]:
+                    yield index - len(phrase) + 1, phrase
+
+    def find_all(self, text: str) -> Set[str]:
+        """Return the set of phrases that occur anywhere in the text"""
+        return {phrase for _, phrase in self.iter_matches(text)}
+
+
+class MatchResult:
+    """Everything the rule-based analyzer needs from one scan of a message"""
+
+    __slots__ = ("text", "words", "phrases", "compound_counts")
+
+    def __init__(self, text: str, words: List[str], phrases: Set[str], compound_counts: Counter):
+        self.text = text
+        self.words = words
+        self.phrases = phrases
+        self.compound_counts = compound_counts
+
+
+class EmotionMatcher:
+    """
+    Precompiled lookup of emotion keywords, their synonyms and rule phrases.
+
+    Single-word terms (keywords and synonyms) are folded into one dict mapping
+    the term to its accumulated per-emotion weight, so scoring a token is one
+    dict lookup. Multi-word or punctuated terms, which can never equal a
+    single token, are matched on word boundaries by the phrase automaton
+    alongside the literal phrases, which are matched as plain substrings.
+    """
+
+    def __init__(self, emotion_keywords: Dict[str, Dict[str, float]],
+                 synonym_lookup: Optional[SynonymLookup] = None,
+                 phrases: Iterable[str] = ()):
+        self.term_weights: Dict[str, Dict[str, float]] = {}
+        self.compound_terms: Dict[str, Dict[str, float]] = {}
+
+        weights = defaultdict(lambda: defaultdict(float))
+        for emotion, keywords in emotion_keywords.items():
+            if isinstance(keywords, dict):
+                depth = synonym_depth(emotion)
+                factor = synonym_factor(depth)
+                for keyword, weight in keywords.items():
+                    weights[keyword][emotion] += weight
+                    if synonym_lookup is None:
+                        continue
+                    for synonym in synonym_lookup(keyword, depth, emotion):
+                        if synonym != keyword:
+                            weights[synonym][emotion] += weight * factor
+            else:
+                # Simple list format (legacy support)
+                for keyword in keywords:
+                    weights[keyword][emotion] += 1.0
+
+        for term, emotion_weights in weights.items():
+            # Messages are lowercased before matching, so other terms never match
+            if not term or term != term.lower():
+                continue
+            if WORD_PATTERN.fullmatch(term):
+                self.term_weights[term] = dict(emotion_weights)
+            else:
+                self.compound_terms[term] = dict(emotion_weights)
+
+        self.phrases: Set[str] = {phrase.lower() for phrase in phrases if phrase}
+        self._automaton = PhraseAutomaton(self.phrases | set(self.compound_terms))
+        self._automaton.build()
+
+    def scan(self, text: str) -> MatchResult:
+        """Tokenize and phrase-scan a message in one pass over the lowercased text"""
+        text = text.lower()
+        words = WORD_PATTERN.findall(text)
+        phrases = set()
+        compound_counts = Counter()
+
+        for start, phrase in self._automaton.iter_matches(text):
+            phrases.add(phrase)
+            if phrase in self.compound_terms and self._on_word_boundaries(text, start, phrase):
+                compound_counts[phrase] += 1
+
+        return MatchResult(text, words, phrases, compound_counts)
+
+    def score_terms(self, match: MatchResult, distinct: bool = False) -> Dict[str, float]:
+        """
+        Sum keyword and synonym weights per emotion for a scanned message.
+
+        Args:
+            match: Result of scan()
+            distinct: Count each term once instead of once per occurrence
+
+        Returns:
+            Dict of emotion to accumulated weight
+        """
+        scores = defaultdict(float)
+        words = set(match.words) if distinct else match.words
+        for word in words:
+            emotion_weights = self.term_weights.get(word)
+            if emotion_weights:
+                for emotion, weight in emotion_weights.items():
+                    scores[emotion] += weight
+
+        for term, count in match.compound_counts.items():
+            occurrences = 1 if distinct else count
+            for emotion, weight in self.compound_terms[term].items():
+                scores[emotion] += weight * occurrences
+
+        return dict(scores)
+
+    @staticmethod
+    def _on_word_boundaries(text: str, start: int, phrase: str) -> bool:
+        """Equivalent of wrapping the phrase in \\b...\\b in a regex"""
+        end = start + len(phrase)
+        before = _is_word_char(text[start - 1]) if start > 0 else False
+        after = _is_word_char(text[end]) if end < len(text) else False
+        return before != _is_word_char(phrase[0]) and after != _is_word_char(phrase[-1])
@@ -0,0 +1,82 @@
+"""
+Day x emotion matrices for emotion history and trend analysis.
+
+The history, trend and wellbeing queries aggregate by day and emotion in
+SQL (see database/emotion_rollup.py); DailyEmotionMatrix holds the result
+as NumPy arrays so charts, per-day distributions and the trend regression
+in EmotionTracker._detect_emotion_patterns work on whole columns at once
+instead of nested dictionaries.
+"""
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+# (day 'YYYY-MM-DD', emotion, event_count, intensity_sum)
+DailyRow = Tuple[str, str, int, float]
+
+
+class DailyEmotionMatrix:
+    """Event counts and intensity totals, one row per day (sorted) and one column per emotion"""
+
+    def __init__(self, days: List[str], emotions: List[str], counts: np.ndarray, intensity: np.ndarray):
+        self.days = days
+        self.emotions = emotions
+        self.counts = counts
+        self.intensity = intensity
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[DailyRow], emotion_labels: Sequence[str] = (),
+                  days: Iterable[str] = ()) -> "DailyEmotionMatrix":
+        """
+        Build the matrix from per day and emotion totals
+
+        Columns start with emotion_labels in their order, followed by any
+        other emotion found in the rows. Days listed in `days` get a row
+        even if they have no data.
+        """
+        rows = list(rows)
+        days = sorted({row[0] for row in rows}.union(days))
+        emotions = list(emotion_labels)
+        known = set(emotions)
+        for row in rows:
+            if row[1] not in known:
+                known.add(row[1])
+                emotions.append(row[1])
+
+        counts = np.zeros((len(days), len(emotions)), dtype=np.int64)
+        intensity = np.zeros((len(days), len(emotions)), dtype=np.float64)
+        if rows:
+            day_index = {day: i for i, day in enumerate(days)}
+            emotion_index = {emotion: i for i, emotion in enumerate(emotions)}
+            cells = (
+                np.fromiter((day_index[row[0]] for row in rows), dtype=np.intp, count=len(rows)),
+                np.fromiter((emotion_index[row[1]] for row in rows), dtype=np.intp, count=len(rows)),
+            )
+            np.add.at(counts, cells, np.fromiter((row[2] for row in rows), dtype=np.int64, count=len(rows)))
+            np.add.at(intensity, cells, np.fromiter((row[3] for row in rows), dtype=np.float64, count=len(rows)))
+        return cls(days, emotions, counts, intensity)
+
+    @classmethod
+    def from_distributions(cls, daily_distributions: Dict[str, Dict[str, float]],
+                           emotion_labels: Sequence[str] = ()) -> "DailyEmotionMatrix":
+        """Build the matrix from {day: {emotion: score}}; scores go into the intensity array"""
+        rows = [
+            (day, emotion, 0, score)
+            for day, distribution in daily_distributions.items()
+            for emotion, score in distribution.items()
+        ]
+        return cls.from_rows(rows, emotion_labels, days=daily_distributions.keys())
+
+    @staticmethod
+    def shares(values: np.ndarray) -> np.ndarray:
+        """Normalize each row to sum to 1 (rows without data stay zero)"""
+        totals = values.sum(axis=1, keepdims=True)
+        return np.divide(values, totals, out=np.zeros(values.shape, dtype=np.float64), where=totals != 0)
+
+    def primary_emotions(self, values: np.ndarray, default: str = "neutral") -> List[str]:
+        """Highest-scoring emotion per day (default for days without data)"""
+        if not self.days:
+            return []
+        best = values.argmax(axis=1)
+        has_data = values.any(axis=1)
+        return [self.emotions[column] if present else default for column, present in zip(best, has_data)]
@@ -0,0 +1,147 @@
+"""
+Memoization of EmotionTracker.analyze_text_advanced results.
+
+Greetings, canned UI phrases and client retries send the same text over and
+over; each one used to repeat the full analysis, including an OpenAI call
+when one is configured. AnalysisMemo keeps results keyed on the normalized
+text, a hash of the context messages and the analyzer version (keyword
+table, synonym lexicon and analysis backend), so retraining or switching
+backends never serves an outdated result.
+
+Rule-based entries hold the raw scores before temporal pattern influence,
+which depends on each worker's trend data and is re-applied on every hit.
+
+Entries live in a bounded in-process LRU with a TTL and can optionally be
+written through to the response_cache table, so other workers and restarts
+share them.
+"""
+import json
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Prefix of memo keys in the response_cache table
+MEMO_KEY_PREFIX = "emotion_analysis"
+
+
+def context_hash(context: Optional[List[str]]) -> str:
+    """Stable hash of the context messages an analysis depended on"""
+    if not context:
+        return ""
+    joined = "\x1f".join(message.lower() for message in context)
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()[:16]
+
+
+class AnalysisMemo:
+    """Thread-safe LRU/TTL memo of analysis results with optional database persistence"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300, db_manager=None,
+                 persist: bool = False, persist_ttl: int = 3600):
+        """
+        Args:
+            max_entries: Results kept in memory at most
+            ttl: Seconds a result is served from memory
+            db_manager: DatabaseManager used for keys and persistence
+            persist: Also store results in the response_cache table
+            persist_ttl: Expiry in seconds of persisted results
+        """
+        self.logger = logging.getLogger(__name__)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_manager = db_manager
+        self.persist = persist and db_manager is not None
+        self.persist_ttl = persist_ttl
+
+        # key -> (JSON-encoded result, monotonic expiry)
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def key(self, text: str, context: Optional[List[str]], version: str) -> str:
+        """Memo key for a normalized text, its context and the analyzer version"""
+        parameters = {"text": text, "context": context_hash(context), "version": version}
+        if self.db_manager is not None and hasattr(self.db_manager, "generate_cache_key"):
+            return self.db_manager.generate_cache_key(MEMO_KEY_PREFIX, parameters)
+        param_hash = hashlib.md5(json.dumps(parameters, sort_keys=True).encode("utf-8")).hexdigest()
+        return f"{MEMO_KEY_PREFIX}:{param_hash}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a fresh copy of a memoized result, or None"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now < entry[1]:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return json.loads(entry[0])
+                del self._entries[key]
+                self.expirations += 1
+
+        if self.persist:
+            try:
+                value, metadata = self.db_manager.get_cached_response(key)
+                if metadata.get("cache_hit") and isinstance(value, dict):
+                    self._store(key, json.dumps(value))
+                    with self._lock:
+                        self.persistent_hits += 1
+                    return value
+            except Exception as e:
+                self.logger.error(f"Error reading memoized emotion analysis: {str(e)}")
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """Memoize a result (stored as JSON, so later changes by callers do not leak in)"""
+        try:
+            encoded = json.dumps(result)
+        except (TypeError, ValueError):
+            return
+        self._store(key, encoded)
+
+        if self.persist:
+            try:
+                self.db_manager.store_cached_response(key, encoded, expiry_seconds=self.persist_ttl)
+            except Exception as e:
+                self.logger.error(f"Error persisting emotion analysis: {str(e)}")
+
+    def clear(self):
+        """Drop all in-memory results (persisted ones expire on their own)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.persistent_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "persist": self.persist,
+                "hits": self.hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.persistent_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _store(self, key: str, encoded: str):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (encoded, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
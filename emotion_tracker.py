@@ -1,6 +1,8 @@
 import os
 import logging
 import json
+import copy
+import hashlib
 import numpy as np
 from datetime import datetime, timedelta
 import sqlite3
@@ -10,9 +12,9 @@ import math
 import threading
 import time
 import random
-from typing import Dict, List, Tuple, Optional, Union, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Optional, Union, Any, Set, Iterator
 
-import nltk
 from nltk.corpus import wordnet
 
 # Import for OpenAI integration
@@ -22,7 +24,15 @@ try:
 except ImportError:
     OPENAI_AVAILABLE = False
 
-nltk.download('wordnet')  # Ensure WordNet is downloaded
+from emotion_matcher import EmotionMatcher, MatchResult
+from emotion_lexicon import LEXICON_FILENAME, LEXICON_VERSION, load_lexicon, keywords_fingerprint
+from emotion_log_writer import EmotionLogWriter
+from database.emotion_rollup import parse_db_timestamp, query_daily_rollups
+from emotion_matrix import DailyEmotionMatrix
+from emotion_memo import AnalysisMemo
+
+# WordNet is only needed for keywords missing from the precomputed synonym
+# lexicon; build it offline with `python emotion_lexicon.py --download`
 
 # Cache for storing previously fetched synonyms
 _synonym_cache: Dict[str, List[str]] = {}
@@ -136,21 +146,12 @@ def _analyze_with_rules(self, text: str, context: Optional[List[str]] = None) ->
     """
     text = text.lower().strip()
     emotions = {emotion: 0.0 for emotion in self.emotion_labels}
-    context_window = 3  # Number of words to consider before and after
-
-
-    for emotion, keywords in self.emotion_keywords.items():
-        for keyword, weight in keywords.items():
-            if re.search(r"\b" + re.escape(keyword) + r"\b", text):
-                emotions[emotion] += weight
-            # Include synonyms in the search with depth control and emotion context
-            # Use depth=1 for common emotions, depth=2 for more nuanced emotions
-            depth = 2 if emotion in ["contemplative", "inspired", "satisfied", "frustrated", "amused"] else 1
-            for synonym in _get_synonyms(keyword, depth=depth, emotion_context=emotion):
-                if re.search(r"\b" + re.escape(synonym) + r"\b", text):
-                    # Adjust weight based on depth - deeper synonyms get lower weights
-                    synonym_weight = weight * (0.7 if depth == 1 else 0.5)
-                    emotions[emotion] += synonym_weight
+
+    # Keywords and synonyms (depth-weighted) are precompiled into the matcher,
+    # so each term present in the text contributes its weight once
+    match = self._matcher.scan(text)
+    for emotion, score in self._matcher.score_terms(match, distinct=True).items():
+        emotions[emotion] += score
 
      # Normalize to ensure no negatives and reasonable values
     for emotion in emotions:
@@ -174,6 +175,547 @@ def _analyze_with_rules(self, text: str, context: Optional[List[str]] = None) ->
     # Return complete analysis
     return {"primary_emotion": primary_emotion, "emotions": normalized_emotions, "intensity": scaled_intensity}
 
+# Phrase-specific boosts for problematic cases. Each rule is (clauses, emotion,
+# boost) and applies when every clause has at least one of its phrases present.
+SPECIAL_PHRASE_BOOSTS = [
+    ((("infuriating to deal with",),), "angry", 5.0),
+    ((("movie captivating", "captivating from start to finish"),), "interested", 5.0),
+    ((("thought-provoking", "thought provoking"),), "contemplative", 5.0),
+    ((("breathtaking",), ("wonder",)), "inspired", 5.0),
+    ((("couldn't figure out", "could not figure out"), ("despite trying", "trying everything")), "frustrated", 5.0),
+
+    # Fear-related phrases
+    ((("terrifies me", "terrified"),), "fearful", 5.0),
+    ((("nightmares",), ("failing",)), "fearful", 5.0),
+    ((("feel unsafe", "makes me feel unsafe"),), "fearful", 5.0),
+
+    # Surprise-related phrases
+    ((("never expected", "unexpected"),), "surprised", 4.0),
+    ((("caught me off guard", "off guard"),), "surprised", 4.0),
+
+    # Angry-related phrases (additional)
+    ((("lie to my face", "lying to my face"),), "angry", 5.0),
+    ((("cannot believe they would", "can't believe they"),), "angry", 4.0),
+
+    # Contemplative-related phrases
+    ((("reflecting on", "reflect on"),), "contemplative", 4.0),
+    ((("reconsider",), ("approach",)), "contemplative", 4.0),
+
+    # Interested-related phrases
+    ((("fascinating",), ("insights",)), "interested", 4.5),
+    ((("can't stop reading", "cannot stop reading"),), "interested", 4.5),
+
+    # Frustrated-related phrases
+    ((("interruptions",), ("impossible",)), "frustrated", 4.0),
+    ((("fix one issue",), ("more appear",)), "frustrated", 4.0),
+
+    # Happy-related phrases
+    ((("promotion",), ("entire year",)), "happy", 4.0),
+
+    # Sad-related phrases
+    ((("miss how things used to be",),), "sad", 4.0),
+
+    # Inspired-related phrases (additional)
+    ((("conference",), ("new ideas",)), "inspired", 5.0),
+    ((("ideas to explore",),), "inspired", 4.5),
+]
+
+# Mixed emotion patterns with more structured and comprehensive approach
+MIXED_EMOTION_PATTERNS = [
+    # Excitement/Anxiety Pattern
+    {
+        "emotions": ["happy", "fearful"],
+        "keywords1": ["excited", "enthusiasm", "looking forward", "thrilled", "eager", "anticipation", "can't wait", "thrilling"],
+        "keywords2": ["nervous", "worried", "anxiety", "anxious", "concerned", "deadline", "stress", "pressure", "apprehensive", "trepidation"],
+        "context_cues": ["but", "yet", "however", "although", "though", "while", "and", "also", "mixed", "both", "at the same time", "simultaneously", "meanwhile", "despite", "nevertheless"],
+        "mixed_weight": 8.0,
+        "individual_weight": 3.0,
+        "proximity_boost": 1.5,  # Extra boost if keywords are close to each other
+        "name": "excitement-anxiety"
+    },
+
+    # Bittersweet Pattern
+    {
+        "emotions": ["happy", "sad"],
+        "keywords1": ["happy", "glad", "joy", "proud", "accomplishments", "achievement", "success", "victory", "milestone", "graduation", "earned", "reward"],
+        "keywords2": ["sad", "melancholy", "bittersweet", "miss", "leave", "behind", "farewell", "goodbye", "end", "nostalgia", "reminisce", "chapter"],
+        "context_cues": ["but", "yet", "however", "although", "though", "while", "and", "also", "bittersweet", "mixed", "both", "at the same time", "simultaneously", "meanwhile", "despite", "nevertheless"],
+        "mixed_weight": 8.0,
+        "individual_weight": 3.0,
+        "proximity_boost": 1.5,
+        "name": "bittersweet"
+    },
+
+    # Frustrated Joy Pattern
+    {
+        "emotions": ["happy", "angry"],
+        "keywords1": ["happy", "pleased", "satisfied", "glad", "thrilled", "celebrate", "achievement", "finally", "at last", "succeeded"],
+        "keywords2": ["angry", "annoyed", "upset", "irritated", "frustrated", "difficulty", "struggle", "problem", "challenge", "obstacle", "hurdle", "roadblock"],
+        "context_cues": ["but", "yet", "however", "although", "though", "while", "and", "also", "mixed", "both", "at the same time", "simultaneously", "nevertheless", "in spite of", "despite"],
+        "mixed_weight": 8.0,
+        "individual_weight": 3.0,
+        "proximity_boost": 1.5,
+        "name": "frustrated-joy"
+    },
+
+    # Angry Disappointment Pattern
+    {
+        "emotions": ["sad", "angry"],
+        "keywords1": ["sad", "disappointed", "upset", "heartbroken", "let down", "discouraged", "disheartened", "down", "blue", "disappointed"],
+        "keywords2": ["angry", "frustrated", "mad", "furious", "outraged", "resentful", "bitter", "indignant", "resentment", "betrayed", "unfair"],
+        "context_cues": ["but", "yet", "however", "although", "though", "while", "and", "also", "mixed", "both", "at the same time", "simultaneously", "meanwhile", "as well as", "together with"],
+        "mixed_weight": 8.0,
+        "individual_weight": 3.0,
+        "proximity_boost": 1.5,
+        "name": "angry-disappointment"
+    },
+
+    # Anxious Anger Pattern
+    {
+        "emotions": ["fearful", "angry"],
+        "keywords1": ["afraid", "scared", "fearful", "worried", "concerned", "anxious", "uncertain", "dread", "fright", "terror", "horror"],
+        "keywords2": ["angry", "frustrated", "mad", "annoyed", "irritated", "fury", "rage", "hostility", "aggravated", "incensed", "livid"],
+        "context_cues": ["but", "yet", "however", "although", "though", "while", "and", "also", "mixed", "both", "at the same time", "simultaneously", "meanwhile", "alongside"],
+        "mixed_weight": 8.0,
+        "individual_weight": 3.0,
+        "proximity_boost": 1.5,
+        "name": "anxious-anger"
+    },
+
+    # Fearful Surprise Pattern
+    {
+        "emotions": ["surprised", "fearful"],
+        "keywords1": ["surprised", "shocked", "amazed", "astonished", "startled", "astounded", "stunned", "taken aback", "unexpected", "sudden"],
+        "keywords2": ["scared", "worried", "concerned", "afraid", "anxious", "frightened", "terrified", "alarmed", "uneasy", "nervous", "on edge"],
+        "context_cues": ["but", "yet", "however", "although", "though", "while", "and", "also", "mixed", "both", "at the same time", "simultaneously", "immediately", "instantly"],
+        "mixed_weight": 8.0,
+        "individual_weight": 3.0,
+        "proximity_boost": 1.5,
+        "name": "fearful-surprise"
+    },
+
+    # Conflicted Decision Pattern
+    {
+        "emotions": ["confused", "anxious"],
+        "keywords1": ["confused", "uncertain", "unsure", "indecisive", "torn", "ambivalent", "conflicted", "dilemma", "crossroads", "choice", "decide", "decision"],
+        "keywords2": ["nervous", "worried", "stress", "pressure", "deadline", "consequences", "impact", "result", "outcome", "repercussions"],
+        "context_cues": ["but", "yet", "however", "although", "though", "while", "and", "also", "mixed", "both", "on one hand", "on the other hand", "either", "or", "versus", "vs"],
+        "mixed_weight": 8.0,
+        "individual_weight": 3.0,
+        "proximity_boost": 1.5,
+        "name": "conflicted-decision"
+    },
+
+    # Hopeful Sadness Pattern
+    {
+        "emotions": ["inspired", "sad"],
+        "keywords1": ["hope", "hopeful", "inspired", "motivated", "determined", "optimistic", "looking forward", "future", "potential", "opportunity"],
+        "keywords2": ["sad", "difficult", "challenging", "hard", "struggle", "tough", "pain", "suffering", "grief", "loss"],
+        "context_cues": ["but", "yet", "however", "although", "though", "while", "and", "also", "mixed", "both", "in spite of", "despite", "through", "beyond", "after"],
+        "mixed_weight": 8.0,
+        "individual_weight": 3.0,
+        "proximity_boost": 1.5,
+        "name": "hopeful-sadness"
+    },
+
+    # Grateful Melancholy Pattern
+    {
+        "emotions": ["grateful", "sad"],
+        "keywords1": ["grateful", "thankful", "appreciate", "blessed", "fortunate", "luck", "lucky", "gratitude", "appreciation"],
+        "keywords2": ["miss", "memories", "remember", "past", "used to", "gone", "never again", "no longer", "changed", "different now", "nostalgia"],
+        "context_cues": ["but", "yet", "however", "although", "though", "while", "and", "also", "mixed", "both", "at the same time", "still", "nevertheless"],
+        "mixed_weight": 8.0,
+        "individual_weight": 3.0,
+        "proximity_boost": 1.5,
+        "name": "grateful-melancholy"
+    },
+
+    # Amused Embarrassment Pattern
+    {
+        "emotions": ["amused", "embarrassed"],
+        "keywords1": ["funny", "laugh", "amusing", "hilarious", "humor", "comedy", "joke", "giggle", "chuckle"],
+        "keywords2": ["embarrassed", "embarrassing", "awkward", "cringe", "mortify", "humiliated", "shame", "blush", "facepalm", "fool"],
+        "context_cues": ["but", "yet", "however", "although", "though", "while", "and", "also", "mixed", "both", "at the same time", "simultaneously", "nevertheless"],
+        "mixed_weight": 8.0,
+        "individual_weight": 3.0,
+        "proximity_boost": 1.5,
+        "name": "amused-embarrassment"
+    }
+]
+
+# Special cases for phrases needing exact matches
+SPECIAL_MIXED_CASES = [
+    {
+        "phrase": "excited about the new project",
+        "phrase2": "nervous about the tight deadline",
+        "emotions": ["happy", "fearful"],
+        "mixed_weight": 10.0  # Extra high weight for exact matches
+    },
+    {
+        "phrase": "proud of my accomplishments",
+        "phrase2": "sad to leave friends",
+        "emotions": ["proud", "sad"],
+        "mixed_weight": 10.0
+    },
+    {
+        "phrase": "happy to be done",
+        "phrase2": "sad to say goodbye",
+        "emotions": ["happy", "sad"],
+        "mixed_weight": 10.0
+    }
+]
+
+# Explicit mixed emotion phrases - comprehensive list
+MIXED_EXPLICIT_PHRASES = [
+    # Direct mixed emotion mentions
+    "mixed emotions", "mixed feelings", "conflicted feelings", "conflicting emotions",
+    "emotional conflict", "ambivalent", "ambivalence", "emotional ambivalence",
+
+    # Phrases indicating internal conflict
+    "torn between", "feel both", "simultaneously feel", "feel simultaneously",
+    "part of me feels", "another part of me", "on one hand", "on the other hand",
+    "caught between", "in two minds", "of two minds", "paradoxical feelings",
+
+    # Emotional state descriptions
+    "emotional rollercoaster", "bittersweet", "sweet sorrow", "pleasant sadness",
+    "joyful melancholy", "melancholic joy", "happy sorrow", "smiling through tears",
+
+    # Common mixed emotion pairings
+    "happy and sad", "excited but nervous", "proud but sad",
+    "grateful yet sad", "relieved but disappointed", "angry but concerned",
+    "frustrated yet hopeful", "happy but worried", "excited and scared",
+    "glad but regretful", "hopeful yet anxious", "calm but tense",
+
+    # Temporal transition phrases
+    "started happy but ended sad", "began with excitement but now worried",
+    "initially nervous now excited", "went from happy to confused",
+    "shifted from anger to concern", "transitioned from joy to anxiety",
+
+    # Complex emotional responses
+    "love-hate relationship", "complicated feelings", "it's complicated",
+    "not sure how to feel", "don't know whether to laugh or cry",
+    "laughing and crying", "tears of joy", "tears of happiness",
+    "nervous excitement", "anxious anticipation", "excited fear",
+
+    # Cultural/idiomatic expressions
+    "bitter sweet", "bitter-sweet", "mixed blessing", "double-edged",
+    "two sides of the same coin", "blessing in disguise",
+    "sweet and sour feelings", "laughing on the outside crying on the inside"
+]
+
+# "emotion X and emotion Y" constructions (e.g. "I feel happy and anxious"),
+# in the order they are checked
+MIXED_PAIR_POSITIVE = ["happy", "excited", "joy", "joyful", "glad", "pleased", "satisfied", "proud"]
+MIXED_PAIR_NEGATIVE = ["sad", "angry", "anxious", "nervous", "worried", "frustrated", "scared", "fearful"]
+MIXED_PAIR_PHRASES = [
+    pattern
+    for pos in MIXED_PAIR_POSITIVE
+    for neg in MIXED_PAIR_NEGATIVE
+    for pattern in (
+        f"{pos} and {neg}", f"{pos} but {neg}",
+        f"{pos} yet {neg}", f"{neg} and {pos}",
+        f"{neg} but {pos}", f"{neg} yet {pos}"
+    )
+]
+
+# Single words checked directly by the excitement/nervousness special case
+MIXED_CUE_WORDS = ["excited", "nervous", "excitement", "nervousness", "while"]
+
+def _apply_phrase_rules(match: MatchResult, emotions: Dict[str, float],
+                        emotional_phrases: Dict[str, List[str]]) -> List[Dict[str, Any]]:
+    """
+    Apply the phrase-driven rules of the rule-based analyzer to one scanned message.
+
+    Adds to `emotions` in place and returns the mixed-emotion patterns detected.
+    """
+    found = match.phrases
+
+    # Special case handling for specific phrases - direct override with high scores
+    for clauses, emotion, boost in SPECIAL_PHRASE_BOOSTS:
+        if all(any(phrase in found for phrase in clause) for clause in clauses):
+            emotions[emotion] += boost
+
+    # Check for exact special cases first (highest priority)
+    for case in SPECIAL_MIXED_CASES:
+        if case["phrase"].lower() in found and case["phrase2"].lower() in found:
+            emotions["mixed"] = case["mixed_weight"]
+            for emotion in case["emotions"]:
+                emotions[emotion] += 3.0
+
+    # Then check for mixed emotion patterns (second priority)
+    # Store detected pattern information for metadata
+    detected_patterns = []
+    sentences = None
+
+    for pattern in MIXED_EMOTION_PATTERNS:
+        # Find actual matching keywords instead of just checking presence
+        matching_keywords1 = [kw for kw in pattern["keywords1"] if kw.lower() in found]
+        matching_keywords2 = [kw for kw in pattern["keywords2"] if kw.lower() in found]
+        matching_cues = [cue for cue in pattern["context_cues"] if cue.lower() in found]
+
+        # Only proceed if we have matches from both keyword sets
+        if matching_keywords1 and matching_keywords2:
+            # Check for context cues
+            if matching_cues:
+                # Calculate base weight for this pattern
+                base_weight = pattern["mixed_weight"]
+
+                # Check for proximity boost (if keywords are close to each other)
+                # We'll do a simple proximity check by looking for pairs within certain distance
+                proximity_boost = 0
+                if sentences is None:
+                    sentences = re.split(r'[.!?]+', match.text)
+
+                # For each pair of emotion keywords, check if they're near each other
+                for kw1 in matching_keywords1:
+                    for kw2 in matching_keywords2:
+                        # Simple algorithm: if both keywords are in the same sentence, boost
+                        for sentence in sentences:
+                            if kw1.lower() in sentence and kw2.lower() in sentence:
+                                # Keywords in same sentence get maximum proximity boost
+                                proximity_boost = pattern.get("proximity_boost", 1.0)
+                                break
+
+                # Calculate final weight with any proximity boost
+                final_weight = base_weight + proximity_boost
+
+                # Apply stronger weight if there's an explicit context cue
+                if any(cue in ["but", "yet", "however", "although", "though"] for cue in matching_cues):
+                    final_weight *= 1.2  # 20% boost for contrast cues
+
+                # Set mixed emotion with calculated weight
+                emotions["mixed"] = max(emotions.get("mixed", 0), final_weight)
+
+                # Also boost the individual emotions
+                em1, em2 = pattern["emotions"]
+                emotions[em1] += pattern["individual_weight"]
+                emotions[em2] += pattern["individual_weight"]
+
+                # Store pattern information for metadata
+                detected_patterns.append({
+                    "pattern": pattern.get("name", f"{em1}-{em2}"),
+                    "keywords1": matching_keywords1,
+                    "keywords2": matching_keywords2,
+                    "context_cues": matching_cues,
+                    "weight": final_weight
+                })
+
+    # Special case pattern matching for specific phrases
+    if ("excited" in found and "nervous" in found) or ("excitement" in found and "nervousness" in found):
+        emotions["happy"] += 4.0  # excited maps to happy
+        emotions["fearful"] += 4.0  # nervous maps to fearful
+        emotions["mixed"] = 9.0  # Very high weight for this common case
+
+    if "while" in found and "excited" in found and "nervous" in found:
+        # This is a direct match for one of our test cases
+        emotions["mixed"] = 12.0  # Give extremely high weight for exact test case
+
+    # Enhanced detection: full phrases or meaningful segments
+    matched_phrase = next((phrase for phrase in MIXED_EXPLICIT_PHRASES if phrase in found), None)
+    if matched_phrase:
+        emotions["mixed"] = 10.0  # Set mixed emotion with very high confidence
+    # If no exact matches, check for related constructions that suggest mixed emotions
+    elif any(pattern in found for pattern in MIXED_PAIR_PHRASES):
+        emotions["mixed"] = 9.5  # High but slightly lower than explicit phrases
+
+    # 1. Check for emotional phrases first (highest priority)
+    for emotion, phrases in emotional_phrases.items():
+        for phrase in phrases:
+            if phrase.lower() in found:
+                emotions[emotion] += 1.5  # Give phrases higher weight
+
+    return detected_patterns
+
+
+def _keyword_hits(words: List[str], term_weights: Dict[str, Dict[str, float]],
+                  negation_words, intensity_modifiers: Dict[str, float]) -> Iterator[Tuple[str, float, bool]]:
+    """
+    Yield (term, multiplier, negated) for every keyword or synonym token.
+
+    A negation word negates, and an intensity modifier scales, the next token only.
+    """
+    negation_active = False
+    intensifier_value = 1.0
+
+    for word in words:
+        # Check for negation words
+        if word in negation_words:
+            negation_active = True
+            continue
+
+        # Check for intensity modifiers
+        if word in intensity_modifiers:
+            intensifier_value = intensity_modifiers[word]
+            continue
+
+        if word in term_weights:
+            yield word, intensifier_value, negation_active
+
+        # Reset negation and intensity after applying to a word
+        negation_active = False
+        intensifier_value = 1.0
+
+
+def _sentiment_score(haystack, positive_indicators: List[str], negative_indicators: List[str]) -> float:
+    """Sentiment (-1.0 to 1.0) from the indicators present in a text or phrase set"""
+    pos_count = sum(1 for word in positive_indicators if word in haystack)
+    neg_count = sum(1 for word in negative_indicators if word in haystack)
+
+    total = pos_count + neg_count
+    if total == 0:
+        return 0.0
+
+    return (pos_count - neg_count) / (pos_count + neg_count)
+
+
+def _context_scores(matcher: EmotionMatcher, emotion_labels: List[str], context: List[str]) -> Dict[str, float]:
+    """Normalized keyword and synonym scores of the combined context messages"""
+    # Combine all context messages
+    combined_text = " ".join(context)
+
+    # Keyword and synonym matching on combined text, counting every occurrence
+    emotions = {emotion: 0.0 for emotion in emotion_labels}
+    match = matcher.scan(combined_text)
+    for emotion, score in matcher.score_terms(match).items():
+        emotions[emotion] += score
+
+    # Normalize
+    total = sum(emotions.values()) or 1.0
+    return {e: (s / total) for e, s in emotions.items() if s > 0}
+
+
+
+class _RuleTables:
+    """Picklable snapshot of the tables the rule-based analyzer reads, for batch scoring"""
+
+    __slots__ = ("matcher", "emotion_labels", "emotional_phrases", "negation_words",
+                 "intensity_modifiers", "positive_indicators", "negative_indicators")
+
+    def __init__(self, matcher: EmotionMatcher, emotion_labels: List[str],
+                 emotional_phrases: Dict[str, List[str]], negation_words: List[str],
+                 intensity_modifiers: Dict[str, float], positive_indicators: List[str],
+                 negative_indicators: List[str]):
+        self.matcher = matcher
+        self.emotion_labels = list(emotion_labels)
+        self.emotional_phrases = emotional_phrases
+        self.negation_words = set(negation_words)
+        self.intensity_modifiers = intensity_modifiers
+        self.positive_indicators = positive_indicators
+        self.negative_indicators = negative_indicators
+
+
+def _score_rule_batch(tables: _RuleTables, items: List[Tuple[str, Tuple[str, ...]]],
+                      timings: Optional[Dict[str, float]] = None) -> Tuple[np.ndarray, List[List[Dict[str, Any]]]]:
+    """
+    Raw rule-based scores (before temporal pattern influence) for many messages.
+
+    Phrase rules run per message on one matcher scan each. Keyword and synonym
+    hits are collected as a sparse texts x terms matrix of intensity
+    multipliers and multiplied by the terms x emotions weight matrix in one
+    NumPy operation.
+
+    Args:
+        tables: Rule tables snapshot
+        items: (normalized text, context messages) pairs
+        timings: Optional dict that receives per-stage durations in milliseconds
+
+    Returns:
+        Tuple of (len(items) x len(emotion_labels) score matrix, detected mixed patterns per item)
+    """
+    labels = tables.emotion_labels
+    label_index = {emotion: i for i, emotion in enumerate(labels)}
+    scores = np.zeros((len(items), len(labels)))
+    detected_patterns = []
+
+    # Stage 1: scan, phrase rules and sentiment; keyword hits are only collected
+    stage_start = time.time()
+    term_index: Dict[str, int] = {}
+    hit_rows, hit_terms, hit_values, hit_negated = [], [], [], []
+    for row, (text, _) in enumerate(items):
+        match = tables.matcher.scan(text)
+        emotions = {emotion: 0.0 for emotion in labels}
+        detected_patterns.append(_apply_phrase_rules(match, emotions, tables.emotional_phrases))
+
+        sentiment_score = _sentiment_score(match.phrases, tables.positive_indicators, tables.negative_indicators)
+        if sentiment_score > 0.3:
+            emotions["happy"] += sentiment_score * 0.5
+        elif sentiment_score < -0.3:
+            emotions["sad"] += abs(sentiment_score) * 0.5
+
+        hits = _keyword_hits(match.words, tables.matcher.term_weights,
+                             tables.negation_words, tables.intensity_modifiers)
+        for term, multiplier, negated in hits:
+            hit_rows.append(row)
+            hit_terms.append(term_index.setdefault(term, len(term_index)))
+            hit_values.append(multiplier)
+            hit_negated.append(negated)
+
+        scores[row] = [emotions[emotion] for emotion in labels]
+
+    if timings is not None:
+        timings["scan_ms"] = (time.time() - stage_start) * 1000
+
+    # Stage 2: keyword scores as one sparse x dense product
+    stage_start = time.time()
+    if hit_rows:
+        weights = np.zeros((len(term_index), len(labels)))
+        for term, column in term_index.items():
+            for emotion, weight in tables.matcher.term_weights[term].items():
+                weights[column, label_index[emotion]] = weight
+
+        rows = np.array(hit_rows)
+        values = np.array(hit_values)
+        negated = np.array(hit_negated)
+        term_scores = weights[np.array(hit_terms)] * values[:, None]
+
+        # Negated terms subtract their weight and push happy/sad towards each other
+        signed = np.where(negated[:, None], -term_scores, term_scores)
+        np.add.at(scores, rows, signed)
+        if negated.any() and "happy" in label_index and "sad" in label_index:
+            happy, sad = label_index["happy"], label_index["sad"]
+            negated_rows = rows[negated]
+            np.add.at(scores[:, sad], negated_rows, 0.3 * term_scores[negated, happy])
+            np.add.at(scores[:, happy], negated_rows, 0.3 * term_scores[negated, sad])
+
+    if timings is not None:
+        timings["keyword_matrix_ms"] = (time.time() - stage_start) * 1000
+
+    # Stage 3: conversation context, scored once per distinct context
+    stage_start = time.time()
+    context_vectors: Dict[Tuple[str, ...], np.ndarray] = {}
+    for row, (_, context) in enumerate(items):
+        if not context:
+            continue
+        vector = context_vectors.get(context)
+        if vector is None:
+            vector = np.zeros(len(labels))
+            for emotion, score in _context_scores(tables.matcher, labels, list(context)).items():
+                vector[label_index[emotion]] = score
+            context_vectors[context] = vector
+        # Merge with lower weight (context has 30% influence)
+        scores[row] += vector * 0.3
+
+    if timings is not None:
+        timings["context_ms"] = (time.time() - stage_start) * 1000
+
+    return scores, detected_patterns
+
+
+# Rule tables of the EmotionTracker that started a batch worker process
+_batch_worker_tables: Optional[_RuleTables] = None
+
+
+def _init_batch_worker(tables: _RuleTables):
+    global _batch_worker_tables
+    _batch_worker_tables = tables
+
+
+def _score_rule_batch_chunk(items: List[Tuple[str, Tuple[str, ...]]]):
+    timings: Dict[str, float] = {}
+    scores, detected_patterns = _score_rule_batch(_batch_worker_tables, items, timings)
+    return scores, detected_patterns, timings
+
+
 class EmotionTracker:
     """Advanced emotion tracking system with enhanced analysis algorithms"""
 
@@ -435,9 +977,38 @@ class EmotionTracker:
         self.data_dir = "emotion_data"
         os.makedirs(self.data_dir, exist_ok=True)
 
+        # Write-behind emotion event logger (started on first log_emotion)
+        self.emotion_log_writer = None
+        self._log_writer_lock = threading.Lock()
+
         # Try to load saved model data
         self._load_extended_model_data()
 
+        # Precomputed synonyms, so startup does not walk WordNet per keyword
+        self.synonym_lexicon = load_lexicon(os.path.join(self.data_dir, LEXICON_FILENAME))
+        if self.synonym_lexicon is None:
+            self.logger.info("No synonym lexicon found, expanding keywords with WordNet at startup")
+        elif self.synonym_lexicon.fingerprint != keywords_fingerprint(self.emotion_keywords):
+            self.logger.info("Synonym lexicon is older than the keyword table, new keywords use WordNet")
+
+        # Memo of analyze_text_advanced results for repeated inputs
+        config = getattr(db_manager, "config", None)
+        self.analysis_memo = AnalysisMemo(
+            max_entries=getattr(config, "EMOTION_MEMO_MAX_ENTRIES", 1024),
+            ttl=getattr(config, "EMOTION_MEMO_TTL", 300),
+            db_manager=db_manager,
+            persist=getattr(config, "EMOTION_MEMO_PERSIST", False),
+            persist_ttl=getattr(config, "EMOTION_MEMO_PERSIST_TTL", 3600)
+        )
+
+        # Process pool for large analyze_batch calls (created on first use)
+        self._batch_pool = None
+        self._batch_pool_workers = 0
+        self._batch_pool_lock = threading.Lock()
+
+        # Compile keywords, synonyms and rule phrases for single-pass matching
+        self._build_matcher()
+
     def _load_extended_model_data(self):
         """Load extended model data from saved files"""
         try:
@@ -481,6 +1052,61 @@ class EmotionTracker:
         except Exception as e:
             self.logger.error(f"Error loading extended model data: {str(e)}")
 
+    def _build_matcher(self):
+        """(Re)build the compiled matcher from the current keywords and phrases"""
+        phrases = set(MIXED_EXPLICIT_PHRASES) | set(MIXED_PAIR_PHRASES) | set(MIXED_CUE_WORDS)
+        for clauses, _, _ in SPECIAL_PHRASE_BOOSTS:
+            for clause in clauses:
+                phrases.update(clause)
+        for case in SPECIAL_MIXED_CASES:
+            phrases.update((case["phrase"], case["phrase2"]))
+        for pattern in MIXED_EMOTION_PATTERNS:
+            phrases.update(pattern["keywords1"])
+            phrases.update(pattern["keywords2"])
+            phrases.update(pattern["context_cues"])
+        for emotion_phrases in self.emotional_phrases.values():
+            phrases.update(emotion_phrases)
+        phrases.update(self.positive_indicators)
+        phrases.update(self.negative_indicators)
+
+        start = time.time()
+        self._matcher = EmotionMatcher(self.emotion_keywords, self._lookup_synonyms, phrases)
+        self._rule_tables = _RuleTables(
+            self._matcher, self.emotion_labels, self.emotional_phrases, self.negation_words,
+            self.intensity_modifiers, self.positive_indicators, self.negative_indicators
+        )
+        # Batch workers hold a copy of the old tables
+        self._shutdown_batch_pool()
+
+        # Memoized results are keyed on the tables they were computed with
+        self.analysis_version = hashlib.sha256(json.dumps([
+            keywords_fingerprint(self.emotion_keywords),
+            LEXICON_VERSION,
+            self.synonym_lexicon.fingerprint if self.synonym_lexicon is not None else None,
+            sorted(self._matcher.phrases)
+        ]).encode("utf-8")).hexdigest()[:16]
+        self.analysis_memo.clear()
+        self.logger.debug(
+            f"Built emotion matcher with {len(self._matcher.term_weights)} terms "
+            f"and {len(self._matcher.phrases)} phrases in {(time.time() - start) * 1000:.1f}ms"
+        )
+
+    def _lookup_synonyms(self, keyword: str, depth: int, emotion: Optional[str]) -> List[str]:
+        """Synonym lookup used while building the matcher"""
+        if self.synonym_lexicon is not None:
+            synonyms = self.synonym_lexicon.get(keyword, emotion)
+            if synonyms is not None:
+                return synonyms
+
+        try:
+            return _get_synonyms(keyword, depth=depth, emotion_context=emotion)
+        except LookupError:
+            # WordNet corpus missing: keep the keywords themselves matchable
+            if not getattr(self, "_synonyms_unavailable", False):
+                self._synonyms_unavailable = True
+                self.logger.warning("WordNet corpus not available, matching emotion keywords without synonyms")
+            return []
+
     def analyze_text_advanced(self, text: str, context: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         Advanced analysis of text to determine emotions with intensity scores and context awareness
@@ -503,13 +1129,31 @@ class EmotionTracker:
         if len(self.conversation_memory) > self.memory_limit:
             self.conversation_memory.pop(0)
 
+        # Repeated inputs (greetings, canned phrases, retries) are memoized. Rule-based
+        # entries hold the raw scores only: pattern influence depends on this worker's
+        # trend data, so it is applied afresh on every call
+        backend = "openai" if OPENAI_AVAILABLE and os.environ.get("OPENAI_API_KEY") else "rules"
+        memo_key = self.analysis_memo.key(text, context, f"{self.analysis_version}:{backend}")
+        memoized = self.analysis_memo.get(memo_key)
+        if memoized is not None:
+            if "rule_scores" in memoized:
+                return self._rule_result(memoized["rule_scores"], context, memoized["detected_patterns"])
+            return memoized
+
         # First attempt with OpenAI if available
-        openai_result = self._analyze_with_openai(text, context) if OPENAI_AVAILABLE else None
-        if openai_result:
-            return openai_result
+        result = self._analyze_with_openai(text, context) if OPENAI_AVAILABLE else None
+        if result:
+            self.analysis_memo.put(memo_key, result)
+            return result
 
         # Fall back to advanced rule-based analysis
-        return self._analyze_with_rules(text, context)
+        emotions, detected_patterns = self._score_with_rules(text, context)
+        self.analysis_memo.put(memo_key, {"rule_scores": emotions, "detected_patterns": detected_patterns})
+        return self._rule_result(emotions, context, detected_patterns)
+
+    def get_analysis_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss metrics of the analyze_text_advanced memo"""
+        return {"version": self.analysis_version, **self.analysis_memo.stats()}
 
     def _analyze_with_openai(self, text: str, context: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
         """Use OpenAI for emotion analysis if available"""
@@ -665,449 +1309,42 @@ class EmotionTracker:
         - intensity: Overall emotional intensity
         - metadata: Additional analysis info
         """
+        emotions, detected_patterns = self._score_with_rules(text, context)
+        return self._rule_result(emotions, context, detected_patterns)
+
+    def _score_with_rules(self, text: str, context: Optional[List[str]] = None
+                          ) -> Tuple[Dict[str, float], List[Dict[str, Any]]]:
+        """Raw rule scores of a text (before pattern influence) and the phrase patterns detected"""
         # Initialize emotions dictionary with zeros
         emotions = {emotion: 0.0 for emotion in self.emotion_labels}
 
-        # Special case handling for specific phrases - direct override with high scores
-        if "infuriating to deal with" in text.lower():
-            emotions["angry"] += 5.0  # Give this a very high weight
-        
-        if "movie captivating" in text.lower() or "captivating from start to finish" in text.lower():
-            emotions["interested"] += 5.0  # Give this a very high weight
-            
-        if "thought-provoking" in text.lower() or "thought provoking" in text.lower():
-            emotions["contemplative"] += 5.0  # Give this a very high weight
-            
-        if "breathtaking" in text.lower() and "wonder" in text.lower():
-            emotions["inspired"] += 5.0  # Give this a very high weight
-            
-        if "couldn't figure out" in text.lower() or "could not figure out" in text.lower():
-            if "despite trying" in text.lower() or "trying everything" in text.lower():
-                emotions["frustrated"] += 5.0  # Give this a very high weight
-                
-        # Additional phrase-specific handling for problematic cases
-        
-        # Fear-related phrases
-        if "terrifies me" in text.lower() or "terrified" in text.lower():
-            emotions["fearful"] += 5.0
-        if "nightmares" in text.lower() and "failing" in text.lower():
-            emotions["fearful"] += 5.0
-        if "feel unsafe" in text.lower() or "makes me feel unsafe" in text.lower():
-            emotions["fearful"] += 5.0
-            
-        # Surprise-related phrases
-        if "never expected" in text.lower() or "unexpected" in text.lower():
-            emotions["surprised"] += 4.0
-        if "caught me off guard" in text.lower() or "off guard" in text.lower():
-            emotions["surprised"] += 4.0
-            
-        # Angry-related phrases (additional)
-        if "lie to my face" in text.lower() or "lying to my face" in text.lower():
-            emotions["angry"] += 5.0
-        if "cannot believe they would" in text.lower() or "can't believe they" in text.lower():
-            emotions["angry"] += 4.0
-            
-        # Contemplative-related phrases
-        if "reflecting on" in text.lower() or "reflect on" in text.lower():
-            emotions["contemplative"] += 4.0
-        if "reconsider" in text.lower() and "approach" in text.lower():
-            emotions["contemplative"] += 4.0
-            
-        # Interested-related phrases
-        if "fascinating" in text.lower() and "insights" in text.lower():
-            emotions["interested"] += 4.5
-        if "can't stop reading" in text.lower() or "cannot stop reading" in text.lower():
-            emotions["interested"] += 4.5
-            
-        # Frustrated-related phrases
-        if "interruptions" in text.lower() and "impossible" in text.lower():
-            emotions["frustrated"] += 4.0
-        if "fix one issue" in text.lower() and "more appear" in text.lower():
-            emotions["frustrated"] += 4.0
-            
-        # Happy-related phrases
-        if "promotion" in text.lower() and "entire year" in text.lower():
-            emotions["happy"] += 4.0
-            
-        # Sad-related phrases
-        if "miss how things used to be" in text.lower():
-            emotions["sad"] += 4.0
-            
-        # Inspired-related phrases (additional)
-        if "conference" in text.lower() and "new ideas" in text.lower():
-            emotions["inspired"] += 5.0
-        if "ideas to explore" in text.lower():
-            emotions["inspired"] += 4.5
-            
-        # Define mixed emotion patterns with more structured and comprehensive approach
-        MIXED_EMOTION_PATTERNS = [
-            # Excitement/Anxiety Pattern
-            {
-                "emotions": ["happy", "fearful"],
-                "keywords1": ["excited", "enthusiasm", "looking forward", "thrilled", "eager", "anticipation", "can't wait", "thrilling"],
-                "keywords2": ["nervous", "worried", "anxiety", "anxious", "concerned", "deadline", "stress", "pressure", "apprehensive", "trepidation"],
-                "context_cues": ["but", "yet", "however", "although", "though", "while", "and", "also", "mixed", "both", "at the same time", "simultaneously", "meanwhile", "despite", "nevertheless"],
-                "mixed_weight": 8.0,
-                "individual_weight": 3.0,
-                "proximity_boost": 1.5,  # Extra boost if keywords are close to each other
-                "name": "excitement-anxiety"
-            },
-            
-            # Bittersweet Pattern
-            {
-                "emotions": ["happy", "sad"],
-                "keywords1": ["happy", "glad", "joy", "proud", "accomplishments", "achievement", "success", "victory", "milestone", "graduation", "earned", "reward"],
-                "keywords2": ["sad", "melancholy", "bittersweet", "miss", "leave", "behind", "farewell", "goodbye", "end", "nostalgia", "reminisce", "chapter"],
-                "context_cues": ["but", "yet", "however", "although", "though", "while", "and", "also", "bittersweet", "mixed", "both", "at the same time", "simultaneously", "meanwhile", "despite", "nevertheless"],
-                "mixed_weight": 8.0,
-                "individual_weight": 3.0,
-                "proximity_boost": 1.5,
-                "name": "bittersweet"
-            },
-            
-            # Frustrated Joy Pattern
-            {
-                "emotions": ["happy", "angry"],
-                "keywords1": ["happy", "pleased", "satisfied", "glad", "thrilled", "celebrate", "achievement", "finally", "at last", "succeeded"],
-                "keywords2": ["angry", "annoyed", "upset", "irritated", "frustrated", "difficulty", "struggle", "problem", "challenge", "obstacle", "hurdle", "roadblock"],
-                "context_cues": ["but", "yet", "however", "although", "though", "while", "and", "also", "mixed", "both", "at the same time", "simultaneously", "nevertheless", "in spite of", "despite"],
-                "mixed_weight": 8.0,
-                "individual_weight": 3.0,
-                "proximity_boost": 1.5,
-                "name": "frustrated-joy"
-            },
-            
-            # Angry Disappointment Pattern
-            {
-                "emotions": ["sad", "angry"],
-                "keywords1": ["sad", "disappointed", "upset", "heartbroken", "let down", "discouraged", "disheartened", "down", "blue", "disappointed"],
-                "keywords2": ["angry", "frustrated", "mad", "furious", "outraged", "resentful", "bitter", "indignant", "resentment", "betrayed", "unfair"],
-                "context_cues": ["but", "yet", "however", "although", "though", "while", "and", "also", "mixed", "both", "at the same time", "simultaneously", "meanwhile", "as well as", "together with"],
-                "mixed_weight": 8.0,
-                "individual_weight": 3.0,
-                "proximity_boost": 1.5,
-                "name": "angry-disappointment"
-            },
-            
-            # Anxious Anger Pattern
-            {
-                "emotions": ["fearful", "angry"],
-                "keywords1": ["afraid", "scared", "fearful", "worried", "concerned", "anxious", "uncertain", "dread", "fright", "terror", "horror"],
-                "keywords2": ["angry", "frustrated", "mad", "annoyed", "irritated", "fury", "rage", "hostility", "aggravated", "incensed", "livid"],
-                "context_cues": ["but", "yet", "however", "although", "though", "while", "and", "also", "mixed", "both", "at the same time", "simultaneously", "meanwhile", "alongside"],
-                "mixed_weight": 8.0,
-                "individual_weight": 3.0,
-                "proximity_boost": 1.5,
-                "name": "anxious-anger"
-            },
-            
-            # Fearful Surprise Pattern
-            {
-                "emotions": ["surprised", "fearful"],
-                "keywords1": ["surprised", "shocked", "amazed", "astonished", "startled", "astounded", "stunned", "taken aback", "unexpected", "sudden"],
-                "keywords2": ["scared", "worried", "concerned", "afraid", "anxious", "frightened", "terrified", "alarmed", "uneasy", "nervous", "on edge"],
-                "context_cues": ["but", "yet", "however", "although", "though", "while", "and", "also", "mixed", "both", "at the same time", "simultaneously", "immediately", "instantly"],
-                "mixed_weight": 8.0,
-                "individual_weight": 3.0,
-                "proximity_boost": 1.5,
-                "name": "fearful-surprise"
-            },
-            
-            # Conflicted Decision Pattern 
-            {
-                "emotions": ["confused", "anxious"],
-                "keywords1": ["confused", "uncertain", "unsure", "indecisive", "torn", "ambivalent", "conflicted", "dilemma", "crossroads", "choice", "decide", "decision"],
-                "keywords2": ["nervous", "worried", "stress", "pressure", "deadline", "consequences", "impact", "result", "outcome", "repercussions"],
-                "context_cues": ["but", "yet", "however", "although", "though", "while", "and", "also", "mixed", "both", "on one hand", "on the other hand", "either", "or", "versus", "vs"],
-                "mixed_weight": 8.0,
-                "individual_weight": 3.0,
-                "proximity_boost": 1.5,
-                "name": "conflicted-decision"
-            },
-            
-            # Hopeful Sadness Pattern
-            {
-                "emotions": ["inspired", "sad"],
-                "keywords1": ["hope", "hopeful", "inspired", "motivated", "determined", "optimistic", "looking forward", "future", "potential", "opportunity"],
-                "keywords2": ["sad", "difficult", "challenging", "hard", "struggle", "tough", "pain", "suffering", "grief", "loss"],
-                "context_cues": ["but", "yet", "however", "although", "though", "while", "and", "also", "mixed", "both", "in spite of", "despite", "through", "beyond", "after"],
-                "mixed_weight": 8.0,
-                "individual_weight": 3.0,
-                "proximity_boost": 1.5,
-                "name": "hopeful-sadness"
-            },
-            
-            # Grateful Melancholy Pattern
-            {
-                "emotions": ["grateful", "sad"],
-                "keywords1": ["grateful", "thankful", "appreciate", "blessed", "fortunate", "luck", "lucky", "gratitude", "appreciation"],
-                "keywords2": ["miss", "memories", "remember", "past", "used to", "gone", "never again", "no longer", "changed", "different now", "nostalgia"],
-                "context_cues": ["but", "yet", "however", "although", "though", "while", "and", "also", "mixed", "both", "at the same time", "still", "nevertheless"],
-                "mixed_weight": 8.0,
-                "individual_weight": 3.0,
-                "proximity_boost": 1.5,
-                "name": "grateful-melancholy"
-            },
-            
-            # Amused Embarrassment Pattern
-            {
-                "emotions": ["amused", "embarrassed"],
-                "keywords1": ["funny", "laugh", "amusing", "hilarious", "humor", "comedy", "joke", "giggle", "chuckle"],
-                "keywords2": ["embarrassed", "embarrassing", "awkward", "cringe", "mortify", "humiliated", "shame", "blush", "facepalm", "fool"],
-                "context_cues": ["but", "yet", "however", "although", "though", "while", "and", "also", "mixed", "both", "at the same time", "simultaneously", "nevertheless"],
-                "mixed_weight": 8.0,
-                "individual_weight": 3.0,
-                "proximity_boost": 1.5,
-                "name": "amused-embarrassment"
-            }
-        ]
-        
-        # Special cases for phrases needing exact matches
-        special_mixed_cases = [
-            {
-                "phrase": "excited about the new project",
-                "phrase2": "nervous about the tight deadline", 
-                "emotions": ["happy", "fearful"],
-                "mixed_weight": 10.0  # Extra high weight for exact matches
-            },
-            {
-                "phrase": "proud of my accomplishments",
-                "phrase2": "sad to leave friends", 
-                "emotions": ["proud", "sad"],
-                "mixed_weight": 10.0
-            },
-            {
-                "phrase": "happy to be done",
-                "phrase2": "sad to say goodbye", 
-                "emotions": ["happy", "sad"],
-                "mixed_weight": 10.0
-            }
-        ]
-        
-        # Check for exact special cases first (highest priority)
-        for case in special_mixed_cases:
-            if case["phrase"].lower() in text.lower() and case["phrase2"].lower() in text.lower():
-                emotions["mixed"] = case["mixed_weight"]
-                for emotion in case["emotions"]:
-                    emotions[emotion] += 3.0
-        
-        # Then check for mixed emotion patterns (second priority)
-        # Store detected pattern information for metadata
-        detected_patterns = []
-        
-        for pattern in MIXED_EMOTION_PATTERNS:
-            # Find actual matching keywords instead of just checking presence
-            matching_keywords1 = [kw for kw in pattern["keywords1"] if kw.lower() in text.lower()]
-            matching_keywords2 = [kw for kw in pattern["keywords2"] if kw.lower() in text.lower()]
-            matching_cues = [cue for cue in pattern["context_cues"] if cue.lower() in text.lower()]
-            
-            # Only proceed if we have matches from both keyword sets
-            if matching_keywords1 and matching_keywords2:
-                # Check for context cues
-                if matching_cues:
-                    # Calculate base weight for this pattern
-                    base_weight = pattern["mixed_weight"]
-                    
-                    # Check for proximity boost (if keywords are close to each other)
-                    # We'll do a simple proximity check by looking for pairs within certain distance
-                    proximity_boost = 0
-                    
-                    # For each pair of emotion keywords, check if they're near each other
-                    for kw1 in matching_keywords1:
-                        for kw2 in matching_keywords2:
-                            # Simple algorithm: if both keywords are in the same sentence, boost
-                            sentences = re.split(r'[.!?]+', text.lower())
-                            for sentence in sentences:
-                                if kw1.lower() in sentence and kw2.lower() in sentence:
-                                    # Keywords in same sentence get maximum proximity boost
-                                    proximity_boost = pattern.get("proximity_boost", 1.0)
-                                    break
-                    
-                    # Calculate final weight with any proximity boost
-                    final_weight = base_weight + proximity_boost
-                    
-                    # Apply stronger weight if there's an explicit context cue
-                    if any(cue in ["but", "yet", "however", "although", "though"] for cue in matching_cues):
-                        final_weight *= 1.2  # 20% boost for contrast cues
-                    
-                    # Set mixed emotion with calculated weight
-                    emotions["mixed"] = max(emotions.get("mixed", 0), final_weight)
-                    
-                    # Also boost the individual emotions
-                    em1, em2 = pattern["emotions"]
-                    emotions[em1] += pattern["individual_weight"]
-                    emotions[em2] += pattern["individual_weight"]
-                    
-                    # Store pattern information for metadata
-                    detected_patterns.append({
-                        "pattern": pattern.get("name", f"{em1}-{em2}"),
-                        "keywords1": matching_keywords1,
-                        "keywords2": matching_keywords2,
-                        "context_cues": matching_cues,
-                        "weight": final_weight
-                    })
-        
-        # Special case pattern matching for specific phrases
-        if ("excited" in text.lower() and "nervous" in text.lower()) or ("excitement" in text.lower() and "nervousness" in text.lower()):
-            emotions["happy"] += 4.0  # excited maps to happy
-            emotions["fearful"] += 4.0  # nervous maps to fearful
-            emotions["mixed"] = 9.0  # Very high weight for this common case
-            
-        if "while" in text.lower() and "excited" in text.lower() and "nervous" in text.lower():
-            # This is a direct match for one of our test cases
-            emotions["mixed"] = 12.0  # Give extremely high weight for exact test case
-            
-        # Check for explicit mixed emotion phrases - comprehensive list
-        mixed_explicit_phrases = [
-            # Direct mixed emotion mentions
-            "mixed emotions", "mixed feelings", "conflicted feelings", "conflicting emotions",
-            "emotional conflict", "ambivalent", "ambivalence", "emotional ambivalence",
-            
-            # Phrases indicating internal conflict
-            "torn between", "feel both", "simultaneously feel", "feel simultaneously",
-            "part of me feels", "another part of me", "on one hand", "on the other hand",
-            "caught between", "in two minds", "of two minds", "paradoxical feelings",
-            
-            # Emotional state descriptions
-            "emotional rollercoaster", "bittersweet", "sweet sorrow", "pleasant sadness",
-            "joyful melancholy", "melancholic joy", "happy sorrow", "smiling through tears",
-            
-            # Common mixed emotion pairings
-            "happy and sad", "excited but nervous", "proud but sad", 
-            "grateful yet sad", "relieved but disappointed", "angry but concerned",
-            "frustrated yet hopeful", "happy but worried", "excited and scared",
-            "glad but regretful", "hopeful yet anxious", "calm but tense",
-            
-            # Temporal transition phrases
-            "started happy but ended sad", "began with excitement but now worried",
-            "initially nervous now excited", "went from happy to confused",
-            "shifted from anger to concern", "transitioned from joy to anxiety",
-            
-            # Complex emotional responses
-            "love-hate relationship", "complicated feelings", "it's complicated",
-            "not sure how to feel", "don't know whether to laugh or cry",
-            "laughing and crying", "tears of joy", "tears of happiness", 
-            "nervous excitement", "anxious anticipation", "excited fear",
-            
-            # Cultural/idiomatic expressions
-            "bitter sweet", "bitter-sweet", "mixed blessing", "double-edged",
-            "two sides of the same coin", "blessing in disguise",
-            "sweet and sour feelings", "laughing on the outside crying on the inside"
-        ]
-        
-        # Enhanced detection: full phrases or meaningful segments
-        matched_phrases = []
-        for phrase in mixed_explicit_phrases:
-            if phrase in text.lower():
-                matched_phrases.append(phrase)
-                emotions["mixed"] = 10.0  # Set mixed emotion with very high confidence
-                break
-                
-        # If no exact matches, check for related constructions that suggest mixed emotions
-        if not matched_phrases:
-            # Look for "emotion X and emotion Y" pattern (e.g., "I feel happy and anxious")
-            positive_emotions = ["happy", "excited", "joy", "joyful", "glad", "pleased", "satisfied", "proud"]
-            negative_emotions = ["sad", "angry", "anxious", "nervous", "worried", "frustrated", "scared", "fearful"]
-            
-            for pos in positive_emotions:
-                for neg in negative_emotions:
-                    patterns = [
-                        f"{pos} and {neg}", f"{pos} but {neg}", 
-                        f"{pos} yet {neg}", f"{neg} and {pos}", 
-                        f"{neg} but {pos}", f"{neg} yet {pos}"
-                    ]
-                    
-                    for pattern in patterns:
-                        if pattern in text.lower():
-                            emotions["mixed"] = 9.5  # High but slightly lower than explicit phrases
-                            matched_phrases.append(pattern)
-                            break
-                    
-                    if matched_phrases:
-                        break
-                
-                if matched_phrases:
-                    break
-            
-        # 1. Check for emotional phrases first (highest priority)
-        for emotion, phrases in self.emotional_phrases.items():
-            for phrase in phrases:
-                if phrase.lower() in text.lower():
-                    emotions[emotion] += 1.5  # Give phrases higher weight
-
-        # 2. Check for keywords with weights
-        words = re.findall(r'\b\w+\b', text.lower())
-
-        # Track negation context
-        negation_active = False
-        intensifier_value = 1.0
-
-        for i, word in enumerate(words):
-            # Check for negation words
-            if word in self.negation_words:
-                negation_active = True
-                continue
-
-            # Check for intensity modifiers
-            if word in self.intensity_modifiers:
-                intensifier_value = self.intensity_modifiers[word]
-                continue
-
-            # Check if word matches any emotion keywords
-            for emotion, keywords in self.emotion_keywords.items():
-                if isinstance(keywords, dict):
-                    # Dictionary format with weights
-                    if word in keywords:
-                        score = keywords[word] * intensifier_value
-                        if negation_active:
-                            # If negated, reduce this emotion and possibly increase opposites
-                            emotions[emotion] -= score
-                            # Add small boost to opposite emotions
-                            if emotion == "happy":
-                                emotions["sad"] += 0.3 * score
-                            elif emotion == "sad":
-                                emotions["happy"] += 0.3 * score
-                        else:
-                            emotions[emotion] += score
-                            
-                    # Check if any synonyms of the keywords match
-                    for keyword, weight in keywords.items():
-                        # Skip if this is exactly the word we already checked
-                        if keyword == word:
-                            continue
-                            
-                        # Use different synonym depth based on emotion complexity
-                        depth = 2 if emotion in ["contemplative", "inspired", "satisfied", "frustrated", "amused"] else 1
-                        
-                        # Check all synonyms for this keyword with emotion context
-                        for synonym in _get_synonyms(keyword, depth=depth, emotion_context=emotion):
-                            if word == synonym:
-                                # Adjust weight based on depth - deeper synonyms get lower weights
-                                synonym_weight = weight * (0.7 if depth == 1 else 0.5) * intensifier_value
-                                
-                                if negation_active:
-                                    emotions[emotion] -= synonym_weight
-                                    # Add small boost to opposite emotions for synonyms too
-                                    if emotion == "happy":
-                                        emotions["sad"] += 0.3 * synonym_weight
-                                    elif emotion == "sad":
-                                        emotions["happy"] += 0.3 * synonym_weight
-                                else:
-                                    emotions[emotion] += synonym_weight
+        # Scan once: tokens plus every keyword, synonym and rule phrase present
+        match = self._matcher.scan(text)
+        found = match.phrases
+
+        # Literal phrase rules: special cases, mixed-emotion patterns, emotional phrases
+        detected_patterns = _apply_phrase_rules(match, emotions, self.emotional_phrases)
+
+        # 2. Check for keywords with weights (synonyms are folded into the matcher)
+        term_weights = self._matcher.term_weights
+        hits = _keyword_hits(match.words, term_weights, self.negation_words, self.intensity_modifiers)
+
+        for term, multiplier, negated in hits:
+            for emotion, weight in term_weights[term].items():
+                score = weight * multiplier
+                if negated:
+                    # If negated, reduce this emotion and possibly increase opposites
+                    emotions[emotion] -= score
+                    # Add small boost to opposite emotions
+                    if emotion == "happy":
+                        emotions["sad"] += 0.3 * score
+                    elif emotion == "sad":
+                        emotions["happy"] += 0.3 * score
                 else:
-                    # Simple list format (legacy support)
-                    if word in keywords:
-                        if negation_active:
-                            emotions[emotion] -= 1.0 * intensifier_value
-                        else:
-                            emotions[emotion] += 1.0 * intensifier_value
-
-            # Reset negation and intensity after applying to a word
-            negation_active = False
-            intensifier_value = 1.0
+                    emotions[emotion] += score
 
         # 3. Add sentiment analysis for unlabeled text
-        sentiment_score = self._calculate_sentiment(text)
+        sentiment_score = self._calculate_sentiment(text, found)
         if sentiment_score > 0.3:
             emotions["happy"] += sentiment_score * 0.5
         elif sentiment_score < -0.3:
@@ -1120,9 +1357,20 @@ class EmotionTracker:
             for emotion, score in context_emotions.items():
                 emotions[emotion] += score * 0.3
 
-        # 5. Factor in temporal patterns
+        return emotions, detected_patterns
+
+    def _rule_result(self, emotions: Dict[str, float], context: Optional[List[str]],
+                     detected_patterns: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Record raw rule scores in the trend data, then factor in temporal patterns"""
+        emotions = dict(emotions)
         self._update_pattern_data(emotions)
         pattern_influence = self._calculate_pattern_influence()
+        return self._build_rule_result(emotions, context, pattern_influence, detected_patterns)
+
+    def _build_rule_result(self, emotions: Dict[str, float], context: Optional[List[str]],
+                           pattern_influence: Dict[str, float],
+                           detected_patterns: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Apply pattern influence to raw rule scores and pick the primary emotion"""
         for emotion, factor in pattern_influence.items():
             if emotion in emotions:
                 emotions[emotion] *= factor  # Adjust based on patterns
@@ -1198,53 +1446,17 @@ class EmotionTracker:
             }
         }
 
-    def _calculate_sentiment(self, text: str) -> float:
+    def _calculate_sentiment(self, text: str, found_phrases: Optional[Set[str]] = None) -> float:
         """Calculate a simple sentiment score (-1.0 to 1.0) based on positive/negative indicators"""
-        pos_count = sum(1 for word in self.positive_indicators if word in text.lower())
-        neg_count = sum(1 for word in self.negative_indicators if word in text.lower())
-
-        total = pos_count + neg_count
-        if total == 0:
-            return 0.0
-
-        return (pos_count - neg_count) / (pos_count + neg_count)
+        # Phrases already located by the matcher scan avoid re-searching the text
+        haystack = found_phrases if found_phrases is not None else text.lower()
+        return _sentiment_score(haystack, self.positive_indicators, self.negative_indicators)
 
     def _analyze_context(self, context: List[str]) -> Dict[str, float]:
         """Analyze conversation context to extract emotional tendencies"""
-        # Combine all context messages
-        combined_text = " ".join(context)
-
-        # Simple keyword matching on combined text
-        emotions = {emotion: 0.0 for emotion in self.emotion_labels}
+        return _context_scores(self._matcher, self.emotion_labels, context)
 
-        for emotion, keywords in self.emotion_keywords.items():
-            if isinstance(keywords, dict):
-                for word, weight in keywords.items():
-                    # Check for exact keyword matches
-                    pattern = r'\b' + re.escape(word) + r'\b'
-                    matches = re.findall(pattern, combined_text.lower())
-                    emotions[emotion] += len(matches) * weight
-                    
-                    # Check for synonyms with emotion context
-                    depth = 2 if emotion in ["contemplative", "inspired", "satisfied", "frustrated", "amused"] else 1
-                    for synonym in _get_synonyms(word, depth=depth, emotion_context=emotion):
-                        syn_pattern = r'\b' + re.escape(synonym) + r'\b'
-                        syn_matches = re.findall(syn_pattern, combined_text.lower())
-                        # Apply reduced weight for synonyms
-                        synonym_weight = weight * (0.7 if depth == 1 else 0.5)
-                        emotions[emotion] += len(syn_matches) * synonym_weight
-            else:
-                # Legacy support for list format
-                for keyword in keywords:
-                    pattern = r'\b' + re.escape(keyword) + r'\b'
-                    matches = re.findall(pattern, combined_text.lower())
-                    emotions[emotion] += len(matches)
-
-        # Normalize
-        total = sum(emotions.values()) or 1.0
-        return {e: (s / total) for e, s in emotions.items() if s > 0}
-
-    def _update_pattern_data(self, emotions: Dict[str, float]):
+    def _update_pattern_data(self, emotions: Dict[str, float], save: bool = True):
         """Update emotional pattern data to track temporal changes"""
         timestamp = datetime.now()
         day_key = timestamp.strftime("%Y-%m-%d")
@@ -1268,13 +1480,16 @@ class EmotionTracker:
                 del self.trend_data[old_key]
 
         # Save updated trend data periodically (every 10 updates)
-        if sum(len(entries) for entries in self.trend_data.values()) % 10 == 0:
-            try:
-                trend_path = os.path.join(self.data_dir, "emotion_trends.json")
-                with open(trend_path, 'w') as f:
-                    json.dump(self.trend_data, f, indent=2)
-            except Exception as e:
-                self.logger.error(f"Error saving trend data: {str(e)}")
+        if save and sum(len(entries) for entries in self.trend_data.values()) % 10 == 0:
+            self._save_trend_data()
+
+    def _save_trend_data(self):
+        try:
+            trend_path = os.path.join(self.data_dir, "emotion_trends.json")
+            with open(trend_path, 'w') as f:
+                json.dump(self.trend_data, f, indent=2)
+        except Exception as e:
+            self.logger.error(f"Error saving trend data: {str(e)}")
 
     def _calculate_pattern_influence(self) -> Dict[str, float]:
         """Calculate pattern influence factors based on recent emotion history"""
@@ -1497,67 +1712,35 @@ class EmotionTracker:
             return {"error": str(e)}
 
     def _analyze_trends_from_database(self, days: int) -> Dict[str, Any]:
-        """Analyze trends using database data when trend cache is empty"""
+        """Analyze trends using the daily rollup when trend cache is empty"""
         try:
-            conn = self.db_manager.get_connection()
-            cursor = conn.cursor()
-
-            # Get start date
-            start_date = (datetime.now() - timedelta(days=days)).isoformat()
-
-            # Query for emotions in the timeframe
-            cursor.execute(
-                "SELECT emotion, timestamp, intensity FROM emotions WHERE timestamp >= %s ORDER BY timestamp",
-                (start_date,)
+            # Whole days, starting `days` days ago; intensity totals per day and emotion
+            start_day = (datetime.now() - timedelta(days=days)).date()
+            matrix = DailyEmotionMatrix.from_rows(
+                query_daily_rollups(self.db_manager, start_day), self.emotion_labels
             )
 
-            results = cursor.fetchall()
-
-            # Group by day
-            daily_emotions = defaultdict(lambda: defaultdict(float))
-
-            for emotion, timestamp_str, intensity in results:
-                try:
-                    timestamp = datetime.fromisoformat(timestamp_str)
-                except ValueError:
-                    # Try alternate format
-                    timestamp = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
-
-                day_key = timestamp.strftime("%Y-%m-%d")
-                daily_emotions[day_key][emotion] += float(intensity)
-
-            # Normalize distributions
-            daily_distributions = {}
-            for day, emotions in daily_emotions.items():
-                total = sum(emotions.values()) or 1.0
-                daily_distributions[day] = {e: (s / total) for e, s in emotions.items()}
-
-            # Find primary emotion per day
-            primary_emotions = {}
-            for day, dist in daily_distributions.items():
-                if dist:
-                    primary_emotions[day] = max(dist.items(), key=lambda x: x[1])[0]
-                else:
-                    primary_emotions[day] = "neutral"
+            # Normalize each day's intensities into a distribution
+            daily_shares = matrix.shares(matrix.intensity)
+            primary_emotions = dict(zip(matrix.days, matrix.primary_emotions(daily_shares)))
 
             # Calculate overall distribution
-            overall = defaultdict(float)
-            for dist in daily_distributions.values():
-                for emotion, score in dist.items():
-                    overall[emotion] += score
-
-            total = sum(overall.values()) or 1.0
-            overall_distribution = {e: (s / total) for e, s in overall.items() if s > 0}
+            overall = daily_shares.sum(axis=0)
+            total = overall.sum() or 1.0
+            overall_distribution = {
+                matrix.emotions[column]: float(overall[column] / total)
+                for column in np.flatnonzero(overall > 0)
+            }
 
             # Find dominant emotions (top 3)
             dominant = sorted(overall_distribution.items(), key=lambda x: x[1], reverse=True)[:3]
 
             # Detect patterns
-            patterns = self._detect_emotion_patterns(daily_distributions)
+            patterns = self._detect_patterns_in_matrix(matrix, daily_shares)
 
             return {
                 "period": f"Last {days} days",
-                "days_analyzed": len(daily_distributions),
+                "days_analyzed": len(matrix.days),
                 "dominant_emotions": [{"emotion": e, "score": s} for e, s in dominant],
                 "daily_primary": primary_emotions,
                 "patterns": patterns,
@@ -1575,23 +1758,20 @@ class EmotionTracker:
             }
 
     def _detect_emotion_patterns(self, daily_distributions: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
-        """Detect patterns in emotional data"""
-        if not daily_distributions:
+        """Detect patterns in emotional data given as {day: {emotion: share}}"""
+        matrix = DailyEmotionMatrix.from_distributions(daily_distributions, self.emotion_labels)
+        return self._detect_patterns_in_matrix(matrix, matrix.intensity)
+
+    def _detect_patterns_in_matrix(self, matrix: DailyEmotionMatrix, daily_shares: np.ndarray) -> Dict[str, Any]:
+        """Detect patterns in a day x emotion matrix of per-day emotion shares"""
+        if not matrix.days:
             return {"type": "insufficient_data", "description": "Not enough data to detect patterns", "strength": 0}
 
-        days = sorted(daily_distributions.keys())
-        if len(days) < 3:
+        if len(matrix.days) < 3:
             return {"type": "insufficient_days", "description": "Need at least 3 days of data", "strength": 0}
 
         # Check for consistent primary emotion
-        primaries = []
-        for day in days:
-            dist = daily_distributions[day]
-            if dist:
-                primary = max(dist.items(), key=lambda x: x[1])[0]
-                primaries.append(primary)
-            else:
-                primaries.append("neutral")
+        primaries = matrix.primary_emotions(daily_shares)
 
         # Count occurrences
         emotion_counts = Counter(primaries)
@@ -1623,36 +1803,23 @@ class EmotionTracker:
                     "strength": 0.8
                 }
 
-        # Check for upward/downward trends in specific emotions
-        trends = {}
-        for emotion in self.emotion_labels:
-            values = [daily_distributions[day].get(emotion, 0) for day in days]
-            if not any(values):
-                continue
-
-            # Calculate trend using linear regression slope
-            n = len(values)
-            x = list(range(n))
-            x_mean = sum(x) / n
-            y_mean = sum(values) / n
+        # Check for upward/downward trends in specific emotions: least squares
+        # slope of every emotion label column at once
+        values = daily_shares[:, :len(self.emotion_labels)]
+        x = np.arange(len(matrix.days), dtype=np.float64)
+        x -= x.mean()
+        slopes = (x @ (values - values.mean(axis=0))) / (x @ x)
 
-            numerator = sum((x[i] - x_mean) * (values[i] - y_mean) for i in range(n))
-            denominator = sum((x[i] - x_mean) ** 2 for i in range(n))
+        # Normalize to -1 to 1 range and only keep significant trends
+        value_range = values.max(axis=0) - values.min(axis=0)
+        normalized = np.divide(slopes, value_range, out=np.zeros_like(slopes), where=value_range > 0)
+        significant = np.flatnonzero((value_range > 0) & (np.abs(normalized) > 0.2))
 
-            slope = numerator / denominator if denominator else 0
-
-            # Normalize to -1 to 1 range
-            max_possible_slope = max(values) - min(values)
-            if max_possible_slope > 0:
-                normalized_slope = slope / max_possible_slope
-
-                # Only include significant trends
-                if abs(normalized_slope) > 0.2:
-                    trends[emotion] = normalized_slope
-
-        if trends:
+        if significant.size:
             # Find strongest trend
-            strongest_emotion, strongest_trend = max(trends.items(), key=lambda x: abs(x[1]))
+            strongest = significant[np.argmax(np.abs(normalized[significant]))]
+            strongest_emotion = matrix.emotions[strongest]
+            strongest_trend = float(normalized[strongest])
             trend_type = "increasing" if strongest_trend > 0 else "decreasing"
 
             return {
@@ -1795,11 +1962,15 @@ class EmotionTracker:
                     id SERIAL PRIMARY KEY,
                     emotion TEXT NOT NULL,
                     text TEXT,
-                    timestamp TEXT NOT NULL,
+                    timestamp TIMESTAMP NOT NULL,
                     source TEXT DEFAULT 'text',
                     intensity REAL DEFAULT 0.5
                 )
             ''')
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_emotions_timestamp ON emotions (timestamp)")
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS ix_emotions_emotion_timestamp ON emotions (emotion, timestamp)"
+            )
 
             conn.commit()
             self.logger.info("Emotion tracker initialized successfully")
@@ -1827,6 +1998,150 @@ class EmotionTracker:
         # Return full details or just the primary emotion based on the return_details flag
         return result if return_details else result["primary_emotion"]
 
+    def analyze_batch(self, texts: List[str], contexts: Optional[List[Optional[List[str]]]] = None,
+                      return_timings: bool = False):
+        """
+        Analyze many texts at once (e.g. an offline sync from a mobile client)
+
+        Identical (text, context) pairs are analyzed once; each position gets
+        its own copy of the result. Rule-based scoring is done for the whole batch with NumPy, and
+        batches with at least EMOTION_BATCH_PROCESS_THRESHOLD distinct texts
+        are split across EMOTION_BATCH_WORKERS processes when that is set.
+        Temporal pattern influence is computed once for the batch, after
+        every text has been recorded in the trend data.
+
+        Args:
+            texts: Texts to analyze
+            contexts: Optional context messages per text (same length as texts)
+            return_timings: If True, also return per-stage durations in milliseconds
+
+        Returns:
+            List of analysis dicts in input order (as analyze_text_advanced), or
+            (results, timings) if return_timings=True
+
+        Raises:
+            ValueError: If contexts is given with a different length than texts
+        """
+        if contexts is not None and len(contexts) != len(texts):
+            raise ValueError(f"contexts has {len(contexts)} entries for {len(texts)} texts")
+
+        timings = {}
+        batch_start = time.time()
+
+        # Normalize and dedupe
+        keys = []
+        unique_index = {}
+        unique_items = []
+        for i, text in enumerate(texts):
+            normalized = (text or "").lower().strip()
+            if not normalized:
+                keys.append(None)
+                continue
+            context = tuple(contexts[i]) if contexts and contexts[i] else ()
+            key = (normalized, context)
+            if key not in unique_index:
+                unique_index[key] = len(unique_items)
+                unique_items.append(key)
+            keys.append(unique_index[key])
+
+        normalized_texts = [unique_items[k][0] for k in keys if k is not None]
+        self.conversation_memory.extend(normalized_texts[-self.memory_limit:])
+        del self.conversation_memory[:-self.memory_limit]
+
+        timings["normalize_ms"] = (time.time() - batch_start) * 1000
+
+        if OPENAI_AVAILABLE and os.environ.get("OPENAI_API_KEY"):
+            # Model-based analysis is per text; dedupe still saves requests
+            stage_start = time.time()
+            unique_results = [
+                self.analyze_text_advanced(text, list(context) or None) for text, context in unique_items
+            ]
+            timings["openai_ms"] = (time.time() - stage_start) * 1000
+        else:
+            unique_results = self._analyze_batch_with_rules(unique_items, [k for k in keys if k is not None], timings)
+
+        neutral = {"primary_emotion": "neutral", "emotions": {"neutral": 1.0}, "intensity": 0.5}
+        results = [copy.deepcopy(unique_results[k]) if k is not None else dict(neutral) for k in keys]
+
+        timings["total_ms"] = (time.time() - batch_start) * 1000
+        return (results, timings) if return_timings else results
+
+    def _analyze_batch_with_rules(self, items: List[Tuple[str, Tuple[str, ...]]], occurrences: List[int],
+                                  timings: Dict[str, float]) -> List[Dict[str, Any]]:
+        """Rule-based analysis of distinct (text, context) pairs; occurrences index items per input text"""
+        if not items:
+            return []
+
+        config = getattr(self.db_manager, "config", None)
+        workers = getattr(config, "EMOTION_BATCH_WORKERS", 0)
+        threshold = getattr(config, "EMOTION_BATCH_PROCESS_THRESHOLD", 1000)
+
+        stage_start = time.time()
+        scores = None
+        if workers > 1 and len(items) >= threshold:
+            scores, detected_patterns = self._score_batch_in_pool(items, workers, timings)
+        if scores is None:
+            scores, detected_patterns = _score_rule_batch(self._rule_tables, items, timings)
+        timings["score_ms"] = (time.time() - stage_start) * 1000
+
+        # Record every input text (duplicates included) before computing influence once
+        stage_start = time.time()
+        labels = self._rule_tables.emotion_labels
+        raw_emotions = [dict(zip(labels, row)) for row in scores.tolist()]
+        for index in occurrences:
+            self._update_pattern_data(raw_emotions[index], save=False)
+        self._save_trend_data()
+        pattern_influence = self._calculate_pattern_influence()
+
+        results = [
+            self._build_rule_result(emotions, list(context) or None, pattern_influence, patterns)
+            for emotions, (_, context), patterns in zip(raw_emotions, items, detected_patterns)
+        ]
+        timings["finalize_ms"] = (time.time() - stage_start) * 1000
+        return results
+
+    def _score_batch_in_pool(self, items: List[Tuple[str, Tuple[str, ...]]], workers: int,
+                             timings: Dict[str, float]):
+        """
+        Split batch scoring across worker processes; returns (None, None) if the pool fails
+
+        Stage timings are summed over the workers' chunks, so with several
+        workers they can add up to more than the wall-clock score_ms.
+        """
+        chunk_size = -(-len(items) // workers)
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        try:
+            pool = self._get_batch_pool(workers)
+            parts = list(pool.map(_score_rule_batch_chunk, chunks))
+        except Exception as e:
+            self.logger.error(f"Batch worker pool failed, scoring in process: {str(e)}")
+            self._shutdown_batch_pool()
+            return None, None
+
+        scores = np.vstack([part_scores for part_scores, _, _ in parts])
+        detected_patterns = [patterns for _, part_patterns, _ in parts for patterns in part_patterns]
+        for _, _, part_timings in parts:
+            for stage, elapsed in part_timings.items():
+                timings[stage] = timings.get(stage, 0.0) + elapsed
+        return scores, detected_patterns
+
+    def _get_batch_pool(self, workers: int) -> ProcessPoolExecutor:
+        with self._batch_pool_lock:
+            if self._batch_pool is None or self._batch_pool_workers != workers:
+                if self._batch_pool is not None:
+                    self._batch_pool.shutdown(wait=False)
+                self._batch_pool = ProcessPoolExecutor(
+                    max_workers=workers, initializer=_init_batch_worker, initargs=(self._rule_tables,)
+                )
+                self._batch_pool_workers = workers
+            return self._batch_pool
+
+    def _shutdown_batch_pool(self):
+        with self._batch_pool_lock:
+            if self._batch_pool is not None:
+                self._batch_pool.shutdown(wait=False)
+                self._batch_pool = None
+
     def analyze_voice(self, audio_path, context=None):
         """
         Analyze voice recording to determine emotion using advanced techniques
@@ -1935,107 +2250,73 @@ class EmotionTracker:
             return None
 
     def log_emotion(self, emotion, text="", source="text", intensity=0.5, session_id=None):
-        """Log an emotion detection event to the database"""
-        try:
-            conn = self.db_manager.get_connection()
-            cursor = conn.cursor()
-
-            timestamp = datetime.now().isoformat()
-
-            # Log to emotion_data table (used for dashboard visualizations)
-            self.db_manager.execute_query(
-                """
-                INSERT INTO emotion_data (timestamp, emotion, source, intensity, text, session_id)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                """,
-                (timestamp, emotion, source, intensity, text, session_id)
-            )
-
-            # Also log to emotions table (used for model training)
-            cursor.execute(
-                "INSERT INTO emotions (emotion, text, timestamp, source, intensity) VALUES (%s, %s, %s, %s, %s)",
-                (emotion, text, timestamp, source, intensity)
-            )
-
-            conn.commit()
-            self.logger.debug(f"Logged emotion: {emotion} from {source}")
-
-            # Also save to JSON file as backup (daily file)
-            date_str = datetime.now().strftime("%Y-%m-%d")
-            filename = os.path.join(self.data_dir, f"emotions_{date_str}.json")
+        """
+        Log an emotion detection event to the database
 
+        The event is queued and written in a batch by the background
+        EmotionLogWriter (within EMOTION_LOG_MAX_LATENCY seconds), together
+        with a line in the daily emotions_YYYY-MM-DD.jsonl backup file.
+        Returns False without blocking if the writer's queue is full.
+        """
+        try:
             entry = {
                 "emotion": emotion,
                 "text": text,
-                "timestamp": timestamp,
+                "timestamp": datetime.now().isoformat(),
                 "source": source,
                 "intensity": intensity,
                 "session_id": session_id
             }
 
-            entries = []
-            if os.path.exists(filename):
-                try:
-                    with open(filename, 'r') as f:
-                        entries = json.load(f)
-                except json.JSONDecodeError:
-                    entries = []
-
-            entries.append(entry)
-
-            with open(filename, 'w') as f:
-                json.dump(entries, f, indent=2)
-
-            return True
+            queued = self._get_log_writer().log(entry)
+            if queued:
+                self.logger.debug(f"Queued emotion log: {emotion} from {source}")
+            return queued
         except Exception as e:
             self.logger.error(f"Failed to log emotion: {str(e)}")
             return False
 
-    def get_emotion_history(self, days=7):
-        """Get emotion history for the specified number of days"""
-        try:
-            conn = self.db_manager.get_connection()
-            cursor = conn.cursor()
-
-            # Get data from the last N days
-            start_date = (datetime.now() - timedelta(days=days)).isoformat()
-
-            # The $1 parameter style requires prepared statements in psycopg2
-            cursor.execute(
-                "SELECT emotion, timestamp, intensity FROM emotions WHERE timestamp >= %s ORDER BY timestamp",
-                (start_date,)
-            )
-
-            results = cursor.fetchall()
-
-            # Format data for the chart
-            emotions_by_date = {}
-            for emotion, timestamp, intensity in results:
-                # Parse timestamp and get just the date portion
-                dt = datetime.fromisoformat(timestamp)
-                date_str = dt.strftime("%Y-%m-%d")
-
-                if date_str not in emotions_by_date:
-                    emotions_by_date[date_str] = {}
+    def _get_log_writer(self) -> EmotionLogWriter:
+        """Start the write-behind emotion logger on first use"""
+        with self._log_writer_lock:
+            if self.emotion_log_writer is None:
+                config = getattr(self.db_manager, "config", None)
+                self.emotion_log_writer = EmotionLogWriter(
+                    self.db_manager,
+                    data_dir=self.data_dir,
+                    max_latency=getattr(config, "EMOTION_LOG_MAX_LATENCY", 1.0),
+                    max_batch_size=getattr(config, "EMOTION_LOG_BATCH_SIZE", 200)
+                )
+            return self.emotion_log_writer
 
-                if emotion not in emotions_by_date[date_str]:
-                    emotions_by_date[date_str][emotion] = 0
+    def flush_emotion_log(self, timeout: float = 5.0) -> bool:
+        """Write all queued emotion events now (e.g. before reading history)"""
+        if self.emotion_log_writer is None:
+            return True
+        return self.emotion_log_writer.flush(timeout)
 
-                emotions_by_date[date_str][emotion] += 1
+    def get_emotion_history(self, days=7):
+        """
+        Get emotion history for the specified number of days
 
-            # Transform to array format for chart.js
-            labels = sorted(emotions_by_date.keys())
-            datasets = []
+        Counts come from the daily rollup, so the window covers whole days
+        starting `days` days ago. Queued log_emotion events are flushed first.
+        """
+        self.flush_emotion_log()
+        try:
+            start_day = (datetime.now() - timedelta(days=days)).date()
+            matrix = DailyEmotionMatrix.from_rows(
+                query_daily_rollups(self.db_manager, start_day), self.emotion_labels
+            )
 
-            for emotion in self.emotion_labels:
-                data = [emotions_by_date.get(date, {}).get(emotion, 0) for date in labels]
-                datasets.append({
-                    "label": emotion.capitalize(),
-                    "data": data
-                })
+            # One chart.js dataset per emotion label: its column of daily counts
+            datasets = [
+                {"label": emotion.capitalize(), "data": matrix.counts[:, column].tolist()}
+                for column, emotion in enumerate(self.emotion_labels)
+            ]
 
             return {
-                "labels": labels,
+                "labels": matrix.days,
                 "datasets": datasets
             }
 
@@ -2056,14 +2337,16 @@ class EmotionTracker:
             return 0
 
     def get_session_emotion_history(self, session_id):
-        """Get emotion history for a specific session"""
+        """Get emotion history for a specific session (queued log_emotion events are flushed first)"""
+        self.flush_emotion_log()
         try:
             # Get emotion data from the session using db_manager.execute_query
             # This query is used for retrieving emotion data by session ID
+            # Served by the (session_id, timestamp) index
             results = self.db_manager.execute_query(
                 """
                 SELECT emotion, timestamp, intensity FROM emotion_data 
-                WHERE session_id = %s 
+                WHERE session_id = ? 
                 ORDER BY timestamp
                 """,
                 (session_id,)
@@ -2080,13 +2363,9 @@ class EmotionTracker:
             current_time = None
             current_emotions = None
 
-            for emotion, timestamp_str, intensity in results:
-                # Parse the timestamp
-                try:
-                    timestamp = datetime.fromisoformat(timestamp_str)
-                except ValueError:
-                    # Try alternate format
-                    timestamp = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
+            for emotion, timestamp_value, intensity in results:
+                # datetime from PostgreSQL, text from SQLite
+                timestamp = parse_db_timestamp(timestamp_value)
 
                 # Round to nearest 5-minute
                 rounded_time = timestamp.replace(
@@ -2304,6 +2583,7 @@ class EmotionTracker:
 
                 # Mark model as trained
                 self.custom_model_trained = True
+                self._build_matcher()
 
                 self.logger.info(f"Advanced emotion model retraining complete with {len(data)} examples")
                 return {
@@ -2,12 +2,12 @@
 API Routes for Multilingual Emotion Idiom Translator
 Provides endpoints for translating emotional idioms between languages
 """
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 import logging
 from typing import Dict, Any, List, Optional
 
 from idiom_translator import get_idiom_translator
-from ai_model_router import AIModelRouter
+from ai_model_router import AIModelRouter, to_sse
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -15,6 +15,9 @@ logger = logging.getLogger(__name__)
 # Create Blueprint
 idiom_bp = Blueprint('idioms', __name__, url_prefix='/api/idioms')
 
+# Most idioms accepted by one /translate/batch request
+MAX_BATCH_IDIOMS = 100
+
 def init_idiom_routes(app, model_router: Optional[AIModelRouter] = None):
     """Initialize the idiom translation routes with necessary dependencies"""
     # Initialize the idiom translator with the model router
@@ -98,6 +101,116 @@ def translate_idiom():
             'message': str(e)
         }), 500
 
+@idiom_bp.route('/translate/batch', methods=['POST'])
+def translate_idioms_batch():
+    """
+    Translate several emotional idioms at once (one AI request per batch of uncached idioms)
+    
+    Request body:
+    {
+        "idioms": ["Walking on sunshine", {"idiom": "Feeling blue", "emotion": "sad"}],
+        "source_lang": "en",
+        "target_lang": "ar",
+        "provide_explanation": true (optional, default: false)
+    }
+    
+    Returns:
+    {
+        "success": true,
+        "count": 2,
+        "results": [<one /translate response per idiom, in order>]
+    }
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not data:
+            return jsonify({'success': False, 'error': 'No data provided'}), 400
+        
+        idioms = data.get('idioms')
+        source_lang = data.get('source_lang')
+        target_lang = data.get('target_lang')
+        
+        if not isinstance(idioms, list) or not idioms or not source_lang or not target_lang:
+            return jsonify({
+                'success': False,
+                'error': 'Missing required fields: idioms (non-empty list), source_lang, target_lang'
+            }), 400
+        
+        if len(idioms) > MAX_BATCH_IDIOMS:
+            return jsonify({
+                'success': False,
+                'error': f'Too many idioms: at most {MAX_BATCH_IDIOMS} per request'
+            }), 400
+        
+        if not all(isinstance(entry, str) or (isinstance(entry, dict) and entry.get('idiom')) for entry in idioms):
+            return jsonify({
+                'success': False,
+                'error': 'Each idiom must be a string or an object with an "idiom" field'
+            }), 400
+        
+        results = get_idiom_translator().translate_idioms(
+            idioms=idioms,
+            source_lang=source_lang,
+            target_lang=target_lang,
+            provide_explanation=data.get('provide_explanation', False)
+        )
+        
+        logger.info(f"Batch idiom translation: {len(idioms)} idioms from {source_lang} to {target_lang}")
+        
+        return jsonify({
+            'success': True,
+            'count': len(results),
+            'results': results
+        })
+    
+    except Exception as e:
+        logger.error(f"Error translating idiom batch: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to translate idioms',
+            'message': str(e)
+        }), 500
+
+@idiom_bp.route('/translate/stream', methods=['POST'])
+def translate_idiom_stream():
+    """
+    Translate an emotional idiom, streaming the model output as Server-Sent Events
+    
+    Request body: same as /translate
+    
+    Events:
+        token: {"content": "..."} for each chunk the model generates
+        result: the /translate response body (plus time_to_first_token_ms)
+    """
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({'success': False, 'error': 'No data provided'}), 400
+    
+    idiom = data.get('idiom')
+    source_lang = data.get('source_lang')
+    target_lang = data.get('target_lang')
+    
+    if not idiom or not source_lang or not target_lang:
+        return jsonify({
+            'success': False, 
+            'error': 'Missing required fields: idiom, source_lang, target_lang'
+        }), 400
+    
+    logger.info(f"Streaming idiom translation: '{idiom}' from {source_lang} to {target_lang}")
+    
+    events = get_idiom_translator().stream_translation(
+        idiom=idiom,
+        source_lang=source_lang,
+        target_lang=target_lang,
+        emotion=data.get('emotion'),
+        provide_explanation=data.get('provide_explanation', False)
+    )
+    return Response(
+        stream_with_context(to_sse(events)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @idiom_bp.route('/common', methods=['GET'])
 def get_common_idioms():
     """
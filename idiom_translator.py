@@ -7,13 +7,22 @@ between different languages, preserving the cultural context and emotional meani
 import json
 import logging
 import os
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
 from ai_model_router import AIModelRouter
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Call-site names in the shared completion cache (see completion_cache.py)
+TRANSLATION_CACHE_SITE = "idiom_translation"
+BATCH_CACHE_SITE = "idiom_translation_batch"
+COMMON_IDIOMS_CACHE_SITE = "common_idioms"
+
+# Batch translation: idioms per AI request, and reply tokens allowed per idiom
+BATCH_MAX_IDIOMS = 20
+BATCH_TOKENS_PER_IDIOM = 200
+
 # Import mock data for testing and fallback
 try:
     from mock_idiom_data import ENGLISH_IDIOMS, ARABIC_IDIOMS, MOCK_TRANSLATIONS
@@ -37,7 +46,6 @@ class IdiomTranslator:
         """
         self.model_router = model_router or AIModelRouter()
         self.supported_languages = ['en', 'ar']  # English and Arabic supported
-        self.idiom_cache = {}  # Cache for translated idioms to reduce API calls
         logger.info("Idiom Translator initialized with %d supported languages", len(self.supported_languages))
     
     def translate_idiom(
@@ -61,6 +69,276 @@ class IdiomTranslator:
         Returns:
             Dictionary with translated idiom and related information
         """
+        early_result = self._check_languages(idiom, source_lang, target_lang)
+        if early_result is not None:
+            return early_result
+        
+        # Create appropriate system prompt for the AI
+        system_prompt = self._create_system_prompt(source_lang, target_lang, provide_explanation, emotion)
+        
+        # Request translation from AI model (repeated requests are served by the completion cache)
+        response = self.model_router.generate_response(
+            prompt=self._create_user_prompt(idiom, emotion),
+            system_prompt=system_prompt,
+            temperature=0.7,
+            max_tokens=500,
+            cache_site=TRANSLATION_CACHE_SITE
+        )
+        
+        # Check if AI response was successful
+        if not response["success"]:
+            return self._translation_failed(
+                response.get("error", "Unknown error"),
+                idiom, source_lang, target_lang, provide_explanation
+            )
+        
+        # Parse AI response to extract translation and explanation
+        return self._parse_translation_response(
+            response["content"], 
+            idiom, 
+            source_lang, 
+            target_lang,
+            provide_explanation
+        )
+    
+    def stream_translation(
+        self,
+        idiom: str,
+        source_lang: str,
+        target_lang: str,
+        emotion: Optional[str] = None,
+        provide_explanation: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Translate an idiom, yielding the model's output as it is generated
+        
+        Yields AIModelRouter.stream_response token events, then one
+        {"type": "result", ...} event carrying the same dictionary
+        translate_idiom would return. A cached translation arrives as a
+        single token event; validation errors produce only the result event.
+        
+        Args:
+            idiom: The idiom or emotional expression to translate
+            source_lang: Source language code (e.g., 'en', 'ar')
+            target_lang: Target language code (e.g., 'en', 'ar')
+            emotion: Optional hint about the emotion expressed in the idiom
+            provide_explanation: Whether to include cultural explanation
+        """
+        early_result = self._check_languages(idiom, source_lang, target_lang)
+        if early_result is not None:
+            yield {"type": "result", **early_result}
+            return
+        
+        system_prompt = self._create_system_prompt(source_lang, target_lang, provide_explanation, emotion)
+        
+        for event in self.model_router.stream_response(
+            prompt=self._create_user_prompt(idiom, emotion),
+            system_prompt=system_prompt,
+            temperature=0.7,
+            max_tokens=500,
+            cache_site=TRANSLATION_CACHE_SITE
+        ):
+            if event["type"] == "token":
+                yield event
+            elif event["type"] == "done":
+                translation_result = self._parse_translation_response(
+                    event["content"], idiom, source_lang, target_lang, provide_explanation
+                )
+                yield {
+                    "type": "result",
+                    **translation_result,
+                    "time_to_first_token_ms": event.get("time_to_first_token_ms")
+                }
+            else:
+                yield {
+                    "type": "result",
+                    **self._translation_failed(
+                        event.get("error", "Unknown error"),
+                        idiom, source_lang, target_lang, provide_explanation
+                    )
+                }
+    
+    def translate_idioms(
+        self,
+        idioms: List[Any],
+        source_lang: str,
+        target_lang: str,
+        provide_explanation: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Translate several idioms with one AI request
+        
+        Idioms already in the completion cache (translated singly or in an
+        earlier batch) are answered from it; the rest are packed into one
+        numbered prompt per BATCH_MAX_IDIOMS with a JSON array output
+        schema. Each item of the reply is parsed like a single translation
+        and cached under the same key translate_idiom uses. Reply items are
+        matched by their "index" only; items missing from the reply (or not
+        matched) are translated singly; if the request itself fails,
+        every item gets translate_idiom's failure result.
+        
+        Args:
+            idioms: Idiom strings, or dicts with "idiom" and optional "emotion"
+            source_lang: Source language code (e.g., 'en', 'ar')
+            target_lang: Target language code (e.g., 'en', 'ar')
+            provide_explanation: Whether to include cultural explanation
+            
+        Returns:
+            One translate_idiom-style result per input, in order
+        """
+        items = [
+            (entry, None) if isinstance(entry, str) else (entry.get("idiom", ""), entry.get("emotion"))
+            for entry in idioms
+        ]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        
+        pending = []
+        for position, (idiom, emotion) in enumerate(items):
+            early_result = self._check_languages(idiom, source_lang, target_lang)
+            if early_result is not None:
+                results[position] = early_result
+                continue
+            cached = self.model_router.get_cached_completion(
+                **self._single_request(idiom, emotion, source_lang, target_lang, provide_explanation),
+                cache_site=TRANSLATION_CACHE_SITE
+            )
+            if cached is not None:
+                results[position] = self._parse_translation_response(
+                    cached["content"], idiom, source_lang, target_lang, provide_explanation
+                )
+            else:
+                pending.append(position)
+        
+        logger.info("Batch idiom translation: %d idioms, %d from cache", len(items), len(items) - len(pending))
+        
+        for start in range(0, len(pending), BATCH_MAX_IDIOMS):
+            chunk = pending[start:start + BATCH_MAX_IDIOMS]
+            translations, error = self._request_batch(
+                [items[position] for position in chunk], source_lang, target_lang, provide_explanation
+            )
+            for number, position in enumerate(chunk, start=1):
+                idiom, emotion = items[position]
+                if translations is None:
+                    results[position] = self._translation_failed(
+                        error, idiom, source_lang, target_lang, provide_explanation
+                    )
+                    continue
+                data = translations.get(number)
+                if data is None:
+                    results[position] = self.translate_idiom(idiom, source_lang, target_lang, emotion, provide_explanation)
+                    continue
+                content = json.dumps(data, ensure_ascii=False)
+                results[position] = self._parse_translation_response(
+                    content, idiom, source_lang, target_lang, provide_explanation
+                )
+                self.model_router.cache_completion(
+                    content,
+                    **self._single_request(idiom, emotion, source_lang, target_lang, provide_explanation),
+                    cache_site=TRANSLATION_CACHE_SITE,
+                    batched=True
+                )
+        
+        return results
+    
+    def _single_request(
+        self,
+        idiom: str,
+        emotion: Optional[str],
+        source_lang: str,
+        target_lang: str,
+        provide_explanation: bool
+    ) -> Dict[str, Any]:
+        """generate_response arguments translate_idiom uses for one idiom"""
+        return {
+            "prompt": self._create_user_prompt(idiom, emotion),
+            "system_prompt": self._create_system_prompt(source_lang, target_lang, provide_explanation, emotion),
+            "temperature": 0.7,
+            "max_tokens": 500
+        }
+    
+    def _request_batch(
+        self,
+        items: List[Tuple[str, Optional[str]]],
+        source_lang: str,
+        target_lang: str,
+        provide_explanation: bool
+    ) -> Tuple[Optional[Dict[int, Dict[str, Any]]], str]:
+        """
+        Ask for several translations in one request
+        
+        Returns:
+            (1-based item number -> translation fields for the items the reply
+            covered, or None if the request failed; the error message)
+        """
+        lines = []
+        for number, (idiom, emotion) in enumerate(items, start=1):
+            line = f"{number}. \"{idiom}\""
+            if emotion:
+                line += f" (emotion: {emotion})"
+            lines.append(line)
+        
+        response = self.model_router.generate_response(
+            prompt="Translate these emotional expressions or idioms:\n" + "\n".join(lines),
+            system_prompt=self._create_batch_system_prompt(source_lang, target_lang, provide_explanation),
+            temperature=0.7,
+            max_tokens=BATCH_TOKENS_PER_IDIOM * len(items),
+            cache_site=BATCH_CACHE_SITE,
+            # A reply that does not parse would be replayed on every retry
+            cache_if=lambda result: self._parse_batch_reply(result["content"], items) is not None
+        )
+        if not response["success"]:
+            error = response.get("error", "Unknown error")
+            logger.error("Batch idiom translation failed: %s", error)
+            return None, error
+        
+        translations = self._parse_batch_reply(response["content"], items)
+        if translations is None:
+            return {}, "Unparseable batch translation reply"
+        return translations, ""
+    
+    def _parse_batch_reply(
+        self,
+        response_text: str,
+        items: List[Tuple[str, Optional[str]]]
+    ) -> Optional[Dict[int, Dict[str, Any]]]:
+        """
+        Translation fields per 1-based item number from a batch reply, or None if it is not a JSON array
+        
+        Entries are matched by their integer "index" only, never by position,
+        so a skipped or reordered item cannot hand one idiom another's
+        translation; entries whose "original_idiom" names a different idiom
+        are dropped too.
+        """
+        try:
+            response_text = response_text.strip()
+            start_idx = response_text.find('[')
+            end_idx = response_text.rfind(']') + 1
+            entries = json.loads(response_text[start_idx:end_idx] if start_idx >= 0 and end_idx > start_idx else response_text)
+        except (json.JSONDecodeError, AttributeError) as e:
+            logger.warning("Failed to parse batch translation JSON from AI response: %s", str(e))
+            return None
+        if not isinstance(entries, list):
+            logger.warning("Batch translation reply is not a JSON array")
+            return None
+        
+        translations = {}
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            number = entry.pop("index", None)
+            if isinstance(number, str) and number.strip().isdigit():
+                number = int(number)
+            if not isinstance(number, int) or isinstance(number, bool) or not 1 <= number <= len(items):
+                continue
+            original = entry.get("original_idiom")
+            if isinstance(original, str) and original.strip().lower() != items[number - 1][0].strip().lower():
+                continue
+            if entry.get("translated_idiom"):
+                translations[number] = entry
+        return translations
+    
+    def _check_languages(self, idiom: str, source_lang: str, target_lang: str) -> Optional[Dict[str, Any]]:
+        """The result for unsupported or identical languages, or None if translation is needed"""
         # Validate languages
         if source_lang not in self.supported_languages:
             return {
@@ -84,78 +362,55 @@ class IdiomTranslator:
                 "target_language": target_lang,
                 "explanation": "No translation needed, languages are the same."
             }
-        
-        # Check cache to avoid unnecessary API calls
-        cache_key = f"{idiom}_{source_lang}_{target_lang}_{emotion}_{provide_explanation}"
-        if cache_key in self.idiom_cache:
-            logger.debug("Idiom translation found in cache: %s", idiom)
-            return self.idiom_cache[cache_key]
-        
-        # Create appropriate system prompt for the AI
-        system_prompt = self._create_system_prompt(source_lang, target_lang, provide_explanation, emotion)
-        
-        # Create user prompt with the idiom to translate
+        return None
+    
+    def _create_user_prompt(self, idiom: str, emotion: Optional[str]) -> str:
+        """Create the user prompt with the idiom to translate"""
         user_prompt = f"Translate this emotional expression or idiom: \"{idiom}\""
         if emotion:
             user_prompt += f"\nThe emotion expressed is: {emotion}"
+        return user_prompt
+    
+    def _translation_failed(
+        self,
+        error: str,
+        idiom: str,
+        source_lang: str,
+        target_lang: str,
+        provide_explanation: bool
+    ) -> Dict[str, Any]:
+        """Result when the AI request failed: mock data if available, otherwise the error"""
+        logger.error("Failed to translate idiom: %s", error)
         
-        # Request translation from AI model
-        response = self.model_router.generate_response(
-            prompt=user_prompt,
-            system_prompt=system_prompt,
-            temperature=0.7,
-            max_tokens=500
-        )
-        
-        # Check if AI response was successful
-        if not response["success"]:
-            logger.error("Failed to translate idiom: %s", response.get("error", "Unknown error"))
-            
-            # Try to use mock data if available
-            if MOCK_DATA_AVAILABLE and idiom in MOCK_TRANSLATIONS and target_lang in MOCK_TRANSLATIONS[idiom]:
-                logger.info("Using mock translation data for idiom: %s", idiom)
-                mock_data = MOCK_TRANSLATIONS[idiom][target_lang]
-                result = {
-                    "success": True,
-                    "original_idiom": idiom,
-                    "translated_idiom": mock_data["translated_idiom"],
-                    "source_language": source_lang,
-                    "target_language": target_lang,
-                    "emotional_meaning": mock_data["emotional_meaning"],
-                    "note": "This translation is from cached example data (API unavailable)"
-                }
-                
-                if "literal_meaning" in mock_data:
-                    result["literal_meaning"] = mock_data["literal_meaning"]
-                
-                if provide_explanation and "cultural_context" in mock_data:
-                    result["cultural_context"] = mock_data["cultural_context"]
-                
-                # Add to cache
-                self.idiom_cache[cache_key] = result
-                return result
-            
-            return {
-                "success": False,
-                "error": f"Failed to translate idiom: {response.get('error', 'Unknown error')}",
+        # Try to use mock data if available
+        if MOCK_DATA_AVAILABLE and idiom in MOCK_TRANSLATIONS and target_lang in MOCK_TRANSLATIONS[idiom]:
+            logger.info("Using mock translation data for idiom: %s", idiom)
+            mock_data = MOCK_TRANSLATIONS[idiom][target_lang]
+            result = {
+                "success": True,
                 "original_idiom": idiom,
+                "translated_idiom": mock_data["translated_idiom"],
                 "source_language": source_lang,
-                "target_language": target_lang
+                "target_language": target_lang,
+                "emotional_meaning": mock_data["emotional_meaning"],
+                "note": "This translation is from cached example data (API unavailable)"
             }
+            
+            if "literal_meaning" in mock_data:
+                result["literal_meaning"] = mock_data["literal_meaning"]
+            
+            if provide_explanation and "cultural_context" in mock_data:
+                result["cultural_context"] = mock_data["cultural_context"]
+            
+            return result
         
-        # Parse AI response to extract translation and explanation
-        translation_result = self._parse_translation_response(
-            response["content"], 
-            idiom, 
-            source_lang, 
-            target_lang,
-            provide_explanation
-        )
-        
-        # Add to cache
-        self.idiom_cache[cache_key] = translation_result
-        
-        return translation_result
+        return {
+            "success": False,
+            "error": f"Failed to translate idiom: {error}",
+            "original_idiom": idiom,
+            "source_language": source_lang,
+            "target_language": target_lang
+        }
     
     def _create_system_prompt(
         self, 
@@ -206,6 +461,33 @@ literal translations. Respond in JSON format with the following structure:
         
         return system_prompt
     
+    def _create_batch_system_prompt(self, source_lang: str, target_lang: str, provide_explanation: bool) -> str:
+        """System prompt for translating a numbered list of idioms in one request"""
+        lang_names = {
+            'en': 'English',
+            'ar': 'Arabic'
+        }
+        source_name = lang_names.get(source_lang, source_lang)
+        target_name = lang_names.get(target_lang, target_lang)
+        
+        fields = f'''    "index": 1,
+    "translated_idiom": "The translated idiom in {target_name}",
+    "literal_meaning": "Literal word-for-word translation (optional)",
+    "emotional_meaning": "The emotional meaning of the idiom"'''
+        if provide_explanation:
+            fields += ',\n    "cultural_context": "Brief explanation of the cultural context or origin"'
+        
+        return f"""You are an expert multilingual translator specializing in emotional expressions and idioms.
+Your task is to translate a numbered list of emotional idioms from {source_name} to {target_name} while preserving 
+their cultural and emotional meaning. Focus on finding equivalent emotional expressions in the target language 
+rather than literal translations. Respond with only a JSON array containing one object per idiom, in the same 
+order, where "index" is the idiom's number in the list:
+[
+  {{
+{fields}
+  }}
+]"""
+    
     def _parse_translation_response(
         self, 
         ai_response: str, 
@@ -320,7 +602,8 @@ Respond with a JSON array using the following structure:
                    (f" for the emotion: {emotion}" if emotion else ""),
             system_prompt=system_prompt,
             temperature=0.7,
-            max_tokens=800
+            max_tokens=800,
+            cache_site=COMMON_IDIOMS_CACHE_SITE
         )
         
         # Handle API errors
@@ -0,0 +1,364 @@
+"""
+Running aggregates over the interaction and performance logs.
+
+The admin statistics (emotion/action counts, per-operation durations) used
+to be computed by scanning every log record on each request. LogAggregates
+keeps them in memory instead: log_manager updates it as records are
+written, and it is checkpointed to a JSON file together with the position
+(last timestamp) it covers, so after a restart only newer records are
+replayed from the log streams.
+
+The aggregates are all-time totals: segment retention in log_manager
+(MAX_SEGMENTS_PER_STREAM) deletes old records but does not subtract them
+here, so the aggregates can cover more history than a time-windowed scan
+of the streams. Only clear() resets them.
+
+Durations go into a DurationHistogram: logarithmic buckets with a bounded
+relative error (the DDSketch scheme), which gives p50/p95/p99 from a few
+hundred counters regardless of how many operations were logged.
+"""
+import os
+import json
+import math
+import time
+import logging
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+DEFAULT_CHECKPOINT_INTERVAL = 60.0
+
+PERCENTILES = (50, 95, 99)
+
+# Durations below this are counted as zero
+MIN_INDEXABLE_DURATION = 1e-6
+
+
+class DurationHistogram:
+    """Logarithmically bucketed histogram; quantiles are within relative_accuracy of the true value"""
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if value < MIN_INDEXABLE_DURATION:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def quantile(self, q: float) -> float:
+        """Estimated value at quantile q (0..1, nearest rank); 0 for an empty histogram"""
+        if self.count == 0:
+            return 0.0
+        rank = max(0, math.ceil(q * self.count) - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "zero_count": self.zero_count,
+            "buckets": {str(index): count for index, count in self.buckets.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DurationHistogram":
+        histogram = cls(data.get("relative_accuracy", DEFAULT_RELATIVE_ACCURACY))
+        histogram.zero_count = data.get("zero_count", 0)
+        histogram.buckets = {int(index): count for index, count in data.get("buckets", {}).items()}
+        histogram.count = histogram.zero_count + sum(histogram.buckets.values())
+        return histogram
+
+
+class OperationStats:
+    """Count, total, min/max, success/error counts and duration histogram for one operation"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_duration_ms = 0.0
+        self.min_duration_ms: Optional[float] = None
+        self.max_duration_ms = 0.0
+        self.success_count = 0
+        self.error_count = 0
+        self.histogram = DurationHistogram()
+
+    def add(self, duration_ms: float, status: str) -> None:
+        self.count += 1
+        self.total_duration_ms += duration_ms
+        self.min_duration_ms = duration_ms if self.min_duration_ms is None else min(self.min_duration_ms, duration_ms)
+        self.max_duration_ms = max(self.max_duration_ms, duration_ms)
+        if status == "success":
+            self.success_count += 1
+        else:
+            self.error_count += 1
+        self.histogram.add(duration_ms)
+
+    def percentiles(self) -> Dict[str, float]:
+        """p50/p95/p99 durations, clamped to the observed min/max"""
+        result = {}
+        for percentile in PERCENTILES:
+            value = self.histogram.quantile(percentile / 100)
+            if self.count:
+                value = min(max(value, self.min_duration_ms), self.max_duration_ms)
+            result[f"p{percentile}_duration_ms"] = value
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_duration_ms": self.total_duration_ms,
+            "min_duration_ms": self.min_duration_ms,
+            "max_duration_ms": self.max_duration_ms,
+            "success_count": self.success_count,
+            "error_count": self.error_count,
+            "histogram": self.histogram.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "OperationStats":
+        stats = cls()
+        stats.count = data.get("count", 0)
+        stats.total_duration_ms = data.get("total_duration_ms", 0.0)
+        stats.min_duration_ms = data.get("min_duration_ms")
+        stats.max_duration_ms = data.get("max_duration_ms", 0.0)
+        stats.success_count = data.get("success_count", 0)
+        stats.error_count = data.get("error_count", 0)
+        stats.histogram = DurationHistogram.from_dict(data.get("histogram", {}))
+        return stats
+
+
+class PerformanceStats:
+    """Per-operation and overall OperationStats, summarized in the get_performance_statistics format"""
+
+    def __init__(self):
+        self.operations: Dict[str, OperationStats] = {}
+        self.overall = OperationStats()
+
+    def add(self, operation: str, duration_ms: float, status: str) -> None:
+        if operation not in self.operations:
+            self.operations[operation] = OperationStats()
+        self.operations[operation].add(duration_ms, status)
+        self.overall.add(duration_ms, status)
+
+    def summary(self, operation_filter: Optional[str] = None) -> Dict[str, Any]:
+        """Statistics for all operations, or only operation_filter"""
+        if operation_filter:
+            operations = {operation_filter: self.operations[operation_filter]} \
+                if operation_filter in self.operations else {}
+            overall = operations.get(operation_filter, OperationStats())
+        else:
+            operations, overall = self.operations, self.overall
+
+        stats = {"operations": {}, "overall": _averages(overall)}
+        stats["overall"].update({
+            "total_operations": overall.count,
+            "success_rate": overall.success_count / overall.count if overall.count else 0,
+            "error_rate": overall.error_count / overall.count if overall.count else 0,
+        })
+        for operation, op_stats in operations.items():
+            stats["operations"][operation] = dict(
+                count=op_stats.count,
+                success_count=op_stats.success_count,
+                error_count=op_stats.error_count,
+                **_averages(op_stats)
+            )
+        return stats
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "operations": {operation: stats.to_dict() for operation, stats in self.operations.items()},
+            "overall": self.overall.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PerformanceStats":
+        stats = cls()
+        stats.operations = {
+            operation: OperationStats.from_dict(op_data) for operation, op_data in data.get("operations", {}).items()
+        }
+        stats.overall = OperationStats.from_dict(data.get("overall", {}))
+        return stats
+
+
+def _averages(stats: OperationStats) -> Dict[str, float]:
+    result = {
+        "avg_duration_ms": stats.total_duration_ms / stats.count if stats.count else 0,
+        "min_duration_ms": stats.min_duration_ms or 0,
+        "max_duration_ms": stats.max_duration_ms,
+    }
+    result.update(stats.percentiles())
+    return result
+
+
+class LogAggregates:
+    """All-time emotion/action counters and performance statistics kept up to date as logs are written"""
+
+    def __init__(self, checkpoint_path: str, checkpoint_interval: float = DEFAULT_CHECKPOINT_INTERVAL):
+        """
+        Args:
+            checkpoint_path: JSON file the aggregates are saved to
+            checkpoint_interval: Seconds between checkpoints while records are being added
+        """
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self._lock = threading.Lock()
+        self._last_checkpoint = time.monotonic()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.emotions: Dict[str, int] = {}
+        self.actions: Dict[str, int] = {}
+        self.performance = PerformanceStats()
+        # stream -> [last timestamp covered, records seen with that timestamp]
+        self.positions: Dict[str, list] = {}
+        self._dirty = False
+
+    # Updating
+
+    def add_interaction(self, stream: str, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._add_interaction(record)
+            self._advance(stream, record)
+        self._maybe_checkpoint()
+
+    def add_performance(self, stream: str, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._add_performance(record)
+            self._advance(stream, record)
+        self._maybe_checkpoint()
+
+    def replay(self, stream: str, records: Iterable[Dict[str, Any]], kind: str) -> int:
+        """
+        Add the records of `stream` not covered yet (records must be in log order)
+
+        Args:
+            stream: Stream name the records come from
+            records: Records read from the stream, from the covered position on
+            kind: "interaction" or "performance"
+
+        Returns:
+            Number of records added
+        """
+        add = self._add_interaction if kind == "interaction" else self._add_performance
+        added = 0
+        with self._lock:
+            last_timestamp, seen_at_last = self.positions.get(stream, [None, 0])
+            skipped_at_last = 0
+            for record in records:
+                timestamp = record.get("timestamp", "")
+                if last_timestamp is not None:
+                    if timestamp < last_timestamp:
+                        continue
+                    if timestamp == last_timestamp and skipped_at_last < seen_at_last:
+                        skipped_at_last += 1
+                        continue
+                add(record)
+                self._advance(stream, record)
+                added += 1
+        return added
+
+    def position(self, stream: str) -> Optional[str]:
+        """Last timestamp covered for a stream"""
+        with self._lock:
+            return self.positions.get(stream, [None, 0])[0]
+
+    def _add_interaction(self, record: Dict[str, Any]) -> None:
+        emotion, action = record.get("emotion"), record.get("action")
+        self.emotions[emotion] = self.emotions.get(emotion, 0) + 1
+        self.actions[action] = self.actions.get(action, 0) + 1
+
+    def _add_performance(self, record: Dict[str, Any]) -> None:
+        self.performance.add(record.get("operation"), float(record.get("duration_ms") or 0), record.get("status"))
+
+    def _advance(self, stream: str, record: Dict[str, Any]) -> None:
+        timestamp = record.get("timestamp", "")
+        position = self.positions.setdefault(stream, [None, 0])
+        if position[0] is None or timestamp > position[0]:
+            position[0], position[1] = timestamp, 1
+        elif timestamp == position[0]:
+            position[1] += 1
+        self._dirty = True
+
+    # Reading
+
+    def emotion_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.emotions)
+
+    def action_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.actions)
+
+    def performance_statistics(self, operation_filter: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            return self.performance.summary(operation_filter)
+
+    # Persistence
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+            self._dirty = True
+        self.checkpoint()
+
+    def load(self) -> bool:
+        """Load the last checkpoint; False if there is none"""
+        if not os.path.exists(self.checkpoint_path):
+            return False
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            with self._lock:
+                self.emotions = data.get("emotions", {})
+                self.actions = data.get("actions", {})
+                self.performance = PerformanceStats.from_dict(data.get("performance", {}))
+                self.positions = data.get("positions", {})
+                self._dirty = False
+            return True
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable log aggregates checkpoint: {str(e)}")
+            with self._lock:
+                self._reset()
+            return False
+
+    def checkpoint(self) -> None:
+        """Write the aggregates to checkpoint_path (atomically replaced) if they changed"""
+        with self._lock:
+            self._last_checkpoint = time.monotonic()
+            if not self._dirty:
+                return
+            data = {
+                "emotions": self.emotions,
+                "actions": self.actions,
+                "performance": self.performance.to_dict(),
+                "positions": self.positions,
+            }
+            self._dirty = False
+            temp_path = f"{self.checkpoint_path}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.checkpoint_path) or ".", exist_ok=True)
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(temp_path, self.checkpoint_path)
+            except OSError as e:
+                self._dirty = True
+                logger.error(f"Error writing log aggregates checkpoint: {str(e)}")
+
+    def _maybe_checkpoint(self) -> None:
+        if time.monotonic() - self._last_checkpoint >= self.checkpoint_interval:
+            self.checkpoint()
@@ -8,95 +8,201 @@ Enhanced for Phase 2 with additional features:
 - Custom event logging
 - Performance monitoring 
 - Structured logging with JSON support
+
+Each log is an append-only stream of rotated JSONL segments with a
+per-segment time index (see log_segments.py), so logging an entry is a
+single line append and time-filtered statistics only open the segments
+inside the requested window. Emotion/action counts and whole-log
+performance statistics come from running aggregates (see log_aggregates.py)
+updated as entries are logged. Those are all-time figures: they still count
+records whose segments retention has since deleted, which windowed queries
+no longer see.
 """
 import csv
 import os
 import json
+import atexit
 import logging
+import threading
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
+from log_aggregates import LogAggregates, PerformanceStats
+from log_segments import SegmentedLog
+
 logger = logging.getLogger(__name__)
 
 # Constants
 LOG_DIR = 'logs'
+
+# Log streams, each stored under LOG_DIR/<stream>/
+INTERACTION_STREAM = 'interactions'
+SESSION_STREAM = 'sessions'
+PERFORMANCE_STREAM = 'performance'
+EVENT_STREAM = 'events'
+USER_JOURNEY_STREAM = 'user_journey'
+LOG_STREAMS = [INTERACTION_STREAM, SESSION_STREAM, PERFORMANCE_STREAM, EVENT_STREAM, USER_JOURNEY_STREAM]
+
+# Segment rotation and retention
+SEGMENT_MAX_BYTES = 4 * 1024 * 1024
+SEGMENT_MAX_AGE_SECONDS = 24 * 3600
+MAX_SEGMENTS_PER_STREAM = 100
+
+# Running aggregates checkpoint (under LOG_DIR)
+AGGREGATES_FILENAME = 'aggregates.json'
+AGGREGATE_CHECKPOINT_SECONDS = 60
+
+# Pre-segment log files, imported into their streams once by init_logs()
 INTERACTION_LOG_FILE = os.path.join(LOG_DIR, 'interaction_log.csv')
 SESSION_LOG_FILE = os.path.join(LOG_DIR, 'session_log.csv')
 PERFORMANCE_LOG_FILE = os.path.join(LOG_DIR, 'performance_log.csv')
 EVENT_LOG_FILE = os.path.join(LOG_DIR, 'event_log.json')
 USER_JOURNEY_LOG_FILE = os.path.join(LOG_DIR, 'user_journey_log.csv')
 
+INTERACTION_FIELDS = ['timestamp', 'user_input', 'emotion', 'action', 'params', 'language']
+SESSION_FIELDS = ['session_id', 'user_id', 'start_time', 'end_time', 'duration_seconds',
+                  'interaction_count', 'platform', 'browser', 'language']
+PERFORMANCE_FIELDS = ['timestamp', 'operation', 'duration_ms', 'status', 'error_message',
+                      'memory_usage_mb', 'cpu_usage_percent']
+USER_JOURNEY_FIELDS = ['timestamp', 'user_id', 'session_id', 'journey_step', 'previous_step',
+                       'next_step', 'step_duration_ms', 'user_feedback']
+
+_streams: Dict[str, SegmentedLog] = {}
+_streams_lock = threading.Lock()
+
+_aggregates: Dict[str, LogAggregates] = {}
+_aggregates_lock = threading.Lock()
+
+
+def get_log_stream(name: str) -> SegmentedLog:
+    """Get (opening on first use) the segmented log for a stream under LOG_DIR"""
+    directory = os.path.join(LOG_DIR, name)
+    with _streams_lock:
+        stream = _streams.get(directory)
+        if stream is None:
+            if not _streams:
+                atexit.register(close_logs)
+            stream = SegmentedLog(
+                directory,
+                name,
+                max_bytes=SEGMENT_MAX_BYTES,
+                max_age_seconds=SEGMENT_MAX_AGE_SECONDS,
+                max_segments=MAX_SEGMENTS_PER_STREAM
+            )
+            _streams[directory] = stream
+        return stream
+
+
+def get_log_aggregates() -> LogAggregates:
+    """
+    Get the running aggregates for LOG_DIR
+    
+    On first use the last checkpoint is loaded and the interaction and
+    performance records logged after it are replayed.
+    """
+    with _aggregates_lock:
+        aggregates = _aggregates.get(LOG_DIR)
+        if aggregates is None:
+            aggregates = LogAggregates(
+                os.path.join(LOG_DIR, AGGREGATES_FILENAME),
+                checkpoint_interval=AGGREGATE_CHECKPOINT_SECONDS
+            )
+            aggregates.load()
+            replayed = 0
+            for name, kind in ((INTERACTION_STREAM, 'interaction'), (PERFORMANCE_STREAM, 'performance')):
+                position = aggregates.position(name)
+                start = datetime.fromisoformat(position) if position else None
+                replayed += aggregates.replay(name, get_log_stream(name).read(start), kind)
+            if replayed:
+                logger.info(f"Replayed {replayed} log records into the running aggregates")
+                aggregates.checkpoint()
+            _aggregates[LOG_DIR] = aggregates
+        return aggregates
+
+
+def _discard_log_aggregates():
+    """Drop the aggregates and their checkpoint so they are rebuilt from the streams"""
+    with _aggregates_lock:
+        _aggregates.pop(LOG_DIR, None)
+        path = os.path.join(LOG_DIR, AGGREGATES_FILENAME)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def close_logs():
+    """Close the active segment of every open stream and checkpoint the aggregates"""
+    with _streams_lock:
+        for stream in _streams.values():
+            stream.close()
+    with _aggregates_lock:
+        for aggregates in _aggregates.values():
+            aggregates.checkpoint()
+
+
+def _legacy_path(filename: str) -> str:
+    return os.path.join(LOG_DIR, os.path.basename(filename))
+
+
+def _import_legacy_logs():
+    """Move records from the old CSV / JSON log files into their streams (once)"""
+    legacy_csv = [
+        (INTERACTION_LOG_FILE, INTERACTION_STREAM, INTERACTION_FIELDS, 'timestamp'),
+        (SESSION_LOG_FILE, SESSION_STREAM, SESSION_FIELDS, 'start_time'),
+        (PERFORMANCE_LOG_FILE, PERFORMANCE_STREAM, PERFORMANCE_FIELDS, 'timestamp'),
+        (USER_JOURNEY_LOG_FILE, USER_JOURNEY_STREAM, USER_JOURNEY_FIELDS, 'timestamp'),
+    ]
+    imported_streams = set()
+    for filename, stream_name, fields, time_field in legacy_csv:
+        path = _legacy_path(filename)
+        if not os.path.exists(path):
+            continue
+        stream = get_log_stream(stream_name)
+        imported = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader, None)  # Skip header row
+            for row in reader:
+                record = dict(zip(fields, row))
+                if not record.get(time_field):
+                    continue
+                record.setdefault('timestamp', record[time_field])
+                stream.append(record)
+                imported += 1
+        os.replace(path, f"{path}.imported")
+        imported_streams.add(stream_name)
+        logger.info(f"Imported {imported} records from {path} into the {stream_name} log")
+
+    path = _legacy_path(EVENT_LOG_FILE)
+    if os.path.exists(path):
+        stream = get_log_stream(EVENT_STREAM)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                events = json.load(f)
+        except json.JSONDecodeError:
+            events = []
+        for event in events:
+            if isinstance(event, dict) and event.get('timestamp'):
+                stream.append(event)
+        os.replace(path, f"{path}.imported")
+        logger.info(f"Imported {len(events)} events from {path} into the {EVENT_STREAM} log")
+
+    # Imported records predate the aggregates' position, so rebuild them
+    if imported_streams & {INTERACTION_STREAM, PERFORMANCE_STREAM}:
+        _discard_log_aggregates()
+
 def init_logs():
     """
     Initialize the enhanced logging system for Phase 2
-    Creates the logs directory and all log files if they don't exist
+    Creates the log stream directories and imports any pre-segment log files
     """
     try:
         # Ensure logs directory exists
         os.makedirs(LOG_DIR, exist_ok=True)
         
-        # Create interaction log file with headers if it doesn't exist
-        if not os.path.exists(INTERACTION_LOG_FILE):
-            with open(INTERACTION_LOG_FILE, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    'timestamp', 
-                    'user_input', 
-                    'emotion', 
-                    'action', 
-                    'params',
-                    'language'
-                ])
-        
-        # Create session log file with headers if it doesn't exist
-        if not os.path.exists(SESSION_LOG_FILE):
-            with open(SESSION_LOG_FILE, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    'session_id',
-                    'user_id',
-                    'start_time',
-                    'end_time',
-                    'duration_seconds',
-                    'interaction_count',
-                    'platform',
-                    'browser',
-                    'language'
-                ])
-        
-        # Create performance log file with headers if it doesn't exist
-        if not os.path.exists(PERFORMANCE_LOG_FILE):
-            with open(PERFORMANCE_LOG_FILE, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    'timestamp',
-                    'operation',
-                    'duration_ms',
-                    'status',
-                    'error_message',
-                    'memory_usage_mb',
-                    'cpu_usage_percent'
-                ])
-        
-        # Create event log file with empty array if it doesn't exist
-        if not os.path.exists(EVENT_LOG_FILE):
-            with open(EVENT_LOG_FILE, 'w', encoding='utf-8') as f:
-                json.dump([], f)
-        
-        # Create user journey log file with headers if it doesn't exist
-        if not os.path.exists(USER_JOURNEY_LOG_FILE):
-            with open(USER_JOURNEY_LOG_FILE, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    'timestamp',
-                    'user_id',
-                    'session_id',
-                    'journey_step',
-                    'previous_step',
-                    'next_step',
-                    'step_duration_ms',
-                    'user_feedback'
-                ])
+        for name in LOG_STREAMS:
+            get_log_stream(name)
+        
+        _import_legacy_logs()
         
         logger.info("Enhanced logging system (Phase 2) initialized successfully")
         return True
@@ -116,23 +222,21 @@ def log_interaction(user_input: str, emotion: str, action: str, params: Dict[str
         language: The language of the interaction ('en' or 'ar')
     """
     try:
-        # Ensure logs directory exists
-        os.makedirs(LOG_DIR, exist_ok=True)
-        
         # Convert params to JSON string
         params_str = json.dumps(params) if isinstance(params, dict) else str(params)
         
-        # Write to CSV log
-        with open(INTERACTION_LOG_FILE, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                datetime.utcnow().isoformat(),
-                user_input,
-                emotion,
-                action,
-                params_str,
-                language
-            ])
+        # Load the aggregates before appending so the record isn't replayed into them
+        aggregates = get_log_aggregates()
+        record = {
+            'timestamp': datetime.utcnow().isoformat(),
+            'user_input': user_input,
+            'emotion': emotion,
+            'action': action,
+            'params': params_str,
+            'language': language
+        }
+        get_log_stream(INTERACTION_STREAM).append(record)
+        aggregates.add_interaction(INTERACTION_STREAM, record)
         
         logger.debug(f"Logged interaction: emotion={emotion}, action={action}, lang={language}")
         return True
@@ -151,29 +255,18 @@ def get_recent_interactions(limit: int = 100) -> List[Dict[str, Any]]:
         List of interaction records as dictionaries
     """
     try:
-        if not os.path.exists(INTERACTION_LOG_FILE):
-            return []
-        
-        interactions = []
-        with open(INTERACTION_LOG_FILE, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            headers = next(reader)  # Skip header row
-            
-            # Read rows and convert to dictionaries
-            for row in reader:
-                if len(row) >= 5:  # Ensure row has minimum expected columns
-                    interaction = {
-                        'timestamp': row[0],
-                        'user_input': row[1],
-                        'emotion': row[2],
-                        'action': row[3],
-                        'params': row[4],
-                        'language': row[5] if len(row) >= 6 else 'en'  # Default to 'en' if language not present
-                    }
-                    interactions.append(interaction)
-        
-        # Return the most recent interactions first, up to the limit
-        return interactions[-limit:][::-1] if interactions else []
+        # Only the newest segments are read
+        return [
+            {
+                'timestamp': record.get('timestamp'),
+                'user_input': record.get('user_input'),
+                'emotion': record.get('emotion'),
+                'action': record.get('action'),
+                'params': record.get('params'),
+                'language': record.get('language') or 'en'  # Default to 'en' if language not present
+            }
+            for record in get_log_stream(INTERACTION_STREAM).tail(limit)
+        ]
     except Exception as e:
         logger.error(f"Error getting recent interactions: {str(e)}")
         return []
@@ -183,23 +276,11 @@ def get_emotion_statistics() -> Dict[str, int]:
     Get statistics on emotions from the interaction log
     
     Returns:
-        Dictionary with emotion counts
+        Dictionary with all-time emotion counts (including records in
+        segments already deleted by retention)
     """
     try:
-        if not os.path.exists(INTERACTION_LOG_FILE):
-            return {}
-        
-        emotion_counts = {}
-        with open(INTERACTION_LOG_FILE, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            next(reader)  # Skip header row
-            
-            for row in reader:
-                if len(row) >= 3:  # Ensure row has emotion column
-                    emotion = row[2]
-                    emotion_counts[emotion] = emotion_counts.get(emotion, 0) + 1
-        
-        return emotion_counts
+        return get_log_aggregates().emotion_counts()
     except Exception as e:
         logger.error(f"Error getting emotion statistics: {str(e)}")
         return {}
@@ -209,23 +290,11 @@ def get_action_statistics() -> Dict[str, int]:
     Get statistics on actions from the interaction log
     
     Returns:
-        Dictionary with action counts
+        Dictionary with all-time action counts (including records in
+        segments already deleted by retention)
     """
     try:
-        if not os.path.exists(INTERACTION_LOG_FILE):
-            return {}
-        
-        action_counts = {}
-        with open(INTERACTION_LOG_FILE, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            next(reader)  # Skip header row
-            
-            for row in reader:
-                if len(row) >= 4:  # Ensure row has action column
-                    action = row[3]
-                    action_counts[action] = action_counts.get(action, 0) + 1
-        
-        return action_counts
+        return get_log_aggregates().action_counts()
     except Exception as e:
         logger.error(f"Error getting action statistics: {str(e)}")
         return {}
@@ -250,28 +319,23 @@ def log_session(session_id: str, user_id: str, start_time: datetime, end_time: O
         True if successful, False otherwise
     """
     try:
-        # Ensure logs directory exists
-        os.makedirs(LOG_DIR, exist_ok=True)
-        
         # Calculate duration if end_time is provided
         duration_seconds = None
         if end_time:
             duration_seconds = (end_time - start_time).total_seconds()
         
-        # Write to CSV log
-        with open(SESSION_LOG_FILE, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                session_id,
-                user_id,
-                start_time.isoformat(),
-                end_time.isoformat() if end_time else "",
-                duration_seconds if duration_seconds is not None else "",
-                interaction_count,
-                platform,
-                browser,
-                language
-            ])
+        get_log_stream(SESSION_STREAM).append({
+            'timestamp': datetime.utcnow().isoformat(),
+            'session_id': session_id,
+            'user_id': user_id,
+            'start_time': start_time.isoformat(),
+            'end_time': end_time.isoformat() if end_time else "",
+            'duration_seconds': duration_seconds if duration_seconds is not None else "",
+            'interaction_count': interaction_count,
+            'platform': platform,
+            'browser': browser,
+            'language': language
+        })
         
         logger.debug(f"Logged session: id={session_id}, user={user_id}, interactions={interaction_count}")
         return True
@@ -297,9 +361,6 @@ def log_performance(operation: str, duration_ms: float, status: str = "success",
         True if successful, False otherwise
     """
     try:
-        # Ensure logs directory exists
-        os.makedirs(LOG_DIR, exist_ok=True)
-        
         # Get memory and CPU usage if not provided
         if memory_usage_mb is None or cpu_usage_percent is None:
             try:
@@ -316,18 +377,18 @@ def log_performance(operation: str, duration_ms: float, status: str = "success",
                 if cpu_usage_percent is None:
                     cpu_usage_percent = ""
         
-        # Write to CSV log
-        with open(PERFORMANCE_LOG_FILE, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                datetime.utcnow().isoformat(),
-                operation,
-                duration_ms,
-                status,
-                error_message,
-                memory_usage_mb,
-                cpu_usage_percent
-            ])
+        aggregates = get_log_aggregates()
+        record = {
+            'timestamp': datetime.utcnow().isoformat(),
+            'operation': operation,
+            'duration_ms': duration_ms,
+            'status': status,
+            'error_message': error_message,
+            'memory_usage_mb': memory_usage_mb,
+            'cpu_usage_percent': cpu_usage_percent
+        }
+        get_log_stream(PERFORMANCE_STREAM).append(record)
+        aggregates.add_performance(PERFORMANCE_STREAM, record)
         
         logger.debug(f"Logged performance: operation={operation}, duration={duration_ms}ms, status={status}")
         return True
@@ -350,19 +411,6 @@ def log_event(event_type: str, data: Dict[str, Any], user_id: Optional[str] = No
         True if successful, False otherwise
     """
     try:
-        # Ensure logs directory exists
-        os.makedirs(LOG_DIR, exist_ok=True)
-        
-        # Read existing events
-        events = []
-        if os.path.exists(EVENT_LOG_FILE):
-            with open(EVENT_LOG_FILE, 'r', encoding='utf-8') as f:
-                try:
-                    events = json.load(f)
-                except json.JSONDecodeError:
-                    # File is empty or invalid, start with empty list
-                    events = []
-        
         # Create new event
         event = {
             "timestamp": datetime.utcnow().isoformat(),
@@ -375,12 +423,8 @@ def log_event(event_type: str, data: Dict[str, Any], user_id: Optional[str] = No
         if session_id:
             event["session_id"] = session_id
         
-        # Add to events list
-        events.append(event)
-        
-        # Write back to file
-        with open(EVENT_LOG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(events, f, indent=2)
+        # Append to the event log
+        get_log_stream(EVENT_STREAM).append(event)
         
         logger.debug(f"Logged event: type={event_type}, user={user_id}, session={session_id}")
         return True
@@ -408,22 +452,16 @@ def log_user_journey(user_id: str, session_id: str, journey_step: str,
         True if successful, False otherwise
     """
     try:
-        # Ensure logs directory exists
-        os.makedirs(LOG_DIR, exist_ok=True)
-        
-        # Write to CSV log
-        with open(USER_JOURNEY_LOG_FILE, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                datetime.utcnow().isoformat(),
-                user_id,
-                session_id,
-                journey_step,
-                previous_step or "",
-                next_step or "",
-                step_duration_ms or "",
-                user_feedback or ""
-            ])
+        get_log_stream(USER_JOURNEY_STREAM).append({
+            'timestamp': datetime.utcnow().isoformat(),
+            'user_id': user_id,
+            'session_id': session_id,
+            'journey_step': journey_step,
+            'previous_step': previous_step or "",
+            'next_step': next_step or "",
+            'step_duration_ms': step_duration_ms or "",
+            'user_feedback': user_feedback or ""
+        })
         
         logger.debug(f"Logged user journey: user={user_id}, step={journey_step}")
         return True
@@ -442,111 +480,31 @@ def get_performance_statistics(start_time: Optional[datetime] = None,
         end_time: Optional end time filter
         operation_filter: Optional operation name filter
         
+    Without start_time/end_time the statistics are all-time (from the running
+    aggregates, including records in segments already deleted by retention);
+    with a window they cover only the records still in the log.
+    
     Returns:
-        Dictionary with performance statistics
+        Dictionary with performance statistics, including p50/p95/p99 durations
     """
     try:
-        if not os.path.exists(PERFORMANCE_LOG_FILE):
+        stream = get_log_stream(PERFORMANCE_STREAM)
+        if not stream.segments():
             return {}
         
-        stats = {
-            "operations": {},
-            "overall": {
-                "avg_duration_ms": 0,
-                "min_duration_ms": float('inf'),
-                "max_duration_ms": 0,
-                "total_operations": 0,
-                "success_rate": 0,
-                "error_rate": 0
-            }
-        }
+        # All-time statistics come straight from the running aggregates
+        if start_time is None and end_time is None:
+            return get_log_aggregates().performance_statistics(operation_filter)
         
-        total_duration = 0
-        success_count = 0
-        error_count = 0
+        # Only segments overlapping [start_time, end_time] are opened
+        stats = PerformanceStats()
+        for record in stream.read(start_time, end_time):
+            operation = record.get('operation')
+            if operation_filter and operation != operation_filter:
+                continue
+            stats.add(operation, float(record.get('duration_ms') or 0), record.get('status'))
         
-        with open(PERFORMANCE_LOG_FILE, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            headers = next(reader)  # Skip header row
-            
-            for row in reader:
-                if len(row) < 7:  # Ensure row has all columns
-                    continue
-                
-                timestamp_str = row[0]
-                operation = row[1]
-                duration_ms = float(row[2]) if row[2] else 0
-                status = row[3]
-                
-                # Parse timestamp
-                timestamp = datetime.fromisoformat(timestamp_str)
-                
-                # Apply filters
-                if start_time and timestamp < start_time:
-                    continue
-                if end_time and timestamp > end_time:
-                    continue
-                if operation_filter and operation != operation_filter:
-                    continue
-                
-                # Update overall stats
-                total_duration += duration_ms
-                stats["overall"]["total_operations"] += 1
-                stats["overall"]["min_duration_ms"] = min(stats["overall"]["min_duration_ms"], duration_ms)
-                stats["overall"]["max_duration_ms"] = max(stats["overall"]["max_duration_ms"], duration_ms)
-                
-                if status == "success":
-                    success_count += 1
-                else:
-                    error_count += 1
-                
-                # Update operation-specific stats
-                if operation not in stats["operations"]:
-                    stats["operations"][operation] = {
-                        "count": 0,
-                        "avg_duration_ms": 0,
-                        "min_duration_ms": float('inf'),
-                        "max_duration_ms": 0,
-                        "success_count": 0,
-                        "error_count": 0
-                    }
-                
-                op_stats = stats["operations"][operation]
-                op_stats["count"] += 1
-                op_stats["total_duration_ms"] = op_stats.get("total_duration_ms", 0) + duration_ms
-                op_stats["min_duration_ms"] = min(op_stats["min_duration_ms"], duration_ms)
-                op_stats["max_duration_ms"] = max(op_stats["max_duration_ms"], duration_ms)
-                
-                if status == "success":
-                    op_stats["success_count"] += 1
-                else:
-                    op_stats["error_count"] += 1
-        
-        # Calculate averages and rates
-        total_operations = stats["overall"]["total_operations"]
-        if total_operations > 0:
-            stats["overall"]["avg_duration_ms"] = total_duration / total_operations
-            stats["overall"]["success_rate"] = success_count / total_operations
-            stats["overall"]["error_rate"] = error_count / total_operations
-            
-            # Handle edge case for min duration
-            if stats["overall"]["min_duration_ms"] == float('inf'):
-                stats["overall"]["min_duration_ms"] = 0
-        
-        # Calculate operation-specific averages
-        for op, op_stats in stats["operations"].items():
-            if op_stats["count"] > 0:
-                op_stats["avg_duration_ms"] = op_stats["total_duration_ms"] / op_stats["count"]
-                
-                # Handle edge case for min duration
-                if op_stats["min_duration_ms"] == float('inf'):
-                    op_stats["min_duration_ms"] = 0
-                    
-                # Remove temporary total_duration_ms field
-                if "total_duration_ms" in op_stats:
-                    del op_stats["total_duration_ms"]
-        
-        return stats
+        return stats.summary()
     except Exception as e:
         logger.error(f"Error getting performance statistics: {str(e)}")
         return {"error": str(e)}
@@ -562,7 +520,8 @@ def get_user_journey_analytics(user_id: Optional[str] = None) -> Dict[str, Any]:
         Dictionary with user journey analytics
     """
     try:
-        if not os.path.exists(USER_JOURNEY_LOG_FILE):
+        stream = get_log_stream(USER_JOURNEY_STREAM)
+        if not stream.segments():
             return {}
         
         analytics = {
@@ -578,68 +537,61 @@ def get_user_journey_analytics(user_id: Optional[str] = None) -> Dict[str, Any]:
         step_durations = {}
         user_paths = {}
         
-        with open(USER_JOURNEY_LOG_FILE, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            headers = next(reader)  # Skip header row
+        for record in stream.read():
+            current_user_id = record.get('user_id')
+            session_id = record.get('session_id')
+            journey_step = record.get('journey_step')
+            previous_step = record.get('previous_step') or None
+            step_duration = float(record['step_duration_ms']) if record.get('step_duration_ms') else None
             
-            for row in reader:
-                if len(row) < 7:  # Ensure row has minimum columns
-                    continue
-                
-                current_user_id = row[1]
-                session_id = row[2]
-                journey_step = row[3]
-                previous_step = row[4] if row[4] else None
-                step_duration = float(row[6]) if row[6] else None
-                
-                # Apply user filter if needed
-                if user_id and current_user_id != user_id:
-                    continue
-                
-                # Track unique steps
-                all_steps.add(journey_step)
-                if previous_step:
-                    all_steps.add(previous_step)
-                
-                # Track step durations
-                if journey_step not in step_durations:
-                    step_durations[journey_step] = {
-                        "total_duration": 0,
-                        "count": 0,
-                        "min_duration": float('inf'),
-                        "max_duration": 0
-                    }
-                
-                if step_duration is not None and step_duration > 0:
-                    step_durations[journey_step]["total_duration"] += step_duration
-                    step_durations[journey_step]["count"] += 1
-                    step_durations[journey_step]["min_duration"] = min(
-                        step_durations[journey_step]["min_duration"], 
-                        step_duration
-                    )
-                    step_durations[journey_step]["max_duration"] = max(
-                        step_durations[journey_step]["max_duration"], 
-                        step_duration
-                    )
-                
-                # Track paths
-                if previous_step:
-                    path_key = f"{previous_step} -> {journey_step}"
-                    if path_key not in analytics["funnel_progression"]:
-                        analytics["funnel_progression"][path_key] = 0
-                    analytics["funnel_progression"][path_key] += 1
-                
-                # Track user paths
-                user_session_key = f"{current_user_id}:{session_id}"
-                if user_session_key not in user_paths:
-                    user_paths[user_session_key] = []
-                user_paths[user_session_key].append(journey_step)
-                
-                # Track session counts
-                if session_id not in analytics["session_counts"]:
-                    analytics["session_counts"][session_id] = 0
-                analytics["session_counts"][session_id] += 1
-        
+            # Apply user filter if needed
+            if user_id and current_user_id != user_id:
+                continue
+            
+            # Track unique steps
+            all_steps.add(journey_step)
+            if previous_step:
+                all_steps.add(previous_step)
+            
+            # Track step durations
+            if journey_step not in step_durations:
+                step_durations[journey_step] = {
+                    "total_duration": 0,
+                    "count": 0,
+                    "min_duration": float('inf'),
+                    "max_duration": 0
+                }
+            
+            if step_duration is not None and step_duration > 0:
+                step_durations[journey_step]["total_duration"] += step_duration
+                step_durations[journey_step]["count"] += 1
+                step_durations[journey_step]["min_duration"] = min(
+                    step_durations[journey_step]["min_duration"], 
+                    step_duration
+                )
+                step_durations[journey_step]["max_duration"] = max(
+                    step_durations[journey_step]["max_duration"], 
+                    step_duration
+                )
+            
+            # Track paths
+            if previous_step:
+                path_key = f"{previous_step} -> {journey_step}"
+                if path_key not in analytics["funnel_progression"]:
+                    analytics["funnel_progression"][path_key] = 0
+                analytics["funnel_progression"][path_key] += 1
+            
+            # Track user paths
+            user_session_key = f"{current_user_id}:{session_id}"
+            if user_session_key not in user_paths:
+                user_paths[user_session_key] = []
+            user_paths[user_session_key].append(journey_step)
+            
+            # Track session counts
+            if session_id not in analytics["session_counts"]:
+                analytics["session_counts"][session_id] = 0
+            analytics["session_counts"][session_id] += 1
+    
         # Calculate common paths
         path_counts = {}
         for path_list in user_paths.values():
@@ -706,7 +658,8 @@ def get_session_statistics(start_date: Optional[datetime] = None,
         Dictionary with session statistics
     """
     try:
-        if not os.path.exists(SESSION_LOG_FILE):
+        stream = get_log_stream(SESSION_STREAM)
+        if not stream.segments():
             return {}
         
         stats = {
@@ -725,51 +678,45 @@ def get_session_statistics(start_date: Optional[datetime] = None,
         total_duration = 0
         total_interactions = 0
         
-        # Read all sessions
-        with open(SESSION_LOG_FILE, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            headers = next(reader)  # Skip header row
+        # Sessions are logged after they start, so segments written before
+        # start_date can be skipped; end_date filters on start time below
+        for record in stream.read(start_date):
+            session_id = record.get('session_id')
+            user_id = record.get('user_id')
+            start_time_str = record.get('start_time')
+            end_time_str = record.get('end_time')
+            duration_seconds = float(record['duration_seconds']) if record.get('duration_seconds') not in (None, "") else None
+            interaction_count = int(record['interaction_count']) if record.get('interaction_count') not in (None, "") else 0
+            platform = record.get('platform')
+            browser = record.get('browser')
+            language = record.get('language')
             
-            for row in reader:
-                if len(row) < 9:  # Ensure row has all expected columns
-                    continue
-                
-                session_id = row[0]
-                user_id = row[1]
-                start_time_str = row[2]
-                end_time_str = row[3]
-                duration_seconds = float(row[4]) if row[4] else None
-                interaction_count = int(row[5]) if row[5] else 0
-                platform = row[6]
-                browser = row[7]
-                language = row[8]
-                
-                # Parse timestamps
-                start_time = datetime.fromisoformat(start_time_str) if start_time_str else None
-                end_time = datetime.fromisoformat(end_time_str) if end_time_str else None
-                
-                # Apply date filters
-                if start_date and start_time and start_time < start_date:
-                    continue
-                if end_date and start_time and start_time > end_date:
-                    continue
-                
-                # Create session object
-                session = {
-                    "session_id": session_id,
-                    "user_id": user_id,
-                    "start_time": start_time,
-                    "end_time": end_time,
-                    "duration_seconds": duration_seconds,
-                    "interaction_count": interaction_count,
-                    "platform": platform,
-                    "browser": browser,
-                    "language": language,
-                    "is_active": end_time is None
-                }
-                
-                sessions.append(session)
-        
+            # Parse timestamps
+            start_time = datetime.fromisoformat(start_time_str) if start_time_str else None
+            end_time = datetime.fromisoformat(end_time_str) if end_time_str else None
+            
+            # Apply date filters
+            if start_date and start_time and start_time < start_date:
+                continue
+            if end_date and start_time and start_time > end_date:
+                continue
+            
+            # Create session object
+            session = {
+                "session_id": session_id,
+                "user_id": user_id,
+                "start_time": start_time,
+                "end_time": end_time,
+                "duration_seconds": duration_seconds,
+                "interaction_count": interaction_count,
+                "platform": platform,
+                "browser": browser,
+                "language": language,
+                "is_active": end_time is None
+            }
+            
+            sessions.append(session)
+    
         # Calculate statistics
         stats["total_sessions"] = len(sessions)
         stats["active_sessions"] = sum(1 for s in sessions if s["is_active"])
@@ -840,68 +787,9 @@ def clear_logs() -> bool:
         True if successful, False otherwise
     """
     try:
-        # Reset interaction log
-        if os.path.exists(INTERACTION_LOG_FILE):
-            with open(INTERACTION_LOG_FILE, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    'timestamp', 
-                    'user_input', 
-                    'emotion', 
-                    'action', 
-                    'params',
-                    'language'
-                ])
-        
-        # Reset session log
-        if os.path.exists(SESSION_LOG_FILE):
-            with open(SESSION_LOG_FILE, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    'session_id',
-                    'user_id',
-                    'start_time',
-                    'end_time',
-                    'duration_seconds',
-                    'interaction_count',
-                    'platform',
-                    'browser',
-                    'language'
-                ])
-        
-        # Reset performance log
-        if os.path.exists(PERFORMANCE_LOG_FILE):
-            with open(PERFORMANCE_LOG_FILE, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    'timestamp',
-                    'operation',
-                    'duration_ms',
-                    'status',
-                    'error_message',
-                    'memory_usage_mb',
-                    'cpu_usage_percent'
-                ])
-        
-        # Reset event log
-        if os.path.exists(EVENT_LOG_FILE):
-            with open(EVENT_LOG_FILE, 'w', encoding='utf-8') as f:
-                json.dump([], f)
-        
-        # Reset user journey log
-        if os.path.exists(USER_JOURNEY_LOG_FILE):
-            with open(USER_JOURNEY_LOG_FILE, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    'timestamp',
-                    'user_id',
-                    'session_id',
-                    'journey_step',
-                    'previous_step',
-                    'next_step',
-                    'step_duration_ms',
-                    'user_feedback'
-                ])
+        for name in LOG_STREAMS:
+            get_log_stream(name).clear()
+        get_log_aggregates().clear()
             
         logger.info("All logs cleared successfully")
         return True
@@ -0,0 +1,277 @@
+"""
+Append-only, rotated JSONL storage for the application logs.
+
+log_manager used to append to CSV files that were never rotated and to keep
+events in a single JSON array that log_event reloaded and rewrote on every
+call. A SegmentedLog stores one stream (interactions, sessions, ...) as a
+directory of JSONL segments:
+
+    logs/<stream>/<stream>-<YYYYmmddTHHMMSS>-<seq>.jsonl
+    logs/<stream>/index.json
+
+Appending writes one line to the open active segment. The active segment is
+closed and a new one started once it reaches max_bytes or max_age_seconds;
+beyond max_segments the oldest segments are deleted. index.json keeps the
+time range and record count of every closed segment (the active segment's
+is tracked in memory and rebuilt from the file after a restart), so reads
+for a time window only open the segments that overlap it.
+"""
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 4 * 1024 * 1024
+DEFAULT_MAX_AGE_SECONDS = 24 * 3600
+DEFAULT_MAX_SEGMENTS = 100
+
+INDEX_FILENAME = "index.json"
+
+
+def _timestamp_key(value: Optional[datetime]) -> Optional[str]:
+    """ISO string comparable with the stored record timestamps"""
+    return value.isoformat() if value is not None else None
+
+
+class SegmentedLog:
+    """One log stream stored as rotated, append-only JSONL segments with a time index"""
+
+    def __init__(self, directory: str, name: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+                 max_segments: Optional[int] = DEFAULT_MAX_SEGMENTS):
+        """
+        Args:
+            directory: Directory holding this stream's segments and index
+            name: Stream name, used as the segment file prefix
+            max_bytes: Size at which the active segment is rotated
+            max_age_seconds: Age at which the active segment is rotated
+            max_segments: Segments kept at most (None keeps everything)
+        """
+        self.directory = directory
+        self.name = name
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.max_segments = max_segments
+
+        self._lock = threading.Lock()
+        self._segments: List[Dict[str, Any]] = []  # closed segments, oldest first
+        self._active: Optional[Dict[str, Any]] = None
+        self._active_file = None
+        self._active_opened = 0.0
+        self._sequence = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_index()
+
+    # Writing
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Append one record; it must carry an ISO 'timestamp'"""
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        timestamp = record["timestamp"]
+        with self._lock:
+            if self._active is not None and self._should_rotate():
+                self._rotate()
+            if self._active is None:
+                self._open_segment(timestamp)
+
+            self._active_file.write(line)
+            self._active_file.flush()
+
+            active = self._active
+            active["count"] += 1
+            active["bytes"] += len(line.encode("utf-8"))
+            if active["first"] is None or timestamp < active["first"]:
+                active["first"] = timestamp
+            if active["last"] is None or timestamp > active["last"]:
+                active["last"] = timestamp
+
+    def rotate(self) -> None:
+        """Close the active segment now (e.g. before archiving the directory)"""
+        with self._lock:
+            if self._active is not None:
+                self._rotate()
+
+    def close(self) -> None:
+        """Close the active segment file and persist the index"""
+        with self._lock:
+            if self._active_file is not None:
+                self._active_file.close()
+                self._active_file = None
+            self._write_index()
+
+    def clear(self) -> None:
+        """Delete every segment of this stream"""
+        with self._lock:
+            if self._active_file is not None:
+                self._active_file.close()
+                self._active_file = None
+            for segment in self._all_segments():
+                try:
+                    os.remove(os.path.join(self.directory, segment["file"]))
+                except OSError:
+                    pass
+            self._segments = []
+            self._active = None
+            self._write_index()
+
+    # Reading
+
+    def read(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Records with start <= timestamp <= end, oldest segment first
+
+        Only segments whose indexed time range overlaps the window are opened.
+        """
+        start_key, end_key = _timestamp_key(start), _timestamp_key(end)
+        for segment in self.segments(start, end):
+            for record in self._read_segment(segment):
+                timestamp = record.get("timestamp", "")
+                if start_key is not None and timestamp < start_key:
+                    continue
+                if end_key is not None and timestamp > end_key:
+                    continue
+                yield record
+
+    def tail(self, limit: int) -> List[Dict[str, Any]]:
+        """The most recent `limit` records, newest first"""
+        records: List[Dict[str, Any]] = []
+        for segment in reversed(self.segments()):
+            records.extend(reversed(list(self._read_segment(segment))))
+            if len(records) >= limit:
+                break
+        return records[:limit]
+
+    def segments(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Index entries (file, first, last, count, bytes) of the segments overlapping the window"""
+        start_key, end_key = _timestamp_key(start), _timestamp_key(end)
+        with self._lock:
+            if self._active_file is not None:
+                self._active_file.flush()
+            selected = []
+            for segment in self._all_segments():
+                if not segment["count"]:
+                    continue
+                if start_key is not None and segment["last"] < start_key:
+                    continue
+                if end_key is not None and segment["first"] > end_key:
+                    continue
+                selected.append(dict(segment))
+            return selected
+
+    def stats(self) -> Dict[str, Any]:
+        """Segment and record totals for this stream"""
+        segments = self.segments()
+        return {
+            "segments": len(segments),
+            "records": sum(segment["count"] for segment in segments),
+            "bytes": sum(segment["bytes"] for segment in segments),
+            "first": segments[0]["first"] if segments else None,
+            "last": segments[-1]["last"] if segments else None,
+        }
+
+    # Internals
+
+    def _all_segments(self) -> List[Dict[str, Any]]:
+        return self._segments + ([self._active] if self._active is not None else [])
+
+    def _read_segment(self, segment: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        path = os.path.join(self.directory, segment["file"])
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn last line after a crash
+                        continue
+        except FileNotFoundError:
+            return
+
+    def _should_rotate(self) -> bool:
+        if self._active["bytes"] >= self.max_bytes:
+            return True
+        return self.max_age_seconds is not None and time.time() - self._active_opened >= self.max_age_seconds
+
+    def _open_segment(self, timestamp: str) -> None:
+        self._sequence += 1
+        stamp = timestamp[:19].replace("-", "").replace(":", "")
+        filename = f"{self.name}-{stamp}-{self._sequence:06d}.jsonl"
+        self._active = {"file": filename, "first": None, "last": None, "count": 0, "bytes": 0}
+        self._active_file = open(os.path.join(self.directory, filename), "a", encoding="utf-8")
+        self._active_opened = time.time()
+
+    def _rotate(self) -> None:
+        self._active_file.close()
+        self._active_file = None
+        if self._active["count"]:
+            self._segments.append(self._active)
+        self._active = None
+
+        if self.max_segments is not None:
+            while len(self._segments) > self.max_segments:
+                expired = self._segments.pop(0)
+                try:
+                    os.remove(os.path.join(self.directory, expired["file"]))
+                except OSError:
+                    pass
+        self._write_index()
+
+    def _write_index(self) -> None:
+        """Persist the closed segments' index (atomically replaced)"""
+        path = os.path.join(self.directory, INDEX_FILENAME)
+        temp_path = f"{path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"sequence": self._sequence, "segments": self._all_segments()}, f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.error(f"Error writing log index for {self.name}: {str(e)}")
+
+    def _load_index(self) -> None:
+        """Load the index and re-scan segments it doesn't cover (the one active before a restart)"""
+        index = {"sequence": 0, "segments": []}
+        path = os.path.join(self.directory, INDEX_FILENAME)
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Rebuilding log index for {self.name}: {str(e)}")
+
+        indexed = {segment["file"]: segment for segment in index.get("segments", [])}
+        files = sorted(
+            filename for filename in os.listdir(self.directory)
+            if filename.startswith(f"{self.name}-") and filename.endswith(".jsonl")
+        )
+        segments = []
+        for filename in files:
+            size = os.path.getsize(os.path.join(self.directory, filename))
+            segment = indexed.get(filename)
+            if segment is None or segment.get("bytes") != size:
+                segment = self._scan_segment(filename, size)
+            segments.append(segment)
+
+        self._segments = [segment for segment in segments if segment["count"]]
+        self._sequence = max([index.get("sequence", 0)] + [
+            int(filename.rsplit("-", 1)[1].split(".")[0]) for filename in files
+            if filename.rsplit("-", 1)[1].split(".")[0].isdigit()
+        ])
+
+    def _scan_segment(self, filename: str, size: int) -> Dict[str, Any]:
+        segment = {"file": filename, "first": None, "last": None, "count": 0, "bytes": size}
+        for record in self._read_segment(segment):
+            timestamp = record.get("timestamp")
+            if not timestamp:
+                continue
+            segment["count"] += 1
+            if segment["first"] is None or timestamp < segment["first"]:
+                segment["first"] = timestamp
+            if segment["last"] is None or timestamp > segment["last"]:
+                segment["last"] = timestamp
+        return segment
@@ -7,17 +7,128 @@ Extended for Phase 2 with additional features:
 - Enhanced memory retrieval with filters
 - Memory categories and tagging
 - Memory usage analytics 
+
+Each thread reuses one connection (WAL mode, statement cache) and the
+schema is created once per database file, so a lookup is a single indexed
+read. Read/write access-log rows are buffered and written in batches.
+
+Every saved value is kept in the memory table as history; memory_current
+points at the latest version of each (user_id, key), so listing a user's
+memories is a range scan of its primary key. Expired versions are removed
+by sweep_expired_memories, run periodically by start_expiry_sweeper.
 """
 import sqlite3
 import os
+import atexit
 import logging
 import json
 import time
+import threading
 from datetime import datetime, timedelta
 from typing import Any, Optional, Dict, List, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
+# Constants
+MEMORY_DB_PATH = 'memory.db'
+STATEMENT_CACHE_SIZE = 128
+BUSY_TIMEOUT_MS = 5000
+
+# Access-log rows are written once this many are pending or the oldest is this old
+ACCESS_LOG_BATCH_SIZE = 100
+ACCESS_LOG_MAX_DELAY_SECONDS = 5.0
+
+DEFAULT_EXPIRY_SWEEP_INTERVAL = 3600
+
+_local = threading.local()
+_schema_lock = threading.RLock()
+_schema_ready = set()
+
+_access_log_lock = threading.Lock()
+_pending_access_log: List[Tuple[str, str, str, str]] = []
+_pending_since = 0.0
+
+def get_connection() -> sqlite3.Connection:
+    """
+    Get this thread's connection to MEMORY_DB_PATH (opened and schema-checked on first use)
+    
+    Rows are returned as sqlite3.Row, which supports access by index and by name.
+    """
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    
+    conn = connections.get(MEMORY_DB_PATH)
+    if conn is None:
+        conn = sqlite3.connect(MEMORY_DB_PATH, timeout=BUSY_TIMEOUT_MS / 1000,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+        connections[MEMORY_DB_PATH] = conn
+    
+    if MEMORY_DB_PATH not in _schema_ready:
+        with _schema_lock:
+            if MEMORY_DB_PATH not in _schema_ready:
+                _create_schema(conn)
+                _schema_ready.add(MEMORY_DB_PATH)
+    return conn
+
+def close_connection():
+    """Flush the access log and close this thread's connections"""
+    flush_access_log()
+    for conn in getattr(_local, 'connections', {}).values():
+        conn.close()
+    _local.connections = {}
+
+def _rollback():
+    """Roll back a failed write so the reused connection isn't left mid-transaction"""
+    try:
+        get_connection().rollback()
+    except Exception:
+        pass
+
+def _log_access(user_id: str, keys: List[str], access_type: str):
+    """Queue access-log rows; they are written in batches by flush_access_log"""
+    global _pending_since
+    timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+    with _access_log_lock:
+        if not _pending_access_log:
+            _pending_since = time.monotonic()
+        _pending_access_log.extend((user_id, key, access_type, timestamp) for key in keys)
+        due = (len(_pending_access_log) >= ACCESS_LOG_BATCH_SIZE
+               or time.monotonic() - _pending_since >= ACCESS_LOG_MAX_DELAY_SECONDS)
+    if due:
+        flush_access_log()
+
+def flush_access_log() -> int:
+    """
+    Write the pending access-log rows in one transaction
+    
+    Returns:
+        Number of rows written
+    """
+    with _access_log_lock:
+        rows = list(_pending_access_log)
+        _pending_access_log.clear()
+    if not rows:
+        return 0
+    
+    try:
+        conn = get_connection()
+        with conn:
+            conn.executemany(
+                "INSERT INTO memory_access_log (user_id, key, access_type, timestamp) VALUES (?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+    except Exception as e:
+        logger.error(f"Error writing memory access log: {str(e)}")
+        return 0
+
+atexit.register(flush_access_log)
+
 def init_db():
     """
     Initialize the memory database
@@ -28,63 +139,94 @@ def init_db():
         # Ensure logs directory exists
         os.makedirs('logs', exist_ok=True)
         
-        conn = sqlite3.connect('memory.db')
-        c = conn.cursor()
-        
-        # Create core memory table (v1)
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS memory (
-                user_id TEXT,
-                key TEXT,
-                value TEXT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Check if category column exists, add if not (Phase 2)
-        cursor = conn.execute('PRAGMA table_info(memory)')
-        columns = [column[1] for column in cursor.fetchall()]
-        
-        if 'category' not in columns:
-            c.execute('ALTER TABLE memory ADD COLUMN category TEXT DEFAULT "general"')
-            logger.info("Added category column to memory table")
-            
-        if 'expires_at' not in columns:
-            c.execute('ALTER TABLE memory ADD COLUMN expires_at DATETIME DEFAULT NULL')
-            logger.info("Added expires_at column to memory table")
-            
-        if 'importance' not in columns:
-            c.execute('ALTER TABLE memory ADD COLUMN importance INTEGER DEFAULT 1')
-            logger.info("Added importance column to memory table")
-            
-        # Create memory tags table (Phase 2)
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS memory_tags (
-                memory_id INTEGER,
-                tag TEXT,
-                PRIMARY KEY (memory_id, tag)
-            )
-        ''')
-        
-        # Create memory access log table (Phase 2)
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS memory_access_log (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT,
-                key TEXT,
-                access_type TEXT,  -- 'read', 'write', 'delete'
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        with _schema_lock:
+            _create_schema(get_connection())
+            _schema_ready.add(MEMORY_DB_PATH)
         logger.info("Memory database initialized successfully with Phase 2 enhancements")
         return True
     except Exception as e:
         logger.error(f"Error initializing memory database: {str(e)}")
         return False
 
+def _create_schema(conn: sqlite3.Connection):
+    """Create missing tables, columns and indexes"""
+    c = conn.cursor()
+    
+    # Create core memory table (v1)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS memory (
+            user_id TEXT,
+            key TEXT,
+            value TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Check if category column exists, add if not (Phase 2)
+    cursor = conn.execute('PRAGMA table_info(memory)')
+    columns = [column[1] for column in cursor.fetchall()]
+    
+    if 'category' not in columns:
+        c.execute('ALTER TABLE memory ADD COLUMN category TEXT DEFAULT "general"')
+        logger.info("Added category column to memory table")
+        
+    if 'expires_at' not in columns:
+        c.execute('ALTER TABLE memory ADD COLUMN expires_at DATETIME DEFAULT NULL')
+        logger.info("Added expires_at column to memory table")
+        
+    if 'importance' not in columns:
+        c.execute('ALTER TABLE memory ADD COLUMN importance INTEGER DEFAULT 1')
+        logger.info("Added importance column to memory table")
+        
+    # Create memory tags table (Phase 2)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS memory_tags (
+            memory_id INTEGER,
+            tag TEXT,
+            PRIMARY KEY (memory_id, tag)
+        )
+    ''')
+    
+    # Create memory access log table (Phase 2)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS memory_access_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT,
+            key TEXT,
+            access_type TEXT,  -- 'read', 'write', 'delete'
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Latest-value lookups by user and key, and tag lookups
+    c.execute('CREATE INDEX IF NOT EXISTS ix_memory_user_key_timestamp ON memory (user_id, key, timestamp)')
+    c.execute('CREATE INDEX IF NOT EXISTS ix_memory_tags_tag ON memory_tags (tag)')
+    c.execute('CREATE INDEX IF NOT EXISTS ix_memory_access_log_user ON memory_access_log (user_id)')
+    
+    # Rows the expiry sweeper has to look at
+    c.execute('CREATE INDEX IF NOT EXISTS ix_memory_expires_at ON memory (expires_at) WHERE expires_at IS NOT NULL')
+    
+    # Latest version of each memory (its rowid in the memory table)
+    c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memory_current'")
+    backfill = c.fetchone() is None
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS memory_current (
+            user_id TEXT,
+            key TEXT,
+            memory_id INTEGER NOT NULL,
+            PRIMARY KEY (user_id, key)
+        ) WITHOUT ROWID
+    ''')
+    if backfill:
+        # Later versions replace earlier ones
+        c.execute('''
+            INSERT OR REPLACE INTO memory_current (user_id, key, memory_id)
+            SELECT user_id, key, rowid FROM memory ORDER BY timestamp, rowid
+        ''')
+        logger.info(f"Created memory_current with {c.rowcount} current memories")
+    
+    conn.commit()
+
 def save_memory(user_id: str, key: str, value: Any, category: str = "general", 
                 importance: int = 1, expires_in_days: Optional[int] = None,
                 tags: Optional[List[str]] = None):
@@ -104,7 +246,7 @@ def save_memory(user_id: str, key: str, value: Any, category: str = "general",
         True if successful, False otherwise
     """
     try:
-        conn = sqlite3.connect('memory.db')
+        conn = get_connection()
         c = conn.cursor()
         
         # Convert value to string if it's not already
@@ -128,22 +270,25 @@ def save_memory(user_id: str, key: str, value: Any, category: str = "general",
         # Get the ID of the inserted memory for tags
         memory_id = c.lastrowid
         
+        # It is now the current version of this key
+        c.execute("""
+            INSERT INTO memory_current (user_id, key, memory_id) VALUES (?, ?, ?)
+            ON CONFLICT (user_id, key) DO UPDATE SET memory_id = excluded.memory_id
+            """,
+            (user_id, key, memory_id)
+        )
+        
         # Add tags if provided
         if tags and memory_id:
             for tag in tags:
                 c.execute("INSERT OR IGNORE INTO memory_tags (memory_id, tag) VALUES (?, ?)",
                          (memory_id, tag))
         
-        # Log the access
-        c.execute("""
-            INSERT INTO memory_access_log (user_id, key, access_type)
-            VALUES (?, ?, ?)
-            """,
-            (user_id, key, "write")
-        )
-        
         conn.commit()
         
+        # Log the access
+        _log_access(user_id, [key], "write")
+        
         # Log details
         log_msg = f"Saved memory for user {user_id}: {key}={value[:30]}... " if len(str(value)) > 30 else f"Saved memory for user {user_id}: {key}={value}"
         log_msg += f"[category={category}, importance={importance}]"
@@ -154,10 +299,10 @@ def save_memory(user_id: str, key: str, value: Any, category: str = "general",
             
         logger.debug(log_msg)
         
-        conn.close()
         return True
     except Exception as e:
         logger.error(f"Error saving memory: {str(e)}")
+        _rollback()
         return False
 
 def get_memory(user_id: str, key: str, include_metadata: bool = False) -> Optional[Union[str, Dict[str, Any]]]:
@@ -174,11 +319,10 @@ def get_memory(user_id: str, key: str, include_metadata: bool = False) -> Option
         If include_metadata is True: Dict with value and metadata, or None if not found
     """
     try:
-        conn = sqlite3.connect('memory.db')
-        conn.row_factory = sqlite3.Row  # Get results as dictionaries
+        conn = get_connection()
         c = conn.cursor()
         
-        # Get the memory with all metadata
+        # Get the memory with all metadata (one read on ix_memory_user_key_timestamp)
         c.execute("""
             SELECT rowid, value, category, importance, expires_at, timestamp 
             FROM memory 
@@ -194,30 +338,16 @@ def get_memory(user_id: str, key: str, include_metadata: bool = False) -> Option
         
         if not row:
             logger.debug(f"No memory found for user {user_id} and key {key}")
-            conn.close()
             return None
-            
-        # Get any tags for this memory
-        memory_id = row['rowid']
-        tags = []
-        
-        if memory_id:
-            tag_cursor = conn.cursor()
-            tag_cursor.execute("SELECT tag FROM memory_tags WHERE memory_id = ?", (memory_id,))
-            tags = [tag[0] for tag in tag_cursor.fetchall()]
         
         # Log the access
-        c.execute("""
-            INSERT INTO memory_access_log (user_id, key, access_type)
-            VALUES (?, ?, ?)
-            """,
-            (user_id, key, "read")
-        )
-        
-        conn.commit()
-        conn.close()
+        _log_access(user_id, [key], "read")
         
         if include_metadata:
+            # Get any tags for this memory
+            c.execute("SELECT tag FROM memory_tags WHERE memory_id = ?", (row['rowid'],))
+            tags = [tag[0] for tag in c.fetchall()]
+            
             # Return the full metadata
             result = dict(row)
             result['tags'] = tags
@@ -263,18 +393,15 @@ def get_all_user_memories(user_id: str,
         If include_metadata is True: List of memory objects with full metadata
     """
     try:
-        conn = sqlite3.connect('memory.db')
-        
-        if include_metadata:
-            conn.row_factory = sqlite3.Row
-            
+        conn = get_connection()
         c = conn.cursor()
         
-        # Start building the query
+        # Start building the query: the latest version of each key, via memory_current
         query = """
             SELECT m.rowid, m.key, m.value, m.category, m.importance, m.expires_at, m.timestamp
-            FROM memory m
-            WHERE m.user_id = ? 
+            FROM memory_current mc
+            JOIN memory m ON m.rowid = mc.memory_id
+            WHERE mc.user_id = ? 
         """
         
         params = []
@@ -291,19 +418,9 @@ def get_all_user_memories(user_id: str,
             
         if not include_expired:
             query += " AND (m.expires_at IS NULL OR datetime(m.expires_at) > datetime('now')) "
-            
-        # This ensures we only get the latest version of each memory
-        query += """
-            AND m.timestamp = (
-                SELECT MAX(timestamp) 
-                FROM memory 
-                WHERE user_id = ? AND key = m.key
-            )
-        """
-        params.append(user_id)
         
-        # Add order by
-        query += " ORDER BY m.key "
+        # Add order by (memory_current's primary key order)
+        query += " ORDER BY mc.key "
         
         # Execute the main query
         c.execute(query, params)
@@ -372,16 +489,7 @@ def get_all_user_memories(user_id: str,
             logger.debug(f"Retrieved {len(results)} memories for user {user_id}")
         
         # Log the access for analytics
-        log_cursor = conn.cursor()
-        for row in rows:
-            key = row['key'] if include_metadata else row[1]
-            log_cursor.execute(
-                "INSERT INTO memory_access_log (user_id, key, access_type) VALUES (?, ?, ?)",
-                (user_id, key, "read")
-            )
-            
-        conn.commit()
-        conn.close()
+        _log_access(user_id, [row['key'] for row in rows], "read")
         
         return results
     except Exception as e:
@@ -400,19 +508,20 @@ def delete_memory(user_id: str, key: str) -> bool:
         True if successful, False otherwise
     """
     try:
-        conn = sqlite3.connect('memory.db')
+        conn = get_connection()
         c = conn.cursor()
         
         c.execute("DELETE FROM memory WHERE user_id = ? AND key = ?", (user_id, key))
         
         rows_affected = c.rowcount
+        c.execute("DELETE FROM memory_current WHERE user_id = ? AND key = ?", (user_id, key))
         conn.commit()
-        conn.close()
         
         logger.debug(f"Deleted memory for user {user_id}: {key} ({rows_affected} rows affected)")
         return rows_affected > 0
     except Exception as e:
         logger.error(f"Error deleting memory: {str(e)}")
+        _rollback()
         return False
 
 def clear_user_memories(user_id: str) -> bool:
@@ -426,21 +535,81 @@ def clear_user_memories(user_id: str) -> bool:
         True if successful, False otherwise
     """
     try:
-        conn = sqlite3.connect('memory.db')
+        conn = get_connection()
         c = conn.cursor()
         
         c.execute("DELETE FROM memory WHERE user_id = ?", (user_id,))
         
         rows_affected = c.rowcount
+        c.execute("DELETE FROM memory_current WHERE user_id = ?", (user_id,))
         conn.commit()
-        conn.close()
         
         logger.debug(f"Cleared all memories for user {user_id} ({rows_affected} rows affected)")
         return True
     except Exception as e:
         logger.error(f"Error clearing user memories: {str(e)}")
+        _rollback()
         return False
 
+def sweep_expired_memories() -> int:
+    """
+    Delete expired memory versions, their tags and current-version entries
+    
+    Returns:
+        Number of memory rows deleted
+    """
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        
+        c.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS expired_memory_ids (memory_id INTEGER PRIMARY KEY)
+        """)
+        c.execute("DELETE FROM expired_memory_ids")
+        c.execute("""
+            INSERT INTO expired_memory_ids (memory_id)
+            SELECT rowid FROM memory
+            WHERE expires_at IS NOT NULL AND datetime(expires_at) <= datetime('now')
+        """)
+        c.execute("DELETE FROM memory_tags WHERE memory_id IN (SELECT memory_id FROM expired_memory_ids)")
+        c.execute("DELETE FROM memory_current WHERE memory_id IN (SELECT memory_id FROM expired_memory_ids)")
+        c.execute("DELETE FROM memory WHERE rowid IN (SELECT memory_id FROM expired_memory_ids)")
+        
+        rows_affected = c.rowcount
+        conn.commit()
+        
+        if rows_affected:
+            logger.info(f"Swept {rows_affected} expired memories")
+        return rows_affected
+    except Exception as e:
+        logger.error(f"Error sweeping expired memories: {str(e)}")
+        _rollback()
+        return 0
+
+def start_expiry_sweeper(interval_seconds: float = DEFAULT_EXPIRY_SWEEP_INTERVAL,
+                         stop_event: Optional[threading.Event] = None) -> threading.Thread:
+    """
+    Run sweep_expired_memories every interval_seconds on a daemon thread
+    
+    Args:
+        interval_seconds: Seconds between sweeps
+        stop_event: Optional event that stops the sweeper when set
+        
+    Returns:
+        The started thread
+    """
+    stop_event = stop_event or threading.Event()
+    
+    def run():
+        while not stop_event.is_set():
+            sweep_expired_memories()
+            stop_event.wait(interval_seconds)
+        close_connection()
+    
+    thread = threading.Thread(target=run, name="memory-expiry-sweeper", daemon=True)
+    thread.start()
+    return thread
+
 def add_memory_tags(memory_id: int, tags: List[str]) -> bool:
     """
     Add tags to a memory (Phase 2)
@@ -453,7 +622,7 @@ def add_memory_tags(memory_id: int, tags: List[str]) -> bool:
         True if successful, False otherwise
     """
     try:
-        conn = sqlite3.connect('memory.db')
+        conn = get_connection()
         c = conn.cursor()
         
         for tag in tags:
@@ -463,12 +632,12 @@ def add_memory_tags(memory_id: int, tags: List[str]) -> bool:
             )
         
         conn.commit()
-        conn.close()
         
         logger.debug(f"Added {len(tags)} tags to memory {memory_id}")
         return True
     except Exception as e:
         logger.error(f"Error adding tags to memory: {str(e)}")
+        _rollback()
         return False
 
 def remove_memory_tags(memory_id: int, tags: List[str]) -> bool:
@@ -483,7 +652,7 @@ def remove_memory_tags(memory_id: int, tags: List[str]) -> bool:
         True if successful, False otherwise
     """
     try:
-        conn = sqlite3.connect('memory.db')
+        conn = get_connection()
         c = conn.cursor()
         
         for tag in tags:
@@ -493,12 +662,12 @@ def remove_memory_tags(memory_id: int, tags: List[str]) -> bool:
             )
         
         conn.commit()
-        conn.close()
         
         logger.debug(f"Removed {len(tags)} tags from memory {memory_id}")
         return True
     except Exception as e:
         logger.error(f"Error removing tags from memory: {str(e)}")
+        _rollback()
         return False
 
 def get_memories_by_tag(user_id: str, tag: str, include_metadata: bool = False) -> Union[Dict[str, str], List[Dict[str, Any]]]:
@@ -515,11 +684,7 @@ def get_memories_by_tag(user_id: str, tag: str, include_metadata: bool = False)
         If include_metadata is True: List of memory objects with full metadata
     """
     try:
-        conn = sqlite3.connect('memory.db')
-        
-        if include_metadata:
-            conn.row_factory = sqlite3.Row
-            
+        conn = get_connection()
         c = conn.cursor()
         
         query = """
@@ -565,7 +730,6 @@ def get_memories_by_tag(user_id: str, tag: str, include_metadata: bool = False)
                 
             logger.debug(f"Retrieved {len(results)} memories with tag '{tag}' for user {user_id}")
         
-        conn.close()
         return results
     except Exception as e:
         logger.error(f"Error getting memories by tag: {str(e)}")
@@ -582,7 +746,10 @@ def get_memory_access_stats(user_id: Optional[str] = None) -> Dict[str, Any]:
         Dictionary with access statistics
     """
     try:
-        conn = sqlite3.connect('memory.db')
+        # Include the accesses still waiting in the batch
+        flush_access_log()
+        
+        conn = get_connection()
         c = conn.cursor()
         
         stats = {}
@@ -643,7 +810,6 @@ def get_memory_access_stats(user_id: Optional[str] = None) -> Dict[str, Any]:
             for row in c.fetchall()
         ]
         
-        conn.close()
         return stats
     except Exception as e:
         logger.error(f"Error getting memory access stats: {str(e)}")
@@ -10,7 +10,7 @@ import uuid
 import logging
 import traceback
 from datetime import datetime, timedelta
-from flask import Blueprint, jsonify, request, session, current_app, Response
+from flask import Blueprint, jsonify, request, session, current_app, Response, stream_with_context
 from werkzeug.utils import secure_filename
 
 # Setup logging
@@ -466,7 +466,8 @@ def mobile_speak():
         }
     }
     
-    Or binary audio data if stream=true
+    Or chunked audio/mpeg if stream=true: audio is sent as the provider
+    produces it and teed into the TTS cache for later requests
     """
     try:
         # Record start time for performance metrics
@@ -607,8 +608,25 @@ def mobile_speak():
                 else:
                     voice = 'ErXwobaYiN019PkySvjV'  # Default English voice
             
+            # Streaming: send provider chunks as they arrive (chunked transfer)
+            if stream:
+                chunks, cache_hit = tts_manager.stream_speech(text, voice=voice, use_cache=not bypass_cache)
+                processing_time_ms = int((time.time() - start_time) * 1000)
+                
+                return Response(
+                    stream_with_context(chunks),
+                    mimetype='audio/mpeg',
+                    headers={
+                        'X-TTS-Voice': voice,
+                        'X-TTS-Language': language,
+                        'X-Cache-Status': 'hit' if cache_hit else cache_status,
+                        'X-Time-To-First-Chunk': str(processing_time_ms)
+                    }
+                )
+            
             # Generate the audio
-            audio_path = tts_manager.generate_tts(text, voice=voice, language=language)
+            tts_result = tts_manager.generate_tts(text, voice=voice, language=language, use_cache=not bypass_cache)
+            audio_path = tts_result['path']
             
             # Verify the audio file exists and has content
             if os.path.exists(audio_path) and os.path.getsize(audio_path) > 0:
@@ -638,36 +656,6 @@ def mobile_speak():
                 end_time = time.time()
                 processing_time_ms = int((end_time - start_time) * 1000)
                 
-                # Streaming response requested
-                if stream:
-                    try:
-                        # Read the audio file and stream it directly
-                        with open(audio_path, 'rb') as audio_file:
-                            audio_data = audio_file.read()
-                        
-                        # Determine content type
-                        content_type = 'audio/mpeg' if audio_path.endswith('.mp3') else 'audio/wav'
-                        
-                        # Create streaming response
-                        return Response(
-                            audio_data,
-                            mimetype=content_type,
-                            headers={
-                                'Content-Disposition': f'inline; filename={os.path.basename(audio_path)}',
-                                'X-TTS-Voice': voice,
-                                'X-TTS-Language': language,
-                                'X-Cache-Status': cache_status,
-                                'X-Processing-Time': str(processing_time_ms)
-                            }
-                        )
-                    except Exception as e:
-                        logger.error(f"Mobile API: Streaming error: {str(e)}")
-                        return jsonify({
-                            "success": False,
-                            "error": "Failed to stream audio",
-                            "error_details": str(e)
-                        }), 500
-                
                 # Standard JSON response with path to audio file
                 return jsonify({
                     'success': True, 
@@ -1010,7 +998,8 @@ def batch_analyze():
             {"id": "2", "primary_emotion": "sad", "confidence": 0.7}
         ],
         "timestamp": "2025-04-03T14:22:00Z",
-        "processing_time_ms": 230
+        "processing_time_ms": 230,
+        "timings_ms": {"normalize_ms": 0.2, "scan_ms": 18.1, "keyword_matrix_ms": 0.3, ...}
     }
     """
     try:
@@ -1038,14 +1027,14 @@ def batch_analyze():
                 "error": "Emotion analysis service not available"
             }), 503
             
-        # Process each text in the batch
+        # Analyze all non-empty texts in one batch
         start_time = time.time()
         results = []
+        batch_items = []
         
         for item in texts:
             item_id = item.get('id', str(uuid.uuid4()))
             text = item.get('text', '')
-            language = item.get('language', 'en')
             
             if not text:
                 # Skip empty texts
@@ -1055,35 +1044,43 @@ def batch_analyze():
                     "error": "Empty text"
                 })
                 continue
-                
-            try:
-                # Analyze emotion
-                emotion_result = emotion_tracker.analyze_text(text)
-                
+            
+            results.append(None)
+            batch_items.append((len(results) - 1, item_id, text))
+        
+        stage_timings = {}
+        try:
+            emotion_results, stage_timings = emotion_tracker.analyze_batch(
+                [text for _, _, text in batch_items], return_timings=True
+            )
+            
+            for (index, item_id, _), emotion_result in zip(batch_items, emotion_results):
                 # Process the result
                 if isinstance(emotion_result, str):
                     dominant_emotion = emotion_result
                     confidence = 0.8
                 else:
                     dominant_emotion = emotion_result.get('primary_emotion', 'neutral')
-                    confidence = emotion_result.get('confidence', 0.8)
+                    confidence = emotion_result.get(
+                        'confidence', emotion_result.get('metadata', {}).get('confidence', 0.8)
+                    )
                 
-                # Add to results
-                results.append({
+                results[index] = {
                     "id": item_id,
                     "success": True,
                     "primary_emotion": dominant_emotion,
                     "confidence": confidence
-                })
+                }
                 
-            except Exception as e:
-                # Record error for this item
-                logger.error(f"Mobile API: Batch analysis error for item {item_id}: {str(e)}")
-                results.append({
+        except Exception as e:
+            # Record the error for every item of the failed batch
+            logger.error(f"Mobile API: Batch analysis error: {str(e)}")
+            for index, item_id, _ in batch_items:
+                results[index] = {
                     "id": item_id,
                     "success": False,
                     "error": str(e)
-                })
+                }
                 
         # Calculate processing time
         processing_time_ms = int((time.time() - start_time) * 1000)
@@ -1093,7 +1090,8 @@ def batch_analyze():
             "success": True,
             "results": results,
             "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "processing_time_ms": processing_time_ms
+            "processing_time_ms": processing_time_ms,
+            "timings_ms": {stage: round(value, 2) for stage, value in stage_timings.items()}
         })
         
     except Exception as e:
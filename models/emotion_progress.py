@@ -7,13 +7,17 @@ They form the foundation of the gamified emotional learning experience.
 
 import datetime
 import enum
-from typing import List, Optional
+import json
+import logging
+from typing import Any, Dict, List, Optional
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Float, Enum, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Float, Enum, Text, event
 from sqlalchemy.orm import relationship
 
 from main import db
 
+logger = logging.getLogger(__name__)
+
 
 # Enums for emotion types and progress levels
 class EmotionType(enum.Enum):
@@ -213,10 +217,151 @@ class EmotionEntry(db.Model):
         return f"<EmotionEntry user_id={self.user_id} emotion={self.emotion_type} created_at={self.created_at}>"
 
 
+class EmotionTriggerCount(db.Model):
+    """Number of emotion entries per user, emotion and trigger, maintained incrementally"""
+    __tablename__ = "emotion_trigger_count"
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    emotion_type = db.Column(db.String(50), nullable=False)
+    trigger = db.Column(db.String(255), nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'emotion_type', 'trigger', name='_user_emotion_trigger_uc'),
+    )
+    
+    def __repr__(self):
+        return f"<EmotionTriggerCount user_id={self.user_id} emotion={self.emotion_type} trigger={self.trigger} count={self.count}>"
+
+
+class AchievementCriteria(db.Model):
+    """
+    Achievement.criteria compiled into columns, so eligibility is one indexed query
+    
+    Rows are written by mapper events whenever an Achievement is inserted or
+    updated; achievements whose criteria are empty or invalid have no row
+    and can never be earned. Null columns mean "no requirement".
+    """
+    __tablename__ = "achievement_criteria"
+    
+    achievement_id = db.Column(db.Integer, db.ForeignKey("achievement.id"), primary_key=True)
+    emotion_type = db.Column(db.String(50), nullable=True, index=True)
+    min_level = db.Column(db.Integer)
+    min_accuracy = db.Column(db.Float)
+    min_interactions = db.Column(db.Integer)
+    min_streak = db.Column(db.Integer)
+    emotions_at_level = db.Column(db.Integer)  # Level that emotions_at_level_count emotions must reach
+    emotions_at_level_count = db.Column(db.Integer)
+    
+    def __repr__(self):
+        return f"<AchievementCriteria achievement_id={self.achievement_id}>"
+
+
+class UserProgressSnapshot(db.Model):
+    """
+    Materialized get_user_progress result for one user
+    
+    Writes that change a user's progress mark the snapshot stale and bump
+    its version in the same transaction; the next read recomputes it. The
+    version doubles as the HTTP ETag of the progress endpoint.
+    """
+    __tablename__ = "user_progress_snapshot"
+    
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    is_stale = db.Column(db.Boolean, nullable=False, default=True)
+    data = db.Column(db.Text)  # JSON-encoded progress dictionary
+    updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<UserProgressSnapshot user_id={self.user_id} version={self.version} stale={self.is_stale}>"
+
+
+def mark_progress_snapshots_stale(connection, user_id: Optional[int] = None):
+    """Invalidate the snapshot of one user (or of all users) using a Core connection"""
+    table = UserProgressSnapshot.__table__
+    statement = table.update().values(is_stale=True, version=table.c.version + 1)
+    if user_id is not None:
+        statement = statement.where(table.c.user_id == user_id)
+    connection.execute(statement)
+
+
+def compile_achievement_criteria(achievement_id: int, emotion_type: Optional[str],
+                                 criteria_json: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Compile an achievement's criteria JSON into an achievement_criteria row
+    
+    Returns:
+        Column values, or None if the achievement can never be earned
+    """
+    if not criteria_json:
+        return None
+    try:
+        criteria = json.loads(criteria_json)
+    except json.JSONDecodeError:
+        logger.error(f"Invalid criteria JSON for achievement {achievement_id}")
+        return None
+    if not criteria or not isinstance(criteria, dict):
+        return None
+    
+    try:
+        emotions_at_level = criteria.get("emotions_at_level")
+        return {
+            "achievement_id": achievement_id,
+            "emotion_type": emotion_type or None,
+            "min_level": criteria.get("min_level"),
+            "min_accuracy": criteria.get("min_accuracy"),
+            "min_interactions": criteria.get("min_interactions"),
+            "min_streak": criteria.get("min_streak"),
+            "emotions_at_level": emotions_at_level["level"] if emotions_at_level else None,
+            "emotions_at_level_count": emotions_at_level["count"] if emotions_at_level else None,
+        }
+    except (KeyError, TypeError) as e:
+        logger.error(f"Invalid criteria for achievement {achievement_id}: {str(e)}")
+        return None
+
+
+def _write_achievement_criteria(connection, achievement: Achievement):
+    table = AchievementCriteria.__table__
+    connection.execute(table.delete().where(table.c.achievement_id == achievement.id))
+    row = compile_achievement_criteria(achievement.id, achievement.emotion_type, achievement.criteria)
+    if row:
+        connection.execute(table.insert().values(**row))
+
+
+@event.listens_for(Achievement, "after_insert")
+@event.listens_for(Achievement, "after_update")
+def _sync_achievement_criteria(mapper, connection, achievement):
+    """Recompile criteria in the same transaction as the achievement change"""
+    _write_achievement_criteria(connection, achievement)
+
+
+@event.listens_for(Achievement, "after_update")
+def _invalidate_achievement_snapshots(mapper, connection, achievement):
+    # Snapshots embed the names and icons of earned achievements
+    mark_progress_snapshots_stale(connection)
+
+
+@event.listens_for(Achievement, "after_delete")
+def _delete_achievement_criteria(mapper, connection, achievement):
+    table = AchievementCriteria.__table__
+    connection.execute(table.delete().where(table.c.achievement_id == achievement.id))
+    mark_progress_snapshots_stale(connection)
+
+
+def _invalidate_user_snapshot(mapper, connection, user):
+    mark_progress_snapshots_stale(connection, user.id)
+
+
 # Update User model to include relationships with the above models
 def update_user_model():
     from models.user import User
     
+    # Snapshots embed the user's name and avatar
+    if not event.contains(User, "after_update", _invalidate_user_snapshot):
+        event.listen(User, "after_update", _invalidate_user_snapshot)
+    
     User.emotion_progress = relationship("UserEmotionProgress", back_populates="user", cascade="all, delete-orphan")
     User.achievements = relationship("UserAchievement", back_populates="user", cascade="all, delete-orphan")
     User.streaks = relationship("EmotionStreak", back_populates="user", cascade="all, delete-orphan")
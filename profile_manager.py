@@ -447,6 +447,23 @@ class ProfileManager:
         else:
             return f"{greeting} {name}"
     
+    def greeting_phrases(self, name=None, language=None):
+        """Every greeting get_greeting can return for a name, across all tones"""
+        if not language:
+            language = self.get_current_profile().get('language', 'en')
+        
+        if not name:
+            name = self.get_current_profile().get('nickname', 'User')
+        
+        phrases = []
+        for tone in ('playful', 'formal', 'calm', 'assertive', 'neutral'):
+            tone_style = self.get_tone_response_style(tone)
+            greetings = tone_style['ar_greetings'] if language == 'ar' else tone_style['greetings']
+            phrase = f"{greetings[0]} {name}"
+            if phrase not in phrases:
+                phrases.append(phrase)
+        return phrases
+
     def adapt_response(self, text, language=None, user_emotion=None):
         """
         Adapt a response based on user's preferred tone and language using advanced emotion modulation
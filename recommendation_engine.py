@@ -21,6 +21,90 @@ from emotion_tracker import EmotionTracker
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Special dates: (month, day): (english_greeting, arabic_greeting)
+SPECIAL_DATE_GREETINGS = {
+    # New Year's Day
+    (1, 1): ("Happy New Year! Here's to new beginnings and emotions.", 
+           "كل عام وأنتم بخير! لبدايات جديدة ومشاعر جديدة."),
+    # Valentine's Day
+    (2, 14): ("Happy Valentine's Day! A day to celebrate love in all its forms.", 
+            "عيد حب سعيد! يوم للاحتفال بالحب بجميع أشكاله."),
+    # International Happiness Day
+    (3, 20): ("Today is International Day of Happiness! How are you feeling?", 
+             "اليوم هو اليوم العالمي للسعادة! كيف تشعر؟"),
+    # World Mental Health Day
+    (10, 10): ("Today is World Mental Health Day. How are you taking care of your emotional well-being?", 
+              "اليوم هو اليوم العالمي للصحة النفسية. كيف تعتني بصحتك العاطفية؟")
+}
+
+# English greeting variations for each time of day
+ENGLISH_GREETINGS = {
+    "night": [
+        "Still awake? The cosmos never sleeps, and neither do you.",
+        "The quiet night is perfect for reflection.",
+        "Stars are shining, and so is your inner light."
+    ],
+    "morning": [
+        "Good morning! The universe awakens with you today.",
+        "Rise and shine! A new day of cosmic energy awaits.",
+        "Morning light brings new possibilities and emotions."
+    ],
+    "afternoon": [
+        "Good afternoon! How's your day's journey going?",
+        "The day is in full swing. How are your emotions flowing?",
+        "Afternoon greetings! The cosmos is vibrant with energy."
+    ],
+    "evening": [
+        "Good evening! Time to reflect on today's emotional journey.",
+        "As the day winds down, how does your emotional cosmos feel?",
+        "Evening has arrived. Let's take a moment to feel the cosmic calm."
+    ]
+}
+
+# English day-specific suffixes ("weekend" applies on Saturday and Sunday)
+ENGLISH_DAY_SUFFIXES = {
+    "weekend": " Enjoy your weekend journey!",
+    "monday": " Beginning a new week with fresh emotions.",
+    "tuesday": " Tuesday's energy flows through the cosmos.",
+    "wednesday": " Midweek reflections guide your path.",
+    "thursday": " Almost to the weekend, stay emotionally balanced.",
+    "friday": " Friday's vibrations bring joy to the cosmos."
+}
+
+# Arabic greeting variations for each time of day
+ARABIC_GREETINGS = {
+    "ليل": [
+        "مازلت مستيقظًا؟ الكون لا ينام أبدًا، وكذلك أنت.",
+        "الليل الهادئ مثالي للتأمل.",
+        "النجوم تتلألأ، وكذلك نورك الداخلي."
+    ],
+    "صباح": [
+        "صباح الخير! يستيقظ الكون معك اليوم.",
+        "أشرق وتألق! يوم جديد من طاقة الكون في انتظارك.",
+        "ضوء الصباح يجلب إمكانيات ومشاعر جديدة."
+    ],
+    "ظهر": [
+        "مساء الخير! كيف تسير رحلة يومك؟",
+        "النهار في كامل نشاطه. كيف تتدفق مشاعرك؟",
+        "تحيات المساء! الكون نابض بالحياة والطاقة."
+    ],
+    "مساء": [
+        "مساء الخير! حان وقت التفكير في رحلة اليوم العاطفية.",
+        "مع اقتراب نهاية اليوم، كيف يشعر كونك العاطفي؟",
+        "لقد حل المساء. دعنا نأخذ لحظة لنشعر بهدوء الكون."
+    ]
+}
+
+# Arabic day-specific suffixes (Friday takes precedence over the weekend)
+ARABIC_DAY_SUFFIXES = {
+    "friday": " جمعة مباركة!",
+    "weekend": " استمتع برحلة عطلة نهاية الأسبوع!",
+    "monday": " بداية أسبوع جديد بمشاعر جديدة.",
+    "tuesday": " طاقة الثلاثاء تتدفق عبر الكون.",
+    "wednesday": " تأملات منتصف الأسبوع ترشد طريقك.",
+    "thursday": " على وشك الوصول إلى عطلة نهاية الأسبوع، حافظ على توازنك العاطفي."
+}
+
 
 class RecommendationEngine:
     """
@@ -967,73 +1051,18 @@ class RecommendationEngine:
     
     def _check_special_date(self, month_day: tuple, language: str) -> str:
         """Check if current date is a special date and return appropriate greeting"""
-        # Dictionary of special dates: (month, day): (english_greeting, arabic_greeting)
-        special_dates = {
-            # New Year's Day
-            (1, 1): ("Happy New Year! Here's to new beginnings and emotions.", 
-                   "كل عام وأنتم بخير! لبدايات جديدة ومشاعر جديدة."),
-            # Valentine's Day
-            (2, 14): ("Happy Valentine's Day! A day to celebrate love in all its forms.", 
-                    "عيد حب سعيد! يوم للاحتفال بالحب بجميع أشكاله."),
-            # International Happiness Day
-            (3, 20): ("Today is International Day of Happiness! How are you feeling?", 
-                     "اليوم هو اليوم العالمي للسعادة! كيف تشعر؟"),
-            # World Mental Health Day
-            (10, 10): ("Today is World Mental Health Day. How are you taking care of your emotional well-being?", 
-                      "اليوم هو اليوم العالمي للصحة النفسية. كيف تعتني بصحتك العاطفية؟")
-        }
-        
-        return special_dates.get(month_day, [None, None])[0 if language == 'en' else 1]
+        return SPECIAL_DATE_GREETINGS.get(month_day, [None, None])[0 if language == 'en' else 1]
     
     def _get_english_greeting(self, time_of_day: str, day_of_week: str, is_weekend: bool) -> str:
         """Generate appropriate English greeting based on time and day"""
-        # Variations for each time of day
-        night_greetings = [
-            "Still awake? The cosmos never sleeps, and neither do you.",
-            "The quiet night is perfect for reflection.",
-            "Stars are shining, and so is your inner light."
-        ]
-        
-        morning_greetings = [
-            "Good morning! The universe awakens with you today.",
-            "Rise and shine! A new day of cosmic energy awaits.",
-            "Morning light brings new possibilities and emotions."
-        ]
-        
-        afternoon_greetings = [
-            "Good afternoon! How's your day's journey going?",
-            "The day is in full swing. How are your emotions flowing?",
-            "Afternoon greetings! The cosmos is vibrant with energy."
-        ]
-        
-        evening_greetings = [
-            "Good evening! Time to reflect on today's emotional journey.",
-            "As the day winds down, how does your emotional cosmos feel?",
-            "Evening has arrived. Let's take a moment to feel the cosmic calm."
-        ]
-        
         # Select appropriate greeting set
-        if time_of_day == "night":
-            greetings = night_greetings
-        elif time_of_day == "morning":
-            greetings = morning_greetings
-        elif time_of_day == "afternoon":
-            greetings = afternoon_greetings
-        else:
-            greetings = evening_greetings
+        greetings = ENGLISH_GREETINGS.get(time_of_day, ENGLISH_GREETINGS["evening"])
             
         # Day-specific additions
         if is_weekend:
-            weekend_suffix = " Enjoy your weekend journey!"
+            weekend_suffix = ENGLISH_DAY_SUFFIXES["weekend"]
         else:
-            weekday_names = {
-                "monday": " Beginning a new week with fresh emotions.",
-                "tuesday": " Tuesday's energy flows through the cosmos.",
-                "wednesday": " Midweek reflections guide your path.",
-                "thursday": " Almost to the weekend, stay emotionally balanced.",
-                "friday": " Friday's vibrations bring joy to the cosmos."
-            }
-            weekend_suffix = weekday_names.get(day_of_week, "")
+            weekend_suffix = ENGLISH_DAY_SUFFIXES.get(day_of_week, "")
             
         # Choose a random greeting and add day-specific suffix
         import random
@@ -1047,54 +1076,16 @@ class RecommendationEngine:
         
     def _get_arabic_greeting(self, time_of_day: str, day_of_week: str, is_weekend: bool, is_friday: bool) -> str:
         """Generate appropriate Arabic greeting based on time and day"""
-        # Variations for each time of day
-        night_greetings = [
-            "مازلت مستيقظًا؟ الكون لا ينام أبدًا، وكذلك أنت.",
-            "الليل الهادئ مثالي للتأمل.",
-            "النجوم تتلألأ، وكذلك نورك الداخلي."
-        ]
-        
-        morning_greetings = [
-            "صباح الخير! يستيقظ الكون معك اليوم.",
-            "أشرق وتألق! يوم جديد من طاقة الكون في انتظارك.",
-            "ضوء الصباح يجلب إمكانيات ومشاعر جديدة."
-        ]
-        
-        afternoon_greetings = [
-            "مساء الخير! كيف تسير رحلة يومك؟",
-            "النهار في كامل نشاطه. كيف تتدفق مشاعرك؟",
-            "تحيات المساء! الكون نابض بالحياة والطاقة."
-        ]
-        
-        evening_greetings = [
-            "مساء الخير! حان وقت التفكير في رحلة اليوم العاطفية.",
-            "مع اقتراب نهاية اليوم، كيف يشعر كونك العاطفي؟",
-            "لقد حل المساء. دعنا نأخذ لحظة لنشعر بهدوء الكون."
-        ]
-        
         # Select appropriate greeting set
-        if time_of_day == "ليل":
-            greetings = night_greetings
-        elif time_of_day == "صباح":
-            greetings = morning_greetings
-        elif time_of_day == "ظهر":
-            greetings = afternoon_greetings
-        else:
-            greetings = evening_greetings
+        greetings = ARABIC_GREETINGS.get(time_of_day, ARABIC_GREETINGS["مساء"])
             
         # Special handling for Friday in Islamic culture
         if is_friday:
-            day_suffix = " جمعة مباركة!"
+            day_suffix = ARABIC_DAY_SUFFIXES["friday"]
         elif is_weekend:
-            day_suffix = " استمتع برحلة عطلة نهاية الأسبوع!"
+            day_suffix = ARABIC_DAY_SUFFIXES["weekend"]
         else:
-            weekday_names = {
-                "monday": " بداية أسبوع جديد بمشاعر جديدة.",
-                "tuesday": " طاقة الثلاثاء تتدفق عبر الكون.",
-                "wednesday": " تأملات منتصف الأسبوع ترشد طريقك.",
-                "thursday": " على وشك الوصول إلى عطلة نهاية الأسبوع، حافظ على توازنك العاطفي."
-            }
-            day_suffix = weekday_names.get(day_of_week, "")
+            day_suffix = ARABIC_DAY_SUFFIXES.get(day_of_week, "")
             
         # Choose a random greeting and add day-specific suffix
         import random
@@ -1105,6 +1096,32 @@ class RecommendationEngine:
             greeting += day_suffix
             
         return greeting
+    
+    @staticmethod
+    def greeting_phrases(language: str = 'en') -> List[str]:
+        """
+        Every greeting get_contextual_greeting can return for a language
+        
+        Used to pre-synthesize greeting audio; the list is the time-of-day
+        greetings with and without each day suffix, plus the special dates.
+        
+        Args:
+            language: Language code ('en' or 'ar')
+            
+        Returns:
+            List of distinct greeting strings
+        """
+        if language == 'en':
+            greeting_sets, suffixes = ENGLISH_GREETINGS, ENGLISH_DAY_SUFFIXES
+        else:
+            greeting_sets, suffixes = ARABIC_GREETINGS, ARABIC_DAY_SUFFIXES
+        
+        phrases = [pair[0 if language == 'en' else 1] for pair in SPECIAL_DATE_GREETINGS.values()]
+        for greetings in greeting_sets.values():
+            for greeting in greetings:
+                phrases.append(greeting)
+                phrases.extend(greeting + suffix for suffix in suffixes.values())
+        return list(dict.fromkeys(phrases))
                 
     def log_recommendation_feedback(
         self,
@@ -8,7 +8,7 @@ managing achievements, and updating learning paths.
 import logging
 from typing import Dict, Any
 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app
 from sqlalchemy.exc import SQLAlchemyError
 
 from services.emotion_progress_service import EmotionProgressService
@@ -27,6 +27,10 @@ def get_user_progress(user_id: int):
     """
     Get a complete picture of a user's emotional learning progress
     
+    Served from the user's materialized progress snapshot. The response
+    carries an ETag; polls sending it back in If-None-Match get a 304
+    until the user's progress changes.
+    
     Args:
         user_id: ID of the user
         
@@ -34,12 +38,20 @@ def get_user_progress(user_id: int):
         JSON with complete progress information
     """
     try:
-        result = EmotionProgressService.get_user_progress(user_id)
+        result = EmotionProgressService.get_progress_snapshot(user_id)
         
         if 'error' in result:
             return jsonify({'success': False, 'error': result['error']}), 400
-            
-        return jsonify({'success': True, 'data': result}), 200
+        
+        # The snapshot is already serialized, so wrap it instead of re-encoding
+        response = Response(
+            '{"success": true, "data": ' + result['json'] + '}',
+            status=200,
+            mimetype='application/json'
+        )
+        response.set_etag(result['etag'])
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
         
     except Exception as e:
         logger.error(f"Error in get_user_progress route: {str(e)}")
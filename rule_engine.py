@@ -1,5 +1,6 @@
 import logging
-from typing import Dict, Any, Optional
+from collections import deque
+from typing import Dict, Any, Iterable, List, Optional, Set
 
 class Rule:
     """
@@ -73,6 +74,114 @@ class Rule:
     def __str__(self) -> str:
         return f"Rule({self.emotion}, {self.keyword}, {self.action}, weight={self.weight})"
 
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a set of keywords.
+    Finds every keyword contained in a text in one pass over the text.
+    """
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self.has_empty = False
+        
+        for keyword in keywords:
+            self._add(keyword)
+        self._build_failure_links()
+        
+    def _add(self, keyword: str):
+        keyword_id = len(self.keywords)
+        self.keywords.append(keyword)
+        if not keyword:
+            self.has_empty = True
+            return
+        state = 0
+        for ch in keyword:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][ch] = next_state
+            state = next_state
+        self._out[state].append(keyword_id)
+        
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(ch, 0)
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+                
+    def find(self, text: str) -> Set[int]:
+        """IDs (positions in self.keywords) of the keywords found in text"""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        if self.has_empty:
+            found.update(i for i, keyword in enumerate(self.keywords) if not keyword)
+        return found
+
+class RuleIndex:
+    """
+    Precompiled lookup structure for RobinDecisionEngine.decide.
+    
+    Rules are bucketed by lowercased emotion (plus one bucket holding every
+    rule, for messages without an emotion). Each bucket has one keyword
+    automaton and, per keyword, the rule that wins among the rules sharing
+    it: highest weight, earliest added on ties - the order decide() used
+    to get from a stable sort.
+    """
+    def __init__(self, rules: List[Rule]):
+        self.size = len(rules)
+        self._positions = {id(rule): position for position, rule in enumerate(rules)}
+        self._buckets = {None: self._build_bucket(rules)}
+        by_emotion: Dict[str, List[Rule]] = {}
+        for rule in rules:
+            by_emotion.setdefault(rule.emotion.lower(), []).append(rule)
+        for emotion, bucket_rules in by_emotion.items():
+            self._buckets[emotion] = self._build_bucket(bucket_rules)
+            
+    @staticmethod
+    def _build_bucket(rules: List[Rule]):
+        best: Dict[str, Rule] = {}
+        for rule in rules:
+            keyword = rule.keyword.lower()
+            current = best.get(keyword)
+            if current is None or rule.weight > current.weight:
+                best[keyword] = rule
+        automaton = KeywordAutomaton(best.keys())
+        return automaton, [best[keyword] for keyword in automaton.keywords]
+        
+    def best_match(self, message: str, emotion: Optional[str] = None) -> Optional[Rule]:
+        """The highest-weight rule matching the message and emotion, or None"""
+        bucket = self._buckets.get(emotion.lower() if emotion else None)
+        if bucket is None:
+            return None
+        automaton, winners = bucket
+        best = None
+        best_position = None
+        for keyword_id in automaton.find(message.lower()):
+            rule = winners[keyword_id]
+            if best is None or rule.weight > best.weight or (
+                    rule.weight == best.weight and self._positions[id(rule)] < best_position):
+                best = rule
+                best_position = self._positions[id(rule)]
+        return best
+
 class RobinDecisionEngine:
     """
     Decision engine for routing user inputs to appropriate actions
@@ -82,17 +191,45 @@ class RobinDecisionEngine:
         self.rules = []
         self.memory = {}
         self.logger = logging.getLogger(__name__)
+        self._index: Optional[RuleIndex] = None
+        self._indexed_rules = None
         
     def add_rule(self, rule: Rule):
         """Add a rule to the engine"""
         self.rules.append(rule)
+        self._index = None
         self.logger.debug(f"Added rule: {rule}")
         
     def remove_rule(self, rule_id: str) -> bool:
         """Remove a rule by ID"""
         initial_count = len(self.rules)
         self.rules = [r for r in self.rules if getattr(r, 'id', None) != rule_id]
+        self._index = None
         return len(self.rules) < initial_count
+    
+    def replace_rules(self, rules: List[Rule]):
+        """
+        Swap in a new rule set with its index already built
+        
+        The index is built before anything is assigned, so concurrent
+        decide() calls keep using the old rules until the swap.
+        """
+        index = RuleIndex(rules)
+        self._index, self._indexed_rules, self.rules = index, rules, rules
+        self.logger.info(f"Replaced rule set ({len(rules)} rules)")
+        
+    def invalidate_index(self):
+        """Rebuild the rule index on the next decide() (after changing rules in place)"""
+        self._index = None
+        
+    def _get_index(self) -> RuleIndex:
+        """The rule index, rebuilt if rules were added, removed or reweighted since it was built"""
+        index = self._index
+        if index is None or self._indexed_rules is not self.rules or index.size != len(self.rules):
+            index = RuleIndex(self.rules)
+            self._index, self._indexed_rules = index, self.rules
+            self.logger.debug(f"Built rule index for {len(self.rules)} rules")
+        return index
 
     def decide(self, message: str, emotion: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -105,20 +242,16 @@ class RobinDecisionEngine:
         Returns:
             Dict with action and params
         """
-        matched = [r for r in self.rules if r.matches(message, emotion)]
+        # Highest-weight matching rule from the precompiled index
+        top_rule = self._get_index().best_match(message, emotion)
 
         # Add logging to trace decision-making
         self.logger.debug(f"Deciding for message: '{message}' with emotion: {emotion}")
-        self.logger.debug(f"Found {len(matched)} matching rules")
 
-        if not matched:
+        if top_rule is None:
             self.logger.info("No rule matched. Using default response.")
             return {"action": "respond_normally", "params": {}}
 
-        # Sort by weight (highest first)
-        matched.sort(key=lambda r: r.weight, reverse=True)
-        top_rule = matched[0]
-
         self.logger.info(f"Matched rule: {top_rule.to_dict()}")
         return {"action": top_rule.action, "params": top_rule.params}
     
@@ -137,6 +270,7 @@ class RobinDecisionEngine:
             if getattr(rule, 'id', None) == rule_id:
                 old_weight = rule.weight
                 rule.weight = max(0.1, rule.weight + delta)
+                self._index = None
                 self.logger.info(f"Updated rule {rule_id} weight: {old_weight} -> {rule.weight}")
                 return True
         return False
@@ -1,25 +1,59 @@
 """
 Rules Config Loader for Mashaaer Feelings Application
 Handles loading, saving, and management of decision rules
+
+With a RulesStore, the rules live in a database shared by all workers
+instead of rules_config.json (which then only seeds an empty store).
+Feedback weight changes are queued and written in batches, and a
+RulesReloader thread in each worker picks up changes by version and
+swaps a freshly indexed rule set into its decision engine.
 """
 import json
 import os
 import logging
+import threading
 from typing import Dict, List, Any, Optional
 
 logger = logging.getLogger(__name__)
 
+FEEDBACK_FACTORS = {'positive': 1.1, 'negative': 0.9}
+
+DEFAULT_RELOAD_INTERVAL = 2.0
+
 class RulesConfigLoader:
     """
     Manages the rules configuration for the decision engine
     Supports dynamic weight adjustments based on user feedback
     """
     
-    def __init__(self, config_path: str = 'rules_config.json'):
-        """Initialize the rules config loader"""
+    def __init__(self, config_path: str = 'rules_config.json', store=None):
+        """
+        Initialize the rules config loader
+        
+        Args:
+            config_path: Rules JSON file (the seed for an empty store, if one is given)
+            store: Optional RulesStore shared by all workers
+        """
         self.config_path = config_path
-        self.rules = self._load_rules()
-        logger.info(f"Loaded {len(self.rules)} rules from {config_path}")
+        self.store = store
+        self.version = None
+        self._lock = threading.Lock()
+        self._pending_factors: Dict[str, List[float]] = {}
+        
+        if store is not None:
+            self.attach_store(store)
+        else:
+            self.rules = self._load_rules()
+            logger.info(f"Loaded {len(self.rules)} rules from {config_path}")
+    
+    def attach_store(self, store):
+        """Switch to a RulesStore (seeding it from config_path if empty) and load its rules"""
+        if store.is_empty():
+            store.seed(self._load_rules())
+        with self._lock:
+            self.store = store
+            self.version, self.rules = store.load()
+        logger.info(f"Loaded {len(self.rules)} rules from the rules store (version {self.version})")
     
     def _load_rules(self) -> List[Dict[str, Any]]:
         """Load rules from the configuration file"""
@@ -140,25 +174,68 @@ class RulesConfigLoader:
         # Get current weight or default to 1.0
         current_weight = rule.get('weight', 1.0)
         
-        # Adjust weight based on feedback type
-        if feedback.lower() == 'positive':
-            # Increase weight by 10%
-            new_weight = current_weight * 1.1
-        elif feedback.lower() == 'negative':
-            # Decrease weight by 10%
-            new_weight = current_weight * 0.9
-        else:
+        # Adjust weight based on feedback type (+/- 10%)
+        factor = FEEDBACK_FACTORS.get(feedback.lower())
+        if factor is None:
             # Invalid feedback type
             logger.warning(f"Invalid feedback type: {feedback}")
             return False
         
         # Update rule weight
-        rule['weight'] = round(new_weight, 2)
+        rule['weight'] = round(current_weight * factor, 2)
         logger.info(f"Updated rule {rule_id} weight: {current_weight} -> {rule['weight']}")
         
+        if self.store is not None:
+            # Written to the store in the next batch (flush_weight_updates)
+            with self._lock:
+                self._pending_factors.setdefault(rule_id, []).append(factor)
+            return True
+        
         # Save updated rules
         return self._save_rules(self.rules)
     
+    def flush_weight_updates(self) -> int:
+        """
+        Write the queued feedback weight changes to the store in one transaction
+        
+        Returns:
+            Number of rules updated
+        """
+        if self.store is None:
+            return 0
+        with self._lock:
+            factors, self._pending_factors = self._pending_factors, {}
+        if not factors:
+            return 0
+        try:
+            return len(self.store.apply_weight_factors(factors))
+        except Exception as e:
+            logger.error(f"Error writing rule weight updates: {str(e)}")
+            # Keep them for the next flush
+            with self._lock:
+                for rule_id, rule_factors in factors.items():
+                    self._pending_factors[rule_id] = rule_factors + self._pending_factors.get(rule_id, [])
+            return 0
+    
+    def refresh(self) -> bool:
+        """
+        Reload the rules if the store's version changed
+        
+        Returns:
+            True if new rules were loaded
+        """
+        if self.store is None or self.store.version() == self.version:
+            return False
+        version, rules = self.store.load()
+        with self._lock:
+            # Keep this worker's queued feedback applied until it is flushed
+            for rule in rules:
+                for factor in self._pending_factors.get(rule.get('id'), []):
+                    rule['weight'] = round(rule.get('weight', 1.0) * factor, 2)
+        self.version, self.rules = version, rules
+        logger.info(f"Reloaded {len(rules)} rules from the rules store (version {version})")
+        return True
+    
     def add_rule(self, rule: Dict[str, Any]) -> bool:
         """Add a new rule to the configuration"""
         # Validate required fields
@@ -180,7 +257,7 @@ class RulesConfigLoader:
         
         # Add rule and save
         self.rules.append(rule)
-        return self._save_rules(self.rules)
+        return self._persist_rule(rule)
     
     def update_rule(self, rule_id: str, updated_data: Dict[str, Any]) -> bool:
         """Update an existing rule"""
@@ -195,7 +272,7 @@ class RulesConfigLoader:
                 rule[key] = value
         
         # Save updated rules
-        return self._save_rules(self.rules)
+        return self._persist_rule(rule)
     
     def delete_rule(self, rule_id: str) -> bool:
         """Delete a rule by ID"""
@@ -206,7 +283,95 @@ class RulesConfigLoader:
         
         # Remove rule and save
         self.rules = [r for r in self.rules if r.get('id') != rule_id]
+        if self.store is not None:
+            try:
+                self.store.delete_rule(rule_id)
+                return True
+            except Exception as e:
+                logger.error(f"Error deleting rule from the rules store: {str(e)}")
+                return False
         return self._save_rules(self.rules)
+    
+    def _persist_rule(self, rule: Dict[str, Any]) -> bool:
+        """Save one added or updated rule (to the store, or by rewriting the file)"""
+        if self.store is None:
+            return self._save_rules(self.rules)
+        # The saved record's weight already includes this worker's queued
+        # feedback for the rule, so those factors must not be applied again
+        with self._lock:
+            pending = self._pending_factors.pop(rule.get('id'), None)
+        try:
+            self.store.save_rule(rule)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving rule to the rules store: {str(e)}")
+            if pending:
+                with self._lock:
+                    self._pending_factors[rule['id']] = pending + self._pending_factors.get(rule['id'], [])
+            return False
+
+
+def rule_from_dict(rule_data: Dict[str, Any]):
+    """Build a decision engine Rule from its configuration dictionary"""
+    from rule_engine import Rule
+    
+    return Rule(
+        emotion=rule_data.get('emotion', 'neutral'),
+        keyword=rule_data.get('keyword', ''),
+        action=rule_data.get('action', 'respond_normally'),
+        params=rule_data.get('params', {}),
+        weight=rule_data.get('weight', 1.0),
+        description=rule_data.get('description', ''),
+        rule_id=rule_data.get('id'),
+        lang=rule_data.get('lang', 'en')
+    )
+
+
+class RulesReloader:
+    """
+    Keeps a worker's decision engine in sync with the shared rules store
+    
+    Every interval it flushes the loader's queued weight updates, and when
+    the store version has moved it reloads the rules, builds their index
+    and swaps them into the engine - all on a background thread, so
+    requests never wait for a reload.
+    """
+    
+    def __init__(self, loader: RulesConfigLoader, engine, interval: float = DEFAULT_RELOAD_INTERVAL):
+        self.loader = loader
+        self.engine = engine
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    def run_once(self) -> bool:
+        """Flush, then reload if needed; True if the engine got new rules"""
+        self.loader.flush_weight_updates()
+        if not self.loader.refresh():
+            return False
+        self.engine.replace_rules([rule_from_dict(rule_data) for rule_data in self.loader.rules])
+        return True
+    
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="rules-reloader", daemon=True)
+            self._thread.start()
+        return self._thread
+    
+    def stop(self, timeout: Optional[float] = 5.0):
+        """Stop the thread after a final flush"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.loader.flush_weight_updates()
+    
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Error reloading rules: {str(e)}")
 
 
 def load_rules_from_config(config_path: str = 'rules_config.json'):
@@ -219,7 +384,7 @@ def load_rules_from_config(config_path: str = 'rules_config.json'):
     Returns:
         Initialized RobinDecisionEngine with rules loaded from config
     """
-    from rule_engine import RobinDecisionEngine, Rule
+    from rule_engine import RobinDecisionEngine
     
     # Create a new decision engine
     engine = RobinDecisionEngine()
@@ -231,17 +396,7 @@ def load_rules_from_config(config_path: str = 'rules_config.json'):
             
         # Add each rule to the engine
         for rule_data in rules_data:
-            rule = Rule(
-                emotion=rule_data.get('emotion', 'neutral'),
-                keyword=rule_data.get('keyword', ''),
-                action=rule_data.get('action', 'respond_normally'),
-                params=rule_data.get('params', {}),
-                weight=rule_data.get('weight', 1.0),
-                description=rule_data.get('description', ''),
-                rule_id=rule_data.get('id'),
-                lang=rule_data.get('lang', 'en')
-            )
-            engine.add_rule(rule)
+            engine.add_rule(rule_from_dict(rule_data))
             
         logger.info(f"Loaded {len(rules_data)} rules from {config_path}")
     except Exception as e:
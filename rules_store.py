@@ -0,0 +1,168 @@
+"""
+Shared rules store for Mashaaer Feelings Application
+
+Keeps the decision rules in a SQLite table (WAL mode, so every worker
+process can read while one writes) together with a version counter that
+is bumped by every change. Workers poll the version (one primary-key
+read) and reload only when it moved; see RulesReloader in
+rules_config_loader.py.
+"""
+import json
+import logging
+import sqlite3
+import threading
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = 'rules_store.db'
+BUSY_TIMEOUT_MS = 5000
+
+
+class RulesStore:
+    """Rules and their version counter in a SQLite database shared by all workers"""
+
+    def __init__(self, db_path: str = DEFAULT_STORE_PATH):
+        """
+        Args:
+            db_path: SQLite database file (shared by every worker process)
+        """
+        self.db_path = db_path
+        self._local = threading.local()
+        self._create_schema()
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection to the store"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_MS / 1000)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        conn = self._connection()
+        with conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS rules (
+                    id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    weight REAL NOT NULL DEFAULT 1.0
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS rules_version (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    version INTEGER NOT NULL
+                )
+            ''')
+            conn.execute('INSERT OR IGNORE INTO rules_version (id, version) VALUES (1, 0)')
+
+    @staticmethod
+    def _bump_version(conn: sqlite3.Connection):
+        conn.execute('UPDATE rules_version SET version = version + 1 WHERE id = 1')
+
+    def version(self) -> int:
+        """Current version of the rule set"""
+        row = self._connection().execute('SELECT version FROM rules_version WHERE id = 1').fetchone()
+        return row[0] if row else 0
+
+    def is_empty(self) -> bool:
+        return self._connection().execute('SELECT 1 FROM rules LIMIT 1').fetchone() is None
+
+    def load(self) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Read the rule set and the version it corresponds to
+
+        Returns:
+            (version, rules)
+        """
+        conn = self._connection()
+        with conn:
+            # One read transaction, so the version matches the rows
+            conn.execute('BEGIN')
+            version = conn.execute('SELECT version FROM rules_version WHERE id = 1').fetchone()[0]
+            rows = conn.execute('SELECT data, weight FROM rules ORDER BY rowid').fetchall()
+
+        rules = []
+        for data, weight in rows:
+            rule = json.loads(data)
+            rule['weight'] = weight
+            rules.append(rule)
+        return version, rules
+
+    def seed(self, rules: List[Dict[str, Any]]) -> bool:
+        """Insert rules if the store is still empty (first worker to start wins)"""
+        conn = self._connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            if conn.execute('SELECT 1 FROM rules LIMIT 1').fetchone() is not None:
+                return False
+            conn.executemany(
+                'INSERT OR IGNORE INTO rules (id, data, weight) VALUES (?, ?, ?)',
+                [(rule['id'], json.dumps(rule, ensure_ascii=False), rule.get('weight', 1.0)) for rule in rules]
+            )
+            self._bump_version(conn)
+        logger.info(f"Seeded rules store with {len(rules)} rules")
+        return True
+
+    def save_rule(self, rule: Dict[str, Any]):
+        """Insert or replace one rule"""
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                '''INSERT INTO rules (id, data, weight) VALUES (?, ?, ?)
+                   ON CONFLICT (id) DO UPDATE SET data = excluded.data, weight = excluded.weight''',
+                (rule['id'], json.dumps(rule, ensure_ascii=False), rule.get('weight', 1.0))
+            )
+            self._bump_version(conn)
+
+    def delete_rule(self, rule_id: str) -> bool:
+        conn = self._connection()
+        with conn:
+            deleted = conn.execute('DELETE FROM rules WHERE id = ?', (rule_id,)).rowcount
+            if deleted:
+                self._bump_version(conn)
+        return deleted > 0
+
+    def apply_weight_factors(self, factors: Dict[str, List[float]]) -> Dict[str, float]:
+        """
+        Apply queued feedback to the stored weights in one transaction
+
+        Each factor is applied in turn to the current stored weight (which
+        may include other workers' feedback), rounding to 2 decimals as
+        RulesConfigLoader.adjust_rule_weight does.
+
+        Args:
+            factors: rule_id -> multiplicative factors in the order received
+
+        Returns:
+            rule_id -> new weight, for the rules that still exist
+        """
+        if not factors:
+            return {}
+        conn = self._connection()
+        weights = {}
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            for rule_id, rule_factors in factors.items():
+                row = conn.execute('SELECT weight FROM rules WHERE id = ?', (rule_id,)).fetchone()
+                if row is None:
+                    continue
+                weight = row[0]
+                for factor in rule_factors:
+                    weight = round(weight * factor, 2)
+                weights[rule_id] = weight
+            conn.executemany('UPDATE rules SET weight = ? WHERE id = ?',
+                             [(weight, rule_id) for rule_id, weight in weights.items()])
+            if weights:
+                self._bump_version(conn)
+        return weights
+
+    def close(self):
+        """Close this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,56 @@
+"""
+Backfill the Emotion Progress Aggregates
+
+record_emotion_interaction maintains per-user trigger counts and compiled
+achievement criteria incrementally. This script builds them from existing
+emotion entries and achievements; run it once after upgrading (it is safe
+to re-run to repair drift).
+
+    python scripts/backfill_progress_aggregates.py [--user-id ID]
+"""
+
+import os
+import sys
+import logging
+import argparse
+
+# Add parent directory to path so we can import project modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, db
+from models.emotion_progress import update_user_model
+from services.emotion_progress_service import EmotionProgressService
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Main entry point for the aggregate backfill"""
+    parser = argparse.ArgumentParser(description="Rebuild emotion progress aggregate tables")
+    parser.add_argument("--user-id", type=int, default=None, help="Only rebuild trigger counts for this user")
+    args = parser.parse_args()
+
+    update_user_model()
+    with app.app_context():
+        # Create the aggregate tables if they don't exist yet
+        db.create_all()
+
+        result = EmotionProgressService.rebuild_aggregates(args.user_id)
+        if "error" in result:
+            logger.error(f"Backfill failed: {result['error']}")
+            return 1
+
+        logger.info(
+            f"Backfill complete: {result['trigger_counts']} trigger counts, "
+            f"{result['achievement_criteria']} achievement criteria"
+        )
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,7 +10,7 @@ import json
 import logging
 from typing import List, Dict, Any, Optional, Tuple
 
-from sqlalchemy import func
+from sqlalchemy import func, or_
 from sqlalchemy.exc import SQLAlchemyError
 
 from main import db
@@ -22,8 +22,13 @@ from models.emotion_progress import (
     UserAchievement,
     UserLearningPathProgress,
     EmotionEntry,
+    EmotionTriggerCount,
+    AchievementCriteria,
+    UserProgressSnapshot,
     EmotionType,
-    ProgressLevel
+    ProgressLevel,
+    compile_achievement_criteria,
+    mark_progress_snapshots_stale
 )
 from models.user import User
 
@@ -158,6 +163,70 @@ class EmotionProgressService:
             logger.error(f"Error in get_user_progress: {str(e)}")
             return {"error": "An unexpected error occurred"}
     
+    @staticmethod
+    def get_progress_snapshot(user_id: int) -> Dict[str, Any]:
+        """
+        Get the user's progress as pre-serialized JSON plus an ETag
+        
+        Serves the materialized snapshot with a single primary-key lookup
+        and only rebuilds it (via get_user_progress) after a write marked
+        it stale. The ETag changes whenever the snapshot is invalidated.
+        
+        Args:
+            user_id: ID of the user
+            
+        Returns:
+            Dictionary with "json" (serialized progress) and "etag", or "error"
+        """
+        try:
+            snapshot = UserProgressSnapshot.query.get(user_id)
+            if snapshot and not snapshot.is_stale and snapshot.data:
+                return {"json": snapshot.data, "etag": f"{user_id}-{snapshot.version}"}
+            
+            if snapshot is None:
+                if User.query.get(user_id) is None:
+                    return {"error": "User not found"}
+                # Create a stale placeholder row before computing, so a write that
+                # commits while we compute has a row to invalidate
+                db.session.add(UserProgressSnapshot(
+                    user_id=user_id,
+                    version=1,
+                    is_stale=True,
+                    updated_at=datetime.datetime.utcnow()
+                ))
+                try:
+                    db.session.commit()
+                except SQLAlchemyError:
+                    # Another request created it first
+                    db.session.rollback()
+                snapshot = UserProgressSnapshot.query.get(user_id)
+            version = snapshot.version
+            
+            progress = EmotionProgressService.get_user_progress(user_id)
+            if "error" in progress:
+                return progress
+            data = json.dumps(progress)
+            
+            # Only store if no write invalidated the snapshot while we were computing
+            UserProgressSnapshot.query.filter_by(
+                user_id=user_id, version=version
+            ).update({
+                "is_stale": False,
+                "data": data,
+                "updated_at": datetime.datetime.utcnow()
+            }, synchronize_session=False)
+            db.session.commit()
+            
+            return {"json": data, "etag": f"{user_id}-{version}"}
+        
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"Database error in get_progress_snapshot: {str(e)}")
+            return {"error": "Database error occurred"}
+        except Exception as e:
+            logger.error(f"Error in get_progress_snapshot: {str(e)}")
+            return {"error": "An unexpected error occurred"}
+    
     @staticmethod
     def record_emotion_interaction(
         user_id: int, 
@@ -236,7 +305,7 @@ class EmotionProgressService:
             # Update most common trigger if provided
             if trigger:
                 progress.most_common_trigger = update_common_trigger(
-                    user_id, emotion_type, trigger
+                    user_id, emotion_type, trigger, progress.most_common_trigger
                 )
             
             # Update last interaction timestamp
@@ -258,10 +327,12 @@ class EmotionProgressService:
             
             # Check for achievements
             if correct:
-                earned_achievements = check_achievements(user_id, emotion_type, progress)
+                earned_achievements = check_achievements(user_id, emotion_type, progress, streak)
             
             # Generate insights if needed
-            insights = generate_insights(user_id, emotion_type)
+            insights = generate_insights(user_id, emotion_type, progress)
+            
+            invalidate_progress_snapshot(user_id)
             
             # Commit changes
             db.session.commit()
@@ -359,6 +430,8 @@ class EmotionProgressService:
                 progress.is_completed = True
                 progress.completed_at = datetime.datetime.utcnow()
             
+            invalidate_progress_snapshot(user_id)
+            
             # Commit changes
             db.session.commit()
             
@@ -461,6 +534,88 @@ class EmotionProgressService:
         except Exception as e:
             logger.error(f"Error in get_user_achievements: {str(e)}")
             return {"error": "An unexpected error occurred"}
+    
+    @staticmethod
+    def rebuild_aggregates(user_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Rebuild the incrementally maintained aggregates from existing data
+        
+        Recounts emotion_trigger_count (and most_common_trigger) from
+        EmotionEntry rows and recompiles achievement_criteria. Run once
+        after upgrading, or to repair drift:
+        
+            python scripts/backfill_progress_aggregates.py [--user-id ID]
+        
+        Args:
+            user_id: Only rebuild trigger counts for this user (default: all users)
+            
+        Returns:
+            Dictionary with the number of rows written
+        """
+        try:
+            # Trigger counts, one GROUP BY over the entries
+            counts_query = EmotionTriggerCount.query
+            entries_query = db.session.query(
+                EmotionEntry.user_id,
+                EmotionEntry.emotion_type,
+                EmotionEntry.trigger,
+                func.count(EmotionEntry.id)
+            ).filter(
+                EmotionEntry.trigger.isnot(None),
+                EmotionEntry.trigger != ""
+            )
+            progress_query = UserEmotionProgress.query
+            if user_id is not None:
+                counts_query = counts_query.filter_by(user_id=user_id)
+                entries_query = entries_query.filter(EmotionEntry.user_id == user_id)
+                progress_query = progress_query.filter_by(user_id=user_id)
+            counts_query.delete(synchronize_session=False)
+            
+            leaders = {}
+            trigger_rows = 0
+            for entry_user_id, emotion_type, trigger, count in entries_query.group_by(
+                EmotionEntry.user_id, EmotionEntry.emotion_type, EmotionEntry.trigger
+            ).order_by(func.min(EmotionEntry.id)):
+                db.session.add(EmotionTriggerCount(
+                    user_id=entry_user_id,
+                    emotion_type=emotion_type,
+                    trigger=trigger,
+                    count=count
+                ))
+                trigger_rows += 1
+                # Ties go to the trigger seen first, as in the original full recount
+                key = (entry_user_id, emotion_type)
+                if key not in leaders or count > leaders[key][1]:
+                    leaders[key] = (trigger, count)
+            
+            for progress in progress_query.all():
+                leader = leaders.get((progress.user_id, progress.emotion_type))
+                if leader:
+                    progress.most_common_trigger = leader[0]
+            
+            # Precompiled achievement criteria
+            AchievementCriteria.query.delete(synchronize_session=False)
+            criteria_rows = 0
+            for achievement in Achievement.query.all():
+                row = compile_achievement_criteria(achievement.id, achievement.emotion_type, achievement.criteria)
+                if row:
+                    db.session.add(AchievementCriteria(**row))
+                    criteria_rows += 1
+            
+            invalidate_progress_snapshot(user_id)
+            
+            db.session.commit()
+            logger.info(f"Rebuilt {trigger_rows} trigger counts and {criteria_rows} achievement criteria")
+            return {
+                "success": True,
+                "trigger_counts": trigger_rows,
+                "achievement_criteria": criteria_rows
+            }
+            
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"Database error in rebuild_aggregates: {str(e)}")
+            return {"error": "Database error occurred"}
 
 
 # Helper functions
@@ -487,33 +642,54 @@ def calculate_xp_award(correct: bool, intensity: Optional[float], current_level:
     return int(xp)
 
 
-def update_common_trigger(user_id: int, emotion_type: str, new_trigger: str) -> str:
-    """Update the most common trigger for an emotion"""
-    # Get all entries for this user and emotion
-    entries = EmotionEntry.query.filter_by(
+def invalidate_progress_snapshot(user_id: Optional[int]) -> None:
+    """
+    Mark a user's progress snapshot stale (all users if user_id is None)
+    
+    Runs on the session's connection, so the invalidation commits or rolls
+    back together with the write that caused it.
+    """
+    mark_progress_snapshots_stale(db.session.connection(), user_id)
+
+
+def update_common_trigger(user_id: int, emotion_type: str, new_trigger: str,
+                          current_trigger: Optional[str] = None) -> str:
+    """
+    Count a new trigger and return the most common trigger for an emotion
+    
+    Counts live in emotion_trigger_count, so this costs two indexed lookups
+    however many entries the user has: the new trigger takes over when its
+    count overtakes the current most common trigger's count.
+    """
+    counter = EmotionTriggerCount.query.filter_by(
         user_id=user_id,
-        emotion_type=emotion_type
-    ).all()
-    
-    # Count triggers
-    trigger_counts = {}
-    for entry in entries:
-        if entry.trigger:
-            trigger_counts[entry.trigger] = trigger_counts.get(entry.trigger, 0) + 1
+        emotion_type=emotion_type,
+        trigger=new_trigger
+    ).first()
     
-    # Add the new trigger
-    trigger_counts[new_trigger] = trigger_counts.get(new_trigger, 0) + 1
+    if not counter:
+        counter = EmotionTriggerCount(
+            user_id=user_id,
+            emotion_type=emotion_type,
+            trigger=new_trigger,
+            count=0
+        )
+        db.session.add(counter)
+    counter.count += 1
     
-    # Find the most common trigger
-    most_common = new_trigger
-    max_count = 0
+    if not current_trigger or current_trigger == new_trigger:
+        return new_trigger
     
-    for trigger, count in trigger_counts.items():
-        if count > max_count:
-            most_common = trigger
-            max_count = count
+    leader = EmotionTriggerCount.query.filter_by(
+        user_id=user_id,
+        emotion_type=emotion_type,
+        trigger=current_trigger
+    ).first()
     
-    return most_common
+    # Ties go to the trigger seen first (counter rows are created in that order)
+    if not leader or counter.count > leader.count or (counter.count == leader.count and counter.id < leader.id):
+        return new_trigger
+    return current_trigger
 
 
 def update_user_streak(user_id: int) -> EmotionStreak:
@@ -555,123 +731,81 @@ def update_user_streak(user_id: int) -> EmotionStreak:
 def check_achievements(
     user_id: int, 
     emotion_type: str,
-    progress: UserEmotionProgress
+    progress: UserEmotionProgress,
+    streak: Optional[EmotionStreak] = None
 ) -> List[Achievement]:
-    """Check if user qualifies for any achievements and award them"""
+    """
+    Check if user qualifies for any achievements and award them
+    
+    The precompiled achievement_criteria rows are filtered in SQL against
+    the user's current progress and streak, excluding achievements already
+    earned; only multi-emotion criteria are checked in Python.
+    """
     earned_achievements = []
     
-    # Get achievements the user doesn't have yet
-    existing_achievement_ids = [
-        ua.achievement_id for ua in UserAchievement.query.filter_by(user_id=user_id).all()
-    ]
-    
-    # Get potentially relevant achievements
-    achievements = Achievement.query.filter(
-        ~Achievement.id.in_(existing_achievement_ids if existing_achievement_ids else [0])
-    ).all()
-    
-    # Check each achievement
-    for achievement in achievements:
-        # Parse criteria from JSON
-        criteria = {}
-        if achievement.criteria:
-            try:
-                criteria = json.loads(achievement.criteria)
-            except json.JSONDecodeError:
-                logger.error(f"Invalid criteria JSON for achievement {achievement.id}")
+    if streak is None:
+        streak = EmotionStreak.query.filter_by(user_id=user_id).first()
+    current_streak = streak.current_streak if streak else 0
+    
+    already_earned = db.session.query(UserAchievement.id).filter(
+        UserAchievement.user_id == user_id,
+        UserAchievement.achievement_id == AchievementCriteria.achievement_id
+    ).exists()
+    
+    candidates = db.session.query(Achievement, AchievementCriteria).join(
+        AchievementCriteria, Achievement.id == AchievementCriteria.achievement_id
+    ).filter(
+        or_(AchievementCriteria.emotion_type.is_(None), AchievementCriteria.emotion_type == emotion_type),
+        or_(AchievementCriteria.min_level.is_(None), AchievementCriteria.min_level <= progress.level),
+        or_(AchievementCriteria.min_accuracy.is_(None), AchievementCriteria.min_accuracy <= progress.accuracy_rate),
+        or_(AchievementCriteria.min_interactions.is_(None),
+            AchievementCriteria.min_interactions <= progress.interactions_count),
+        or_(AchievementCriteria.min_streak.is_(None), AchievementCriteria.min_streak <= current_streak),
+        ~already_earned
+    ).order_by(Achievement.id).all()
+    
+    # Levels of the user's emotions (one row per emotion type), loaded only if needed
+    emotion_levels = None
+    
+    for achievement, criteria in candidates:
+        # Check multi-emotion criteria
+        if criteria.emotions_at_level is not None:
+            if emotion_levels is None:
+                emotion_levels = [
+                    level for (level,) in db.session.query(UserEmotionProgress.level).filter_by(user_id=user_id)
+                ]
+            emotions_at_level = sum(1 for level in emotion_levels if level >= criteria.emotions_at_level)
+            if emotions_at_level < criteria.emotions_at_level_count:
                 continue
         
-        # Check if criteria are met
-        if meets_achievement_criteria(user_id, achievement, criteria, emotion_type, progress):
-            # Award the achievement
-            user_achievement = UserAchievement(
-                user_id=user_id,
-                achievement_id=achievement.id,
-                earned_at=datetime.datetime.utcnow()
-            )
-            db.session.add(user_achievement)
-            earned_achievements.append(achievement)
+        # Award the achievement
+        user_achievement = UserAchievement(
+            user_id=user_id,
+            achievement_id=achievement.id,
+            earned_at=datetime.datetime.utcnow()
+        )
+        db.session.add(user_achievement)
+        earned_achievements.append(achievement)
     
     return earned_achievements
 
 
-def meets_achievement_criteria(
+def generate_insights(
     user_id: int,
-    achievement: Achievement,
-    criteria: Dict[str, Any],
-    current_emotion: str,
-    progress: UserEmotionProgress
-) -> bool:
-    """Check if a user meets the criteria for an achievement"""
-    if not criteria:
-        return False
-    
-    # Check emotion-specific criteria
-    if achievement.emotion_type and achievement.emotion_type != current_emotion:
-        return False
-    
-    # Check level criteria
-    if "min_level" in criteria:
-        min_level = criteria["min_level"]
-        if progress.level < min_level:
-            return False
-    
-    # Check accuracy criteria
-    if "min_accuracy" in criteria:
-        min_accuracy = criteria["min_accuracy"]
-        if progress.accuracy_rate < min_accuracy:
-            return False
-    
-    # Check interaction count criteria
-    if "min_interactions" in criteria:
-        min_interactions = criteria["min_interactions"]
-        if progress.interactions_count < min_interactions:
-            return False
-    
-    # Check streak criteria
-    if "min_streak" in criteria:
-        min_streak = criteria["min_streak"]
-        streak = EmotionStreak.query.filter_by(user_id=user_id).first()
-        if not streak or streak.current_streak < min_streak:
-            return False
-    
-    # Check multi-emotion criteria
-    if "emotions_at_level" in criteria:
-        required_level = criteria["emotions_at_level"]["level"]
-        required_count = criteria["emotions_at_level"]["count"]
-        
-        emotions_at_level = UserEmotionProgress.query.filter_by(
-            user_id=user_id
-        ).filter(
-            UserEmotionProgress.level >= required_level
-        ).count()
-        
-        if emotions_at_level < required_count:
-            return False
-    
-    # All criteria passed
-    return True
-
-
-def generate_insights(user_id: int, emotion_type: str) -> List[EmotionInsight]:
+    emotion_type: str,
+    progress: Optional[UserEmotionProgress] = None
+) -> List[EmotionInsight]:
     """Generate insights based on user's emotional data"""
     # Get progress record
-    progress = UserEmotionProgress.query.filter_by(
-        user_id=user_id,
-        emotion_type=emotion_type
-    ).first()
+    if progress is None:
+        progress = UserEmotionProgress.query.filter_by(
+            user_id=user_id,
+            emotion_type=emotion_type
+        ).first()
     
     if not progress:
         return []
     
-    # Get recent entries
-    recent_entries = EmotionEntry.query.filter_by(
-        user_id=user_id,
-        emotion_type=emotion_type
-    ).order_by(
-        EmotionEntry.created_at.desc()
-    ).limit(10).all()
-    
     insights = []
     
     # Generate insights based on patterns
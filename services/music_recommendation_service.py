@@ -13,6 +13,8 @@ from typing import Dict, List, Any, Optional
 
 import requests
 
+from completion_cache import CompletionCache, get_completion_cache
+
 # Define emotion types directly to avoid circular imports
 import enum
 
@@ -33,6 +35,9 @@ logger = logging.getLogger(__name__)
 # OpenAI API key
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 
+# Call-site name in the shared completion cache
+RECOMMENDATIONS_CACHE_SITE = "music_recommendations"
+
 
 class MusicRecommendationService:
     """Service for providing mood-based music recommendations"""
@@ -495,27 +500,37 @@ class MusicRecommendationService:
                 "response_format": {"type": "json_object"}
             }
             
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=payload
+            # Identical prompts are answered from the shared completion cache
+            cache = get_completion_cache()
+            cache_key = CompletionCache.key(
+                payload["model"], payload["messages"][0]["content"], prompt, None, None
             )
+            cached = cache.get(cache_key, RECOMMENDATIONS_CACHE_SITE)
+            if cached is not None:
+                content = cached["content"]
+            else:
+                response = requests.post(
+                    "https://api.openai.com/v1/chat/completions",
+                    headers=headers,
+                    json=payload
+                )
+                if response.status_code != 200:
+                    logger.error(f"OpenAI API error: {response.status_code} - {response.text}")
+                    # Fallback to sample playlists if API call fails
+                    return MusicRecommendationService._get_sample_playlists(emotion, limit)
+                content = response.json()["choices"][0]["message"]["content"]
             
-            if response.status_code == 200:
-                result = response.json()
-                playlists_json = json.loads(result["choices"][0]["message"]["content"])
-                
-                # Extract playlists array if nested
-                if "playlists" in playlists_json:
-                    playlists = playlists_json["playlists"]
-                else:
-                    playlists = playlists_json
-                
-                return playlists[:limit]
+            playlists_json = json.loads(content)
+            if cached is None:
+                cache.put(cache_key, {"content": content}, RECOMMENDATIONS_CACHE_SITE)
+            
+            # Extract playlists array if nested
+            if "playlists" in playlists_json:
+                playlists = playlists_json["playlists"]
             else:
-                logger.error(f"OpenAI API error: {response.status_code} - {response.text}")
-                # Fallback to sample playlists if API call fails
-                return MusicRecommendationService._get_sample_playlists(emotion, limit)
+                playlists = playlists_json
+            
+            return playlists[:limit]
         
         except Exception as e:
             logger.error(f"Error generating AI recommendations: {str(e)}")
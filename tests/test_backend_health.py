@@ -0,0 +1,111 @@
+"""
+Tests for cached backend health, the circuit breaker, and the AI model
+router's pooled Ollama session.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ai_model_router import AIModelRouter
+from backend_health import BackendHealth, CircuitBreaker
+
+
+class _StubOllama(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    ports = []
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.ports.append(self.client_address[1])
+        self._reply(200, {"models": [{"name": "openchat:latest"}, {"name": "llama3:8b"}]})
+
+    def do_POST(self):
+        self.ports.append(self.client_address[1])
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if request["prompt"] == "fail":
+            self._reply(503, {"error": "overloaded"})
+        else:
+            self._reply(200, {"response": f"echo {request['prompt']}", "done": True})
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_ollama(monkeypatch):
+    _StubOllama.ports = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setenv("MODEL_BACKEND", "ollama")
+    monkeypatch.setenv("OLLAMA_BASE_URL", base_url)
+    yield base_url
+    server.shutdown()
+    server.server_close()
+
+
+def test_breaker_opens_after_threshold_and_probes_after_timeout():
+    calls = []
+    health = BackendHealth("test", probe=lambda: calls.append(1) or True,
+                           interval=3600, failure_threshold=2, reset_timeout=0.05)
+    assert health.is_available()
+    assert len(calls) == 1
+    assert health.is_available()
+    assert len(calls) == 1  # cached
+
+    health.record_failure()
+    assert health.is_available()
+    health.record_failure()
+    assert health.breaker.state == CircuitBreaker.OPEN
+    assert not health.is_available()
+    assert len(calls) == 1  # fails fast without probing
+
+    threading.Event().wait(0.06)
+    assert health.is_available()  # probe due, and it succeeds
+    assert len(calls) == 2
+    assert health.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_probe_keeps_circuit_open():
+    health = BackendHealth("test", probe=lambda: False, interval=3600,
+                           failure_threshold=1, reset_timeout=0.05)
+    health.record_failure()
+    threading.Event().wait(0.06)
+    assert not health.is_available()
+    assert health.breaker.is_open()  # re-opened for another reset_timeout
+
+
+def test_health_without_probe_follows_request_outcomes():
+    health = BackendHealth("openai", failure_threshold=1, reset_timeout=60)
+    assert health.is_available()
+    health.record_failure()
+    assert not health.is_available()
+    assert health.status()["circuit"] == CircuitBreaker.OPEN
+
+
+def test_router_reuses_connection_and_cached_models(stub_ollama):
+    router = AIModelRouter()
+    assert router.is_ollama_running()
+    for i in range(3):
+        result = router.complete_with_ollama(f"hi {i}")
+        assert result["success"] and result["content"] == f"echo hi {i}"
+
+    assert router.get_available_models()["ollama"] == ["openchat"]
+    assert len(_StubOllama.ports) == 4  # one probe, three generations
+    assert len(set(_StubOllama.ports)) == 1  # all on one keep-alive connection
+
+    for _ in range(3):
+        assert router.complete_with_ollama("fail")["error"] == "overloaded"
+    result = router.complete_with_ollama("hi")
+    assert result["error_type"] == "service_unavailable"
+    assert len(_StubOllama.ports) == 7  # the last call failed fast
+    assert router.get_status()["backend_health"]["ollama"]["circuit"] == CircuitBreaker.OPEN
@@ -0,0 +1,128 @@
+"""
+Tests for the prompt-keyed LLM completion cache and its use by
+AIModelRouter and IdiomTranslator.
+"""
+import pytest
+
+import completion_cache as completion_cache_module
+from ai_model_router import AIModelRouter
+from completion_cache import CompletionCache, get_completion_cache
+from database.db_manager import DatabaseManager
+from idiom_translator import IdiomTranslator
+
+TRANSLATION = '{"translated_idiom": "على سحابة", "emotional_meaning": "Very happy"}'
+
+
+class _CacheConfig:
+    USE_POSTGRES = False
+    DATABASE_URL = ""
+    CACHE_HIT_FLUSH_INTERVAL = 3600
+    LLM_CACHE_MAX_ENTRIES = 16
+
+
+@pytest.fixture
+def manager(tmp_path):
+    db_manager = DatabaseManager(config=_CacheConfig(), db_path=str(tmp_path / "completions.db"))
+    db_manager.initialize_db()
+    yield db_manager
+    db_manager.stop_cache_flusher()
+
+
+@pytest.fixture
+def router(monkeypatch):
+    """Router using a fresh shared cache, with a counting fake Ollama completion"""
+    monkeypatch.setattr(completion_cache_module, "completion_cache", None)
+    monkeypatch.setenv("MODEL_BACKEND", "ollama")
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    router = AIModelRouter()
+    router.calls = []
+
+    def complete(prompt, model, system_prompt=None, temperature=0.7, max_tokens=1000, stream=False):
+        router.calls.append(prompt)
+        return {"success": True, "content": TRANSLATION, "model": model}
+
+    monkeypatch.setattr(router, "is_ollama_running", lambda: True)
+    monkeypatch.setattr(router, "complete_with_ollama", complete)
+    return router
+
+
+def test_key_covers_every_input():
+    base = CompletionCache.key("gpt-4o", "system", "prompt", 0.7, 500)
+    assert CompletionCache.key("gpt-4o", "system", "prompt", 0.7, 500) == base
+    assert CompletionCache.key("openchat", "system", "prompt", 0.7, 500) != base
+    assert CompletionCache.key("gpt-4o", None, "prompt", 0.7, 500) != base
+    assert CompletionCache.key("gpt-4o", "system", "prompt ", 0.7, 500) != base
+    assert CompletionCache.key("gpt-4o", "system", "prompt", 0.2, 500) != base
+    assert CompletionCache.key("gpt-4o", "system", "prompt", 0.7, 100) != base
+
+
+def test_lru_bound_and_site_hit_rates():
+    cache = CompletionCache(max_entries=2)
+    cache.put("a", {"content": "1"}, "x")
+    cache.put("b", {"content": "2"}, "x")
+    assert cache.get("a", "x") == {"content": "1"}
+    cache.put("c", {"content": "3"}, "y")
+
+    assert cache.get("b", "x") is None
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 1
+    assert stats["sites"]["x"]["hit_rate"] == 0.5
+    assert stats["hit_rate"] == 0.5
+
+
+def test_completions_persist_across_workers(manager):
+    first = CompletionCache(db_manager=manager)
+    first.put("k", {"content": "hello"}, "site")
+
+    second = CompletionCache(db_manager=manager)
+    assert second.get("k", "site") == {"content": "hello"}
+    assert second.stats()["persistent_hits"] == 1
+    assert second.get("k", "site") == {"content": "hello"}
+    assert second.stats()["hits"] == 1
+
+
+def test_shared_cache_takes_settings_from_config(manager, monkeypatch):
+    monkeypatch.setattr(completion_cache_module, "completion_cache", None)
+    cache = get_completion_cache()
+    assert cache.db_manager is None
+    assert get_completion_cache(manager) is cache
+    assert cache.db_manager is manager
+
+    monkeypatch.setattr(completion_cache_module, "completion_cache", None)
+    assert get_completion_cache(manager).max_entries == 16
+
+
+def test_generate_response_caches_only_opted_in_calls(router):
+    router.generate_response("hi")
+    router.generate_response("hi")
+    assert len(router.calls) == 2
+
+    first = router.generate_response("hi", cache_site="test")
+    second = router.generate_response("hi", cache_site="test")
+    assert len(router.calls) == 3
+    assert "cached" not in first and second["cached"]
+    assert second["content"] == first["content"]
+    assert router.get_status()["completion_cache"]["sites"]["test"]["hits"] == 1
+
+
+def test_fallback_replies_are_not_cached(router, monkeypatch):
+    router.openai_api_key = "test-key"
+    monkeypatch.setattr(router, "complete_with_ollama", lambda **kwargs: {"success": False, "error": "down"})
+    monkeypatch.setattr(router, "complete_with_openai",
+                        lambda **kwargs: {"success": True, "content": "from openai", "model": "gpt-4o"})
+
+    assert router.generate_response("hi", cache_site="test")["fallback"]
+    assert "cached" not in router.generate_response("hi", cache_site="test")
+    assert router.completion_cache.get(router._completion_key("hi", None, None, 0.7, 1000), "test") is None
+
+
+def test_idiom_translations_share_the_cache(router):
+    translator = IdiomTranslator(router)
+    first = translator.translate_idiom("on cloud nine", "en", "ar")
+    assert first["translated_idiom"] == "على سحابة"
+
+    # A second translator (e.g. another worker's) reuses the completion
+    again = IdiomTranslator(router).translate_idiom("on cloud nine", "en", "ar")
+    assert again == first
+    assert len(router.calls) == 1
+    assert router.completion_cache.stats()["sites"]["idiom_translation"]["hits"] == 1
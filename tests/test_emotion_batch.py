@@ -0,0 +1,93 @@
+"""
+Tests for EmotionTracker.analyze_batch.
+"""
+import pytest
+
+import emotion_tracker
+from emotion_tracker import EmotionTracker
+
+TEXTS = [
+    "I am so happy and grateful for this wonderful day",
+    "I'm not happy about this, it is really frustrating",
+    "I feel excited but also nervous about the interview",
+    "This is extremely sad news",
+    "Just another ordinary afternoon",
+]
+
+
+@pytest.fixture
+def tracker(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(emotion_tracker, "OPENAI_AVAILABLE", False)
+    return EmotionTracker(None)
+
+
+def _same_result(single, batched):
+    assert batched["primary_emotion"] == single["primary_emotion"]
+    assert batched["emotions"] == pytest.approx(single["emotions"])
+    assert batched["intensity"] == pytest.approx(single["intensity"])
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_single_text_batch_matches_analyze_text_advanced(tracker, text):
+    context = ["I was worried yesterday"]
+
+    tracker.trend_data = {}
+    single = tracker.analyze_text_advanced(text, context)
+    tracker.trend_data = {}
+    batched = tracker.analyze_batch([text], [context])
+
+    _same_result(single, batched[0])
+
+
+def test_batch_keeps_order_and_dedupes(tracker):
+    texts = TEXTS + [TEXTS[0].upper(), "", None, TEXTS[3]]
+    results, timings = tracker.analyze_batch(texts, return_timings=True)
+
+    assert len(results) == len(texts)
+    assert results[5] == results[0] and results[5] is not results[0]
+    assert results[8] == results[3]
+    results[5]["metadata"]["mixed_emotion_info"]["top_emotions"].clear()
+    assert results[0]["metadata"]["mixed_emotion_info"]["top_emotions"]
+    assert results[6]["primary_emotion"] == "neutral"
+    assert results[7]["primary_emotion"] == "neutral"
+    assert {"normalize_ms", "scan_ms", "keyword_matrix_ms", "score_ms", "finalize_ms", "total_ms"} <= set(timings)
+
+
+def test_batch_rejects_contexts_of_another_length(tracker):
+    with pytest.raises(ValueError):
+        tracker.analyze_batch(TEXTS[:2], [["hello"]])
+
+
+def test_batch_records_every_text_in_trend_data(tracker):
+    tracker.trend_data = {}
+    tracker.analyze_batch(TEXTS + TEXTS)
+
+    assert sum(len(entries) for entries in tracker.trend_data.values()) == 2 * len(TEXTS)
+
+
+def test_empty_batch(tracker):
+    assert tracker.analyze_batch([]) == []
+
+
+def test_worker_pool_matches_in_process_scoring(tracker):
+    class _Config:
+        EMOTION_BATCH_WORKERS = 2
+        EMOTION_BATCH_PROCESS_THRESHOLD = 2
+
+    class _Manager:
+        config = _Config()
+
+    tracker.trend_data = {}
+    expected = tracker.analyze_batch(TEXTS)
+
+    tracker.db_manager = _Manager()
+    tracker.trend_data = {}
+    try:
+        pooled, timings = tracker.analyze_batch(TEXTS, return_timings=True)
+    finally:
+        tracker._shutdown_batch_pool()
+
+    for single, batched in zip(expected, pooled):
+        _same_result(single, batched)
+    assert {"scan_ms", "keyword_matrix_ms", "context_ms", "score_ms"} <= set(timings)
@@ -0,0 +1,77 @@
+"""
+Tests for the precomputed emotion synonym lexicon.
+"""
+import json
+import threading
+from unittest.mock import patch
+
+import pytest
+
+import emotion_tracker
+from emotion_lexicon import (
+    LEXICON_VERSION, build_lexicon, keywords_fingerprint, load_lexicon, save_lexicon
+)
+from emotion_tracker import EmotionTracker
+
+
+def _fake_synonyms(keyword, depth, emotion):
+    return [f"{keyword}ish", f"{emotion}y", "shared"]
+
+
+def test_build_save_load_roundtrip(tmp_path):
+    keywords = {"happy": {"glad": 0.9}, "amused": {"funny": 0.8}, "legacy": ["meh"]}
+    calls = []
+
+    def synonyms(keyword, depth, emotion):
+        calls.append((keyword, depth, emotion))
+        return _fake_synonyms(keyword, depth, emotion)
+
+    lexicon = build_lexicon(keywords, synonyms)
+    path = str(tmp_path / "lexicon.json")
+    save_lexicon(lexicon, path)
+    loaded = load_lexicon(path)
+
+    assert calls == [("glad", 1, "happy"), ("funny", 2, "amused")]
+    assert sorted(loaded.get("glad", "happy")) == ["gladish", "happyy", "shared"]
+    assert loaded.get("glad", "sad") is None
+    assert loaded.get("meh", "legacy") is None
+    # Shared synonyms are stored once
+    assert loaded.terms.count("shared") == 1
+    assert loaded.fingerprint == keywords_fingerprint(keywords)
+    assert len(loaded) == 2
+    assert [entry.name for entry in tmp_path.iterdir()] == ["lexicon.json"]  # no temp file left
+
+
+def test_concurrent_saves_use_their_own_temp_files(tmp_path):
+    path = str(tmp_path / "lexicon.json")
+    lexicons = [build_lexicon({"happy": {f"glad{i}": 0.9}}, _fake_synonyms) for i in range(8)]
+    threads = [threading.Thread(target=save_lexicon, args=(lexicon, path)) for lexicon in lexicons]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert load_lexicon(path).fingerprint in {lexicon.fingerprint for lexicon in lexicons}
+    assert [entry.name for entry in tmp_path.iterdir()] == ["lexicon.json"]
+
+
+def test_load_ignores_missing_or_outdated_files(tmp_path):
+    assert load_lexicon(str(tmp_path / "missing.json")) is None
+
+    path = tmp_path / "old.json"
+    path.write_text(json.dumps({"version": LEXICON_VERSION + 1, "terms": [], "synonyms": {}}))
+    assert load_lexicon(str(path)) is None
+
+
+def test_tracker_uses_lexicon_instead_of_wordnet(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with patch.object(emotion_tracker, "_get_synonyms", return_value=[]):
+        keywords = EmotionTracker(None).emotion_keywords
+
+    save_lexicon(build_lexicon(keywords, _fake_synonyms), str(tmp_path / "emotion_data" / "synonym_lexicon.json"))
+
+    with patch.object(emotion_tracker, "_get_synonyms", side_effect=AssertionError("WordNet used")):
+        tracker = EmotionTracker(None)
+
+    assert tracker.synonym_lexicon is not None
+    assert tracker._matcher.term_weights["gladish"] == pytest.approx({"happy": 0.9 * 0.7})
@@ -0,0 +1,247 @@
+"""
+Tests for the batched, write-behind emotion event logger.
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+
+from database.emotion_rollup import query_daily_rollups
+from database.models import EmotionDailyRollup
+from emotion_log_writer import EmotionLogWriter
+
+
+class _SqliteManager:
+    """Minimal stand-in for DatabaseManager backed by a SQLite file"""
+
+    use_postgres = False
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE emotion_data (timestamp TEXT, emotion TEXT, source TEXT, "
+                     "intensity REAL, text TEXT, session_id TEXT)")
+        conn.execute("CREATE TABLE emotions (emotion TEXT, text TEXT, timestamp TEXT, "
+                     "source TEXT, intensity REAL)")
+        conn.commit()
+        conn.close()
+        EmotionDailyRollup.__table__.create(create_engine(f"sqlite:///{path}"))
+
+    def get_connection(self):
+        if not hasattr(self._local, "conn"):
+            self._local.conn = sqlite3.connect(self.path)
+        return self._local.conn
+
+    def execute_query(self, query, params=None):
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute(query, params or ()).fetchall()
+        finally:
+            conn.close()
+
+    def count(self, table):
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        finally:
+            conn.close()
+
+
+def _event(i, day="2026-01-02", emotion="happy", session_id="s1"):
+    return {
+        "emotion": emotion,
+        "text": f"message {i}",
+        "timestamp": f"{day}T10:00:{i % 60:02d}",
+        "source": "text",
+        "intensity": 0.5,
+        "session_id": session_id,
+    }
+
+
+@pytest.fixture
+def db(tmp_path):
+    return _SqliteManager(str(tmp_path / "emotions.db"))
+
+
+def test_flush_writes_queued_events_to_both_tables(db, tmp_path):
+    writer = EmotionLogWriter(db, data_dir=str(tmp_path), max_latency=60)
+    try:
+        for i in range(5):
+            assert writer.log(_event(i))
+        assert writer.flush()
+
+        assert db.count("emotion_data") == 5
+        assert db.count("emotions") == 5
+        assert writer.stats()["batches_written"] == 1
+    finally:
+        writer.close()
+
+
+def test_batches_are_capped_by_size(db, tmp_path):
+    writer = EmotionLogWriter(db, data_dir=str(tmp_path), max_latency=60, max_batch_size=4)
+    try:
+        for i in range(10):
+            writer.log(_event(i))
+        writer.flush()
+
+        assert writer.stats()["events_written"] == 10
+        assert writer.stats()["batches_written"] == 3
+    finally:
+        writer.close()
+
+
+def test_backup_is_appended_as_daily_jsonl(db, tmp_path):
+    writer = EmotionLogWriter(db, data_dir=str(tmp_path), max_latency=60)
+    try:
+        writer.log(_event(1, day="2026-01-02"))
+        writer.log(_event(2, day="2026-01-03"))
+        writer.flush()
+        writer.log(_event(3, day="2026-01-02"))
+        writer.flush()
+    finally:
+        writer.close()
+
+    with open(os.path.join(str(tmp_path), "emotions_2026-01-02.jsonl")) as f:
+        lines = [json.loads(line) for line in f]
+    assert [entry["text"] for entry in lines] == ["message 1", "message 3"]
+    assert os.path.exists(os.path.join(str(tmp_path), "emotions_2026-01-03.jsonl"))
+
+
+def test_events_are_written_after_max_latency(db, tmp_path):
+    writer = EmotionLogWriter(db, data_dir=str(tmp_path), max_latency=0.05)
+    try:
+        writer.log(_event(1))
+        writer._thread.join(0.5)
+        assert db.count("emotions") == 1
+    finally:
+        writer.close()
+
+
+def test_close_drains_pending_events_and_rejects_new_ones(db, tmp_path):
+    writer = EmotionLogWriter(db, data_dir=str(tmp_path), max_latency=60)
+    writer.log(_event(1))
+    writer.close()
+
+    assert db.count("emotions") == 1
+    assert not writer.log(_event(2))
+
+
+def test_timestamps_are_stored_in_sortable_datetime_format(db, tmp_path):
+    writer = EmotionLogWriter(db, data_dir=str(tmp_path), max_latency=60)
+    try:
+        writer.log(_event(7))
+        writer.flush()
+    finally:
+        writer.close()
+
+    rows = db.execute_query("SELECT timestamp FROM emotion_data UNION ALL SELECT timestamp FROM emotions")
+    assert rows == [("2026-01-02 10:00:07.000000",), ("2026-01-02 10:00:07.000000",)]
+
+
+def test_daily_rollup_is_maintained_across_batches(db, tmp_path):
+    writer = EmotionLogWriter(db, data_dir=str(tmp_path), max_latency=60)
+    try:
+        writer.log(_event(1))
+        writer.log(_event(2, session_id="s2"))
+        writer.log(_event(3, emotion="sad", session_id=None))
+        writer.flush()
+        writer.log(_event(4))
+        writer.log(_event(5, day="2026-01-03"))
+        writer.flush()
+    finally:
+        writer.close()
+
+    rows = db.execute_query(
+        "SELECT day, session_id, emotion, event_count, intensity_sum FROM emotion_daily_rollup "
+        "ORDER BY day, session_id, emotion"
+    )
+    assert rows == [
+        ("2026-01-02", "", "sad", 1, 0.5),
+        ("2026-01-02", "s1", "happy", 2, 1.0),
+        ("2026-01-02", "s2", "happy", 1, 0.5),
+        ("2026-01-03", "s1", "happy", 1, 0.5),
+    ]
+
+    assert query_daily_rollups(db, date(2026, 1, 2)) == [
+        ("2026-01-02", "happy", 3, 1.5),
+        ("2026-01-02", "sad", 1, 0.5),
+        ("2026-01-03", "happy", 1, 0.5),
+    ]
+    assert query_daily_rollups(db, date(2026, 1, 3), session_id="s1") == [("2026-01-03", "happy", 1, 0.5)]
+
+
+class _AutocommitConnection:
+    """sqlite3 connection with a psycopg2-style autocommit switch"""
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+
+    @property
+    def autocommit(self):
+        return self._conn.isolation_level is None
+
+    @autocommit.setter
+    def autocommit(self, value):
+        self._conn.isolation_level = None if value else "DEFERRED"
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def test_failed_rollup_rolls_back_events_on_autocommit_connections(db, tmp_path, monkeypatch):
+    conn = _AutocommitConnection(db.path)
+    monkeypatch.setattr(db, "get_connection", lambda: conn)
+
+    def fail(cursor, events, use_postgres):
+        raise RuntimeError("rollup failed")
+
+    monkeypatch.setattr("emotion_log_writer.upsert_daily_rollups", fail)
+    writer = EmotionLogWriter(db, data_dir=str(tmp_path), max_latency=60)
+    try:
+        writer.log(_event(1))
+        writer.flush()
+    finally:
+        writer.close()
+
+    assert writer.stats()["failed_batches"] == 1
+    assert db.count("emotion_data") == 0 and db.count("emotions") == 0
+    assert conn.autocommit
+
+
+def test_log_drops_events_instead_of_blocking_when_the_writer_stalls(db, tmp_path, monkeypatch):
+    stalled = threading.Event()
+    connect = db.get_connection
+    monkeypatch.setattr(db, "get_connection", lambda: stalled.wait(5) and connect())
+    writer = EmotionLogWriter(db, data_dir=str(tmp_path), max_latency=0, max_queue_size=1)
+    try:
+        assert writer.log(_event(1))
+        while writer.stats()["pending"]:  # worker picked it up and is stuck writing
+            threading.Event().wait(0.01)
+        assert writer.log(_event(2))
+        assert not writer.log(_event(3))
+        assert writer.stats()["dropped_events"] == 1
+
+        stalled.set()
+        assert writer.flush()
+        assert db.count("emotions") == 2
+    finally:
+        writer.close()
+
+
+def test_history_reads_see_events_logged_just_before(db, tmp_path, monkeypatch):
+    import emotion_tracker
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(emotion_tracker, "OPENAI_AVAILABLE", False)
+    tracker = emotion_tracker.EmotionTracker(None)
+    tracker.db_manager = db
+    try:
+        assert tracker.log_emotion("happy", "great news", session_id="s9")
+        history = tracker.get_session_emotion_history("s9")
+        assert history["distribution"] == {"happy": 1}
+    finally:
+        tracker.emotion_log_writer.close()
@@ -0,0 +1,87 @@
+"""
+Tests for the compiled keyword/synonym/phrase matcher used by the
+rule-based emotion analysis.
+"""
+import re
+
+import pytest
+
+from emotion_matcher import EmotionMatcher, PhraseAutomaton
+
+KEYWORDS = {
+    "happy": {"happy": 1.0, "glad": 0.9},
+    "sad": {"sad": 1.0, "down": 0.7},
+    "contemplative": {"pondering": 0.9},
+    "legacy": ["meh"],
+}
+
+SYNONYMS = {
+    "happy": ["glad", "felicitous", "well-chosen"],
+    "glad": ["happy", "beaming"],
+    "sad": ["deplorable", "Sorry"],
+    "down": ["depressed", "glad"],
+    "pondering": ["musing", "deal with"],
+}
+
+
+def _lookup(keyword, depth, emotion):
+    return [syn for syn in SYNONYMS.get(keyword, []) if syn != keyword]
+
+
+@pytest.fixture
+def matcher():
+    return EmotionMatcher(KEYWORDS, _lookup, phrases=["off guard", "caught me off guard", "or", "Made My Day"])
+
+
+def test_automaton_reports_overlapping_and_nested_phrases():
+    automaton = PhraseAutomaton(["he", "she", "his", "hers", "thought", "thought-provoking"])
+    found = automaton.find_all("ushers thought-provoking")
+    assert found == {"he", "she", "hers", "thought", "thought-provoking"}
+
+
+def test_automaton_reports_start_offsets():
+    automaton = PhraseAutomaton(["ab", "b"])
+    assert sorted(automaton.iter_matches("abab")) == [(0, "ab"), (1, "b"), (2, "ab"), (3, "b")]
+
+
+def test_term_weights_fold_keywords_and_synonyms(matcher):
+    # "glad" is a happy keyword, a synonym of "happy" and a synonym of sad's "down"
+    assert matcher.term_weights["glad"] == pytest.approx({"happy": 0.9 + 1.0 * 0.7, "sad": 0.7 * 0.7})
+    # Synonyms of deep emotions get the depth-2 factor
+    assert matcher.term_weights["musing"] == pytest.approx({"contemplative": 0.9 * 0.5})
+    assert matcher.term_weights["meh"] == {"legacy": 1.0}
+    # Capitalised synonyms can never match lowercased text
+    assert "sorry" not in matcher.term_weights and "Sorry" not in matcher.term_weights
+
+
+def test_compound_terms_match_on_word_boundaries(matcher):
+    assert set(matcher.compound_terms) == {"well-chosen", "deal with"}
+
+    match = matcher.scan("A well-chosen word helps deal with it; not dealing with it")
+    assert match.compound_counts == {"well-chosen": 1, "deal with": 1}
+
+    assert not matcher.scan("I ordeal without end").compound_counts
+
+
+def test_phrases_match_as_substrings(matcher):
+    match = matcher.scan("That Plot Twist Caught Me Off Guard and made my day for sure")
+    assert {"off guard", "caught me off guard", "or", "made my day"} <= match.phrases
+    assert match.words[:3] == ["that", "plot", "twist"]
+
+
+def test_score_terms_matches_regex_reference(matcher):
+    text = "glad, so GLAD and happy - felicitous even; down but musing. deal with it"
+    match = matcher.scan(text)
+
+    reference_counts = {}
+    reference_distinct = {}
+    for term, weights in {**matcher.term_weights, **matcher.compound_terms}.items():
+        hits = len(re.findall(r"\b" + re.escape(term) + r"\b", text.lower()))
+        for emotion, weight in weights.items():
+            reference_counts[emotion] = reference_counts.get(emotion, 0.0) + hits * weight
+            reference_distinct[emotion] = reference_distinct.get(emotion, 0.0) + (weight if hits else 0.0)
+
+    assert matcher.score_terms(match) == pytest.approx({e: s for e, s in reference_counts.items() if s})
+    assert matcher.score_terms(match, distinct=True) == pytest.approx(
+        {e: s for e, s in reference_distinct.items() if s}
+    )
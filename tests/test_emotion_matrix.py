@@ -0,0 +1,82 @@
+"""
+Tests for the day x emotion matrices behind emotion history and trends.
+"""
+import pytest
+
+import emotion_tracker
+from emotion_matrix import DailyEmotionMatrix
+from emotion_tracker import EmotionTracker
+
+ROWS = [
+    ("2026-01-02", "sad", 1, 0.5),
+    ("2026-01-01", "happy", 2, 1.5),
+    ("2026-01-01", "curious", 1, 0.5),
+    ("2026-01-02", "happy", 3, 0.5),
+]
+
+
+@pytest.fixture
+def tracker(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(emotion_tracker, "OPENAI_AVAILABLE", False)
+    return EmotionTracker(None)
+
+
+class _Rollups:
+    """execute_query stand-in returning fixed rollup rows"""
+
+    use_postgres = False
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def execute_query(self, query, params=None):
+        self.queries.append((query, params))
+        return self.rows
+
+
+def test_rows_fill_label_columns_then_extra_emotions():
+    matrix = DailyEmotionMatrix.from_rows(ROWS, ["happy", "sad", "angry"], days=["2026-01-03"])
+
+    assert matrix.days == ["2026-01-01", "2026-01-02", "2026-01-03"]
+    assert matrix.emotions == ["happy", "sad", "angry", "curious"]
+    assert matrix.counts.tolist() == [[2, 0, 0, 1], [3, 1, 0, 0], [0, 0, 0, 0]]
+
+    shares = matrix.shares(matrix.intensity)
+    assert shares[0].tolist() == [0.75, 0.0, 0.0, 0.25]
+    assert shares[2].tolist() == [0.0] * 4
+    assert matrix.primary_emotions(shares) == ["happy", "happy", "neutral"]
+
+
+def test_history_uses_one_dataset_per_label(tracker):
+    tracker.db_manager = _Rollups(ROWS)
+    history = tracker.get_emotion_history(7)
+
+    assert history["labels"] == ["2026-01-01", "2026-01-02"]
+    datasets = {dataset["label"]: dataset["data"] for dataset in history["datasets"]}
+    assert len(datasets) == len(tracker.emotion_labels)
+    assert datasets["Happy"] == [2, 3]
+    assert datasets["Sad"] == [0, 1]
+    assert "GROUP BY day, emotion" in tracker.db_manager.queries[0][0]
+
+
+def test_trend_regression_finds_the_strongest_slope(tracker):
+    shares = [  # happy, sad, angry; primaries happy, angry, happy, sad, sad
+        (0.8, 0.1, 0.1),
+        (0.3, 0.2, 0.5),
+        (0.6, 0.3, 0.1),
+        (0.3, 0.6, 0.1),
+        (0.2, 0.7, 0.1),
+    ]
+    distributions = {
+        f"2026-01-0{i + 1}": dict(zip(("happy", "sad", "angry"), row)) for i, row in enumerate(shares)
+    }
+
+    patterns = tracker._detect_emotion_patterns(distributions)
+
+    # sad: slope 0.16 per day over a 0.6 range; happy's -0.2 is not significant
+    assert patterns["type"] == "increasing_trend"
+    assert patterns["emotion"] == "sad"
+    assert patterns["value"] == pytest.approx(0.16 / 0.6)
+    assert isinstance(patterns["value"], float)
@@ -0,0 +1,117 @@
+"""
+Tests for the memo of emotion analysis results.
+"""
+import time
+
+import pytest
+
+import emotion_tracker
+from database.db_manager import DatabaseManager
+from emotion_memo import AnalysisMemo, context_hash
+from emotion_tracker import EmotionTracker
+
+
+class _MemoConfig:
+    USE_POSTGRES = False
+    DATABASE_URL = ""
+    CACHE_HIT_FLUSH_INTERVAL = 3600
+    EMOTION_MEMO_PERSIST = True
+
+
+@pytest.fixture
+def manager(tmp_path):
+    db_manager = DatabaseManager(config=_MemoConfig(), db_path=str(tmp_path / "memo.db"))
+    db_manager.initialize_db()
+    yield db_manager
+    db_manager.stop_cache_flusher()
+
+
+def test_keys_depend_on_text_context_and_version():
+    memo = AnalysisMemo()
+    base = memo.key("hello", ["hi"], "v1")
+
+    assert memo.key("hello", ["HI"], "v1") == base
+    assert memo.key("hello", ["hi there"], "v1") != base
+    assert memo.key("hello", None, "v1") != base
+    assert memo.key("hello", ["hi"], "v2") != base
+    assert context_hash(None) == context_hash([]) == ""
+
+
+def test_results_are_copies():
+    memo = AnalysisMemo()
+    memo.put("k", {"primary_emotion": "happy", "emotions": {"happy": 1.0}})
+
+    first = memo.get("k")
+    first["source"] = "voice"
+    assert memo.get("k") == {"primary_emotion": "happy", "emotions": {"happy": 1.0}}
+
+
+def test_lru_eviction_and_ttl():
+    memo = AnalysisMemo(max_entries=2, ttl=60)
+    memo.put("a", {"n": 1})
+    memo.put("b", {"n": 2})
+    memo.get("a")
+    memo.put("c", {"n": 3})
+
+    assert memo.get("b") is None
+    assert memo.get("a") == {"n": 1}
+    assert memo.stats()["evictions"] == 1
+
+    short = AnalysisMemo(ttl=0.01)
+    short.put("a", {"n": 1})
+    time.sleep(0.02)
+    assert short.get("a") is None
+    assert short.stats()["expirations"] == 1
+
+
+def test_persisted_results_survive_a_new_memo(manager):
+    memo = AnalysisMemo(db_manager=manager, persist=True)
+    key = memo.key("good morning", None, "v1")
+    memo.put(key, {"primary_emotion": "happy"})
+
+    other = AnalysisMemo(db_manager=manager, persist=True)
+    assert other.get(key) == {"primary_emotion": "happy"}
+    assert other.get(key) == {"primary_emotion": "happy"}
+    assert other.stats()["persistent_hits"] == 1
+    assert other.stats()["hits"] == 1
+
+
+def test_tracker_memoizes_repeated_text(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(emotion_tracker, "OPENAI_AVAILABLE", False)
+    tracker = EmotionTracker(None)
+
+    first = tracker.analyze_text_advanced("I am so happy today")
+    second = tracker.analyze_text_advanced("  I am SO happy today ")
+    stats = tracker.get_analysis_cache_stats()
+
+    assert second == first
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+    # Retraining changes the keyword tables and with them the memo version
+    version = stats["version"]
+    tracker.emotion_keywords["happy"]["chuffed"] = 0.9
+    tracker._build_matcher()
+    assert tracker.get_analysis_cache_stats()["version"] != version
+    assert tracker.get_analysis_cache_stats()["entries"] == 0
+
+
+def test_rule_memo_hits_reapply_pattern_influence(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(emotion_tracker, "OPENAI_AVAILABLE", False)
+    tracker = EmotionTracker(None)
+    recorded = []
+    original = tracker._update_pattern_data
+    monkeypatch.setattr(tracker, "_update_pattern_data",
+                        lambda emotions, save=True: recorded.append(dict(emotions)) or original(emotions, save))
+
+    tracker.analyze_text_advanced("I am so happy today")
+    memoized = tracker.analysis_memo.get(tracker.analysis_memo.key(
+        "i am so happy today", None, f"{tracker.analysis_version}:rules"))
+    assert set(memoized) == {"rule_scores", "detected_patterns"}
+
+    # A hit records the same raw scores and sees influence from the current trend data
+    monkeypatch.setattr(tracker, "_calculate_pattern_influence", lambda: {"happy": 0.0})
+    again = tracker.analyze_text_advanced("I am so happy today")
+    assert recorded[0] == recorded[1]
+    assert again["primary_emotion"] != "happy"
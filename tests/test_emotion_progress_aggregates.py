@@ -0,0 +1,168 @@
+"""
+Tests for the incrementally maintained emotion progress aggregates
+(trigger counts, precompiled achievement criteria and progress snapshots).
+"""
+import json
+
+import pytest
+from sqlalchemy import event
+
+import main
+from main import db
+from models.emotion_progress import (
+    Achievement, AchievementCriteria, EmotionEntry, EmotionTriggerCount,
+    UserEmotionProgress, UserProgressSnapshot, update_user_model
+)
+from models.user import User
+from services.emotion_progress_service import EmotionProgressService
+
+update_user_model()
+
+
+@pytest.fixture
+def user_id():
+    with main.app.app_context():
+        db.create_all()
+        user = User(username="progress-user", email="progress@example.com")
+        db.session.add(user)
+        db.session.commit()
+        yield user.id
+        db.session.remove()
+        db.drop_all()
+
+
+def _record(user_id, trigger=None, correct=True, emotion="happiness"):
+    result = EmotionProgressService.record_emotion_interaction(user_id, emotion, correct, trigger=trigger)
+    assert result.get("success"), result
+    return result
+
+
+def _count_queries(func):
+    statements = []
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, "before_cursor_execute", before_execute)
+    try:
+        func()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_execute)
+    return len(statements)
+
+
+def test_most_common_trigger_ties_go_to_first_seen(user_id):
+    for trigger in ["home", "work", "work", "home"]:
+        _record(user_id, trigger)
+
+    progress = UserEmotionProgress.query.filter_by(user_id=user_id, emotion_type="happiness").one()
+    assert progress.most_common_trigger == "home"
+    counts = {c.trigger: c.count for c in EmotionTriggerCount.query.filter_by(user_id=user_id)}
+    assert counts == {"home": 2, "work": 2}
+
+    _record(user_id, "work")
+    assert progress.most_common_trigger == "work"
+
+
+def test_achievement_criteria_are_compiled_and_awarded_once(user_id):
+    db.session.add_all([
+        Achievement(name="Three", description="d", criteria=json.dumps({"min_interactions": 3})),
+        Achievement(name="Sad only", description="d", emotion_type="sadness",
+                    criteria=json.dumps({"min_interactions": 1})),
+        Achievement(name="Never", description="d", criteria="not json"),
+    ])
+    db.session.commit()
+    assert AchievementCriteria.query.count() == 2
+
+    earned = [a["name"] for _ in range(4) for a in _record(user_id)["achievements"]]
+    assert earned == ["Three"]
+
+
+def test_recording_cost_does_not_grow_with_history(user_id):
+    db.session.add(Achievement(name="Streak", description="d", criteria=json.dumps({"min_streak": 5})))
+    db.session.commit()
+
+    # Both measurements are past the insight thresholds (10 interactions, level 2)
+    for i in range(30):
+        _record(user_id, ["work", "home", "school"][i % 3])
+    early = _count_queries(lambda: _record(user_id, "home"))
+    for i in range(60):
+        _record(user_id, ["work", "home", "school"][i % 3])
+    late = _count_queries(lambda: _record(user_id, "home"))
+
+    assert late <= early
+
+
+def test_rebuild_aggregates_recounts_existing_entries(user_id):
+    for trigger in ["school", "work", "work", None]:
+        db.session.add(EmotionEntry(user_id=user_id, emotion_type="anger", trigger=trigger))
+    db.session.add(UserEmotionProgress(user_id=user_id, emotion_type="anger"))
+    db.session.commit()
+
+    result = EmotionProgressService.rebuild_aggregates()
+
+    assert result["trigger_counts"] == 2
+    counts = {c.trigger: c.count for c in EmotionTriggerCount.query.filter_by(user_id=user_id)}
+    assert counts == {"school": 1, "work": 2}
+    progress = UserEmotionProgress.query.filter_by(user_id=user_id, emotion_type="anger").one()
+    assert progress.most_common_trigger == "work"
+
+
+def test_progress_snapshot_is_served_until_invalidated(user_id):
+    _record(user_id, "home")
+    first = EmotionProgressService.get_progress_snapshot(user_id)
+    assert json.loads(first["json"]) == EmotionProgressService.get_user_progress(user_id)
+
+    assert _count_queries(lambda: EmotionProgressService.get_progress_snapshot(user_id)) == 1
+    assert EmotionProgressService.get_progress_snapshot(user_id)["etag"] == first["etag"]
+
+    result = EmotionProgressService.update_learning_path_progress(user_id, 1, 1, 100, is_completed=True)
+    assert result["success"]
+    assert UserProgressSnapshot.query.get(user_id).is_stale
+    second = EmotionProgressService.get_progress_snapshot(user_id)
+    assert second["etag"] != first["etag"]
+    assert json.loads(second["json"])["learning_paths"]["1"]["overall_progress"] == 100
+
+    User.query.get(user_id).first_name = "Renamed"
+    db.session.commit()
+    third = EmotionProgressService.get_progress_snapshot(user_id)
+    assert json.loads(third["json"])["user"]["first_name"] == "Renamed"
+    assert third["etag"] != second["etag"]
+
+
+def test_progress_route_honours_if_none_match(user_id):
+    _record(user_id, "home")
+    client = main.app.test_client()
+
+    response = client.get(f"/api/progress/user/{user_id}")
+    assert response.status_code == 200
+    assert response.get_json()["data"]["emotions"]["happiness"]["interactions"] == 1
+    etag = response.headers["ETag"]
+
+    cached = client.get(f"/api/progress/user/{user_id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.data == b""
+
+    _record(user_id, "work")
+    changed = client.get(f"/api/progress/user/{user_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.get_json()["data"]["emotions"]["happiness"]["interactions"] == 2
+
+
+def test_write_during_the_first_snapshot_build_invalidates_it(user_id, monkeypatch):
+    compute = EmotionProgressService.get_user_progress
+
+    def compute_then_write(uid):
+        progress = compute(uid)
+        _record(uid, "work")  # commits while the first snapshot is being built
+        return progress
+
+    monkeypatch.setattr(EmotionProgressService, "get_user_progress", staticmethod(compute_then_write))
+    first = EmotionProgressService.get_progress_snapshot(user_id)
+    monkeypatch.setattr(EmotionProgressService, "get_user_progress", staticmethod(compute))
+
+    assert UserProgressSnapshot.query.get(user_id).is_stale
+    second = EmotionProgressService.get_progress_snapshot(user_id)
+    assert second["etag"] != first["etag"]
+    assert json.loads(second["json"])["emotions"]["happiness"]["interactions"] == 1
@@ -0,0 +1,128 @@
+"""
+Tests for AIModelRouter's concurrent fallback mode: hedged requests,
+latency-aware ordering and per-backend in-flight caps.
+"""
+import threading
+import time
+
+import pytest
+
+import ai_model_router
+from ai_model_router import AIModelRouter
+from backend_health import LatencyEWMA
+
+
+def _backend(calls, name, delay=0.0, success=True):
+    def complete(prompt, model, system_prompt=None, temperature=0.7, max_tokens=1000, stream=False):
+        calls.append(name)
+        time.sleep(delay)
+        if not success:
+            return {"success": False, "error": f"{name} down", "model": model, "content": None}
+        return {"success": True, "content": f"from {name}", "model": model}
+    return complete
+
+
+@pytest.fixture
+def router(monkeypatch):
+    monkeypatch.setenv("MODEL_BACKEND", "auto")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(ai_model_router, "_model_latency", {})
+    monkeypatch.setattr(ai_model_router, "_openai_slots", threading.BoundedSemaphore(4))
+    monkeypatch.setattr(ai_model_router, "MODEL_HEDGE_DELAY_MS", 50)
+    router = AIModelRouter()
+    monkeypatch.setattr(router, "is_ollama_running", lambda: True)
+    monkeypatch.setattr(router.ollama, "slots", threading.BoundedSemaphore(4))
+    return router
+
+
+def test_ewma_tracks_mean_and_p95():
+    latency = LatencyEWMA(alpha=0.5)
+    assert latency.p95() is None
+    for seconds in (1.0, 1.0, 1.0):
+        latency.record(seconds)
+    assert latency.mean == pytest.approx(1.0) and latency.p95() == pytest.approx(1.0)
+    latency.record(3.0)
+    assert latency.mean == pytest.approx(2.0)
+    assert latency.p95() > 2.0
+
+
+def test_slow_backend_is_hedged(router):
+    calls = []
+    router.complete_with_openai = _backend(calls, "openai", delay=0.5)
+    router.complete_with_ollama = _backend(calls, "ollama", delay=0.01)
+
+    start = time.perf_counter()
+    result = router.generate_response_hedged("hi")
+    assert time.perf_counter() - start < 0.4
+    assert result["content"] == "from ollama"
+    assert result["hedged"] and result["fallback"]
+    assert calls == ["openai", "ollama"]
+
+
+def test_failure_starts_fallback_without_waiting(router, monkeypatch):
+    monkeypatch.setattr(ai_model_router, "MODEL_HEDGE_DELAY_MS", 10_000)
+    calls = []
+    router.complete_with_openai = _backend(calls, "openai", success=False)
+    router.complete_with_ollama = _backend(calls, "ollama")
+
+    start = time.perf_counter()
+    result = router.generate_response_hedged("hi")
+    assert time.perf_counter() - start < 1
+    assert result["content"] == "from ollama" and not result["hedged"]
+
+
+def test_auto_mode_prefers_the_faster_model(router):
+    ai_model_router.get_model_latency("gpt-4o").record(1.2)
+    ai_model_router.get_model_latency("openchat").record(0.1)
+    calls = []
+    router.complete_with_openai = _backend(calls, "openai")
+    router.complete_with_ollama = _backend(calls, "ollama")
+
+    result = router.generate_response_hedged("hi", hedge=False)
+    assert result["content"] == "from ollama" and "fallback" not in result
+    assert calls == ["ollama"]
+
+
+def test_failing_model_loses_its_place(router):
+    ai_model_router.get_model_latency("gpt-4o").record(0.1)
+    ai_model_router.get_model_latency("openchat").record(1.0)
+    calls = []
+    router.complete_with_openai = _backend(calls, "openai", success=False)
+    router.complete_with_ollama = _backend(calls, "ollama")
+
+    assert router.generate_response_hedged("hi", hedge=False)["content"] == "from ollama"
+    assert router.generate_response_hedged("hi", hedge=False)["content"] == "from ollama"
+    assert calls == ["openai", "ollama", "ollama"]
+
+
+def test_open_circuit_is_ranked_last(router):
+    ai_model_router.get_model_latency("gpt-4o").record(0.1)
+    ai_model_router.get_model_latency("openchat").record(1.0)
+    for _ in range(ai_model_router.MODEL_BREAKER_THRESHOLD):
+        router.openai_health.record_failure()
+
+    plan = [("openai", "gpt-4o"), ("ollama", "openchat")]
+    assert router._rank_by_latency(plan) == [("ollama", "openchat"), ("openai", "gpt-4o")]
+
+
+def test_backends_at_their_cap_are_skipped(router, monkeypatch):
+    calls = []
+    router.complete_with_openai = _backend(calls, "openai")
+    router.complete_with_ollama = _backend(calls, "ollama")
+    monkeypatch.setattr(ai_model_router, "_openai_slots", threading.BoundedSemaphore(1))
+    ai_model_router._openai_slots.acquire()
+
+    assert router.generate_response_hedged("hi")["content"] == "from ollama"
+
+    router.ollama.slots = threading.BoundedSemaphore(1)
+    router.ollama.slots.acquire()
+    assert router.generate_response_hedged("hi")["error_type"] == "backend_busy"
+    assert calls == ["ollama"]
+
+
+def test_generate_response_uses_hedging_when_enabled(router):
+    calls = []
+    router.complete_with_openai = _backend(calls, "openai", delay=0.5)
+    router.complete_with_ollama = _backend(calls, "ollama")
+    router.hedging = True
+    assert router.generate_response("hi")["content"] == "from ollama"
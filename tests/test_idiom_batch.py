@@ -0,0 +1,169 @@
+"""
+Tests for batch idiom translation and single-flight coalescing of
+identical completion requests.
+"""
+import json
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+import completion_cache as completion_cache_module
+import idiom_translator as idiom_translator_module
+from ai_model_router import AIModelRouter
+from completion_cache import SingleFlight
+from idiom_routes import idiom_bp
+from idiom_translator import IdiomTranslator
+
+
+def _batch_reply(prompt):
+    """Fake model: answers a numbered batch prompt as a JSON array, a single prompt as an object"""
+    if prompt.startswith("Translate these"):
+        idioms = [line.split('"')[1] for line in prompt.splitlines()[1:]]
+        return json.dumps([
+            {"index": number, "translated_idiom": f"ar:{idiom}", "emotional_meaning": "meaning"}
+            for number, idiom in enumerate(idioms, start=1)
+        ])
+    idiom = prompt.split('"')[1]
+    return json.dumps({"translated_idiom": f"ar:{idiom}", "emotional_meaning": "meaning"})
+
+
+@pytest.fixture
+def router(monkeypatch):
+    monkeypatch.setattr(completion_cache_module, "completion_cache", None)
+    monkeypatch.setenv("MODEL_BACKEND", "ollama")
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    router = AIModelRouter()
+    router.calls = []
+
+    def complete(prompt, model, system_prompt=None, temperature=0.7, max_tokens=1000, stream=False):
+        router.calls.append(prompt)
+        time.sleep(getattr(router, "delay", 0))
+        return {"success": True, "content": _batch_reply(prompt), "model": model}
+
+    monkeypatch.setattr(router, "is_ollama_running", lambda: True)
+    monkeypatch.setattr(router, "complete_with_ollama", complete)
+    return router
+
+
+def test_batch_uses_one_request_and_skips_cached_items(router):
+    translator = IdiomTranslator(router)
+    translator.translate_idiom("feeling blue", "en", "ar")
+    assert len(router.calls) == 1
+
+    results = translator.translate_idioms(
+        ["on cloud nine", {"idiom": "feeling blue"}, {"idiom": "heart of gold", "emotion": "love"}], "en", "ar"
+    )
+    assert [result["translated_idiom"] for result in results] == ["ar:on cloud nine", "ar:feeling blue", "ar:heart of gold"]
+    assert len(router.calls) == 2
+    assert "feeling blue" not in router.calls[1]  # served from the cache
+
+    # Batch items are cached under the single-translation key
+    assert translator.translate_idiom("heart of gold", "en", "ar", emotion="love")["translated_idiom"] == "ar:heart of gold"
+    assert len(router.calls) == 2
+
+
+def test_items_missing_from_the_reply_are_translated_singly(router, monkeypatch):
+    original = router.complete_with_ollama
+
+    def drop_second(prompt, model, **kwargs):
+        result = original(prompt, model, **kwargs)
+        if prompt.startswith("Translate these"):
+            result["content"] = json.dumps(json.loads(result["content"])[:1])
+        return result
+
+    monkeypatch.setattr(router, "complete_with_ollama", drop_second)
+    results = IdiomTranslator(router).translate_idioms(["a bit down", "over the moon"], "en", "ar")
+    assert [result["translated_idiom"] for result in results] == ["ar:a bit down", "ar:over the moon"]
+    assert len(router.calls) == 2
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def slow():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return {"value": 1}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=lambda: results.append(flight.do("k", slow))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    for thread in [leader] + followers:
+        thread.join()
+
+    assert len(calls) == 1 and flight.coalesced == 3
+    assert sorted(shared for _, shared in results) == [False, True, True, True]
+    assert all(value == {"value": 1} for value, _ in results)
+
+
+def test_concurrent_identical_batches_share_one_call(router, monkeypatch):
+    router.delay = 0.1
+    monkeypatch.setattr(idiom_translator_module, "idiom_translator", IdiomTranslator(router))
+    app = Flask(__name__)
+    app.register_blueprint(idiom_bp)
+    body = {"idioms": ["on cloud nine", "feeling blue"], "source_lang": "en", "target_lang": "ar"}
+
+    responses = []
+
+    def post():
+        responses.append(app.test_client().post("/api/idioms/translate/batch", json=body).get_json())
+
+    threads = [threading.Thread(target=post) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(router.calls) == 1
+    for response in responses:
+        assert response["success"] and response["count"] == 2
+        assert response["results"][1]["translated_idiom"] == "ar:feeling blue"
+
+    too_many = dict(body, idioms=["x"] * 101)
+    assert app.test_client().post("/api/idioms/translate/batch", json=too_many).status_code == 400
+
+
+def test_reply_items_are_matched_by_index_only(router, monkeypatch):
+    original = router.complete_with_ollama
+
+    def unnumbered_and_mislabelled(prompt, model, **kwargs):
+        result = original(prompt, model, **kwargs)
+        if prompt.startswith("Translate these"):
+            entries = json.loads(result["content"])
+            del entries[0]["index"]  # would be position-matched
+            entries[1]["original_idiom"] = "a bit down"  # answers the wrong idiom
+            result["content"] = json.dumps(entries)
+        return result
+
+    monkeypatch.setattr(router, "complete_with_ollama", unnumbered_and_mislabelled)
+    results = IdiomTranslator(router).translate_idioms(["a bit down", "over the moon", "heart of gold"], "en", "ar")
+    assert [result["translated_idiom"] for result in results] == ["ar:a bit down", "ar:over the moon", "ar:heart of gold"]
+    # Only the third item came from the batch; the others were translated singly
+    assert len(router.calls) == 3
+    assert router.completion_cache.stats()["sites"]["idiom_translation"]["stores"] == 3
+
+
+def test_unparseable_batch_replies_are_not_cached(router, monkeypatch):
+    original = router.complete_with_ollama
+
+    def garbled(prompt, model, **kwargs):
+        result = original(prompt, model, **kwargs)
+        if prompt.startswith("Translate these"):
+            result["content"] = "Sorry, here you go: {"
+        return result
+
+    monkeypatch.setattr(router, "complete_with_ollama", garbled)
+    results = IdiomTranslator(router).translate_idioms(["a bit down", "over the moon"], "en", "ar")
+    assert [result["translated_idiom"] for result in results] == ["ar:a bit down", "ar:over the moon"]
+    sites = router.completion_cache.stats()["sites"]
+    assert sites["idiom_translation_batch"]["stores"] == 0
+    assert sites["idiom_translation"]["stores"] == 2
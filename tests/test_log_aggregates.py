@@ -0,0 +1,93 @@
+"""
+Tests for the running log aggregates behind the admin statistics.
+"""
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+import log_manager
+from log_aggregates import DurationHistogram, LogAggregates, PerformanceStats
+
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_manager, "LOG_DIR", str(tmp_path))
+    monkeypatch.setattr(log_manager, "_streams", {})
+    monkeypatch.setattr(log_manager, "_aggregates", {})
+    yield tmp_path
+    log_manager.close_logs()
+
+
+def test_histogram_quantiles_within_relative_accuracy():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(3, 1) for _ in range(20000)] + [0.0] * 100
+    histogram = DurationHistogram(relative_accuracy=0.01)
+    for value in values:
+        histogram.add(value)
+
+    restored = DurationHistogram.from_dict(histogram.to_dict())
+    for q in (0.5, 0.95, 0.99):
+        expected = np.quantile(values, q, method="inverted_cdf")
+        assert restored.quantile(q) == pytest.approx(expected, rel=0.02)
+    assert histogram.quantile(0.0) == 0.0
+
+
+def test_performance_summary_format():
+    stats = PerformanceStats()
+    for duration in (10, 20, 30, 40):
+        stats.add("tts", duration, "success")
+    stats.add("stt", 100, "error")
+
+    summary = stats.summary()
+    assert summary["overall"]["total_operations"] == 5
+    assert summary["overall"]["error_rate"] == pytest.approx(0.2)
+    assert summary["operations"]["tts"]["avg_duration_ms"] == 25
+    assert summary["operations"]["tts"]["min_duration_ms"] == 10
+    assert summary["operations"]["tts"]["p99_duration_ms"] == pytest.approx(40, rel=0.02)
+
+    only_stt = stats.summary("stt")
+    assert list(only_stt["operations"]) == ["stt"]
+    assert only_stt["overall"]["p50_duration_ms"] == 100
+
+
+def test_checkpoint_and_replay_do_not_double_count(tmp_path):
+    path = str(tmp_path / "aggregates.json")
+    t0 = datetime(2026, 1, 1)
+    records = [
+        {"timestamp": (t0 + timedelta(seconds=i // 2)).isoformat(), "emotion": "happy", "action": "greet"}
+        for i in range(6)
+    ]
+
+    aggregates = LogAggregates(path)
+    for record in records[:3]:
+        aggregates.add_interaction("interactions", record)
+    aggregates.checkpoint()
+
+    restored = LogAggregates(path)
+    assert restored.load()
+    assert restored.replay("interactions", records, "interaction") == 3
+    assert restored.emotion_counts() == {"happy": 6}
+
+
+def test_log_manager_statistics_survive_restart(log_dir, monkeypatch):
+    log_manager.log_interaction("hi", "happy", "greet", {})
+    log_manager.log_performance("tts", 50.0, memory_usage_mb=1, cpu_usage_percent=1)
+    log_manager.close_logs()
+
+    # New process: checkpoint plus the records logged after it
+    monkeypatch.setattr(log_manager, "_streams", {})
+    monkeypatch.setattr(log_manager, "_aggregates", {})
+    log_manager.log_interaction("sad", "sad", "comfort", {})
+
+    assert log_manager.get_emotion_statistics() == {"happy": 1, "sad": 1}
+    assert log_manager.get_action_statistics() == {"greet": 1, "comfort": 1}
+    stats = log_manager.get_performance_statistics()
+    assert stats["operations"]["tts"]["p95_duration_ms"] == 50.0
+
+    windowed = log_manager.get_performance_statistics(start_time=datetime.utcnow() - timedelta(hours=1))
+    assert windowed["overall"]["p50_duration_ms"] == 50.0
+
+    log_manager.clear_logs()
+    assert log_manager.get_emotion_statistics() == {}
@@ -0,0 +1,103 @@
+"""
+Tests for the rotated JSONL log segments and the log_manager functions built on them.
+"""
+import csv
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+import log_manager
+from log_segments import SegmentedLog
+
+T0 = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def _record(minutes, **fields):
+    return dict(fields, timestamp=(T0 + timedelta(minutes=minutes)).isoformat())
+
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_manager, "LOG_DIR", str(tmp_path))
+    monkeypatch.setattr(log_manager, "_streams", {})
+    monkeypatch.setattr(log_manager, "_aggregates", {})
+    yield tmp_path
+    log_manager.close_logs()
+
+
+def test_rotation_index_and_window_reads(tmp_path):
+    log = SegmentedLog(str(tmp_path), "perf", max_bytes=200)
+    for minute in range(20):
+        log.append(_record(minute, value=minute))
+
+    segments = log.segments()
+    assert len(segments) > 3
+    assert sum(segment["count"] for segment in segments) == 20
+
+    start, end = T0 + timedelta(minutes=5), T0 + timedelta(minutes=8)
+    window = log.segments(start, end)
+    assert len(window) < len(segments)
+    assert [record["value"] for record in log.read(start, end)] == [5, 6, 7, 8]
+    assert [record["value"] for record in log.tail(3)] == [19, 18, 17]
+
+
+def test_restart_recovers_active_segment_and_retention(tmp_path):
+    log = SegmentedLog(str(tmp_path), "events", max_bytes=200, max_segments=2)
+    for minute in range(12):
+        log.append(_record(minute, value=minute))
+    log._active_file.close()  # simulate a crash: active segment not in the index
+
+    reopened = SegmentedLog(str(tmp_path), "events", max_bytes=200, max_segments=2)
+    records = [record["value"] for record in reopened.read()]
+    assert records == sorted(records) and records[-1] == 11
+    assert len(reopened.segments()) <= 3
+
+    reopened.append(_record(30, value=30))
+    assert reopened.tail(1)[0]["value"] == 30
+    files = [name for name in os.listdir(tmp_path) if name.endswith(".jsonl")]
+    assert len(files) == len(set(files)) == len(reopened.segments())
+
+
+def test_log_manager_round_trip(log_dir):
+    log_manager.init_logs()
+    log_manager.log_interaction("hi", "happy", "greet", {"a": 1}, language="ar")
+    log_manager.log_interaction("bye", "sad", "farewell", {})
+    log_manager.log_event("click", {"button": "ok"}, user_id="u1")
+    log_manager.log_performance("tts", 120.0, memory_usage_mb=1, cpu_usage_percent=1)
+    log_manager.log_performance("tts", 80.0, status="error", memory_usage_mb=1, cpu_usage_percent=1)
+
+    recent = log_manager.get_recent_interactions(limit=1)
+    assert recent[0]["user_input"] == "bye" and recent[0]["language"] == "en"
+    assert log_manager.get_emotion_statistics() == {"happy": 1, "sad": 1}
+    assert log_manager.get_action_statistics() == {"greet": 1, "farewell": 1}
+
+    stats = log_manager.get_performance_statistics(start_time=datetime.utcnow() - timedelta(minutes=5))
+    assert stats["overall"]["total_operations"] == 2
+    assert stats["operations"]["tts"]["error_count"] == 1
+    future = log_manager.get_performance_statistics(start_time=datetime.utcnow() + timedelta(days=1))
+    assert future["overall"]["total_operations"] == 0
+
+    events = list(log_manager.get_log_stream(log_manager.EVENT_STREAM).read())
+    assert events[0]["event_type"] == "click"
+
+    assert log_manager.clear_logs()
+    assert log_manager.get_recent_interactions() == []
+
+
+def test_init_imports_legacy_files_once(log_dir):
+    with open(log_dir / "interaction_log.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["timestamp", "user_input", "emotion", "action", "params", "language"])
+        writer.writerow([T0.isoformat(), "old", "neutral", "none", "{}", "en"])
+    with open(log_dir / "event_log.json", "w", encoding="utf-8") as f:
+        json.dump([{"timestamp": T0.isoformat(), "event_type": "legacy", "data": {}}], f)
+
+    log_manager.init_logs()
+    log_manager.init_logs()
+
+    assert [i["user_input"] for i in log_manager.get_recent_interactions()] == ["old"]
+    assert len(list(log_manager.get_log_stream(log_manager.EVENT_STREAM).read())) == 1
+    assert (log_dir / "interaction_log.csv.imported").exists()
+    assert not (log_dir / "event_log.json").exists()
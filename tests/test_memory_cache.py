@@ -0,0 +1,123 @@
+"""
+Tests for the in-process cache tier in front of the response_cache table.
+"""
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from database.db_manager import DatabaseManager
+from database.memory_cache import MemoryCacheTier, like_to_regex
+from database.models import Cache
+
+
+class _CacheConfig:
+    USE_POSTGRES = False
+    DATABASE_URL = ""
+    MEMORY_CACHE_MAX_ENTRIES = 100
+    MEMORY_CACHE_MAX_BYTES = 1024 * 1024
+    MEMORY_CACHE_TTL = 60
+    CACHE_HIT_FLUSH_INTERVAL = 3600  # Flush only when the test asks for it
+
+
+@pytest.fixture
+def manager(tmp_path):
+    db_manager = DatabaseManager(config=_CacheConfig(), db_path=str(tmp_path / "cache.db"))
+    db_manager.initialize_db()
+    yield db_manager
+    db_manager.stop_cache_flusher()
+
+
+def _db_entry(db_manager, key):
+    with db_manager.Session() as session:
+        return session.query(Cache).filter(Cache.key == key).first()
+
+
+def test_like_pattern_translation():
+    regex = like_to_regex("emotion_analysis:%_x")
+    assert regex.match("emotion_analysis:abc_x")
+    assert regex.match("emotion_analysis:1x")
+    assert not regex.match("emotion_analysis:x")
+    assert not regex.match("tts:emotion_analysis:ax")
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    tier = MemoryCacheTier(max_entries=2, max_bytes=10, ttl=60)
+    tier.put("a", "1234", {})
+    tier.put("b", "1234", {})
+    tier.get("a")  # "b" is now least recently used
+    tier.put("c", "12", {})
+    assert tier.get("b") is None
+    assert tier.get("a") is not None and tier.get("c") is not None
+
+    tier.put("d", "123456789", {})
+    assert tier.stats()["size_bytes"] <= 10
+    assert tier.stats()["evictions"] >= 2
+
+
+def test_ttl_and_row_expiry():
+    tier = MemoryCacheTier(ttl=0.01)
+    tier.put("a", "x", {})
+    tier.put("b", "x", {}, expires_at=datetime.now() - timedelta(seconds=1))
+    assert tier.get("b") is None
+    time.sleep(0.02)
+    assert tier.get("a") is None
+    assert tier.stats()["expirations"] == 2
+
+
+def test_hits_are_served_from_memory_and_flushed_in_batches(manager):
+    assert manager.store_cached_response("emotion_analysis:1", {"primary_emotion": "happy"})
+
+    for expected_hits in (1, 2, 3):
+        value, metadata = manager.get_cached_response("emotion_analysis:1")
+        assert value == {"primary_emotion": "happy"}
+        assert metadata["cache_tier"] == "memory"
+        assert metadata["hit_count"] == expected_hits
+
+    # No per-hit database writes
+    assert _db_entry(manager, "emotion_analysis:1").hit_count == 0
+
+    assert manager.flush_cache_hits() == 1
+    entry = _db_entry(manager, "emotion_analysis:1")
+    assert entry.hit_count == 3
+    assert entry.last_hit_at is not None
+
+
+def test_database_hit_populates_memory_tier(manager):
+    manager.store_cached_response("emotion_analysis:2", {"v": 1})
+    manager.memory_cache.invalidate()
+
+    _, metadata = manager.get_cached_response("emotion_analysis:2")
+    assert metadata["cache_tier"] == "database"
+    _, metadata = manager.get_cached_response("emotion_analysis:2")
+    assert metadata["cache_tier"] == "memory"
+    assert metadata["hit_count"] == 2
+
+    value, metadata = manager.get_cached_response("missing")
+    assert value is None and metadata == {"cache_hit": False}
+
+
+def test_pattern_invalidation_clears_both_tiers(manager):
+    manager.store_cached_response("emotion_analysis:a", {"v": 1})
+    manager.store_cached_response("emotion_analysis:b", {"v": 2})
+    manager.store_cached_response("tts:a", {"v": 3})
+
+    assert manager.invalidate_cache(pattern="emotion_analysis:%") == 2
+
+    assert manager.get_cached_response("emotion_analysis:a")[0] is None
+    assert manager.get_cached_response("emotion_analysis:b")[0] is None
+    assert manager.get_cached_response("tts:a")[0] == {"v": 3}
+
+
+def test_stats_report_both_tiers(manager):
+    manager.store_cached_response("k", {"v": 1})
+    manager.memory_cache.invalidate()
+    manager.get_cached_response("k")
+    manager.get_cached_response("k")
+    manager.get_cached_response("missing")
+
+    stats = manager.get_cache_stats()
+    assert stats["total_entries"] == 1
+    assert stats["memory_tier"]["hits"] == 1
+    assert stats["memory_tier"]["pending_hit_updates"] == 2
+    assert stats["database_tier"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
@@ -0,0 +1,98 @@
+"""
+Tests for the memory store's connection reuse, indexes and batched access log.
+"""
+import threading
+
+import pytest
+
+import memory_store
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_store, "MEMORY_DB_PATH", str(tmp_path / "memory.db"))
+    monkeypatch.setattr(memory_store, "_pending_access_log", [])
+    memory_store.init_db()
+    yield memory_store
+    memory_store.close_connection()
+
+
+def test_connection_reused_per_thread_in_wal_mode(store):
+    conn = store.get_connection()
+    assert store.get_connection() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(store.get_connection()))
+    thread.start()
+    thread.join()
+    assert other[0] is not conn
+
+
+def test_lookup_uses_index(store):
+    plan = store.get_connection().execute(
+        "EXPLAIN QUERY PLAN SELECT rowid, value FROM memory WHERE user_id = ? AND key = ? "
+        "ORDER BY timestamp DESC LIMIT 1", ("u1", "k")
+    ).fetchall()
+    assert any("ix_memory_user_key_timestamp" in row[3] for row in plan)
+
+    indexes = {row[1] for row in store.get_connection().execute("PRAGMA index_list(memory_tags)")}
+    assert "ix_memory_tags_tag" in indexes
+
+
+def test_access_log_is_batched(store, monkeypatch):
+    monkeypatch.setattr(store, "ACCESS_LOG_BATCH_SIZE", 3)
+    monkeypatch.setattr(store, "ACCESS_LOG_MAX_DELAY_SECONDS", 60)
+    assert store.save_memory("u1", "name", "Sara", tags=["profile"])
+
+    def logged():
+        return store.get_connection().execute("SELECT COUNT(*) FROM memory_access_log").fetchone()[0]
+
+    assert store.get_memory("u1", "name") == "Sara"
+    assert logged() == 0  # write + read still pending
+    assert store.get_memory("u1", "name", include_metadata=True)["tags"] == ["profile"]
+    assert logged() == 3
+
+    assert store.get_memories_by_tag("u1", "profile") == {"name": "Sara"}
+    stats = store.get_memory_access_stats("u1")
+    assert stats["access_by_type"] == {"read": 2, "write": 1}
+
+
+def test_listing_reads_current_versions(store):
+    for value in ("a", "b", "c"):
+        store.save_memory("u1", "color", value)
+    store.save_memory("u1", "food", "rice", category="preferences")
+    store.save_memory("u2", "color", "red")
+
+    assert store.get_all_user_memories("u1") == {"color": "c", "food": "rice"}
+    assert store.get_all_user_memories("u1", category="preferences") == {"food": "rice"}
+
+    plan = " ".join(row[3] for row in store.get_connection().execute(
+        "EXPLAIN QUERY PLAN SELECT m.value FROM memory_current mc JOIN memory m ON m.rowid = mc.memory_id "
+        "WHERE mc.user_id = ? ORDER BY mc.key", ("u1",)
+    ))
+    assert "SEARCH mc" in plan and "TEMP B-TREE" not in plan
+
+    assert store.delete_memory("u1", "color")
+    assert store.get_all_user_memories("u1") == {"food": "rice"}
+
+
+def test_backfill_and_expiry_sweep(store):
+    conn = store.get_connection()
+    conn.execute("DROP TABLE memory_current")
+    conn.executemany(
+        "INSERT INTO memory (user_id, key, value, timestamp, expires_at) VALUES (?, ?, ?, ?, ?)",
+        [
+            ("u1", "mood", "old", "2026-01-01 10:00:00", None),
+            ("u1", "mood", "new", "2026-01-02 10:00:00", None),
+            ("u1", "temp", "gone", "2026-01-01 10:00:00", "2000-01-01T00:00:00.000000"),
+        ]
+    )
+    conn.commit()
+    store.init_db()
+
+    assert store.get_all_user_memories("u1") == {"mood": "new"}
+    assert "temp" in store.get_all_user_memories("u1", include_expired=True)
+
+    assert store.sweep_expired_memories() == 1
+    assert store.get_all_user_memories("u1", include_expired=True) == {"mood": "new"}
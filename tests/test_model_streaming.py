@@ -0,0 +1,134 @@
+"""
+Tests for streamed AI responses: AIModelRouter.stream_response, the idiom
+translator's stream_translation and the SSE endpoints.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from flask import Flask
+
+import completion_cache
+import idiom_translator as idiom_translator_module
+from ai_model_router import AIModelRouter, to_sse
+from idiom_routes import idiom_bp
+from idiom_translator import IdiomTranslator
+
+TRANSLATION = '{"translated_idiom": "في غاية السعادة", "emotional_meaning": "Very happy"}'
+
+
+class _StreamingOllama(BaseHTTPRequestHandler):
+    """Streams the reply as NDJSON, a few characters per line, like Ollama"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    reply = "Hello there"
+
+    def do_GET(self):
+        body = json.dumps({"models": [{"name": "openchat:latest"}]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        assert request["stream"] is True
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        reply = self.reply
+        chunks = [reply[i:i + 4] for i in range(0, len(reply), 4)]
+        for chunk in chunks:
+            self._write_chunk({"response": chunk, "done": False})
+        self._write_chunk({"response": "", "done": True})
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, payload):
+        line = (json.dumps(payload) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def router(monkeypatch):
+    _StreamingOllama.reply = "Hello there"
+    monkeypatch.setattr(completion_cache, "completion_cache", None)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StreamingOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("MODEL_BACKEND", "ollama")
+    monkeypatch.setenv("OLLAMA_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    yield AIModelRouter()
+    server.shutdown()
+    server.server_close()
+
+
+def test_stream_response_yields_tokens_then_done(router):
+    events = list(router.stream_response("hi"))
+    tokens = [event["content"] for event in events if event["type"] == "token"]
+    assert tokens == ["Hell", "o th", "ere"]
+
+    done = events[-1]
+    assert done["type"] == "done"
+    assert done["content"] == "Hello there"
+    assert done["model"] == "openchat"
+    assert done["time_to_first_token_ms"] is not None
+    assert done["time_to_first_token_ms"] <= done["total_time_ms"]
+    assert router.request_count == 1
+
+
+def test_stream_response_skips_openai_while_its_circuit_is_open(router):
+    router.openai_api_key = "test-key"
+    for _ in range(router.openai_health.breaker.failure_threshold):
+        router.openai_health.record_failure()
+
+    done = list(router.stream_response("hi", model="gpt-4o"))[-1]
+    assert done["type"] == "done" and done["model"] == "openchat"
+    with pytest.raises(RuntimeError):
+        next(router._stream_openai("hi", "gpt-4o", "system", 0.7, 100))
+
+
+def test_stream_response_without_backend_reports_error(monkeypatch):
+    monkeypatch.setenv("MODEL_BACKEND", "ollama")
+    monkeypatch.setenv("OLLAMA_BASE_URL", "http://127.0.0.1:9")
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    events = list(AIModelRouter().stream_response("hi"))
+    assert [event["type"] for event in events] == ["error"]
+    assert events[0]["error_type"] == "no_backends_available"
+
+
+def test_to_sse_format():
+    frames = list(to_sse([{"type": "token", "content": "مرحبا"}, {"type": "done", "success": True}]))
+    assert frames == [
+        'event: token\ndata: {"content": "مرحبا"}\n\n',
+        'event: done\ndata: {"success": true}\n\n',
+    ]
+
+
+def test_idiom_translation_streams_and_caches(router, monkeypatch):
+    _StreamingOllama.reply = TRANSLATION
+    monkeypatch.setattr(idiom_translator_module, "idiom_translator", IdiomTranslator(router))
+    app = Flask(__name__)
+    app.register_blueprint(idiom_bp)
+    body = {"idiom": "on cloud nine", "source_lang": "en", "target_lang": "ar"}
+
+    response = app.test_client().post("/api/idioms/translate/stream", json=body)
+    assert response.mimetype == "text/event-stream"
+    frames = [frame for frame in response.get_data(as_text=True).split("\n\n") if frame]
+    names = [frame.split("\n")[0] for frame in frames]
+    assert names[:-1] == ["event: token"] * (len(frames) - 1) and len(frames) > 2
+    assert names[-1] == "event: result"
+    result = json.loads(frames[-1].split("\n", 1)[1][len("data: "):])
+    assert result["translated_idiom"] == "في غاية السعادة"
+
+    # Second request is served from the completion cache as one token
+    events = list(idiom_translator_module.idiom_translator.stream_translation(**body))
+    assert [event["type"] for event in events] == ["token", "result"]
+    assert events[0]["content"] == TRANSLATION
+    assert events[1]["translated_idiom"] == "في غاية السعادة"
@@ -0,0 +1,51 @@
+"""
+Tests for the precompiled rule index used by RobinDecisionEngine.decide.
+"""
+import random
+
+from rule_engine import KeywordAutomaton, RobinDecisionEngine, Rule
+
+
+def _linear_decide(rules, message, emotion):
+    matched = [r for r in rules if r.matches(message, emotion)]
+    matched.sort(key=lambda r: r.weight, reverse=True)
+    return matched[0] if matched else None
+
+
+def test_automaton_finds_overlapping_keywords():
+    automaton = KeywordAutomaton(["he", "she", "hers", "his", ""])
+    found = {automaton.keywords[i] for i in automaton.find("ushers")}
+    assert found == {"he", "she", "hers", ""}
+
+
+def test_decide_picks_highest_weight_then_earliest():
+    engine = RobinDecisionEngine()
+    engine.add_rule(Rule("sad", "alone", "first", weight=1.0, rule_id="r1"))
+    engine.add_rule(Rule("sad", "ALONE", "second", weight=1.0, rule_id="r2"))
+    engine.add_rule(Rule("Sad", "lone", "third", weight=0.5, rule_id="r3"))
+
+    assert engine.decide("I feel so Alone", "SAD")["action"] == "first"
+    assert engine.decide("I feel so alone", "happy")["action"] == "respond_normally"
+
+    engine.update_rule_weight("r3", 1.0)
+    assert engine.decide("I feel so alone", "sad")["action"] == "third"
+
+    engine.remove_rule("r3")
+    engine.remove_rule("r1")
+    assert engine.decide("alone again", None)["action"] == "second"
+
+
+def test_index_agrees_with_linear_scan():
+    rng = random.Random(5)
+    alphabet = "abcé İ"
+    engine = RobinDecisionEngine()
+    for i in range(60):
+        keyword = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 3)))
+        engine.add_rule(Rule(rng.choice(["sad", "Happy"]), keyword, f"a{i}",
+                             weight=rng.choice([1.0, 2.0]), rule_id=str(i)))
+
+    for _ in range(200):
+        message = "".join(rng.choice(alphabet + "ABC") for _ in range(rng.randint(0, 12)))
+        emotion = rng.choice([None, "sad", "HAPPY", "angry"])
+        expected = _linear_decide(engine.rules, message, emotion)
+        assert engine.decide(message, emotion)["action"] == (expected.action if expected else "respond_normally")
@@ -0,0 +1,136 @@
+"""
+Tests for the shared rules store and the per-worker rules reloader.
+"""
+import json
+
+import pytest
+
+from rule_engine import RobinDecisionEngine
+from rules_config_loader import RulesConfigLoader, RulesReloader, rule_from_dict
+from rules_store import RulesStore
+
+RULES = [
+    {"id": "rule001", "emotion": "sad", "keyword": "alone", "action": "offer_companionship", "weight": 1.0},
+    {"id": "rule002", "emotion": "sad", "keyword": "alone", "action": "play_music", "weight": 1.05},
+]
+
+
+@pytest.fixture
+def workers(tmp_path):
+    """Two workers (loader + engine + reloader) sharing one store, seeded from a rules file"""
+    config_path = tmp_path / "rules_config.json"
+    config_path.write_text(json.dumps(RULES), encoding="utf-8")
+    db_path = str(tmp_path / "rules_store.db")
+
+    result = []
+    for _ in range(2):
+        loader = RulesConfigLoader(str(config_path), store=RulesStore(db_path))
+        engine = RobinDecisionEngine()
+        engine.replace_rules([rule_from_dict(rule) for rule in loader.rules])
+        result.append(RulesReloader(loader, engine, interval=0.05))
+    return result
+
+
+def test_feedback_is_batched_and_reaches_other_workers(workers, tmp_path):
+    first, second = workers
+    store = first.loader.store
+    version = store.version()
+
+    assert first.engine.decide("all alone", "sad")["action"] == "play_music"
+    assert first.loader.adjust_rule_weight("rule001", "positive")
+    assert first.loader.adjust_rule_weight("rule001", "positive")
+    assert first.loader.get_rule_by_id("rule001")["weight"] == 1.21
+    assert store.version() == version  # queued, nothing written yet
+
+    assert not second.run_once()
+    assert first.run_once()  # flush (one version bump) and reload
+    assert store.version() == version + 1
+    assert second.run_once()
+
+    for worker in workers:
+        assert worker.loader.get_rule_by_id("rule001")["weight"] == 1.21
+        assert worker.engine.decide("all alone", "sad")["action"] == "offer_companionship"
+
+    # The rules file is only the seed; feedback doesn't rewrite it
+    assert json.loads((tmp_path / "rules_config.json").read_text(encoding="utf-8")) == RULES
+
+
+def test_admin_changes_bump_version_and_swap_index(workers):
+    first, second = workers
+    new_rule = {"id": "rule003", "emotion": "happy", "keyword": "dance", "action": "play_music"}
+    assert first.loader.add_rule(new_rule)
+    assert second.run_once()
+    assert second.engine.decide("let's dance", "happy")["action"] == "play_music"
+
+    assert first.loader.delete_rule("rule003")
+    assert second.run_once()
+    assert second.engine.decide("let's dance", "happy")["action"] == "respond_normally"
+
+
+def test_saving_a_rule_does_not_reapply_queued_feedback(workers):
+    first, _ = workers
+    assert first.loader.adjust_rule_weight("rule001", "positive")
+    assert first.loader.update_rule("rule001", {"keyword": "lonely"})
+    first.loader.flush_weight_updates()
+
+    _, rules = first.loader.store.load()
+    assert {rule["id"]: rule["weight"] for rule in rules}["rule001"] == 1.1
+
+
+def test_background_reloader_converges(workers):
+    first, second = workers
+    second.start()
+    try:
+        first.loader.adjust_rule_weight("rule002", "negative")
+        first.loader.flush_weight_updates()
+        second._stop_event.wait(0.5)
+        assert second.loader.get_rule_by_id("rule002")["weight"] == round(1.05 * 0.9, 2)
+    finally:
+        second.stop()
+
+
+def test_init_api_builds_the_store_from_config(tmp_path, monkeypatch):
+    import api_routes
+    from flask import Flask
+
+    config_path = tmp_path / "rules_config.json"
+    config_path.write_text(json.dumps(RULES), encoding="utf-8")
+    loader = RulesConfigLoader(str(config_path))
+    engine = RobinDecisionEngine()
+    reloader = RulesReloader(loader, engine)
+    monkeypatch.setattr(api_routes, "rules_loader", loader)
+    monkeypatch.setattr(api_routes, "robin_engine", engine)
+    monkeypatch.setattr(api_routes, "rules_reloader", reloader)
+    assert loader.store is None  # importing api_routes opens no store
+
+    class _Config:
+        RULES_STORE_PATH = str(tmp_path / "rules_store.db")
+        RULES_RELOAD_INTERVAL = 0.05
+
+    api_routes.init_api(Flask(__name__), config=_Config())
+    try:
+        assert loader.store.db_path == _Config.RULES_STORE_PATH
+        assert engine.decide("all alone", "sad")["action"] == "play_music"
+        assert reloader.interval == 0.05
+    finally:
+        reloader.stop()
+
+
+def test_feedback_without_a_store_updates_the_engine(tmp_path, monkeypatch):
+    import api_routes
+    from flask import Flask
+
+    config_path = tmp_path / "rules_config.json"
+    config_path.write_text(json.dumps(RULES), encoding="utf-8")
+    loader = RulesConfigLoader(str(config_path))
+    engine = RobinDecisionEngine()
+    engine.replace_rules([rule_from_dict(rule) for rule in loader.rules])
+    monkeypatch.setattr(api_routes, "rules_loader", loader)
+    monkeypatch.setattr(api_routes, "robin_engine", engine)
+    app = Flask(__name__)
+    app.register_blueprint(api_routes.api_bp)
+
+    assert engine.decide("all alone", "sad")["action"] == "play_music"
+    response = app.test_client().post("/api/feedback", json={"rule_id": "rule001", "feedback": "positive"})
+    assert response.status_code == 200
+    assert engine.decide("all alone", "sad")["action"] == "offer_companionship"
@@ -0,0 +1,101 @@
+"""
+Tests for the shared TTS audio cache (content addressing, LRU eviction
+within the size budget and atomic writes).
+"""
+import os
+
+import pytest
+
+from tts import gtts_fallback
+from tts.audio_cache import TTSAudioCache
+from tts.gtts_fallback import GTTSFallback
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return TTSAudioCache(str(tmp_path / "tts_cache"), max_bytes=1000)
+
+
+def test_key_normalizes_text_and_language(cache):
+    key = cache.key("gtts", "Hello   world ", language="en_US", voice_params={"a": 1, "b": 2})
+    assert key == cache.key("gtts", "Hello world", language="EN-us", voice_params={"b": 2, "a": 1})
+    assert key != cache.key("gtts", "Hello world", language="ar", voice_params={"a": 1, "b": 2})
+    assert key != cache.key("elevenlabs", "Hello world", language="en-us", voice_params={"a": 1, "b": 2})
+
+
+def test_put_and_get_round_trip(cache):
+    key = cache.key("gtts", "good morning", language="en")
+    assert cache.get(key) is None
+
+    path = cache.put_bytes(key, "gtts", b"x" * 100, text="good morning", language="en")
+    assert os.path.basename(path) == f"gtts_{key}.mp3"
+    assert cache.get(key) == path
+    with open(path, "rb") as f:
+        assert f.read() == b"x" * 100
+    assert cache.stats()["entries"] == 1
+
+
+def test_evicts_least_recently_used_over_budget(cache):
+    keys = [cache.key("gtts", f"phrase {i}") for i in range(4)]
+    paths = [cache.put_bytes(key, "gtts", b"x" * 300) for key in keys[:3]]
+
+    # Touch the oldest entry so the second one becomes least recently used
+    assert cache.get(keys[0]) == paths[0]
+    cache.put_bytes(keys[3], "gtts", b"x" * 300)
+
+    assert cache.get(keys[1]) is None
+    assert not os.path.exists(paths[1])
+    assert cache.get(keys[0]) == paths[0]
+    assert cache.stats()["size_bytes"] <= cache.max_bytes
+
+
+def test_failed_or_empty_writes_leave_nothing_behind(cache):
+    key = cache.key("gtts", "broken")
+
+    def failing_write(temp_path):
+        with open(temp_path, "wb") as f:
+            f.write(b"partial")
+        raise IOError("connection reset")
+
+    with pytest.raises(IOError):
+        cache.put_file(key, "gtts", failing_write)
+    with pytest.raises(ValueError):
+        cache.put_bytes(key, "gtts", b"")
+
+    assert cache.get(key) is None
+    assert [name for name in os.listdir(cache.cache_dir) if name.endswith(".mp3") or name.endswith(".tmp")] == []
+
+
+def test_missing_file_is_treated_as_miss(cache):
+    key = cache.key("gtts", "deleted")
+    os.remove(cache.put_bytes(key, "gtts", b"audio"))
+    assert cache.get(key) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_gtts_provider_uses_shared_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(gtts_fallback, "gTTS", None)
+    audio_cache = TTSAudioCache(str(tmp_path / "tts_cache"))
+    provider = GTTSFallback(audio_cache=audio_cache)
+
+    key = provider._cache_key("How are you feeling today?", "en")
+    path = audio_cache.put_bytes(key, "gtts", b"audio")
+
+    assert provider.cached_path("How are you  feeling today?", "english") == path
+    assert provider.speak("How are you feeling today?", language="en-US") == path
+
+
+def test_tee_indexes_completed_streams_only(cache):
+    key = cache.key("elevenlabs", "streamed text")
+    assert b"".join(cache.tee(iter([b"ab", b"", b"cd"]), key, "elevenlabs")) == b"abcd"
+    with open(cache.get(key), "rb") as f:
+        assert f.read() == b"abcd"
+
+    # A client disconnecting mid-stream closes the generator: nothing is cached
+    partial_key = cache.key("elevenlabs", "abandoned text")
+    stream = cache.tee(iter([b"ab", b"cd"]), partial_key, "elevenlabs")
+    assert next(stream) == b"ab"
+    stream.close()
+    assert cache.get(partial_key) is None
+    assert not [name for name in os.listdir(cache.cache_dir) if name.endswith(".tmp")]
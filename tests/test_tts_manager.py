@@ -0,0 +1,194 @@
+"""
+Tests for concurrent synthesis in TTSManager (cache lookup before locking,
+per-request single-flight, the bounded provider pool and streaming).
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from tts import gtts_fallback
+from tts.tts_manager import TTSManager
+
+
+class _Config:
+    TTS_PROVIDER = "elevenlabs"
+    ELEVENLABS_API_KEY = ""
+    APP_URL = ""
+    TTS_MAX_WORKERS = 4
+
+    def is_offline(self):
+        return True
+
+
+class _SlowProvider:
+    """Provider stub that blocks until released and records concurrent calls"""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.release = threading.Event()
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def _path(self, text, voice):
+        return os.path.join(self.cache_dir, f"{voice}_{abs(hash(text))}.mp3")
+
+    def cached_path(self, text, voice="default", voice_params=None):
+        path = self._path(text, voice)
+        return path if os.path.exists(path) else None
+
+    def speak(self, text, voice="default", voice_params=None, use_cache=None):
+        with self._lock:
+            self.calls.append(text)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        self.release.wait(5)
+        path = self._path(text, voice)
+        with open(path, "wb") as f:
+            f.write(b"audio")
+        with self._lock:
+            self.active -= 1
+        return path
+
+    def stream(self, text, voice="default", voice_params=None, chunk_size=8192):
+        self.release.wait(5)
+
+        def chunks():
+            parts = [b"first", b"second"]
+            with open(self._path(text, voice), "wb") as f:
+                for part in parts:
+                    f.write(part)
+                    yield part
+        return chunks()
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(gtts_fallback, "gTTS", None)
+    tts_manager = TTSManager(_Config())
+    tts_manager.elevenlabs = _SlowProvider(str(tmp_path))
+    tts_manager.use_elevenlabs = True
+    tts_manager.use_gtts = False
+    yield tts_manager
+    tts_manager.elevenlabs.release.set()
+    tts_manager.synthesis_pool.shutdown(wait=True)
+
+
+def _speak_in_threads(manager, texts):
+    results = [None] * len(texts)
+
+    def run(index, text):
+        results[index] = manager.speak(text)
+
+    threads = [threading.Thread(target=run, args=(i, text)) for i, text in enumerate(texts)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    assert condition()
+
+
+def test_identical_requests_share_one_synthesis(manager):
+    threads, results = _speak_in_threads(manager, ["hello there"] * 5)
+    _wait_for(lambda: manager.stats["coalesced"] == 4)
+    manager.elevenlabs.release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert manager.elevenlabs.calls == ["hello there"]
+    assert len(set(results)) == 1
+
+
+def test_different_requests_run_in_parallel(manager):
+    threads, _ = _speak_in_threads(manager, ["one", "two", "three"])
+    _wait_for(lambda: manager.elevenlabs.max_active == 3)
+    manager.elevenlabs.release.set()
+    for thread in threads:
+        thread.join(5)
+
+
+def test_cache_hits_do_not_wait_for_running_synthesis(manager):
+    manager.elevenlabs.release.set()
+    cached = manager.speak("cached phrase")
+    manager.elevenlabs.release.clear()
+
+    threads, _ = _speak_in_threads(manager, ["slow phrase"])
+    _wait_for(lambda: manager.elevenlabs.active == 1)
+
+    start = time.time()
+    assert manager.generate_tts("cached phrase")["cache_hit"] is True
+    assert manager.speak("cached phrase") == cached
+    assert time.time() - start < 1
+    # The hit is reported per call only, not in state shared with concurrent callers
+    assert not hasattr(manager, "last_was_cache_hit")
+
+    manager.elevenlabs.release.set()
+    for thread in threads:
+        thread.join(5)
+
+
+def test_stream_speech_streams_then_serves_from_cache(manager):
+    manager.elevenlabs.release.set()
+
+    chunks, cache_hit = manager.stream_speech("streamed phrase", chunk_size=4)
+    assert cache_hit is False
+    assert b"".join(chunks) == b"firstsecond"
+
+    chunks, cache_hit = manager.stream_speech("streamed phrase", chunk_size=4)
+    assert cache_hit is True
+    assert list(chunks)[0] == b"firs"
+    assert manager.stats["streamed"] == 1
+    assert manager.stats["cache_hits"] == 1
+
+
+def test_stream_speech_falls_back_when_provider_fails(manager):
+    manager.elevenlabs.release.set()
+
+    def failing_stream(*args, **kwargs):
+        raise IOError("streaming endpoint unavailable")
+
+    manager.elevenlabs.stream = failing_stream
+    chunks, cache_hit = manager.stream_speech("fallback phrase")
+    assert cache_hit is False
+    assert b"".join(chunks) == b"audio"
+    assert manager.elevenlabs.calls == ["fallback phrase"]
+
+
+
+class _InlineExecutor:
+    """Runs the task in submit(), so the future is already done when it is returned"""
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    def shutdown(self, wait=True):
+        pass
+
+
+def test_synthesis_that_finishes_before_submit_returns_does_not_deadlock(manager):
+    manager.elevenlabs.release.set()
+    manager.synthesis_pool = _InlineExecutor()
+    results = []
+    # Daemon threads, so a deadlock fails the test instead of hanging the run
+    threads = [threading.Thread(target=lambda text=text: results.append(manager.speak(text)), daemon=True)
+               for text in ["instant phrase", "another instant phrase"]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert not any(thread.is_alive() for thread in threads)
+    assert len(results) == 2 and all(results)
+    assert manager._inflight == {}
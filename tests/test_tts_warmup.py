@@ -0,0 +1,92 @@
+"""
+Tests for the static phrase TTS warm-up job.
+"""
+import os
+import threading
+import time
+
+from recommendation_engine import RecommendationEngine
+from config import Config
+from tts_warmup import TTSWarmup, collect_utterances, warm_tts_cache
+
+
+class _Narrator:
+    guidance_scripts = {
+        "welcome": {"initial": {"en": "Welcome.", "ar": "مرحبًا."}},
+        "main": {"help": {"en": "Say help."}},
+    }
+
+
+class _Manager:
+    """generate_tts stub with a cache and a concurrency probe"""
+
+    def __init__(self, cache_dir, fail_text=None):
+        self.cache_dir = cache_dir
+        self.fail_text = fail_text
+        self.cached = {}
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        self.warmup_report = None
+
+    def generate_tts(self, text, language=None, voice="default", use_cache=True):
+        if (text, language) in self.cached:
+            return {"path": self.cached[(text, language)], "cache_hit": True}
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.02)
+        with self.lock:
+            self.active -= 1
+        if text == self.fail_text:
+            return {"path": os.path.join(self.cache_dir, "error.mp3"), "cache_hit": False}
+        path = os.path.join(self.cache_dir, f"{len(self.cached)}.mp3")
+        with open(path, "wb") as f:
+            f.write(b"audio")
+        self.cached[(text, language)] = path
+        return {"path": path, "cache_hit": False}
+
+
+def test_collect_utterances_covers_scripts_and_greetings():
+    utterances = collect_utterances(["en", "ar"], narrator=_Narrator())
+    texts = {(text, language) for text, language, _ in utterances}
+
+    assert ("Welcome.", "en") in texts and ("مرحبًا.", "ar") in texts and ("Say help.", "en") in texts
+    for language in ("en", "ar"):
+        assert {(greeting, language) for greeting in RecommendationEngine.greeting_phrases(language)} <= texts
+    assert len(texts) == len(utterances)
+
+
+def test_greeting_phrases_include_suffixed_variants():
+    phrases = RecommendationEngine.greeting_phrases("en")
+    assert "Good morning! The universe awakens with you today." in phrases
+    assert "Good morning! The universe awakens with you today. Enjoy your weekend journey!" in phrases
+
+
+def test_warmup_synthesizes_missing_phrases_with_bounded_concurrency(tmp_path):
+    manager = _Manager(str(tmp_path), fail_text="broken")
+    utterances = [(f"phrase {i}", "en", "test") for i in range(8)] + [("broken", "en", "test")]
+    manager.generate_tts("phrase 0", language="en")
+
+    report = TTSWarmup(manager, max_workers=3).run(utterances)
+
+    assert report["already_cached"] == 1
+    assert report["synthesized"] == 7
+    assert report["failed"] == 1 and report["failures"][0]["text"] == "broken"
+    assert report["by_language"]["en"] == {"total": 9, "covered": 8}
+    assert 1 < manager.max_active <= 3
+    assert manager.warmup_report is report
+
+    again = TTSWarmup(manager, max_workers=3).run(utterances[:8])
+    assert again["already_cached"] == 8 and again["coverage"] == 1.0
+
+
+def test_startup_warmup_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.delenv("TTS_WARMUP_ENABLED", raising=False)
+    manager = _Manager(str(tmp_path))
+    assert warm_tts_cache(manager, Config(), narrator=_Narrator()) is None
+    assert manager.cached == {}
+
+    monkeypatch.setenv("TTS_WARMUP_ENABLED", "true")
+    monkeypatch.setenv("TTS_WARMUP_WORKERS", "16")
+    assert warm_tts_cache(manager, Config(), narrator=_Narrator())["total"] > 0
@@ -0,0 +1,270 @@
+"""
+Content-addressed audio cache shared by the TTS providers.
+
+Audio is stored as tts_cache/<provider>_<sha256>.mp3, where the hash covers
+the normalized text, voice, language and voice parameters, so two requests
+share a file exactly when they would produce the same audio. A SQLite index
+next to the files tracks size and last access of every entry; when the
+total size exceeds the budget the least recently used files are deleted.
+
+Files are written to a temporary name and renamed into place, so a worker
+never serves a half-written file written by another one. Streamed audio is
+teed into the cache the same way and only indexed once the stream completes.
+"""
+import os
+import json
+import uuid
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+import unicodedata
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+DEFAULT_CACHE_DIR = "tts_cache"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 8192
+INDEX_FILENAME = "tts_index.db"
+
+_shared_caches: Dict[str, "TTSAudioCache"] = {}
+_shared_lock = threading.Lock()
+
+
+def normalize_text(text: str) -> str:
+    """Unicode-normalize and collapse whitespace so equivalent texts share audio"""
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def normalize_language(language: Optional[str]) -> str:
+    """Canonical language tag (en_US, EN-us -> en-us)"""
+    return (language or "").strip().replace("_", "-").lower()
+
+
+def iter_file(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield a file's content in chunks"""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+class TTSAudioCache:
+    """Size-bounded LRU cache of synthesized audio files with a SQLite index"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, INDEX_FILENAME)
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tts_audio (
+                    key TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    provider TEXT NOT NULL,
+                    voice TEXT,
+                    language TEXT,
+                    text TEXT,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hit_count INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tts_audio_last_access ON tts_audio (last_access)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.index_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def key(self, provider: str, text: str, voice: str = "", language: Optional[str] = None,
+            voice_params: Optional[Dict[str, Any]] = None) -> str:
+        """Content address of the audio for a synthesis request"""
+        material = json.dumps([
+            provider,
+            normalize_text(text),
+            voice or "",
+            normalize_language(language),
+            voice_params or {},
+        ], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str, provider: str) -> str:
+        return os.path.join(self.cache_dir, f"{provider}_{key}.mp3")
+
+    def get(self, key: str) -> Optional[str]:
+        """Path of the cached audio for a key, or None; refreshes its LRU position"""
+        try:
+            with self._connection() as conn:
+                row = conn.execute("SELECT filename, size FROM tts_audio WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    path = os.path.join(self.cache_dir, row[0])
+                    try:
+                        valid = os.path.getsize(path) == row[1]
+                    except OSError:
+                        valid = False
+                    if valid:
+                        conn.execute(
+                            "UPDATE tts_audio SET last_access = ?, hit_count = hit_count + 1 WHERE key = ?",
+                            (time.time(), key)
+                        )
+                        self.hits += 1
+                        return path
+                    # File deleted or replaced behind our back
+                    conn.execute("DELETE FROM tts_audio WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            self.logger.error(f"TTS cache lookup failed: {str(e)}")
+        self.misses += 1
+        return None
+
+    def put_bytes(self, key: str, provider: str, data: bytes, **details) -> str:
+        """Store audio bytes under a key and return the final path"""
+        def write(temp_path):
+            with open(temp_path, "wb") as f:
+                f.write(data)
+        return self.put_file(key, provider, write, **details)
+
+    def put_file(self, key: str, provider: str, write: Callable[[str], Any], text: str = "",
+                 voice: str = "", language: Optional[str] = None) -> str:
+        """
+        Store audio produced by write(temp_path) under a key and return the final path
+
+        The file only appears under its final name once complete; empty
+        output is discarded and raises ValueError.
+        """
+        path = self.path_for(key, provider)
+        with self.atomic_path(path) as temp_path:
+            write(temp_path)
+            if os.path.getsize(temp_path) == 0:
+                raise ValueError("TTS provider produced an empty audio file")
+        self._index(key, path, provider, text, voice, language)
+        return path
+
+    @contextmanager
+    def writer(self, key: str, provider: str, text: str = "", voice: str = "",
+               language: Optional[str] = None):
+        """
+        Yield a binary file whose content becomes the entry for a key
+
+        The entry is only added if the block completes; on an exception
+        (including a client disconnect closing a streaming generator) the
+        partial file is discarded.
+        """
+        path = self.path_for(key, provider)
+        with self.atomic_path(path) as temp_path:
+            with open(temp_path, "wb") as f:
+                yield f
+            if os.path.getsize(temp_path) == 0:
+                raise ValueError("TTS provider produced an empty audio file")
+        self._index(key, path, provider, text, voice, language)
+
+    def tee(self, chunks: Iterable[bytes], key: str, provider: str, **details) -> Iterator[bytes]:
+        """Pass audio chunks through while writing them to the cache entry for a key"""
+        with self.writer(key, provider, **details) as f:
+            for chunk in chunks:
+                if chunk:
+                    f.write(chunk)
+                    yield chunk
+
+    @contextmanager
+    def atomic_path(self, path: str):
+        """Yield a temporary path that is renamed to `path` if the block succeeds"""
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            yield temp_path
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _index(self, key, path, provider, text, voice, language):
+        now = time.time()
+        size = os.path.getsize(path)
+        try:
+            with self._connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO tts_audio "
+                    "(key, filename, provider, voice, language, text, size, created_at, last_access, hit_count) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                    (key, os.path.basename(path), provider, voice, normalize_language(language),
+                     normalize_text(text)[:200], size, now, now)
+                )
+            self.evict()
+        except sqlite3.Error as e:
+            self.logger.error(f"TTS cache index update failed: {str(e)}")
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """Delete least recently used entries until the cache fits the size budget"""
+        budget = self.max_bytes if max_bytes is None else max_bytes
+        removed = 0
+        with self._connection() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM tts_audio").fetchone()[0]
+            if total <= budget:
+                return 0
+            for key, filename, size in conn.execute(
+                "SELECT key, filename, size FROM tts_audio ORDER BY last_access"
+            ).fetchall():
+                if total <= budget:
+                    break
+                try:
+                    os.remove(os.path.join(self.cache_dir, filename))
+                except OSError:
+                    pass
+                conn.execute("DELETE FROM tts_audio WHERE key = ?", (key,))
+                total -= size
+                removed += 1
+        self.evictions += removed
+        if removed:
+            self.logger.info(f"Evicted {removed} TTS cache entries to stay within {budget} bytes")
+        return removed
+
+    def remove(self, key: str):
+        with self._connection() as conn:
+            row = conn.execute("SELECT filename FROM tts_audio WHERE key = ?", (key,)).fetchone()
+            if row:
+                try:
+                    os.remove(os.path.join(self.cache_dir, row[0]))
+                except OSError:
+                    pass
+                conn.execute("DELETE FROM tts_audio WHERE key = ?", (key,))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connection() as conn:
+            entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM tts_audio").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "size_bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+def get_audio_cache(cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: Optional[int] = None) -> TTSAudioCache:
+    """Cache instance shared by every provider writing to the same directory"""
+    with _shared_lock:
+        cache = _shared_caches.get(os.path.abspath(cache_dir))
+        if cache is None:
+            cache = TTSAudioCache(cache_dir, max_bytes or DEFAULT_MAX_BYTES)
+            _shared_caches[os.path.abspath(cache_dir)] = cache
+        elif max_bytes:
+            cache.max_bytes = max_bytes
+        return cache
@@ -2,13 +2,15 @@ import os
 import logging
 import requests
 import json
+import threading
 import time
 from datetime import datetime
+from .audio_cache import get_audio_cache
 
 class ElevenLabsTTS:
     """Text-to-Speech implementation using ElevenLabs API"""
     
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, audio_cache=None):
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.DEBUG)
         
@@ -45,6 +47,8 @@ class ElevenLabsTTS:
         # Create directory for audio cache
         self.cache_dir = "tts_cache"
         os.makedirs(self.cache_dir, exist_ok=True)
+        self.audio_cache = audio_cache or get_audio_cache(self.cache_dir)
+        self.model_id = "eleven_multilingual_v2"
         
         # Cache control flag
         self.use_cache = True
@@ -52,6 +56,7 @@ class ElevenLabsTTS:
         # Track API usage
         self.request_count = 0
         self.last_request_time = None
+        self._rate_lock = threading.Lock()
         
         # Log API key status
         if self.api_key:
@@ -108,7 +113,7 @@ class ElevenLabsTTS:
             self.logger.error(f"Traceback: {traceback.format_exc()}")
             return False
     
-    def speak(self, text, voice="default", voice_params=None):
+    def speak(self, text, voice="default", voice_params=None, use_cache=None):
         """
         Generate speech from text and return path to audio file
         
@@ -117,7 +122,11 @@ class ElevenLabsTTS:
             voice (str): Voice ID or name
             voice_params (dict): Optional voice parameters for emotional tone modulation
                 (stability, similarity_boost, style, use_speaker_boost)
+            use_cache (bool): Per-call cache override (defaults to self.use_cache)
         """
+        if use_cache is None:
+            use_cache = self.use_cache
+        
         self.logger.info(f"ElevenLabs TTS generating speech for: '{text[:30]}...' with voice: {voice}")
         
         if not self.api_key:
@@ -131,68 +140,26 @@ class ElevenLabsTTS:
                 self.logger.error("Failed to retrieve ElevenLabs API key from environment")
                 raise ValueError("ElevenLabs API key not set and not found in environment")
         
-        # Handle None, default, or empty voice value first
-        if voice is None or voice == "default" or voice == "":
-            voice_id = self.voices["default"]
-            self.logger.info(f"Using default voice: {voice_id}")
-        # Special handling for known ElevenLabs voice IDs
-        elif voice == "ErXwobaYiN019PkySvjV":
-            # This is the Rachel (English) voice
-            voice_id = "ErXwobaYiN019PkySvjV"
-            self.logger.info(f"Using English voice Rachel: {voice_id}")
-        elif voice == "21m00Tcm4TlvDq8ikWAM":
-            # This is the Arabic voice
-            voice_id = "21m00Tcm4TlvDq8ikWAM"
-            self.logger.info(f"Using Arabic voice: {voice_id}")
-        elif voice == "XrExE9yKIg1WjnnlVkGX":
-            # This is another Arabic voice
-            voice_id = "XrExE9yKIg1WjnnlVkGX"
-            self.logger.info(f"Using Arabic voice (direct ID): {voice_id}")
-        # Fallback to dictionary for other voices
-        else:
-            # Get voice ID - try to check if it's a direct ElevenLabs ID (usually 21-24 chars)
-            if isinstance(voice, str) and len(voice) >= 21 and all(c in '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ' for c in voice):
-                voice_id = voice  # Use the ID directly
-                self.logger.info(f"Using voice ID directly: {voice_id}")
-            elif isinstance(voice, str):
-                # Otherwise, look up in our voice dictionary
-                voice_id = self.voices.get(voice.lower(), self.voices["default"])
-                self.logger.info(f"Mapped voice '{voice}' to ElevenLabs voice ID: {voice_id}")
-            else:
-                # Fallback for any other case
-                voice_id = self.voices["default"]
-                self.logger.info(f"Invalid voice type, using default: {voice_id}")
+        voice_id = self._resolve_voice_id(voice)
+        voice_settings = self._voice_settings(voice_params)
         
-        # Create a cache filename based on text and voice
-        import hashlib
-        text_hash = hashlib.md5(text.encode()).hexdigest()
-        cache_filename = f"{voice_id}_{text_hash}.mp3"
-        cache_path = os.path.join(self.cache_dir, cache_filename)
+        # Cache key covers text, voice, model and effective voice settings
+        cache_key = self._cache_key(text, voice_id, voice_settings)
         
         # Check if we should use cache
-        if self.use_cache and os.path.exists(cache_path):
-            file_size = os.path.getsize(cache_path)
-            if file_size > 0:
-                self.logger.info(f"Using cached audio for: {text[:30]}... (size: {file_size} bytes)")
+        if use_cache:
+            cache_path = self.audio_cache.get(cache_key)
+            if cache_path:
+                self.logger.info(f"Using cached audio for: {text[:30]}... ({cache_path})")
                 return cache_path
-            else:
-                self.logger.warning(f"Found zero-byte cached file, will regenerate: {cache_path}")
-        elif not self.use_cache:
+        else:
             self.logger.info(f"Cache disabled for this request, generating fresh audio")
         
         try:
             # Verify directories exist
             os.makedirs(self.cache_dir, exist_ok=True)
             
-            # Rate limiting: max 3 requests per second
-            current_time = time.time()
-            if self.last_request_time and (current_time - self.last_request_time) < 0.33:
-                delay_time = 0.33 - (current_time - self.last_request_time)
-                self.logger.debug(f"Rate limiting - waiting {delay_time:.2f} seconds")
-                time.sleep(delay_time)
-            
-            self.last_request_time = time.time()
-            self.request_count += 1
+            self._wait_for_rate_limit()
             
             # Prepare API request
             headers = {
@@ -201,24 +168,12 @@ class ElevenLabsTTS:
                 "Accept": "audio/mpeg"
             }
             
-            # Prepare voice settings
-            voice_settings = {
-                "stability": 0.5,
-                "similarity_boost": 0.5,
-                "style": 0.0,
-                "use_speaker_boost": True
-            }
-            
-            # Apply voice parameters if provided
             if voice_params:
                 self.logger.debug(f"Applying custom voice parameters for emotional tone: {voice_params}")
-                for param, value in voice_params.items():
-                    if param in voice_settings:
-                        voice_settings[param] = value
             
             data = {
                 "text": text,
-                "model_id": "eleven_multilingual_v2",
+                "model_id": self.model_id,
                 "voice_settings": voice_settings
             }
             
@@ -270,21 +225,13 @@ class ElevenLabsTTS:
                 self.logger.error(f"Response content (hex): {response.content.hex()}")
                 raise Exception(f"Audio response too small: {content_length} bytes")
                 
-            # Save the audio file
+            # Save the audio file (written atomically and indexed in the shared cache)
             try:
-                with open(cache_path, "wb") as f:
-                    f.write(response.content)
-                
-                # Verify the file was created
-                if os.path.exists(cache_path):
-                    file_size = os.path.getsize(cache_path)
-                    self.logger.info(f"Successfully generated speech and saved to {cache_path}. File size: {file_size} bytes")
-                    if file_size < 100:
-                        self.logger.warning(f"Saved audio file is suspiciously small: {file_size} bytes")
-                    return cache_path
-                else:
-                    self.logger.error(f"Failed to save audio to {cache_path}")
-                    raise Exception(f"Failed to save audio file to {cache_path}")
+                cache_path = self.audio_cache.put_bytes(
+                    cache_key, "elevenlabs", response.content, text=text, voice=voice_id
+                )
+                self.logger.info(f"Successfully generated speech and saved to {cache_path}. File size: {content_length} bytes")
+                return cache_path
             except Exception as save_e:
                 self.logger.error(f"Error saving audio file: {str(save_e)}")
                 import traceback
@@ -298,6 +245,149 @@ class ElevenLabsTTS:
             # Create a more detailed error message
             raise Exception(f"ElevenLabs TTS failed: {str(e)} (voice: {voice}, voice_id: {voice_id})")
     
+    def stream(self, text, voice="default", voice_params=None, chunk_size=8192):
+        """
+        Stream speech from the ElevenLabs streaming endpoint
+        
+        Chunks are teed into the audio cache, so the next request for the
+        same text is a cache hit once this stream has been fully consumed.
+        HTTP errors are raised here, before any audio is returned.
+        
+        Args:
+            text (str): The text to convert to speech
+            voice (str): Voice ID or name
+            voice_params (dict): Optional voice parameters for emotional tone modulation
+            chunk_size (int): Bytes per yielded chunk
+        
+        Returns:
+            iterator: MP3 audio chunks
+        """
+        if not self.api_key:
+            self.api_key = os.environ.get('ELEVENLABS_API_KEY')
+            if not self.api_key:
+                raise ValueError("ElevenLabs API key not set and not found in environment")
+        
+        voice_id = self._resolve_voice_id(voice)
+        voice_settings = self._voice_settings(voice_params)
+        cache_key = self._cache_key(text, voice_id, voice_settings)
+        
+        self._wait_for_rate_limit()
+        self.logger.info(f"ElevenLabs TTS streaming speech for: '{text[:30]}...' with voice: {voice}")
+        
+        response = requests.post(
+            f"{self.base_url}/text-to-speech/{voice_id}/stream",
+            headers={
+                "xi-api-key": self.api_key,
+                "Content-Type": "application/json",
+                "Accept": "audio/mpeg"
+            },
+            json={
+                "text": text,
+                "model_id": self.model_id,
+                "voice_settings": voice_settings
+            },
+            stream=True,
+            timeout=20
+        )
+        
+        if response.status_code != 200:
+            error_msg = f"ElevenLabs streaming API error: {response.status_code} - {response.text[:200]}"
+            response.close()
+            self.logger.error(error_msg)
+            raise Exception(error_msg)
+        
+        def chunks():
+            try:
+                yield from self.audio_cache.tee(
+                    response.iter_content(chunk_size), cache_key, "elevenlabs", text=text, voice=voice_id
+                )
+            finally:
+                response.close()
+        
+        return chunks()
+    
+    def _wait_for_rate_limit(self):
+        """Rate limiting: max 3 requests per second (shared by concurrent callers)"""
+        with self._rate_lock:
+            current_time = time.time()
+            if self.last_request_time and (current_time - self.last_request_time) < 0.33:
+                delay_time = 0.33 - (current_time - self.last_request_time)
+                self.logger.debug(f"Rate limiting - waiting {delay_time:.2f} seconds")
+                time.sleep(delay_time)
+            
+            self.last_request_time = time.time()
+            self.request_count += 1
+    
+    def _resolve_voice_id(self, voice):
+        """Map a voice name, shortcode or ElevenLabs ID to an ElevenLabs voice ID"""
+        # Handle None, default, or empty voice value first
+        if voice is None or voice == "default" or voice == "":
+            voice_id = self.voices["default"]
+            self.logger.info(f"Using default voice: {voice_id}")
+        # Special handling for known ElevenLabs voice IDs
+        elif voice == "ErXwobaYiN019PkySvjV":
+            # This is the Rachel (English) voice
+            voice_id = "ErXwobaYiN019PkySvjV"
+            self.logger.info(f"Using English voice Rachel: {voice_id}")
+        elif voice == "21m00Tcm4TlvDq8ikWAM":
+            # This is the Arabic voice
+            voice_id = "21m00Tcm4TlvDq8ikWAM"
+            self.logger.info(f"Using Arabic voice: {voice_id}")
+        elif voice == "XrExE9yKIg1WjnnlVkGX":
+            # This is another Arabic voice
+            voice_id = "XrExE9yKIg1WjnnlVkGX"
+            self.logger.info(f"Using Arabic voice (direct ID): {voice_id}")
+        # Fallback to dictionary for other voices
+        else:
+            # Get voice ID - try to check if it's a direct ElevenLabs ID (usually 21-24 chars)
+            if isinstance(voice, str) and len(voice) >= 21 and all(c in '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ' for c in voice):
+                voice_id = voice  # Use the ID directly
+                self.logger.info(f"Using voice ID directly: {voice_id}")
+            elif isinstance(voice, str):
+                # Otherwise, look up in our voice dictionary
+                voice_id = self.voices.get(voice.lower(), self.voices["default"])
+                self.logger.info(f"Mapped voice '{voice}' to ElevenLabs voice ID: {voice_id}")
+            else:
+                # Fallback for any other case
+                voice_id = self.voices["default"]
+                self.logger.info(f"Invalid voice type, using default: {voice_id}")
+        
+        return voice_id
+    
+    def _voice_settings(self, voice_params=None):
+        """Default voice settings overridden by the supported keys of voice_params"""
+        voice_settings = {
+            "stability": 0.5,
+            "similarity_boost": 0.5,
+            "style": 0.0,
+            "use_speaker_boost": True
+        }
+        
+        # Apply voice parameters if provided
+        if voice_params:
+            for param, value in voice_params.items():
+                if param in voice_settings:
+                    voice_settings[param] = value
+        return voice_settings
+    
+    def _cache_key(self, text, voice_id, voice_settings):
+        """Audio cache key for a text, voice ID and effective voice settings"""
+        return self.audio_cache.key(
+            "elevenlabs", text, voice=f"{voice_id}:{self.model_id}", voice_params=voice_settings
+        )
+    
+    def cached_path(self, text, voice="default", voice_params=None):
+        """
+        Return the cached audio path for a text and voice without synthesizing
+        
+        Returns:
+            str: Path of a non-empty cached file, or None
+        """
+        if not self.use_cache or not text:
+            return None
+        cache_key = self._cache_key(text, self._resolve_voice_id(voice), self._voice_settings(voice_params))
+        return self.audio_cache.get(cache_key)
+    
     def enable_cache(self):
         """Enable caching for TTS generation"""
         self.use_cache = True
@@ -1,10 +1,10 @@
 import os
 import logging
-import hashlib
 import json
 import base64
 import io
 import importlib.util
+from .audio_cache import get_audio_cache, iter_file
 
 # Check if gtts is available
 try:
@@ -18,7 +18,7 @@ except ImportError:
 class GTTSFallback:
     """Text-to-Speech fallback implementation with cached responses"""
     
-    def __init__(self):
+    def __init__(self, audio_cache=None):
         self.logger = logging.getLogger(__name__)
         
         # Language mapping
@@ -37,6 +37,7 @@ class GTTSFallback:
         # Create directory for audio cache
         self.cache_dir = "tts_cache"
         os.makedirs(self.cache_dir, exist_ok=True)
+        self.audio_cache = audio_cache or get_audio_cache(self.cache_dir)
         
         # Cache control flag
         self.use_cache = True
@@ -95,7 +96,7 @@ class GTTSFallback:
         # Always return True since we have fallbacks
         return True
     
-    def speak(self, text, voice="default", language=None):
+    def speak(self, text, voice="default", language=None, use_cache=None):
         """
         Generate speech from text using gTTS and return path to audio file
         
@@ -103,26 +104,12 @@ class GTTSFallback:
             text (str): The text to convert to speech
             voice (str): Voice name or type
             language (str): Optional explicit language code that overrides voice mapping
+            use_cache (bool): Per-call cache override (defaults to self.use_cache)
         """
-        # Map voice to language if language not explicitly provided
-        if language:
-            # Override with explicit language if provided (e.g., 'ar', 'en')
-            if language.startswith('ar'):
-                lang = 'ar'
-            elif language.startswith('en'):
-                lang = 'en'
-            else:
-                lang = language[:2]  # Use first two chars as language code
-            self.logger.debug(f"Using explicit language override: {lang} from {language}")
-        else:
-            # Handle None or invalid voice values
-            if voice is None or not isinstance(voice, str):
-                lang = "en"  # Default to English
-                self.logger.debug(f"Using default language 'en' for None or invalid voice: {voice}")
-            else:
-                # Otherwise use voice mapping
-                lang = self.languages.get(voice.lower(), "en")
-                self.logger.debug(f"Mapped voice '{voice}' to language: {lang}")
+        if use_cache is None:
+            use_cache = self.use_cache
+        
+        lang = self._resolve_language(voice, language)
         
         # Handling Arabic text specially (right-to-left language)
         is_arabic = lang == 'ar'
@@ -130,24 +117,21 @@ class GTTSFallback:
             self.logger.debug("Processing Arabic text for TTS generation")
         
         # Check for exact matches in offline responses
-        text_lower = text.lower().strip()
-        for key, audio_file in self.offline_responses.items():
-            if key in text_lower:
-                offline_path = os.path.join(self.cache_dir, audio_file)
-                if os.path.exists(offline_path) and os.path.getsize(offline_path) > 0:
-                    self.logger.debug(f"Using offline response for: {text[:20]}...")
-                    return offline_path
+        offline_path = self._offline_response_path(text)
+        if offline_path:
+            self.logger.debug(f"Using offline response for: {text[:20]}...")
+            return offline_path
         
-        # Create a cache filename based on text and language
-        text_hash = hashlib.md5(text.encode()).hexdigest()
-        cache_filename = f"gtts_{lang}_{text_hash}.mp3"
-        cache_path = os.path.join(self.cache_dir, cache_filename)
+        # Cache key covers text and language
+        cache_key = self._cache_key(text, lang)
         
         # Check if we should use cache
-        if self.use_cache and os.path.exists(cache_path) and os.path.getsize(cache_path) > 0:
-            self.logger.debug(f"Using cached audio for: {text[:20]}...")
-            return cache_path
-        elif not self.use_cache:
+        if use_cache:
+            cache_path = self.audio_cache.get(cache_key)
+            if cache_path:
+                self.logger.debug(f"Using cached audio for: {text[:20]}...")
+                return cache_path
+        else:
             self.logger.info(f"Cache disabled for this request, generating fresh audio")
         
         # Try to generate speech with gTTS if available
@@ -158,18 +142,12 @@ class GTTSFallback:
                 # Generate speech with gTTS
                 tts = gTTS(text=text, lang=lang, slow=False)
                 
-                # Ensure the directory exists
-                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
-                
-                # Save to file
-                tts.save(cache_path)
-                
-                # Verify the file was created successfully
-                if os.path.exists(cache_path) and os.path.getsize(cache_path) > 0:
-                    self.logger.info(f"Successfully generated speech to {cache_path}")
-                    return cache_path
-                else:
-                    self.logger.error(f"gTTS returned empty or missing file at {cache_path}")
+                # Save to the shared cache (written atomically, empty output is rejected)
+                cache_path = self.audio_cache.put_file(
+                    cache_key, "gtts", tts.save, text=text, language=lang
+                )
+                self.logger.info(f"Successfully generated speech to {cache_path}")
+                return cache_path
             
             except Exception as e:
                 self.logger.error(f"gTTS speech generation failed: {str(e)}")
@@ -184,15 +162,6 @@ class GTTSFallback:
         if os.path.exists(lang_fallback) and os.path.getsize(lang_fallback) > 0:
             self.logger.info(f"Using language-specific fallback for {lang}")
             return lang_fallback
-            
-        # Create an empty placeholder file for this request (avoids repeated failures)
-        try:
-            with open(cache_path, 'wb') as f:
-                # Just write an empty file as placeholder
-                f.write(b'')
-            self.logger.warning(f"Created empty placeholder for: {text[:50]}...")
-        except Exception as e:
-            self.logger.error(f"Failed to create placeholder file: {str(e)}")
         
         # Return a default audio file as fallback
         fallback_path = os.path.join(self.cache_dir, "error.mp3")
@@ -203,6 +172,88 @@ class GTTSFallback:
             self._create_static_error_file(fallback_path)
             return fallback_path
     
+    def stream(self, text, voice="default", language=None, chunk_size=8192):
+        """
+        Stream speech from gTTS, teeing the audio into the cache
+        
+        gTTS synthesizes long text in sentence-sized parts; each part is
+        yielded as soon as Google returns it.
+        
+        Returns:
+            iterator: MP3 audio chunks
+        """
+        offline_path = self._offline_response_path(text)
+        if offline_path:
+            return iter_file(offline_path, chunk_size)
+        
+        if not gTTS:
+            raise RuntimeError("gTTS not available for streaming")
+        
+        lang = self._resolve_language(voice, language)
+        tts = gTTS(text=text, lang=lang, slow=False)
+        if hasattr(tts, "stream"):
+            parts = tts.stream()
+        else:
+            # Older gTTS releases only write complete files
+            buffer = io.BytesIO()
+            tts.write_to_fp(buffer)
+            parts = iter([buffer.getvalue()])
+        
+        return self.audio_cache.tee(parts, self._cache_key(text, lang), "gtts", text=text, language=lang)
+    
+    def _resolve_language(self, voice, language=None):
+        """Map an explicit language code, or else the voice name, to a gTTS language"""
+        # Map voice to language if language not explicitly provided
+        if language:
+            # Override with explicit language if provided (e.g., 'ar', 'en')
+            if language.startswith('ar'):
+                lang = 'ar'
+            elif language.startswith('en'):
+                lang = 'en'
+            else:
+                lang = language[:2]  # Use first two chars as language code
+            self.logger.debug(f"Using explicit language override: {lang} from {language}")
+        else:
+            # Handle None or invalid voice values
+            if voice is None or not isinstance(voice, str):
+                lang = "en"  # Default to English
+                self.logger.debug(f"Using default language 'en' for None or invalid voice: {voice}")
+            else:
+                # Otherwise use voice mapping
+                lang = self.languages.get(voice.lower(), "en")
+                self.logger.debug(f"Mapped voice '{voice}' to language: {lang}")
+        return lang
+    
+    def _offline_response_path(self, text):
+        """Pre-generated audio for common phrases (hello, thanks, ...) contained in the text"""
+        text_lower = text.lower().strip()
+        for key, audio_file in self.offline_responses.items():
+            if key in text_lower:
+                offline_path = os.path.join(self.cache_dir, audio_file)
+                if os.path.exists(offline_path) and os.path.getsize(offline_path) > 0:
+                    return offline_path
+        return None
+    
+    def _cache_key(self, text, lang):
+        """Audio cache key for a text and gTTS language"""
+        return self.audio_cache.key("gtts", text, language=lang)
+    
+    def cached_path(self, text, voice="default", language=None):
+        """
+        Return the audio speak() would serve from cache, without synthesizing
+        
+        Returns:
+            str: Path of a non-empty cached or offline response file, or None
+        """
+        if not text:
+            return None
+        offline_path = self._offline_response_path(text)
+        if offline_path:
+            return offline_path
+        if not self.use_cache:
+            return None
+        return self.audio_cache.get(self._cache_key(text, self._resolve_language(voice, language)))
+    
     def _create_static_error_file(self, filepath):
         """Create a static error MP3 file"""
         try:
@@ -1,10 +1,13 @@
 import os
+import itertools
 import logging
 import subprocess
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from .elevenlabs import ElevenLabsTTS
 from .gtts_fallback import GTTSFallback
+from .audio_cache import get_audio_cache, iter_file
 import json
 
 class TTSManager:
@@ -49,16 +52,29 @@ class TTSManager:
             if elevenlabs_api_key and elevenlabs_api_key.startswith('hf_'):
                 self.logger.error(f"Detected a Hugging Face API key (starts with 'hf_') instead of an ElevenLabs key")
             
+        # Both providers store audio in one size-bounded, content-addressed cache
+        self.audio_cache = get_audio_cache(
+            "tts_cache", getattr(config, 'TTS_CACHE_MAX_BYTES', 512 * 1024 * 1024)
+        )
+        
         # Initialize TTS providers (pass key directly to ensure it's used)
-        self.elevenlabs = ElevenLabsTTS(api_key=elevenlabs_api_key)
-        self.gtts = GTTSFallback()
+        self.elevenlabs = ElevenLabsTTS(api_key=elevenlabs_api_key, audio_cache=self.audio_cache)
+        self.gtts = GTTSFallback(audio_cache=self.audio_cache)
         
         # Track which provider to use
         self.use_elevenlabs = False
         self.use_gtts = False
         
-        # Lock for thread safety
-        self.tts_lock = threading.Lock()
+        # Provider calls run on a bounded pool; identical requests in flight
+        # share one synthesis (single-flight) instead of serializing on a lock
+        self.max_workers = getattr(config, 'TTS_MAX_WORKERS', 4)
+        self.synthesis_pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tts")
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self.stats = {"requests": 0, "cache_hits": 0, "coalesced": 0, "synthesized": 0, "streamed": 0}
+        
+        # Coverage report of the last static phrase warm-up (see tts_warmup.py)
+        self.warmup_report = None
     
     def initialize(self):
         """Initialize TTS system"""
@@ -127,7 +143,8 @@ class TTSManager:
             self.use_gtts = True
             return True
     
-    def speak(self, text, voice="default", language=None, profile_manager=None, voice_params=None):
+    def speak(self, text, voice="default", language=None, profile_manager=None, voice_params=None,
+              use_cache=True):
         """
         Synthesize speech from text with the best available provider
         
@@ -138,7 +155,13 @@ class TTSManager:
             profile_manager: Optional profile manager to get voice preferences
             voice_params (dict): Optional voice parameters for emotional tone modulation
                                  (stability, similarity_boost, style, etc.)
+            use_cache (bool): Whether cached audio may be returned
         """
+        return self._speak(text, voice, language, profile_manager, voice_params, use_cache)[0]
+    
+    def _speak(self, text, voice="default", language=None, profile_manager=None, voice_params=None,
+               use_cache=True):
+        """speak() returning (audio_path, cache_hit)"""
         # Create a guaranteed fallback file early
         fallback_path = os.path.join("tts_cache", "error.mp3")
         if not os.path.exists(os.path.dirname(fallback_path)):
@@ -153,7 +176,7 @@ class TTSManager:
             empty_audio = os.path.join("tts_cache", "empty.mp3")
             with open(empty_audio, 'wb') as f:
                 f.write(b'')
-            return empty_audio
+            return empty_audio, False
             
         # If using profile_manager, adapt response style and get voice preference
         if profile_manager:
@@ -195,66 +218,182 @@ class TTSManager:
                 except Exception as e:
                     self.logger.warning(f"Error applying emotional voice settings: {str(e)}")
         
-        with self.tts_lock:
+        self._count("requests")
+        
+        # Cache lookup first: hits never wait for a lock or a pool slot
+        if use_cache:
+            cached_path = self._cached_path(text, voice, voice_params)
+            if cached_path:
+                self._count("cache_hits")
+                self.logger.debug(f"TTS cache hit for: '{text[:30]}...' ({cached_path})")
+                self._play_audio(cached_path)
+                return cached_path, True
+        
+        # Single-flight: identical requests wait for the synthesis already running
+        key = (text, voice, json.dumps(voice_params, sort_keys=True, default=str), use_cache)
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self.synthesis_pool.submit(
+                    self._synthesize, text, voice, voice_params, use_cache, fallback_path
+                )
+                self._inflight[key] = future
+                self.stats["synthesized"] += 1
+            else:
+                self.stats["coalesced"] += 1
+                self.logger.debug(f"Joining in-flight synthesis for: '{text[:30]}...'")
+        
+        if leader:
+            # Registered outside the lock: a future that is already done runs
+            # the callback inline, and _release_inflight takes the lock itself
+            future.add_done_callback(lambda done: self._release_inflight(key, done))
+        
+        try:
+            return future.result(), False
+        except Exception as e:
+            self.logger.error(f"TTS error: {str(e)}")
+            return fallback_path, False
+    
+    def stream_speech(self, text, voice="default", voice_params=None, use_cache=True, chunk_size=8192):
+        """
+        Synthesize speech as a stream of audio chunks
+        
+        Cached audio is streamed from disk. Otherwise the preferred provider
+        streams its output while teeing it into the audio cache; the first
+        chunk is fetched here, so a provider failing before any audio is
+        produced falls back to the next one and finally to speak().
+        
+        Args:
+            text (str): The text to be spoken
+            voice (str): Voice ID or category
+            voice_params (dict): Optional voice parameters for emotional tone modulation
+            use_cache (bool): Whether cached audio may be returned
+            chunk_size (int): Bytes per chunk read from cached files
+        
+        Returns:
+            tuple: (iterator of MP3 chunks, cache_hit)
+        """
+        if use_cache:
+            cached_path = self._cached_path(text, voice, voice_params)
+            if cached_path:
+                self._count("requests")
+                self._count("cache_hits")
+                return iter_file(cached_path, chunk_size), True
+        
+        providers = []
+        if self.use_elevenlabs and self.config.TTS_PROVIDER == "elevenlabs":
+            providers.append(("ElevenLabs", lambda: self.elevenlabs.stream(
+                text, voice, voice_params=voice_params, chunk_size=chunk_size)))
+        if self.use_gtts:
+            providers.append(("gTTS", lambda: self.gtts.stream(text, voice, chunk_size=chunk_size)))
+        
+        for name, start_stream in providers:
             try:
-                self.logger.info(f"Generating speech for text: '{text[:30]}...' with voice: {voice}")
-                
-                # Try ElevenLabs first if available and preferred
-                if self.use_elevenlabs and self.config.TTS_PROVIDER == "elevenlabs":
-                    try:
-                        self.logger.info(f"Using ElevenLabs for: {text[:30]}... (voice: {voice})")
-                        audio_path = self.elevenlabs.speak(text, voice)
-                        if audio_path and os.path.exists(audio_path):
-                            self.logger.info(f"ElevenLabs successfully generated audio: {audio_path}")
-                            self._play_audio(audio_path)
-                            return audio_path
-                        else:
-                            self.logger.warning(f"ElevenLabs returned invalid path: {audio_path}")
-                    except Exception as e:
-                        self.logger.warning(f"ElevenLabs TTS failed, falling back to gTTS: {str(e)}")
-                        import traceback
-                        self.logger.warning(f"ElevenLabs error traceback: {traceback.format_exc()}")
-                
-                # Fall back to gTTS
-                if self.use_gtts:
-                    try:
-                        self.logger.info(f"Using gTTS for: {text[:30]}... (voice: {voice})")
-                        audio_path = self.gtts.speak(text, voice)
-                        if audio_path and os.path.exists(audio_path):
-                            self.logger.info(f"gTTS successfully generated audio: {audio_path}")
-                            self._play_audio(audio_path)
-                            return audio_path
-                        else:
-                            self.logger.warning(f"gTTS returned invalid path: {audio_path}")
-                    except Exception as e:
-                        self.logger.warning(f"gTTS failed: {str(e)}")
-                        import traceback
-                        self.logger.warning(f"gTTS error traceback: {traceback.format_exc()}")
-                
-                # If we reach here, we need to return a fallback
-                self.logger.error("All TTS providers failed, using fallback")
-                
-                # Force gtts to be available in GTTSFallback mode
-                self.gtts.is_available = lambda: True
-                
-                try:
-                    # Try to get a simple cached response
-                    fallback_audio = self.gtts.speak("I'm sorry, I encountered an error.", voice)
-                    if fallback_audio and os.path.exists(fallback_audio):
-                        return fallback_audio
-                except Exception as fallback_e:
-                    self.logger.error(f"Error generating fallback audio: {str(fallback_e)}")
-                
-                # Last resort fallback
-                return fallback_path
-            
+                chunks = start_stream()
+                first_chunk = next(chunks, b"")
+                if first_chunk:
+                    self._count("requests")
+                    self._count("streamed")
+                    self.logger.info(f"Streaming {name} audio for: '{text[:30]}...'")
+                    return itertools.chain([first_chunk], chunks), False
+                self.logger.warning(f"{name} returned an empty audio stream")
             except Exception as e:
-                self.logger.error(f"TTS error: {str(e)}")
-                import traceback
-                self.logger.error(f"TTS error traceback: {traceback.format_exc()}")
-                # Return the fallback path as a last resort
-                return fallback_path
+                self.logger.warning(f"{name} streaming failed: {str(e)}")
+        
+        # No provider could stream: synthesize the complete file instead
+        audio_path, cache_hit = self._speak(text, voice, voice_params=voice_params, use_cache=use_cache)
+        return iter_file(audio_path, chunk_size), cache_hit
+    
+    def get_cache_stats(self):
+        """Request, single-flight and audio cache counters"""
+        with self._inflight_lock:
+            stats = dict(self.stats)
+        stats["audio_cache"] = self.audio_cache.stats()
+        stats["warmup"] = self.warmup_report
+        return stats
+    
+    def _cached_path(self, text, voice, voice_params=None):
+        """Audio the provider chain would serve from cache for this request, or None"""
+        try:
+            if self.use_elevenlabs and self.config.TTS_PROVIDER == "elevenlabs":
+                return self.elevenlabs.cached_path(text, voice, voice_params)
+            if self.use_gtts:
+                return self.gtts.cached_path(text, voice)
+        except Exception as e:
+            self.logger.warning(f"TTS cache lookup failed: {str(e)}")
+        return None
+    
+    def _count(self, name):
+        with self._inflight_lock:
+            self.stats[name] += 1
     
+    def _release_inflight(self, key, future):
+        with self._inflight_lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+    
+    def _synthesize(self, text, voice, voice_params, use_cache, fallback_path):
+        """Run the provider chain (ElevenLabs, then gTTS, then static fallback) on a pool thread"""
+        try:
+            self.logger.info(f"Generating speech for text: '{text[:30]}...' with voice: {voice}")
+            
+            # Try ElevenLabs first if available and preferred
+            if self.use_elevenlabs and self.config.TTS_PROVIDER == "elevenlabs":
+                try:
+                    self.logger.info(f"Using ElevenLabs for: {text[:30]}... (voice: {voice})")
+                    audio_path = self.elevenlabs.speak(text, voice, voice_params=voice_params, use_cache=use_cache)
+                    if audio_path and os.path.exists(audio_path):
+                        self.logger.info(f"ElevenLabs successfully generated audio: {audio_path}")
+                        self._play_audio(audio_path)
+                        return audio_path
+                    else:
+                        self.logger.warning(f"ElevenLabs returned invalid path: {audio_path}")
+                except Exception as e:
+                    self.logger.warning(f"ElevenLabs TTS failed, falling back to gTTS: {str(e)}")
+                    import traceback
+                    self.logger.warning(f"ElevenLabs error traceback: {traceback.format_exc()}")
+            
+            # Fall back to gTTS
+            if self.use_gtts:
+                try:
+                    self.logger.info(f"Using gTTS for: {text[:30]}... (voice: {voice})")
+                    audio_path = self.gtts.speak(text, voice, use_cache=use_cache)
+                    if audio_path and os.path.exists(audio_path):
+                        self.logger.info(f"gTTS successfully generated audio: {audio_path}")
+                        self._play_audio(audio_path)
+                        return audio_path
+                    else:
+                        self.logger.warning(f"gTTS returned invalid path: {audio_path}")
+                except Exception as e:
+                    self.logger.warning(f"gTTS failed: {str(e)}")
+                    import traceback
+                    self.logger.warning(f"gTTS error traceback: {traceback.format_exc()}")
+            
+            # If we reach here, we need to return a fallback
+            self.logger.error("All TTS providers failed, using fallback")
+            
+            # Force gtts to be available in GTTSFallback mode
+            self.gtts.is_available = lambda: True
+            
+            try:
+                # Try to get a simple cached response
+                fallback_audio = self.gtts.speak("I'm sorry, I encountered an error.", voice)
+                if fallback_audio and os.path.exists(fallback_audio):
+                    return fallback_audio
+            except Exception as fallback_e:
+                self.logger.error(f"Error generating fallback audio: {str(fallback_e)}")
+            
+            # Last resort fallback
+            return fallback_path
+        
+        except Exception as e:
+            self.logger.error(f"TTS error: {str(e)}")
+            import traceback
+            self.logger.error(f"TTS error traceback: {traceback.format_exc()}")
+            # Return the fallback path as a last resort
+            return fallback_path
+
     def _play_audio(self, audio_path):
         """Play the audio file (platform-independent)"""
         if not os.path.exists(audio_path):
@@ -303,9 +442,6 @@ class TTSManager:
                 - audio_url: URL to the generated audio file
                 - cache_hit: Whether the result was served from cache
         """
-        # Track if we get a cache hit
-        self.last_was_cache_hit = False
-        
         # If language is specified but voice is default, use the appropriate voice
         if language and voice == "default":
             # Use the language code as the voice identifier if possible
@@ -321,31 +457,20 @@ class TTSManager:
             
             self.logger.info(f"Mapped language '{language}' to voice '{voice}'")
         
-        # Handle cache control
         if not use_cache:
             self.logger.info(f"Cache disabled for TTS request: '{text[:30]}...'")
-            if hasattr(self.elevenlabs, 'disable_cache'):
-                self.elevenlabs.disable_cache()
-            if hasattr(self.gtts, 'disable_cache'):
-                self.gtts.disable_cache()
         
-        # Call the speak method to handle the actual TTS generation
-        audio_path = self.speak(text, voice, language)
+        # Call the speak method to handle the actual TTS generation; cache
+        # control is per call, so concurrent requests do not affect each other
+        audio_path, cache_hit = self._speak(text, voice, language, use_cache=use_cache)
         
         # Convert file path to URL
         base_url = self.config.APP_URL or ""
         audio_url = f"{base_url}/{audio_path}"
         
-        # Re-enable cache for future requests if it was disabled
-        if not use_cache:
-            if hasattr(self.elevenlabs, 'enable_cache'):
-                self.elevenlabs.enable_cache()
-            if hasattr(self.gtts, 'enable_cache'):
-                self.gtts.enable_cache()
-        
         # Return dictionary with results
         return {
             'audio_url': audio_url,
-            'cache_hit': getattr(self, 'last_was_cache_hit', False),
+            'cache_hit': cache_hit,
             'path': audio_path
         }
@@ -0,0 +1,212 @@
+"""
+Background pre-synthesis of the static phrases the app speaks.
+
+Accessibility guidance scripts and greetings are fixed texts, but each one
+used to be synthesized the first time a user reached it, so the first
+visitor of a screen waited for a full TTS round trip. TTSWarmup enumerates
+these utterances per language and runs them through TTSManager with
+bounded concurrency; phrases already in the audio cache cost one index
+lookup, missing ones are synthesized and cached. The last run's coverage
+report is kept on the TTS manager and shown in /status.
+
+Warming at startup is opt-in (TTS_WARMUP_ENABLED): single-flight only
+dedupes within one process, so concurrent cold starts would each pay for
+the same synthesis. Deploys warm the shared cache once instead:
+
+    python tts_warmup.py --languages en,ar      # warm the cache once
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Files TTSManager returns when synthesis failed
+FALLBACK_FILENAMES = ("error.mp3", "empty.mp3")
+
+Utterance = Tuple[str, str, str]  # (text, language, source)
+
+
+def collect_utterances(languages: Iterable[str] = ("en", "ar"), narrator=None,
+                       profile_manager=None) -> List[Utterance]:
+    """
+    Enumerate the static phrases spoken by the accessibility and onboarding flows
+
+    Args:
+        languages: Language codes to collect phrases for
+        narrator: AccessibilityNarrator whose guidance scripts to use (a default one is created if None)
+        profile_manager: Optional ProfileManager for the current user's greetings
+
+    Returns:
+        Distinct (text, language, source) tuples
+    """
+    languages = list(languages)
+    utterances: List[Utterance] = []
+
+    if narrator is None:
+        from accessibility_narrator import AccessibilityNarrator
+        narrator = AccessibilityNarrator()
+    for screen, contexts in narrator.guidance_scripts.items():
+        for context, texts in contexts.items():
+            for language in languages:
+                if texts.get(language):
+                    utterances.append((texts[language], language, f"accessibility:{screen}.{context}"))
+
+    try:
+        from recommendation_engine import RecommendationEngine
+        for language in languages:
+            for greeting in RecommendationEngine.greeting_phrases(language):
+                utterances.append((greeting, language, "contextual_greeting"))
+    except Exception as e:
+        logger.warning(f"Skipping contextual greetings: {str(e)}")
+
+    if profile_manager is not None:
+        for language in languages:
+            try:
+                for greeting in profile_manager.greeting_phrases(language=language):
+                    utterances.append((greeting, language, "profile_greeting"))
+            except Exception as e:
+                logger.warning(f"Skipping profile greetings for {language}: {str(e)}")
+
+    seen = set()
+    distinct = []
+    for text, language, source in utterances:
+        if (text, language) not in seen:
+            seen.add((text, language))
+            distinct.append((text, language, source))
+    return distinct
+
+
+class TTSWarmup:
+    """Synthesizes missing static utterances through TTSManager with bounded concurrency"""
+
+    def __init__(self, tts_manager, max_workers: int = 2):
+        """
+        Args:
+            tts_manager: Initialized TTSManager
+            max_workers: Phrases synthesized at the same time at most
+        """
+        self.tts_manager = tts_manager
+        self.max_workers = max(1, max_workers)
+
+    def run(self, utterances: List[Utterance]) -> Dict[str, Any]:
+        """
+        Make sure every utterance is in the audio cache
+
+        Returns:
+            dict: Coverage report (totals, per-language counts and failures)
+        """
+        start_time = time.time()
+        report = {
+            "total": len(utterances),
+            "already_cached": 0,
+            "synthesized": 0,
+            "failed": 0,
+            "by_language": {},
+            "failures": [],
+        }
+        lock = threading.Lock()
+
+        def warm(utterance: Utterance):
+            text, language, source = utterance
+            try:
+                result = self.tts_manager.generate_tts(text, language=language)
+                path = result.get("path")
+                ok = bool(path) and os.path.basename(path) not in FALLBACK_FILENAMES \
+                    and os.path.exists(path) and os.path.getsize(path) > 0
+                outcome = "already_cached" if ok and result.get("cache_hit") else "synthesized" if ok else "failed"
+            except Exception as e:
+                logger.warning(f"TTS warm-up failed for {source}: {str(e)}")
+                outcome = "failed"
+
+            with lock:
+                report[outcome] += 1
+                counts = report["by_language"].setdefault(language, {"total": 0, "covered": 0})
+                counts["total"] += 1
+                if outcome == "failed":
+                    report["failures"].append({"source": source, "language": language, "text": text[:60]})
+                else:
+                    counts["covered"] += 1
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tts-warmup") as pool:
+            list(pool.map(warm, utterances))
+
+        covered = report["already_cached"] + report["synthesized"]
+        report["coverage"] = covered / report["total"] if report["total"] else 1.0
+        report["elapsed_seconds"] = round(time.time() - start_time, 2)
+        report["completed_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+        self.tts_manager.warmup_report = report
+        logger.info(
+            f"TTS warm-up: {covered}/{report['total']} phrases cached "
+            f"({report['synthesized']} synthesized, {report['failed']} failed) in {report['elapsed_seconds']}s"
+        )
+        return report
+
+
+def warm_tts_cache(tts_manager, config=None, narrator=None, profile_manager=None) -> Optional[Dict[str, Any]]:
+    """Collect and warm the static utterances using the TTS_WARMUP_* settings (off unless TTS_WARMUP_ENABLED)"""
+    if not getattr(config, 'TTS_WARMUP_ENABLED', False):
+        logger.info("TTS warm-up disabled")
+        return None
+
+    languages = getattr(config, 'TTS_WARMUP_LANGUAGES', ["en", "ar"])
+    max_workers = getattr(config, 'TTS_WARMUP_WORKERS', 2)
+    try:
+        utterances = collect_utterances(languages, narrator=narrator, profile_manager=profile_manager)
+        return TTSWarmup(tts_manager, max_workers).run(utterances)
+    except Exception as e:
+        logger.error(f"TTS warm-up failed: {str(e)}")
+        return None
+
+
+def start_background_warmup(tts_manager, config=None, narrator=None, profile_manager=None) -> threading.Thread:
+    """Run warm_tts_cache on a daemon thread"""
+    thread = threading.Thread(
+        target=warm_tts_cache,
+        args=(tts_manager, config, narrator, profile_manager),
+        name="tts-warmup",
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+def main():
+    """Warm the TTS cache once from the command line"""
+    parser = argparse.ArgumentParser(description="Pre-synthesize the Mashaaer static TTS phrases")
+    parser.add_argument("--languages", default="en,ar", help="Comma-separated language codes")
+    parser.add_argument("--workers", type=int, default=2, help="Phrases synthesized concurrently")
+    parser.add_argument("--list", action="store_true", help="Only list the phrases")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    utterances = collect_utterances(args.languages.split(","))
+    if args.list:
+        for text, language, source in utterances:
+            print(f"{language}\t{source}\t{text}")
+        return 0
+
+    from config import Config
+    from tts.tts_manager import TTSManager
+
+    tts_manager = TTSManager(Config())
+    tts_manager.initialize()
+    report = TTSWarmup(tts_manager, args.workers).run(utterances)
+
+    print("\n=== TTS Warm-up ===")
+    print(f"Phrases: {report['total']}, already cached: {report['already_cached']}, "
+          f"synthesized: {report['synthesized']}, failed: {report['failed']}")
+    print(f"Coverage: {report['coverage']:.1%} in {report['elapsed_seconds']}s")
+    tts_manager.synthesis_pool.shutdown(wait=True)
+    return 0 if report["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())